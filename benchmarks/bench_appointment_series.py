@@ -0,0 +1,105 @@
+# benchmarks/bench_appointment_series.py
+# ============================================================
+# BENCHMARK: Terminserien, lazy expandiert (utils/appointment_series.py)
+# ------------------------------------------------------------
+# Legt S Serien pro Arzt an (wöchentlich, Mo+Do, 5 Jahre, Zeitzone
+# Europe/Berlin) und misst occurrences_in_window() für eine
+# Kalenderwoche eines Arztes
+#   - am Anfang, in der Mitte und am Ende der Serien
+# Erwartung: konstante Kosten, unabhängig davon, wie viele Termine
+# der Serie vor dem Fenster liegen.
+#
+# Zum Vergleich: Zeilen, die materialisierte Termine in appointments
+# bräuchten.
+#
+# Aufruf:
+#   python benchmarks/bench_appointment_series.py --doctors 1000 --series 20
+# ============================================================
+
+import argparse
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent / "src"
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from database.migrate import migrate  # noqa: E402
+from utils.appointment_series import occurrences_in_window  # noqa: E402
+from utils.recurrence import expand, format_date  # noqa: E402
+
+EPOCH = datetime(2026, 1, 5, 7, 0)   # Montag
+YEARS = 5
+
+
+def fill(conn, doctors: int, series_per_doctor: int) -> int:
+    conn.executemany(
+        "INSERT INTO users (username, password, role) VALUES (?, 'x', 'doctor')",
+        ((f"doctor{i}",) for i in range(doctors))
+    )
+    conn.execute("INSERT INTO patients (first_name, last_name, birthdate, mrn) VALUES ('F', 'L', '1980-01-01', 'M')")
+
+    until = EPOCH + timedelta(days=365 * YEARS)
+    per_series = len(expand(EPOCH, "weekly", 1, until=until, by_weekday=["MO", "TH"],
+                            timezone_name="Europe/Berlin", limit=10_000))
+    rows = []
+    for doctor in range(1, doctors + 1):
+        for slot in range(series_per_doctor):
+            start = EPOCH + timedelta(minutes=30 * slot)
+            rows.append((
+                1, doctor, format_date(start), 30, "weekly", 1, None, format_date(until), "MO,TH", "Europe/Berlin",
+                "Physio", format_date(start), format_date(until + timedelta(minutes=30 * slot + 30)), ""
+            ))
+    conn.executemany(
+        """
+        INSERT INTO appointment_series (
+            patient_id, doctor_id, date, duration_minutes, frequency, interval, count, until,
+            by_weekday, timezone, description, span_start, span_end, created_at
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        rows
+    )
+    conn.commit()
+    return per_series * len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lazy appointment series expansion")
+    parser.add_argument("--doctors", type=int, default=1_000)
+    parser.add_argument("--series", type=int, default=20, help="series per doctor")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    path = Path(tempfile.mkdtemp(prefix="bench_appointment_series_")) / "healthcare.db"
+    migrate(path)
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+
+    start = time.perf_counter()
+    materialized = fill(conn, args.doctors, args.series)
+    print(f"[+] {args.doctors * args.series:,} series in {time.perf_counter() - start:.1f} s "
+          f"(would be {materialized:,} appointment rows)\n")
+
+    print(f"{'window':<18} {'median ms':>10} {'appointments':>13}")
+    for label, offset_days in (("first week", 0), ("after 2.5 years", 365 * YEARS // 2), ("last week", 365 * YEARS - 7)):
+        week = EPOCH.replace(hour=0) + timedelta(days=offset_days)
+        timings, found = [], 0
+        for _ in range(args.repeat):
+            doctor = rng.randint(1, args.doctors)
+            begin = time.perf_counter()
+            found = len(occurrences_in_window(conn, week, week + timedelta(days=7), doctor_id=doctor))
+            timings.append((time.perf_counter() - begin) * 1000)
+        print(f"{label:<18} {statistics.median(timings):>10.3f} {found:>13}")
+
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
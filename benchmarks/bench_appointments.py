@@ -0,0 +1,163 @@
+# benchmarks/bench_appointments.py
+# ============================================================
+# BENCHMARK: Terminkalender + Konfliktprüfung (api/appointments.py)
+# ------------------------------------------------------------
+# Erzeugt N Termine (Standard 10M) für 1k Ärzte über 5 Jahre und misst:
+#   calendar week       : GET /appointments?doctor_id=&from=&to=
+#   calendar (no index) : dieselbe Abfrage mit NOT INDEXED (Full Scan)
+#   conflict bounded    : find_conflict() – Range ab start - maximale Dauer
+#   conflict unbounded  : naive Überschneidungsprüfung über die gesamte
+#                         Historie des Arztes (date < end AND end_date > start)
+#
+# Die Termine werden per rekursivem CTE in SQLite erzeugt (Trigger und
+# Indizes sind aktiv, wie im Betrieb); 10M dauern einige Minuten.
+#
+# Aufruf:
+#   python benchmarks/bench_appointments.py --appointments 10000000 --doctors 1000
+# ============================================================
+
+import argparse
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent / "src"
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from database.migrate import migrate  # noqa: E402
+from utils.validation_new import APPOINTMENT_MAX_DURATION_MINUTES  # noqa: E402
+
+DATE_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+EPOCH = datetime(2022, 1, 1)
+SLOTS = 5 * 365 * 24 * 4   # 15-Minuten-Raster über 5 Jahre
+
+CALENDAR = """
+    SELECT id, patient_id, doctor_id, date, end_date, description
+    FROM appointments {hint}
+    WHERE doctor_id = ? AND date >= ? AND end_date > ? AND date < ?
+    ORDER BY date, id
+    LIMIT 500
+"""
+
+CONFLICT_BOUNDED = """
+    SELECT id, date, end_date FROM appointments
+    WHERE doctor_id = ? AND date >= ? AND date < ? AND end_date > ?
+    ORDER BY date LIMIT 1
+"""
+
+# Ohne untere Grenze: liest alle früheren Termine des Arztes
+CONFLICT_UNBOUNDED = """
+    SELECT id, date, end_date FROM appointments
+    WHERE doctor_id = ? AND date < ? AND end_date > ?
+    ORDER BY date LIMIT 1
+"""
+
+
+def fmt(value: datetime) -> str:
+    return value.strftime(DATE_FORMAT)
+
+
+def fill(conn, appointments: int, doctors: int):
+    conn.executemany(
+        "INSERT INTO users (username, password, role) VALUES (?, 'x', 'doctor')",
+        ((f"doctor{i}",) for i in range(doctors))
+    )
+    conn.execute("INSERT INTO patients (first_name, last_name, birthdate, mrn) VALUES ('F', 'L', '1980-01-01', 'M')")
+    conn.execute(
+        """
+        -- MATERIALIZED: random() genau einmal pro Zeile (date und end_date aus demselben slot)
+        WITH RECURSIVE seq(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM seq WHERE i < ?),
+        slots AS MATERIALIZED (
+            SELECT 1 + abs(random()) % ? AS doctor_id, abs(random()) % ? AS slot FROM seq
+        )
+        INSERT INTO appointments (patient_id, doctor_id, date, end_date, description)
+        SELECT 1, doctor_id,
+               strftime('%Y-%m-%dT%H:%M:%SZ', ?, '+' || (slot * 15) || ' minutes'),
+               strftime('%Y-%m-%dT%H:%M:%SZ', ?, '+' || (slot * 15 + 30) || ' minutes'),
+               'Check'
+        FROM slots
+        """,
+        (appointments, doctors, SLOTS, EPOCH.isoformat(), EPOCH.isoformat())
+    )
+    conn.commit()
+
+
+def measure(conn, sql, params_fn, repeat) -> float:
+    timings = []
+    for _ in range(repeat):
+        params = params_fn()
+        start = time.perf_counter()
+        conn.execute(sql, params).fetchall()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Appointment calendar and conflict detection")
+    parser.add_argument("--appointments", type=int, default=10_000_000)
+    parser.add_argument("--doctors", type=int, default=1_000)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--scan-repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    path = Path(tempfile.mkdtemp(prefix="bench_appointments_")) / "healthcare.db"
+    migrate(path)
+
+    conn = sqlite3.connect(path)
+    print(f"[*] Generating {args.appointments:,} appointments for {args.doctors:,} doctors...")
+    start = time.perf_counter()
+    fill(conn, args.appointments, args.doctors)
+    print(f"[+] Done in {time.perf_counter() - start:.1f} s "
+          f"({args.appointments / args.doctors:,.0f} appointments per doctor)\n")
+
+    max_duration = timedelta(minutes=APPOINTMENT_MAX_DURATION_MINUTES)
+
+    def random_week():
+        week_start = EPOCH + timedelta(days=rng.randrange(5 * 365 - 7))
+        week_end = week_start + timedelta(days=7)
+        return (rng.randint(1, args.doctors), fmt(week_start - max_duration), fmt(week_start), fmt(week_end))
+
+    def random_slot():
+        # Neuer Termin gegen Ende des Zeitraums (typisch: in der Zukunft)
+        start = EPOCH + timedelta(minutes=15 * rng.randrange(SLOTS - SLOTS // 10, SLOTS))
+        return rng.randint(1, args.doctors), start, start + timedelta(minutes=30)
+
+    def bounded():
+        doctor, start, end = random_slot()
+        return doctor, fmt(start - max_duration), fmt(end), fmt(start)
+
+    def unbounded():
+        doctor, start, end = random_slot()
+        return doctor, fmt(end), fmt(start)
+
+    results = [
+        ("calendar week", measure(conn, CALENDAR.format(hint=""), random_week, args.repeat)),
+        ("calendar week (no index)", measure(conn, CALENDAR.format(hint="NOT INDEXED"), random_week, args.scan_repeat)),
+        ("conflict check (bounded)", measure(conn, CONFLICT_BOUNDED, bounded, args.repeat)),
+        ("conflict check (unbounded)", measure(conn, CONFLICT_UNBOUNDED, unbounded, args.repeat)),
+    ]
+
+    print(f"{'query':<28} {'median ms':>10}")
+    for label, ms in results:
+        print(f"{label:<28} {ms:>10.3f}")
+
+    print()
+    for label, sql, params in (
+        ("calendar", CALENDAR.format(hint=""), random_week()),
+        ("conflict (bounded)", CONFLICT_BOUNDED, bounded()),
+    ):
+        plan = " | ".join(row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params))
+        print(f"{label}: {plan}")
+
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
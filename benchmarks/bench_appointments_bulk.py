@@ -0,0 +1,105 @@
+# benchmarks/bench_appointments_bulk.py
+# ============================================================
+# BENCHMARK: Sammelanlage von Terminen (POST /appointments/bulk)
+# ------------------------------------------------------------
+# Legt N Termine über den Flask-Test-Client (ohne Netzwerk) an:
+#   single     : N x POST /appointments/create (Patientenprüfung,
+#                Commit und Audit-Eintrag pro Termin)
+#   bulk list  : 1 x POST /appointments/bulk mit N Einträgen
+#   bulk rrule : 1 x POST /appointments/bulk mit einer Serie (count=N)
+#
+# Jede Runde bucht in einem eigenen, freien Zeitfenster.
+#
+# Aufruf:
+#   python benchmarks/bench_appointments_bulk.py --appointments 1000
+# ============================================================
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent / "src"
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import database  # noqa: E402
+from database import db  # noqa: E402
+import config  # noqa: E402
+
+SLOT_MINUTES = 15
+
+
+def prepare_database():
+    path = Path(tempfile.mkdtemp(prefix="bench_appointments_bulk_")) / "healthcare.db"
+    db.DB_PATH = path
+    database.DB_PATH = path
+    database.init_db()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk appointment creation")
+    parser.add_argument("--appointments", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    os.environ.setdefault("PASSWORD_HASH_WORKERS", "0")
+    config.Config.PASSWORD_HASH_WORKERS = 0
+    config.Config.APPOINTMENTS_BULK_MAX_OCCURRENCES = max(args.appointments, 1000)
+    prepare_database()
+
+    from app import create_app
+    app = create_app()
+    client = app.test_client()
+    token = client.post("/login", json={"username": "doctor1", "password": "Doctor123!"}).get_json()["token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    n = args.appointments
+    window = timedelta(minutes=SLOT_MINUTES * n)
+    next_start = [datetime.utcnow().replace(microsecond=0) + timedelta(days=30)]
+
+    def items():
+        start = next_start[0]
+        next_start[0] += window
+        return [
+            {"patient_id": 1, "date": (start + timedelta(minutes=SLOT_MINUTES * i)).isoformat(),
+             "duration_minutes": SLOT_MINUTES, "description": "Vaccination"}
+            for i in range(n)
+        ]
+
+    def single():
+        for item in items():
+            assert client.post("/appointments/create", json=item, headers=headers).status_code == 201
+
+    def bulk_list():
+        response = client.post("/appointments/bulk", json={"appointments": items()}, headers=headers)
+        assert response.status_code == 201, response.get_json()
+
+    def bulk_rrule():
+        first = items()[0]
+        first["recurrence"] = {"frequency": "minutely", "interval": SLOT_MINUTES, "count": n}
+        response = client.post("/appointments/bulk", json={"appointments": [first]}, headers=headers)
+        assert response.status_code == 201, response.get_json()
+
+    modes = {"single": single, "bulk list": bulk_list, "bulk rrule": bulk_rrule}
+    results = {label: [] for label in modes}
+    for _ in range(args.rounds):
+        for label, fn in modes.items():
+            start = time.perf_counter()
+            fn()
+            results[label].append(time.perf_counter() - start)
+
+    baseline = statistics.median(results["single"])
+    print(f"{n:,} appointments per run, median of {args.rounds} rounds\n")
+    print(f"{'mode':<12} {'total ms':>10} {'appts/s':>10} {'speedup':>8}")
+    for label, values in results.items():
+        median = statistics.median(values)
+        print(f"{label:<12} {median * 1000:>10.1f} {n / median:>10,.0f} {baseline / median:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+# benchmarks/bench_conditional_get.py
+# ============================================================
+# BENCHMARK: Bedingte GETs (utils/etag.py)
+# ------------------------------------------------------------
+# Requests/s über den Flask-Test-Client (ohne Netzwerk) für
+#   GET /patient/1 und GET /fhir/Patient/1
+# jeweils
+#   full : ohne If-None-Match (Zeile laden + serialisieren, 200)
+#   304  : If-None-Match mit aktuellem ETag (nur Versions-Lookup)
+#
+# Aufruf:
+#   python benchmarks/bench_conditional_get.py --requests 5000
+# ============================================================
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent / "src"
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import database  # noqa: E402
+from database import db  # noqa: E402
+import config  # noqa: E402
+
+
+def prepare_database():
+    path = Path(tempfile.mkdtemp(prefix="bench_conditional_get_")) / "healthcare.db"
+    db.DB_PATH = path
+    database.DB_PATH = path
+    database.init_db()
+
+
+def rate(client, path: str, headers: dict, requests: int, expected: int) -> float:
+    assert client.get(path, headers=headers).status_code == expected
+    start = time.perf_counter()
+    for _ in range(requests):
+        client.get(path, headers=headers)
+    return requests / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Conditional GET throughput")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    os.environ.setdefault("PASSWORD_HASH_WORKERS", "0")
+    config.Config.PASSWORD_HASH_WORKERS = 0
+    prepare_database()
+
+    from app import create_app
+    app = create_app()
+    client = app.test_client()
+    token = client.post("/login", json={"username": "doctor1", "password": "Doctor123!"}).get_json()["token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    print(f"{'endpoint':<18} {'full req/s':>11} {'304 req/s':>11} {'speedup':>8}")
+    for path in ("/patient/1", "/fhir/Patient/1"):
+        etag = client.get(path, headers=headers).headers["ETag"]
+        conditional = {**headers, "If-None-Match": etag}
+
+        full, cached = [], []
+        for _ in range(args.rounds):
+            full.append(rate(client, path, headers, args.requests, 200))
+            cached.append(rate(client, path, conditional, args.requests, 304))
+        full, cached = statistics.median(full), statistics.median(cached)
+        print(f"{path:<18} {full:>11,.0f} {cached:>11,.0f} {cached / full:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+# benchmarks/bench_login_burst.py
+# ============================================================
+# BENCHMARK: Login-Burst (Schichtwechsel) + parallele Lesezugriffe
+# ------------------------------------------------------------
+# Simuliert einen Server mit fester Anzahl Request-Worker
+# (--request-workers) und schickt gemischten Traffic:
+#   --logins  POST /login     (PBKDF2, 200.000 Iterationen)
+#   --reads   GET /patient/1  (klinischer Lesezugriff)
+#
+# Modi:
+#   inline : PASSWORD_HASH_WORKERS=0 (Hashing im Request-Worker)
+#   pool   : begrenzter Prozess-Pool, Überlast -> 503 + Retry-After
+#
+# Gemessen wird die Latenz ab Eingang in die Warteschlange
+# (inkl. Wartezeit auf einen freien Request-Worker).
+#
+# Aufruf:
+#   python benchmarks/bench_login_burst.py --logins 200 --reads 400
+# ============================================================
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent / "src"
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import database  # noqa: E402
+from database import db  # noqa: E402
+
+
+def prepare_database():
+    path = Path(tempfile.mkdtemp(prefix="bench_login_")) / "healthcare.db"
+    db.DB_PATH = path
+    database.DB_PATH = path
+    database.init_db()
+
+
+
+def percentile(values, pct) -> float:
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def run(app, args, mode: str) -> dict:
+    from utils.password_pool import configure_password_pool
+
+    app.config["PASSWORD_HASH_WORKERS"] = 0 if mode == "inline" else args.hash_workers
+    app.config["PASSWORD_HASH_MAX_PENDING"] = args.max_pending
+    configure_password_pool(app.config)
+
+    client = app.test_client()
+    token = client.post("/login", json={"username": "doctor1", "password": "Doctor123!"}).get_json()["token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    def login():
+        start = time.perf_counter()
+        response = client.post("/login", json={"username": "nurse1", "password": "Nurse123!"})
+        return "login", response.status_code, time.perf_counter() - start
+
+    def read(submitted):
+        response = client.get("/patient/1", headers=headers)
+        return "read", response.status_code, time.perf_counter() - submitted
+
+    # Logins zuerst (Burst um 07:00), Lesezugriffe gleichmäßig dazwischen
+    jobs = ["login"] * args.logins
+    step = max(1, len(jobs) // max(1, args.reads))
+    for i in range(args.reads):
+        jobs.insert(min(len(jobs), i * (step + 1)), "read")
+
+    results = []
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.request_workers) as workers:
+        futures = []
+        for job in jobs:
+            if job == "read":
+                futures.append(workers.submit(read, time.perf_counter()))
+            else:
+                futures.append(workers.submit(login))
+        for future in futures:
+            results.append(future.result())
+    elapsed = time.perf_counter() - started
+
+    reads = [t * 1000 for kind, status, t in results if kind == "read" and status == 200]
+    logins = [(status, t) for kind, status, t in results if kind == "login"]
+    return {
+        "read_p50": percentile(reads, 50),
+        "read_p95": percentile(reads, 95),
+        "read_max": max(reads) if reads else float("nan"),
+        "login_ok": sum(1 for status, _ in logins if status == 200),
+        "login_503": sum(1 for status, _ in logins if status == 503),
+        "login_p50": statistics.median(t * 1000 for status, t in logins if status == 200) if logins else float("nan"),
+        "elapsed": elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mixed login burst + read traffic")
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--reads", type=int, default=400)
+    parser.add_argument("--request-workers", type=int, default=8)
+    parser.add_argument("--hash-workers", type=int, default=max(1, (os.cpu_count() or 2) // 2))
+    parser.add_argument("--max-pending", type=int, default=2)
+    parser.add_argument("--modes", nargs="+", default=["inline", "pool"], choices=["inline", "pool"])
+    args = parser.parse_args()
+
+    os.environ.setdefault("AUDIT_LOG_MODE", "batched")
+    prepare_database()
+
+    from app import create_app
+    app = create_app()
+
+    print(f"{'mode':>8} {'read p50 ms':>12} {'read p95 ms':>12} {'read max ms':>12} "
+          f"{'login ok':>9} {'login 503':>10} {'login p50 ms':>13} {'total s':>8}")
+    for mode in args.modes:
+        r = run(app, args, mode)
+        print(f"{mode:>8} {r['read_p50']:>12.1f} {r['read_p95']:>12.1f} {r['read_max']:>12.1f} "
+              f"{r['login_ok']:>9} {r['login_503']:>10} {r['login_p50']:>13.1f} {r['elapsed']:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+# benchmarks/bench_metrics_overhead.py
+# ============================================================
+# BENCHMARK: Overhead der Instrumentierung (utils/metrics.py)
+# ------------------------------------------------------------
+# Misst Requests/s für GET /patient/1 und GET /search über den
+# Flask-Test-Client (ohne Netzwerk), jeweils mit
+#   off     : METRICS_ENABLED=0
+#   metrics : Histogramme + Query-Listener
+#   timing  : zusätzlich Server-Timing-Header
+#
+# End-to-End-Werte schwanken auf geteilten Maschinen stark; daher
+# zusätzlich die direkt gemessenen Kosten der Hooks pro Request
+# (before/after_request + Query-Listener + Audit-Timing).
+#
+# Aufruf:
+#   python benchmarks/bench_metrics_overhead.py --requests 5000
+# ============================================================
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent / "src"
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import database  # noqa: E402
+from database import db  # noqa: E402
+import config  # noqa: E402
+
+MODES = {
+    "off": {"METRICS_ENABLED": False, "SERVER_TIMING_ENABLED": False},
+    "metrics": {"METRICS_ENABLED": True, "SERVER_TIMING_ENABLED": False},
+    "timing": {"METRICS_ENABLED": True, "SERVER_TIMING_ENABLED": True},
+}
+
+
+def prepare_database():
+    path = Path(tempfile.mkdtemp(prefix="bench_metrics_")) / "healthcare.db"
+    db.DB_PATH = path
+    database.DB_PATH = path
+    database.init_db()
+
+
+
+def run(mode: str, paths, requests: int) -> float:
+    # Hooks werden in create_app() registriert -> pro Modus eine eigene App
+    for key, value in MODES[mode].items():
+        setattr(config.Config, key, value)
+
+    from app import create_app
+    app = create_app()
+    client = app.test_client()
+
+    token = client.post("/login", json={"username": "doctor1", "password": "Doctor123!"}).get_json()["token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    for path in paths:   # Aufwärmen (Session-Cache, Pool)
+        client.get(path, headers=headers)
+
+    start = time.perf_counter()
+    for i in range(requests):
+        client.get(paths[i % len(paths)], headers=headers)
+    return requests / (time.perf_counter() - start)
+
+
+def hook_cost_us(queries_per_request: int, iterations: int = 20000) -> float:
+    """Mikrosekunden Instrumentierung pro Request (Modus "timing")."""
+    from flask import Response
+    from utils import metrics
+
+    for key, value in MODES["timing"].items():
+        setattr(config.Config, key, value)
+    from app import create_app
+    app = create_app()
+
+    before = next(f for f in app.before_request_funcs[None] if f.__name__ == "_start_timer")
+    after = next(f for f in app.after_request_funcs[None] if f.__name__ == "_record_request")
+    response = Response("{}")
+
+    with app.test_request_context("/patient/1"):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            before()
+            for _ in range(queries_per_request):
+                metrics._on_query("SELECT 1", (), 0.0001)
+            metrics.record_timing("audit", 0.00001, "audit_log_duration_seconds", (("mode", "batched"),))
+            after(response)
+        return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Instrumentation overhead")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    os.environ.setdefault("PASSWORD_HASH_WORKERS", "0")
+    config.Config.PASSWORD_HASH_WORKERS = 0
+    prepare_database()
+
+    paths = ["/patient/1", "/search?q=Mus"]
+    results = {mode: [] for mode in MODES}
+
+    # Runden abwechseln, damit Drift (Cache, Turbo) alle Modi gleich trifft
+    for _ in range(args.rounds):
+        for mode in MODES:
+            results[mode].append(run(mode, paths, args.requests))
+
+    baseline = statistics.median(results["off"])
+    print(f"{'mode':>8} {'median req/s':>13} {'vs off':>8}")
+    for mode, values in results.items():
+        median = statistics.median(values)
+        print(f"{mode:>8} {median:>13,.0f} {(median / baseline - 1) * 100:>+7.1f}%")
+
+    print()
+    for queries in (1, 5, 20):
+        cost = hook_cost_us(queries)
+        print(f"hook cost with {queries:>2} SQL statements: {cost:6.1f} us/request "
+              f"({cost / (1e6 / baseline) * 100:.2f}% of an average request)")
+
+
+if __name__ == "__main__":
+    main()
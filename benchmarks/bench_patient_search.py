@@ -0,0 +1,124 @@
+# benchmarks/bench_patient_search.py
+# ============================================================
+# BENCHMARK: Patientensuche LIKE '%q%' vs. FTS5-Trigram-Index
+# ------------------------------------------------------------
+# Erzeugt synthetische Patienten (10k / 100k / 1M; jeder zehnte mit
+# Nachname "Schmidt...") und misst pro Seite (20 Treffer)
+#   LIKE     : alte Abfrage (Scan über alle Zeilen)
+#   FTS5     : erste Seite aus api/search.py (bm25-rank, Keyset (rank, id))
+#   page 2   : Folgeseite mit dem Cursor der ersten Seite
+# für zufällige, selektive Trigramme und für die breite Suche "schmidt"
+# (10 % der Zeilen; der Index bewertet alle Treffer, die Antwort bleibt
+# eine Seite).
+#
+# Aufruf:
+#   python benchmarks/bench_patient_search.py --sizes 10000 100000 1000000
+# ============================================================
+
+import argparse
+import random
+import sqlite3
+import statistics
+import string
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent / "src"
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from database.migrate import migrate  # noqa: E402
+
+LIKE_QUERY = """
+    SELECT id, first_name, last_name
+    FROM patients
+    WHERE first_name LIKE ? OR last_name LIKE ?
+"""
+
+FTS_QUERY = """
+    SELECT rowid AS id, first_name, last_name, rank
+    FROM patients_fts
+    WHERE patients_fts MATCH ?
+    AND (rank, rowid) > (?, ?)
+    ORDER BY rank, rowid
+    LIMIT 21
+"""
+
+COUNT_QUERY = "SELECT COUNT(*) FROM patients_fts WHERE patients_fts MATCH ?"
+
+BROAD_QUERY = "schmidt"
+
+
+def random_name(rng) -> str:
+    return rng.choice(string.ascii_uppercase) + "".join(
+        rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 9))
+    )
+
+
+def build_database(size: int, rng) -> sqlite3.Connection:
+    path = Path(tempfile.mkdtemp(prefix="bench_search_")) / "healthcare.db"
+    migrate(path)
+    conn = sqlite3.connect(path)
+    conn.executemany(
+        "INSERT INTO patients (first_name, last_name, birthdate, mrn) VALUES (?, ?, ?, ?)",
+        (
+            (random_name(rng), "Schmidt" + random_name(rng).lower() if i % 10 == 0 else random_name(rng),
+             "1980-01-01", f"MRN-{i:08d}")
+            for i in range(size)
+        )
+    )
+    conn.commit()
+    return conn
+
+
+def measure(conn, sql, params, repeat) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        conn.execute(sql, params).fetchall()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def second_page(conn, phrase):
+    """Parameter der Folgeseite (Cursor = letzte Zeile der ersten Seite)."""
+    rows = conn.execute(FTS_QUERY, (phrase, float("-inf"), 0)).fetchall()
+    last = rows[min(len(rows), 20) - 1] if rows else (0, None, None, float("-inf"))
+    return phrase, last[3], last[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Patient search: LIKE scan vs. FTS5 trigram index")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+
+    print(f"{'patients':>10} {'query':>10} {'LIKE ms':>9} {'FTS5 ms':>9} {'page 2 ms':>10} {'matches':>8}")
+    for size in args.sizes:
+        conn = build_database(size, rng)
+
+        like_ms, fts_ms, next_ms = [], [], []
+        for _ in range(args.queries):
+            q = random_name(rng)[1:4]
+            phrase = f'"{q}"'
+            like_ms.append(measure(conn, LIKE_QUERY, (f"%{q}%", f"%{q}%"), args.repeat))
+            fts_ms.append(measure(conn, FTS_QUERY, (phrase, float("-inf"), 0), args.repeat))
+            next_ms.append(measure(conn, FTS_QUERY, second_page(conn, phrase), args.repeat))
+        print(f"{size:>10} {'random':>10} {statistics.median(like_ms):>9.2f} {statistics.median(fts_ms):>9.2f} "
+              f"{statistics.median(next_ms):>10.2f} {'':>8}")
+
+        like, phrase = f"%{BROAD_QUERY}%", f'"{BROAD_QUERY}"'
+        matches = conn.execute(COUNT_QUERY, (phrase,)).fetchone()[0]
+        print(f"{size:>10} {BROAD_QUERY:>10} {measure(conn, LIKE_QUERY, (like, like), args.repeat):>9.2f} "
+              f"{measure(conn, FTS_QUERY, (phrase, float('-inf'), 0), args.repeat):>9.2f} "
+              f"{measure(conn, FTS_QUERY, second_page(conn, phrase), args.repeat):>10.2f} {matches:>8}")
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
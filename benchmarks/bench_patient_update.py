@@ -0,0 +1,93 @@
+# benchmarks/bench_patient_update.py
+# ============================================================
+# BENCHMARK: Patienten-Update (POST /patient/update)
+# ------------------------------------------------------------
+# Vergleicht auf Datenbankebene (database.db, WAL, Verbindungspool)
+#   two-step : SELECT id (fetch_one) + UPDATE (execute), zwei
+#              Verbindungen/Transaktionen, ohne Versionsprüfung
+#   returning: EIN bedingtes UPDATE ... WHERE id = ? AND version = ?
+#              RETURNING in write_transaction (wie update_patient)
+# plus Requests/s des Endpoints über den Flask-Test-Client.
+#
+# Aufruf:
+#   python benchmarks/bench_patient_update.py --updates 5000
+# ============================================================
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent / "src"
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import database  # noqa: E402
+from database import db  # noqa: E402
+import config  # noqa: E402
+
+
+def prepare_database():
+    path = Path(tempfile.mkdtemp(prefix="bench_patient_update_")) / "healthcare.db"
+    db.DB_PATH = path
+    database.DB_PATH = path
+    database.init_db()
+
+
+def two_step(updates: int) -> float:
+    start = time.perf_counter()
+    for i in range(updates):
+        if db.fetch_one("SELECT id FROM patients WHERE id = ?", (1,)) is not None:
+            db.execute("UPDATE patients SET diagnosis = ?, version = version + 1 WHERE id = ?", (f"d{i}", 1))
+    return updates / (time.perf_counter() - start)
+
+
+def returning(updates: int) -> float:
+    version = db.fetch_one("SELECT version FROM patients WHERE id = ?", (1,))["version"]
+    start = time.perf_counter()
+    for i in range(updates):
+        with db.write_transaction() as conn:
+            row = conn.execute(
+                "UPDATE patients SET diagnosis = ?, version = version + 1 WHERE id = ? AND version = ? RETURNING version",
+                (f"d{i}", 1, version)
+            ).fetchone()
+        version = row["version"]
+    return updates / (time.perf_counter() - start)
+
+
+def endpoint(client, headers: dict, updates: int) -> float:
+    version = client.get("/patient/1", headers=headers).get_json()["version"]
+    start = time.perf_counter()
+    for i in range(updates):
+        response = client.post("/patient/update", json={"id": 1, "diagnosis": f"d{i}", "version": version}, headers=headers)
+        version = response.get_json()["version"]
+    return updates / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Patient update throughput")
+    parser.add_argument("--updates", type=int, default=5000)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    os.environ.setdefault("PASSWORD_HASH_WORKERS", "0")
+    config.Config.PASSWORD_HASH_WORKERS = 0
+    prepare_database()
+
+    print(f"{'variant':<12} {'updates/s':>10}")
+    for label, run in (("two-step", two_step), ("returning", returning)):
+        print(f"{label:<12} {statistics.median(run(args.updates) for _ in range(args.rounds)):>10,.0f}")
+
+    from app import create_app
+    client = create_app().test_client()
+    token = client.post("/login", json={"username": "doctor1", "password": "Doctor123!"}).get_json()["token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    rate = statistics.median(endpoint(client, headers, args.updates // 5) for _ in range(args.rounds))
+    print(f"{'endpoint':<12} {rate:>10,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+# benchmarks/bench_schema_indexes.py
+# ============================================================
+# BENCHMARK: Sekundärindizes (Migration 0004)
+# ------------------------------------------------------------
+# Legt eine DB auf Schema-Stand 0003 an (ohne Sekundärindizes),
+# füllt sie mit synthetischen Daten, misst typische Abfragen,
+# wendet dann die Migration auf die gefüllte DB an (wie in
+# Produktion) und misst erneut.
+#
+# Ausgegeben werden Latenz (Median) und EXPLAIN QUERY PLAN vor und
+# nach der Migration; "SCAN <tabelle>" = Full Table Scan.
+#
+# Aufruf:
+#   python benchmarks/bench_schema_indexes.py --appointments 500000 --audit 1000000
+# ============================================================
+
+import argparse
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent / "src"
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from database.migrate import migrate  # noqa: E402
+
+INDEX_MIGRATION = 4
+
+QUERIES = {
+    "appointments by patient": (
+        "SELECT id, date, description FROM appointments WHERE patient_id = ?",
+        lambda rng, n: (rng.randint(1, n["patients"]),),
+    ),
+    "doctor calendar (1 week)": (
+        "SELECT id, patient_id, date FROM appointments WHERE doctor_id = ? AND date BETWEEN ? AND ? ORDER BY date",
+        lambda rng, n: (rng.randint(1, n["doctors"]), "2025-03-01", "2025-03-08"),
+    ),
+    "audit events of a user": (
+        "SELECT id, timestamp, action FROM audit_logs WHERE user_id = ? ORDER BY timestamp DESC LIMIT 100",
+        lambda rng, n: (rng.randint(1, n["users"]),),
+    ),
+    "audit time range (1 hour)": (
+        "SELECT COUNT(*) FROM audit_logs WHERE timestamp BETWEEN ? AND ?",
+        lambda rng, n: ("2025-06-01T10:00:00", "2025-06-01T11:00:00"),
+    ),
+    "/stats doctor count": (
+        "SELECT COUNT(*) AS count FROM users WHERE role = 'doctor'",
+        lambda rng, n: (),
+    ),
+}
+
+
+def fill(conn, rng, sizes):
+    conn.executemany(
+        "INSERT INTO users (username, password, role) VALUES (?, 'x', ?)",
+        ((f"user{i}", "doctor" if i <= sizes["doctors"] else rng.choice(("nurse", "admin")))
+         for i in range(1, sizes["users"] + 1))
+    )
+    conn.executemany(
+        "INSERT INTO patients (first_name, last_name, birthdate, mrn) VALUES ('F', ?, '1980-01-01', ?)",
+        ((f"L{i}", f"MRN-{i:08d}") for i in range(sizes["patients"]))
+    )
+    conn.executemany(
+        "INSERT INTO appointments (patient_id, doctor_id, date, description) VALUES (?, ?, ?, 'Check')",
+        ((rng.randint(1, sizes["patients"]), rng.randint(1, sizes["doctors"]),
+          f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T{rng.randint(8, 17):02d}:00:00Z")
+         for _ in range(sizes["appointments"]))
+    )
+    conn.executemany(
+        "INSERT INTO audit_logs (timestamp, user_id, action, resource_type, resource_id, success) "
+        "VALUES (?, ?, 'VIEW_PATIENT', 'Patient', 1, 1)",
+        ((f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T"
+          f"{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:{rng.randint(0, 59):02d}",
+          rng.randint(1, sizes["users"]))
+         for _ in range(sizes["audit"]))
+    )
+    conn.commit()
+
+
+def measure(conn, rng, sizes, repeat) -> dict:
+    results = {}
+    for label, (sql, params) in QUERIES.items():
+        timings = []
+        for _ in range(repeat):
+            args = params(rng, sizes)
+            start = time.perf_counter()
+            conn.execute(sql, args).fetchall()
+            timings.append((time.perf_counter() - start) * 1000)
+        plan = [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params(rng, sizes))]
+        results[label] = (statistics.median(timings), plan)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query plans before/after the secondary index migration")
+    parser.add_argument("--users", type=int, default=2_000)
+    parser.add_argument("--doctors", type=int, default=200)
+    parser.add_argument("--patients", type=int, default=100_000)
+    parser.add_argument("--appointments", type=int, default=500_000)
+    parser.add_argument("--audit", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    sizes = vars(args)
+    rng = random.Random(42)
+
+    path = Path(tempfile.mkdtemp(prefix="bench_indexes_")) / "healthcare.db"
+    migrate(path, target=INDEX_MIGRATION - 1)
+
+    conn = sqlite3.connect(path)
+    print(f"[*] Filling {args.appointments:,} appointments, {args.audit:,} audit events...")
+    fill(conn, rng, sizes)
+    before = measure(conn, rng, sizes, args.repeat)
+    conn.close()
+
+    start = time.perf_counter()
+    migrate(path)
+    print(f"[+] Index migration on filled database: {time.perf_counter() - start:.2f} s\n")
+
+    conn = sqlite3.connect(path)
+    after = measure(conn, rng, sizes, args.repeat)
+    conn.close()
+
+    print(f"{'query':<28} {'before ms':>10} {'after ms':>10} {'speedup':>9}")
+    for label in QUERIES:
+        (old_ms, old_plan), (new_ms, new_plan) = before[label], after[label]
+        print(f"{label:<28} {old_ms:>10.3f} {new_ms:>10.3f} {old_ms / max(new_ms, 1e-6):>8.0f}x")
+        print(f"{'':<4}before: {' | '.join(old_plan)}")
+        print(f"{'':<4}after:  {' | '.join(new_plan)}")
+
+
+if __name__ == "__main__":
+    main()
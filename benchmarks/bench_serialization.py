@@ -0,0 +1,96 @@
+# benchmarks/bench_serialization.py
+# ============================================================
+# BENCHMARK: FHIR-Serialisierung (1 / 100 / 10k Ressourcen)
+# ------------------------------------------------------------
+# Vergleicht
+#   handbuilt+json  : Dict pro Row von Hand + json.dumps (alter Stand)
+#   compiled+json   : kompilierter Mapper (utils.serialization) + json.dumps
+#   compiled+orjson : kompilierter Mapper + orjson (falls installiert)
+#
+# Aufruf:
+#   python benchmarks/bench_serialization.py --sizes 1 100 10000
+# ============================================================
+
+import argparse
+import json
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent / "src"
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from api.fhir import fhir_patient_resource  # noqa: E402
+from utils.serialization import orjson  # noqa: E402
+
+
+def handbuilt_patient(row) -> dict:
+    return {
+        "resourceType": "Patient",
+        "id": str(row["id"]),
+        "name": [{
+            "text": f"{row['first_name']} {row['last_name']}"
+        }],
+        "birthDate": row["birthdate"],
+        "identifier": [
+            {
+                "system": "urn:mrn",
+                "value": row["mrn"]
+            }
+        ]
+    }
+
+
+def load_rows(n: int):
+    conn = sqlite3.connect(":memory:")
+    conn.row_factory = sqlite3.Row
+    conn.execute("CREATE TABLE patients (id INTEGER PRIMARY KEY, first_name, last_name, birthdate, mrn)")
+    conn.executemany(
+        "INSERT INTO patients (first_name, last_name, birthdate, mrn) VALUES (?, ?, ?, ?)",
+        ((f"First{i}", f"Last{i}", "1980-01-01", f"MRN-{i}") for i in range(n))
+    )
+    return conn.execute("SELECT id, first_name, last_name, birthdate, mrn FROM patients").fetchall()
+
+
+def bench(fn, rows, min_seconds: float) -> float:
+    """Ressourcen pro Sekunde (Mapping + JSON-Encoding eines Bundles)."""
+    iterations = 0
+    start = time.perf_counter()
+    while True:
+        fn(rows)
+        iterations += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_seconds:
+            return iterations * len(rows) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FHIR serialization throughput")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 100, 10_000])
+    parser.add_argument("--seconds", type=float, default=1.0)
+    args = parser.parse_args()
+
+    variants = {
+        "handbuilt+json": lambda rows: json.dumps(
+            {"resourceType": "Bundle", "entry": [{"resource": handbuilt_patient(r)} for r in rows]}
+        ),
+        "compiled+json": lambda rows: json.dumps(
+            {"resourceType": "Bundle", "entry": [{"resource": fhir_patient_resource(r)} for r in rows]}
+        ),
+    }
+    if orjson is not None:
+        variants["compiled+orjson"] = lambda rows: orjson.dumps(
+            {"resourceType": "Bundle", "entry": [{"resource": fhir_patient_resource(r)} for r in rows]}
+        )
+
+    print(f"{'resources':>10} " + " ".join(f"{name:>18}" for name in variants) + "   (resources/s)")
+    for size in args.sizes:
+        rows = load_rows(size)
+        results = [bench(fn, rows, args.seconds) for fn in variants.values()]
+        print(f"{size:>10} " + " ".join(f"{r:>18,.0f}" for r in results))
+
+
+if __name__ == "__main__":
+    main()
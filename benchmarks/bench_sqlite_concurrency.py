@@ -0,0 +1,132 @@
+# benchmarks/bench_sqlite_concurrency.py
+# ============================================================
+# BENCHMARK: Lesedurchsatz bei gleichzeitigen Schreibern
+# ------------------------------------------------------------
+# Vergleicht das alte SQLite-Verhalten (Rollback-Journal,
+# synchronous=FULL, unkoordinierte Writer) mit dem Storage-Profil
+# aus config.Config (WAL, synchronous=NORMAL, serialisierter Writer).
+#
+# Aufruf:
+#   python benchmarks/bench_sqlite_concurrency.py --readers 8 --writers 4 --seconds 5
+# ============================================================
+
+import argparse
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent / "src"
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from database import db  # noqa: E402
+from database.migrate import migrate  # noqa: E402
+
+PROFILES = {
+    "legacy": {
+        "SQLITE_JOURNAL_MODE": "DELETE",
+        "SQLITE_SYNCHRONOUS": "FULL",
+        "SQLITE_MMAP_SIZE": 0,
+        "SQLITE_CACHE_SIZE": -2000,
+        "SQLITE_BUSY_TIMEOUT_MS": 5000,
+        "SQLITE_TEMP_STORE": "DEFAULT",
+        "DB_SERIALIZE_WRITES": False,
+    },
+    "tuned": {},  # Defaults aus config.Config
+}
+
+
+def prepare_database(path: Path, patients: int):
+    migrate(path)
+    conn = sqlite3.connect(path)
+    conn.executemany(
+        "INSERT INTO patients (first_name, last_name, birthdate, mrn) VALUES (?, ?, ?, ?)",
+        ((f"First{i}", f"Last{i}", "1980-01-01", f"MRN-{i}") for i in range(patients))
+    )
+    conn.commit()
+    conn.close()
+
+
+def run_profile(name: str, args) -> dict:
+    tmp_dir = tempfile.mkdtemp(prefix=f"bench_{name}_")
+    db.DB_PATH = Path(tmp_dir) / "healthcare.db"
+    prepare_database(db.DB_PATH, args.patients)
+
+    db.configure_storage(PROFILES[name])
+    db.configure_pool(args.readers + args.writers, 30, 30)
+
+    stop = threading.Event()
+    counters = {"reads": 0, "writes": 0, "errors": 0}
+    lock = threading.Lock()
+
+    def reader(seed):
+        n = errors = 0
+        pid = seed
+        while not stop.is_set():
+            pid = (pid * 7919 + 1) % args.patients + 1
+            try:
+                db.fetch_one("SELECT id, first_name, last_name FROM patients WHERE id = ?", (pid,))
+                n += 1
+            except sqlite3.OperationalError:
+                errors += 1
+        with lock:
+            counters["reads"] += n
+            counters["errors"] += errors
+
+    def writer():
+        n = errors = 0
+        while not stop.is_set():
+            try:
+                db.execute(
+                    """
+                    INSERT INTO audit_logs (timestamp, user_id, action, resource_type, resource_id, success)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    """,
+                    (time.time(), 1, "BENCH_WRITE", "Patient", 1, 1)
+                )
+                n += 1
+            except sqlite3.OperationalError:
+                errors += 1
+        with lock:
+            counters["writes"] += n
+            counters["errors"] += errors
+
+    threads = [threading.Thread(target=reader, args=(i,)) for i in range(args.readers)]
+    threads += [threading.Thread(target=writer) for _ in range(args.writers)]
+
+    for t in threads:
+        t.start()
+    time.sleep(args.seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+
+    db.close_pool()
+
+    return {
+        "profile": name,
+        "reads_per_s": counters["reads"] / args.seconds,
+        "writes_per_s": counters["writes"] / args.seconds,
+        "lock_errors": counters["errors"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLite read throughput with concurrent writers")
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--patients", type=int, default=10_000)
+    args = parser.parse_args()
+
+    print(f"{'profile':<8} {'reads/s':>12} {'writes/s':>12} {'lock errors':>12}")
+    for name in PROFILES:
+        r = run_profile(name, args)
+        print(f"{r['profile']:<8} {r['reads_per_s']:>12.0f} {r['writes_per_s']:>12.0f} {r['lock_errors']:>12}")
+
+
+if __name__ == "__main__":
+    main()
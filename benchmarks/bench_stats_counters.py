@@ -0,0 +1,118 @@
+# benchmarks/bench_stats_counters.py
+# ============================================================
+# BENCHMARK: GET /stats – COUNT(*)-Scans vs. Zähler-Tabelle
+# ------------------------------------------------------------
+# Misst die vier alten COUNT(*)-Abfragen gegen die eine Abfrage
+# auf stats_counters/appointment_days (Migration 0005) sowie
+# die Mehrkosten der Trigger beim Einfügen von Terminen.
+#
+# Aufruf:
+#   python benchmarks/bench_stats_counters.py --appointments 2000000
+# ============================================================
+
+import argparse
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent / "src"
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from database.migrate import migrate  # noqa: E402
+
+COUNTERS_MIGRATION = 5
+
+OLD_QUERIES = [
+    "SELECT COUNT(*) AS count FROM patients",
+    "SELECT COUNT(*) AS count FROM users",
+    "SELECT COUNT(*) AS count FROM appointments",
+    "SELECT COUNT(*) AS count FROM users WHERE role = 'doctor'",
+]
+
+# Wie api/stats.py: Zähler + Tageszeilen für ±4 Wochen
+NEW_QUERY = """
+    SELECT 'counter' AS kind, name AS key, value FROM stats_counters
+    UNION ALL
+    SELECT 'day', day, count FROM appointment_days WHERE day BETWEEN '2025-05-05' AND '2025-07-06'
+"""
+
+
+def appointments(rng, n):
+    return (
+        (rng.randint(1, 1000), rng.randint(1, 50),
+         f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T{rng.randint(8, 17):02d}:00:00Z")
+        for _ in range(n)
+    )
+
+
+def insert_rate(path, rng, n) -> float:
+    conn = sqlite3.connect(path)
+    start = time.perf_counter()
+    conn.executemany(
+        "INSERT INTO appointments (patient_id, doctor_id, date, description) VALUES (?, ?, ?, 'Check')",
+        appointments(rng, n)
+    )
+    conn.commit()
+    conn.close()
+    return n / (time.perf_counter() - start)
+
+
+def median_ms(conn, queries, repeat) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for sql in queries:
+            conn.execute(sql).fetchall()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stats: COUNT(*) scans vs. trigger-maintained counters")
+    parser.add_argument("--appointments", type=int, default=2_000_000)
+    parser.add_argument("--inserts", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    path = Path(tempfile.mkdtemp(prefix="bench_stats_")) / "healthcare.db"
+    migrate(path, target=COUNTERS_MIGRATION - 1)
+
+    print(f"[*] Inserting {args.appointments:,} appointments...")
+    conn = sqlite3.connect(path)
+    conn.executemany(
+        "INSERT INTO appointments (patient_id, doctor_id, date, description) VALUES (?, ?, ?, 'Check')",
+        appointments(rng, args.appointments)
+    )
+    conn.commit()
+    old_ms = median_ms(conn, OLD_QUERIES, args.repeat)
+    conn.close()
+
+    rate_before = insert_rate(path, rng, args.inserts)
+
+    start = time.perf_counter()
+    migrate(path)
+    print(f"[+] Counter migration incl. backfill: {time.perf_counter() - start:.2f} s\n")
+
+    conn = sqlite3.connect(path)
+    new_ms = median_ms(conn, [NEW_QUERY], args.repeat)
+    conn.close()
+
+    rate_after = insert_rate(path, rng, args.inserts)
+
+    print(f"{'stats query':<34} {'median ms':>10}")
+    print(f"{'4x COUNT(*) (old)':<34} {old_ms:>10.3f}")
+    print(f"{'counters + days (1 query)':<34} {new_ms:>10.3f}   {old_ms / max(new_ms, 1e-6):,.0f}x faster")
+    print()
+    print(f"appointment inserts/s without triggers: {rate_before:>10,.0f}")
+    print(f"appointment inserts/s with triggers:    {rate_after:>10,.0f}  "
+          f"({(rate_after / rate_before - 1) * 100:+.1f}%)")
+
+
+if __name__ == "__main__":
+    main()
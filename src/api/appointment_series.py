@@ -0,0 +1,418 @@
+# src/api/appointment_series.py
+from flask import Blueprint, jsonify, request, g, current_app
+from database.db import fetch_one, connection, write_transaction
+from utils.security import require_role
+from utils.logging_utils import audit_log
+from utils.validation_new import (
+    validate_json, validate_query, AppointmentSeriesCreateSchema, OccurrenceUpdateSchema,
+    AppointmentCalendarQuerySchema, APPOINTMENT_MAX_DURATION_MINUTES
+)
+from utils.recurrence import expand, RecurrenceError, FREQUENCIES, to_utc, utc_now, format_date, parse_date
+from utils.appointment_series import (
+    get_series, get_exception, is_occurrence, occurrences_in_window, adjust_appointment_stats
+)
+from api.appointments import find_conflict, find_booked_conflict
+from config import Config
+import sqlite3
+from datetime import timedelta
+
+series_bp = Blueprint("appointment_series", __name__)
+
+# Höchstens so viele Konflikte in einer 409-Antwort
+_MAX_REPORTED_CONFLICTS = 20
+
+
+def _series_resource(series, exceptions) -> dict:
+    return {
+        "id": series["id"],
+        "patient_id": series["patient_id"],
+        "doctor_id": series["doctor_id"],
+        "date": series["date"],
+        "duration_minutes": series["duration_minutes"],
+        "description": series["description"],
+        "recurrence": {
+            "frequency": series["frequency"],
+            "interval": series["interval"],
+            "count": series["count"],
+            "until": series["until"],
+            "by_weekday": series["by_weekday"].split(",") if series["by_weekday"] else None,
+            "timezone": series["timezone"],
+        },
+        "span_start": series["span_start"],
+        "span_end": series["span_end"],
+        "exceptions": [
+            {
+                "occurrence": row["occurrence"],
+                "cancelled": bool(row["cancelled"]),
+                "date": row["date"],
+                "end_date": row["end_date"],
+                "description": row["description"],
+            }
+            for row in exceptions
+        ],
+    }
+
+
+def _parse_occurrence(value: str):
+    try:
+        return parse_date(value)
+    except ValueError:
+        return None
+
+
+# ============================================================
+# POST /appointments/series  (doctor, nurse) – Serie anlegen
+# ============================================================
+@series_bp.route("/appointments/series", methods=["POST"])
+@require_role(["doctor", "nurse"])
+@validate_json(AppointmentSeriesCreateSchema)
+def create_series():
+    """
+    Terminserie anlegen (z.B. Physiotherapie wöchentlich, 12 Wochen)
+    ----------------------------------------------------------------
+    - gespeichert wird EINE Zeile mit der Regel, nicht ein Termin pro
+      Wiederholung; Termine entstehen beim Lesen (GET /appointments/calendar)
+    - jeder Termin der Serie wird gegen Einzel- und Serientermine des
+      Arztes geprüft (Konflikt -> 409, nichts wird angelegt)
+    - Prüfung und Insert in derselben Schreib-Transaktion
+    - /stats zählt jeden Termin der Serie (adjust_appointment_stats)
+    """
+
+    data = request.validated_data
+    doctor_id = g.current_user["id"]
+    rule = data["recurrence"]
+
+    start = to_utc(data["date"])
+    until = to_utc(rule["until"]) if "until" in rule else None
+    duration = timedelta(minutes=data.get("duration_minutes") or current_app.config.get(
+        "APPOINTMENT_DEFAULT_DURATION_MINUTES", Config.APPOINTMENT_DEFAULT_DURATION_MINUTES
+    ))
+    description = data["description"].strip()
+
+    # Ohne by_weekday liegen Termine genau einen Schritt auseinander
+    if "by_weekday" not in rule and duration > FREQUENCIES[rule["frequency"]] * rule["interval"]:
+        return jsonify({"error": "Appointments of a series must not overlap"}), 400
+
+    try:
+        starts = expand(
+            start, rule["frequency"], rule["interval"], rule.get("count"), until,
+            rule.get("by_weekday"), rule.get("timezone"),
+            limit=current_app.config.get(
+                "APPOINTMENT_SERIES_MAX_OCCURRENCES", Config.APPOINTMENT_SERIES_MAX_OCCURRENCES
+            )
+        )
+    except RecurrenceError as e:
+        return jsonify({"error": "Validation failed", "details": {"recurrence": [str(e)]}}), 400
+
+    if not starts:
+        return jsonify({"error": "Recurrence yields no appointments"}), 400
+
+    if starts[0] < utc_now():
+        return jsonify({"error": "Appointment date cannot be in the past"}), 400
+
+    try:
+        patient = fetch_one("SELECT id FROM patients WHERE id = ?", (data["patient_id"],))
+    except sqlite3.Error:
+        audit_log(doctor_id, "APPOINTMENT_SERIES_CREATE_DB_ERROR", "AppointmentSeries", None, success=False)
+        return jsonify({"error": "Database error"}), 500
+
+    if patient is None:
+        audit_log(doctor_id, "APPOINTMENT_SERIES_CREATE_PATIENT_NOT_FOUND", "AppointmentSeries",
+                  data["patient_id"], success=False)
+        return jsonify({"error": "Patient not found"}), 404
+
+    conflicts = []
+    try:
+        with write_transaction() as conn:
+            # Andere Serien des Arztes EINMAL über die ganze Spanne expandieren,
+            # Einzeltermine weiter per Index-Lookup pro Termin
+            series_occ = occurrences_in_window(conn, starts[0], starts[-1] + duration, doctor_id=doctor_id)
+            booked = sorted(
+                (parse_date(occ["date"]), parse_date(occ["end_date"]), index)
+                for index, occ in enumerate(series_occ)
+            )
+
+            for begin in starts:
+                conflict = find_conflict(conn, doctor_id, begin, begin + duration, include_series=False)
+                if conflict is None:
+                    clash = find_booked_conflict(booked, begin, begin + duration)
+                    if clash is not None:
+                        occ = series_occ[clash[2]]
+                        conflict = {key: occ[key] for key in ("series_id", "occurrence", "date", "end_date")}
+                if conflict is not None:
+                    conflicts.append({"date": format_date(begin), "conflict": conflict})
+                    if len(conflicts) == _MAX_REPORTED_CONFLICTS:
+                        break
+
+            if not conflicts:
+                series_id = conn.execute(
+                    """
+                    INSERT INTO appointment_series (
+                        patient_id, doctor_id, date, duration_minutes, frequency, interval, count, until,
+                        by_weekday, timezone, description, span_start, span_end, created_at
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (
+                        data["patient_id"], doctor_id, format_date(start), int(duration.total_seconds() // 60),
+                        rule["frequency"], rule["interval"], rule.get("count"),
+                        format_date(until) if until else None,
+                        ",".join(rule["by_weekday"]) if rule.get("by_weekday") else None,
+                        rule.get("timezone"), description,
+                        format_date(starts[0]), format_date(starts[-1] + duration),
+                        utc_now().isoformat(),
+                    )
+                ).lastrowid
+                adjust_appointment_stats(conn, [format_date(begin) for begin in starts], +1)
+    except sqlite3.Error:
+        audit_log(doctor_id, "APPOINTMENT_SERIES_CREATE_FAILED", "AppointmentSeries", None, success=False)
+        return jsonify({"error": "Failed to create appointment series"}), 500
+
+    if conflicts:
+        audit_log(doctor_id, "APPOINTMENT_SERIES_CREATE_CONFLICT", "AppointmentSeries", data["patient_id"],
+                  success=False)
+        return jsonify({
+            "error": "Appointment series conflicts with existing appointments",
+            "conflicts": conflicts
+        }), 409
+
+    audit_log(doctor_id, "APPOINTMENT_SERIES_CREATE_SUCCESS", "AppointmentSeries", series_id, success=True)
+
+    return jsonify({
+        "message": "Appointment series created",
+        "id": series_id,
+        "occurrences": len(starts),
+        "span_start": format_date(starts[0]),
+        "span_end": format_date(starts[-1] + duration)
+    }), 201
+
+
+# ============================================================
+# GET /appointments/series/<id>  (doctor, nurse)
+# ============================================================
+@series_bp.route("/appointments/series/<int:series_id>", methods=["GET"])
+@require_role(["doctor", "nurse"])
+def get_appointment_series(series_id):
+    """Regel + Abweichungen einer Serie (ohne Expansion)."""
+
+    user_id = g.current_user["id"]
+
+    try:
+        with connection() as conn:
+            series = get_series(conn, series_id)
+            exceptions = conn.execute(
+                """
+                SELECT occurrence, cancelled, date, end_date, description
+                FROM appointment_series_exceptions
+                WHERE series_id = ?
+                ORDER BY occurrence
+                """,
+                (series_id,)
+            ).fetchall() if series is not None else []
+    except sqlite3.Error:
+        audit_log(user_id, "READ_APPOINTMENT_SERIES_DB_ERROR", "AppointmentSeries", series_id, success=False)
+        return jsonify({"error": "Database error"}), 500
+
+    if series is None:
+        audit_log(user_id, "READ_APPOINTMENT_SERIES_NOT_FOUND", "AppointmentSeries", series_id, success=False)
+        return jsonify({"error": "Appointment series not found"}), 404
+
+    audit_log(user_id, "READ_APPOINTMENT_SERIES", "AppointmentSeries", series_id, success=True)
+    return jsonify(_series_resource(series, exceptions)), 200
+
+
+# ============================================================
+# PUT / DELETE /appointments/series/<id>/occurrences/<start>
+# ============================================================
+def _occurrence_context(conn, series_id: int, occurrence: str):
+    """(series, exception) oder (None, Fehlerantwort)."""
+    series = get_series(conn, series_id)
+    if series is None:
+        return None, (jsonify({"error": "Appointment series not found"}), 404)
+
+    original = _parse_occurrence(occurrence)
+    exception = get_exception(conn, series_id, occurrence)
+    if original is None or not is_occurrence(series, original) or (exception is not None and exception["cancelled"]):
+        return None, (jsonify({"error": "Occurrence not found"}), 404)
+    return (series, exception), None
+
+
+@series_bp.route("/appointments/series/<int:series_id>/occurrences/<occurrence>", methods=["PUT"])
+@require_role(["doctor", "nurse"])
+@validate_json(OccurrenceUpdateSchema)
+def update_occurrence(series_id, occurrence):
+    """
+    Einzelnen Serientermin verschieben / Dauer oder Beschreibung ändern.
+    <occurrence> = ursprünglicher Beginn ("YYYY-MM-DDTHH:MM:SSZ").
+    Konfliktprüfung wie beim Anlegen (ohne den Termin selbst).
+    """
+
+    data = request.validated_data
+    user_id = g.current_user["id"]
+
+    try:
+        with write_transaction() as conn:
+            context, error = _occurrence_context(conn, series_id, occurrence)
+            if error is not None:
+                audit_log(user_id, "APPOINTMENT_OCCURRENCE_UPDATE_NOT_FOUND", "AppointmentSeries", series_id,
+                          success=False)
+                return error
+            series, exception = context
+
+            current_start = parse_date(exception["date"] if exception else occurrence)
+            current_end = parse_date(exception["end_date"]) if exception else \
+                current_start + timedelta(minutes=series["duration_minutes"])
+
+            start = to_utc(data["date"]) if "date" in data else current_start
+            end = start + (timedelta(minutes=data["duration_minutes"]) if "duration_minutes" in data
+                           else current_end - current_start)
+            description = data["description"].strip() if "description" in data else (
+                exception["description"] if exception else None
+            )
+
+            if start < utc_now():
+                audit_log(user_id, "APPOINTMENT_OCCURRENCE_UPDATE_INVALID_DATE", "AppointmentSeries", series_id,
+                          success=False)
+                return jsonify({"error": "Appointment date cannot be in the past"}), 400
+
+            conflict = find_conflict(conn, series["doctor_id"], start, end, ignore=(series_id, occurrence))
+            if conflict is None:
+                conn.execute(
+                    """
+                    INSERT INTO appointment_series_exceptions (series_id, occurrence, cancelled, date, end_date, description)
+                    VALUES (?, ?, 0, ?, ?, ?)
+                    ON CONFLICT(series_id, occurrence) DO UPDATE SET
+                        cancelled = 0, date = excluded.date, end_date = excluded.end_date,
+                        description = excluded.description
+                    """,
+                    (series_id, occurrence, format_date(start), format_date(end), description)
+                )
+                # Verschobener Termin außerhalb der bisherigen Spanne
+                conn.execute(
+                    "UPDATE appointment_series SET span_start = MIN(span_start, ?), span_end = MAX(span_end, ?) WHERE id = ?",
+                    (format_date(start), format_date(end), series_id)
+                )
+                # /stats: Termin zählt ab jetzt am neuen Tag
+                adjust_appointment_stats(conn, [format_date(current_start)], -1)
+                adjust_appointment_stats(conn, [format_date(start)], +1)
+    except sqlite3.Error:
+        audit_log(user_id, "APPOINTMENT_OCCURRENCE_UPDATE_FAILED", "AppointmentSeries", series_id, success=False)
+        return jsonify({"error": "Failed to update appointment"}), 500
+
+    if conflict is not None:
+        audit_log(user_id, "APPOINTMENT_OCCURRENCE_UPDATE_CONFLICT", "AppointmentSeries", series_id, success=False)
+        return jsonify({
+            "error": "Appointment conflicts with an existing appointment",
+            "conflict": conflict
+        }), 409
+
+    audit_log(user_id, "APPOINTMENT_OCCURRENCE_UPDATE_SUCCESS", "AppointmentSeries", series_id, success=True)
+
+    return jsonify({
+        "series_id": series_id,
+        "occurrence": occurrence,
+        "date": format_date(start),
+        "end_date": format_date(end),
+        "description": description or series["description"]
+    }), 200
+
+
+@series_bp.route("/appointments/series/<int:series_id>/occurrences/<occurrence>", methods=["DELETE"])
+@require_role(["doctor", "nurse"])
+def cancel_occurrence(series_id, occurrence):
+    """Einzelnen Serientermin absagen (Ausnahme, die Serie bleibt bestehen)."""
+
+    user_id = g.current_user["id"]
+
+    try:
+        with write_transaction() as conn:
+            context, error = _occurrence_context(conn, series_id, occurrence)
+            if error is None:
+                _series, exception = context
+                adjust_appointment_stats(conn, [exception["date"] if exception else occurrence], -1)
+                conn.execute(
+                    """
+                    INSERT INTO appointment_series_exceptions (series_id, occurrence, cancelled)
+                    VALUES (?, ?, 1)
+                    ON CONFLICT(series_id, occurrence) DO UPDATE SET
+                        cancelled = 1, date = NULL, end_date = NULL, description = NULL
+                    """,
+                    (series_id, occurrence)
+                )
+    except sqlite3.Error:
+        audit_log(user_id, "APPOINTMENT_OCCURRENCE_CANCEL_FAILED", "AppointmentSeries", series_id, success=False)
+        return jsonify({"error": "Failed to cancel appointment"}), 500
+
+    if error is not None:
+        audit_log(user_id, "APPOINTMENT_OCCURRENCE_CANCEL_NOT_FOUND", "AppointmentSeries", series_id, success=False)
+        return error
+
+    audit_log(user_id, "APPOINTMENT_OCCURRENCE_CANCEL_SUCCESS", "AppointmentSeries", series_id, success=True)
+    return jsonify({"message": "Appointment cancelled", "series_id": series_id, "occurrence": occurrence}), 200
+
+
+# ============================================================
+# GET /appointments/calendar  (doctor, nurse)
+# ============================================================
+@series_bp.route("/appointments/calendar", methods=["GET"])
+@require_role(["doctor", "nurse"])
+@validate_query(AppointmentCalendarQuerySchema)
+def get_calendar():
+    """
+    Kalenderansicht: Einzeltermine + Serientermine im Fenster [from, to)
+    für einen Arzt und/oder Patienten, nach Beginn sortiert.
+
+    - Einzeltermine: Range-Scan wie GET /appointments
+    - Serien: nur Serien, deren Spanne das Fenster schneidet; expandiert
+      werden nur die Termine im Fenster
+    - Fensterlänge begrenzt (APPOINTMENT_CALENDAR_MAX_DAYS), daher keine
+      Pagination
+
+    DSGVO / TR-03161:
+    - RBAC: doctor, nurse
+    - Ein Audit-Eintrag pro Abfrage
+    """
+
+    params = request.validated_params
+    user_id = g.current_user["id"]
+
+    start, end = to_utc(params["start"]), to_utc(params["end"])
+    max_days = current_app.config.get("APPOINTMENT_CALENDAR_MAX_DAYS", Config.APPOINTMENT_CALENDAR_MAX_DAYS)
+    if end - start > timedelta(days=max_days):
+        return jsonify({"error": f"Window must not exceed {max_days} days"}), 400
+
+    where = ["date >= ?", "end_date > ?", "date < ?"]
+    args = [format_date(start - timedelta(minutes=APPOINTMENT_MAX_DURATION_MINUTES)), format_date(start),
+            format_date(end)]
+    if "doctor_id" in params:
+        where.append("doctor_id = ?")
+        args.append(params["doctor_id"])
+    if "patient_id" in params:
+        where.append("patient_id = ?")
+        args.append(params["patient_id"])
+
+    try:
+        with connection() as conn:
+            singles = conn.execute(
+                """
+                SELECT id, patient_id, doctor_id, date, end_date, description
+                FROM appointments
+                WHERE """ + " AND ".join(where) + """
+                ORDER BY date, id
+                """,
+                args
+            ).fetchall()
+            series = occurrences_in_window(conn, start, end, params.get("doctor_id"), params.get("patient_id"))
+    except sqlite3.Error:
+        audit_log(user_id, "READ_CALENDAR_DB_ERROR", "Appointment", None, success=False)
+        return jsonify({"error": "Database error"}), 500
+
+    audit_log(user_id, "READ_CALENDAR", "Appointment", params.get("patient_id"), success=True)
+
+    appointments = [dict(row) for row in singles] + series
+    appointments.sort(key=lambda item: item["date"])
+
+    return jsonify({
+        "from": format_date(start),
+        "to": format_date(end),
+        "appointments": appointments
+    }), 200
@@ -1,14 +1,71 @@
 # src/api/appointments.py
-from flask import Blueprint, jsonify, request, g
-from database.db import fetch_one, execute
+from flask import Blueprint, jsonify, request, g, current_app
+from database.db import fetch_one, fetch_all, write_transaction
 from utils.security import require_role
-from utils.logging_utils import audit_log
-from utils.validation_new import validate_json, AppointmentCreateSchema
+from utils.logging_utils import audit_log, audit_log_many
+from utils.validation_new import (
+    validate_json, validate_query, AppointmentCreateSchema, AppointmentBulkCreateSchema,
+    AppointmentListQuerySchema, KeysetCursor, APPOINTMENT_MAX_DURATION_MINUTES
+)
+from utils.recurrence import expand, RecurrenceError, to_utc, utc_now, format_date
+from utils.appointment_series import find_series_conflict
+from utils.serialization import compile_mapper, column
+from config import Config
+import bisect
+import json
 import sqlite3
-from datetime import datetime
+from datetime import datetime, timedelta
 
 appointments_bp = Blueprint("appointments", __name__)
 
+# Startpunkt ohne Cursor: liegt vor jedem (date, id)
+_FIRST_PAGE = ("", 0)
+
+_cursor_field = KeysetCursor(size=2)
+
+_appointment = compile_mapper({
+    "id": column("id"),
+    "patient_id": column("patient_id"),
+    "doctor_id": column("doctor_id"),
+    "date": column("date"),
+    "end_date": column("end_date"),
+    "description": column("description"),
+})
+
+
+def find_conflict(conn, doctor_id: int, start: datetime, end: datetime, ignore=None, include_series=True):
+    """
+    Erster Termin des Arztes, der [start, end) überschneidet, sonst None.
+    Geprüft werden Einzeltermine und (include_series) Serientermine
+    (ignore: siehe find_series_conflict); Ergebnis als dict.
+
+    Intervall-Lookup über idx_appointments_doctor_date: gelesen werden nur
+    Termine, die zwischen start - maximale Dauer und end beginnen, nicht
+    die gesamte Historie des Arztes.
+    """
+    row = conn.execute(
+        """
+        SELECT id, date, end_date
+        FROM appointments
+        WHERE doctor_id = ?
+          AND date >= ? AND date < ?
+          AND end_date > ?
+        ORDER BY date
+        LIMIT 1
+        """,
+        (
+            doctor_id,
+            format_date(start - timedelta(minutes=APPOINTMENT_MAX_DURATION_MINUTES)),
+            format_date(end),
+            format_date(start),
+        )
+    ).fetchone()
+    if row is not None:
+        return {"id": row["id"], "date": row["date"], "end_date": row["end_date"]}
+    if include_series:
+        return find_series_conflict(conn, doctor_id, start, end, ignore)
+    return None
+
 
 @appointments_bp.route("/appointments/create", methods=["POST"])
 @require_role(["doctor", "nurse"])
@@ -24,6 +81,8 @@ def create_appointment():
     - doctor_id immer = aktuelle Session
     - TR-03161: parameterisierte SQL + generische Fehler
     - DSGVO: minimal logging, keine sensiblen Inhalte
+    - Keine Doppelbuchung: überschneidende Termine des Arztes -> 409
+      (Prüfung und Insert in derselben Schreib-Transaktion)
     """
 
     if g.current_user is None:
@@ -32,14 +91,18 @@ def create_appointment():
     data = request.validated_data
 
     patient_id = data["patient_id"]
-    appointment_dt = data["date"]     # Marshmallow liefert datetime
+    start = to_utc(data["date"])     # Marshmallow liefert datetime
+    duration = data.get("duration_minutes") or current_app.config.get(
+        "APPOINTMENT_DEFAULT_DURATION_MINUTES", Config.APPOINTMENT_DEFAULT_DURATION_MINUTES
+    )
+    end = start + timedelta(minutes=duration)
     description = data["description"].strip()
 
     doctor_id = g.current_user["id"]
 
     # Optional TR-03161-Pro-Tipp (nicht zwingend):
     # Termin darf nicht in der Vergangenheit liegen.
-    if appointment_dt < datetime.utcnow():
+    if start < utc_now():
         return jsonify({"error": "Appointment date cannot be in the past"}), 400
 
     # Prüfen, ob Patient existiert
@@ -53,25 +116,311 @@ def create_appointment():
         audit_log(doctor_id, "APPOINTMENT_CREATE_PATIENT_NOT_FOUND", "Appointment", patient_id, success=False)
         return jsonify({"error": "Patient not found"}), 404
 
-    # Termin in DB speichern
+    # Konfliktprüfung + Termin speichern (atomar)
     try:
-        execute(
-            """
-            INSERT INTO appointments (patient_id, doctor_id, date, description)
-            VALUES (?, ?, ?, ?)
-            """,
-            (patient_id, doctor_id, appointment_dt.isoformat(), description)
-        )
+        with write_transaction() as conn:
+            conflict = find_conflict(conn, doctor_id, start, end)
+            if conflict is None:
+                appointment_id = conn.execute(
+                    """
+                    INSERT INTO appointments (patient_id, doctor_id, date, end_date, description)
+                    VALUES (?, ?, ?, ?, ?)
+                    """,
+                    (patient_id, doctor_id, format_date(start), format_date(end), description)
+                ).lastrowid
     except sqlite3.Error:
         audit_log(doctor_id, "APPOINTMENT_CREATE_FAILED", "Appointment", patient_id, success=False)
         return jsonify({"error": "Failed to create appointment"}), 500
 
+    if conflict is not None:
+        audit_log(doctor_id, "APPOINTMENT_CREATE_CONFLICT", "Appointment", conflict.get("id"), success=False)
+        return jsonify({
+            "error": "Appointment conflicts with an existing appointment",
+            "conflict": conflict
+        }), 409
+
     audit_log(doctor_id, "APPOINTMENT_CREATE_SUCCESS", "Appointment", patient_id, success=True)
 
     return jsonify({
         "message": "Appointment created",
+        "id": appointment_id,
         "patient_id": patient_id,
         "doctor_id": doctor_id,
-        "date": appointment_dt.isoformat(),
+        "date": format_date(start),
+        "end_date": format_date(end),
         "description": description
     }), 201
+
+
+# ============================================================
+# POST /appointments/bulk  (doctor, nurse) – Serien / Sammelimport
+# ============================================================
+_INSERT_APPOINTMENT = """
+    INSERT INTO appointments (patient_id, doctor_id, date, end_date, description)
+    VALUES (?, ?, ?, ?, ?)
+"""
+
+
+def find_booked_conflict(booked, start: datetime, end: datetime):
+    """
+    Überschneidung mit bereits in dieser Anfrage angenommenen Terminen.
+    booked: nach Beginn sortierte Liste (start, end, index).
+    """
+    position = bisect.bisect_left(booked, (start - timedelta(minutes=APPOINTMENT_MAX_DURATION_MINUTES),))
+    while position < len(booked) and booked[position][0] < end:
+        if booked[position][1] > start:
+            return booked[position]
+        position += 1
+    return None
+
+
+def _item_slots(item, default_duration: int, limit: int):
+    """[(start, end)] eines Eintrags (naive UTC); Serien werden expandiert."""
+    duration = timedelta(minutes=item.get("duration_minutes") or default_duration)
+    rule = item.get("recurrence")
+    if rule is None:
+        starts = [item["date"]]
+    else:
+        starts = expand(
+            item["date"], rule["frequency"], rule["interval"], rule.get("count"), rule.get("until"),
+            rule.get("by_weekday"), rule.get("timezone"), limit=limit
+        )
+    return [(to_utc(start), to_utc(start) + duration) for start in starts]
+
+
+@appointments_bp.route("/appointments/bulk", methods=["POST"])
+@require_role(["doctor", "nurse"])
+@validate_json(AppointmentBulkCreateSchema)
+def create_appointments_bulk():
+    """
+    Mehrere Termine / Terminserien in EINER Anfrage
+    -----------------------------------------------
+    - Serien (recurrence) werden serverseitig expandiert
+    - alle patient_ids mit EINER Mengenabfrage geprüft
+    - Konfliktprüfung (Bestand + innerhalb der Anfrage) und Insert per
+      executemany in EINER Schreib-Transaktion
+    - EIN Audit-Batch, ein Eintrag pro Anfrage-Eintrag
+    - Ergebnis pro Eintrag in Anfrage-Reihenfolge; ein Eintrag (auch eine
+      Serie) wird ganz oder gar nicht angelegt
+
+    Status: 201 alles angelegt, 200 teilweise, 409 bei atomic=true mit
+    mindestens einem fehlerhaften Eintrag (dann wird nichts angelegt).
+    """
+
+    if g.current_user is None:
+        return jsonify({"error": "Authentication required"}), 401
+
+    data = request.validated_data
+    items = data["appointments"]
+    doctor_id = g.current_user["id"]
+
+    default_duration = current_app.config.get(
+        "APPOINTMENT_DEFAULT_DURATION_MINUTES", Config.APPOINTMENT_DEFAULT_DURATION_MINUTES
+    )
+    max_occurrences = current_app.config.get(
+        "APPOINTMENTS_BULK_MAX_OCCURRENCES", Config.APPOINTMENTS_BULK_MAX_OCCURRENCES
+    )
+
+    # 1. Serien expandieren (Gesamtzahl begrenzt)
+    slots_per_item = []
+    total = 0
+    try:
+        for item in items:
+            slots = _item_slots(item, default_duration, max_occurrences - total)
+            total += len(slots)
+            if total > max_occurrences:
+                raise RecurrenceError(f"More than {max_occurrences} appointments per request")
+            slots_per_item.append(slots)
+    except RecurrenceError as e:
+        return jsonify({"error": "Validation failed", "details": {"appointments": [str(e)]}}), 400
+
+    # 2. EINE Mengenabfrage für alle Patienten
+    try:
+        existing = {
+            row["id"] for row in fetch_all(
+                "SELECT id FROM patients WHERE id IN (SELECT value FROM json_each(?))",
+                (json.dumps(sorted({item["patient_id"] for item in items})),)
+            )
+        }
+    except sqlite3.Error:
+        audit_log(doctor_id, "APPOINTMENT_BULK_CREATE_DB_ERROR", "Appointment", None, success=False)
+        return jsonify({"error": "Database error"}), 500
+
+    now = utc_now()
+    results = []
+    rows = []        # Insert-Parameter, in Anfrage-Reihenfolge
+    owners = []      # Ergebnis-Eintrag je Zeile in rows
+    booked = []
+
+    # 3. Prüfen + Einfügen (atomar)
+    try:
+        with write_transaction() as conn:
+            for index, (item, slots) in enumerate(zip(items, slots_per_item)):
+                result = {"index": index, "patient_id": item["patient_id"]}
+                results.append(result)
+
+                if item["patient_id"] not in existing:
+                    result.update(status=404, error="Patient not found")
+                    continue
+                if slots[0][0] < now:
+                    result.update(status=400, error="Appointment date cannot be in the past")
+                    continue
+
+                conflicts = []
+                accepted = []
+                for start, end in slots:
+                    clash = find_conflict(conn, doctor_id, start, end)
+                    if clash is not None:
+                        conflicts.append({"date": format_date(start), "conflict": clash})
+                        continue
+                    clash = find_booked_conflict(booked, start, end)
+                    if clash is not None:
+                        conflicts.append({
+                            "date": format_date(start),
+                            "conflict": {"index": clash[2], "date": format_date(clash[0]), "end_date": format_date(clash[1])}
+                        })
+                        continue
+                    accepted.append((start, end, index))
+                    bisect.insort(booked, (start, end, index))
+
+                if conflicts:
+                    for slot in accepted:
+                        booked.remove(slot)
+                    result.update(status=409, error="Appointment conflicts with an existing appointment",
+                                  conflicts=conflicts)
+                    continue
+
+                description = item["description"].strip()
+                result.update(status=201, appointments=[])
+                for start, end, _ in accepted:
+                    rows.append((item["patient_id"], doctor_id, format_date(start), format_date(end), description))
+                    owners.append(result)
+
+            failed = sum(1 for result in results if result["status"] != 201)
+            if data["atomic"] and failed:
+                rows = []
+
+            if rows:
+                # Neue IDs: alles oberhalb des bisherigen Maximums (Schreib-Lock gehalten)
+                last_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM appointments").fetchone()[0]
+                conn.executemany(_INSERT_APPOINTMENT, rows)
+                ids = [row[0] for row in conn.execute(
+                    "SELECT id FROM appointments WHERE id > ? ORDER BY id", (last_id,)
+                )]
+                for appointment_id, row, result in zip(ids, rows, owners):
+                    result["appointments"].append({"id": appointment_id, "date": row[2], "end_date": row[3]})
+    except sqlite3.Error:
+        audit_log(doctor_id, "APPOINTMENT_BULK_CREATE_FAILED", "Appointment", None, success=False)
+        return jsonify({"error": "Failed to create appointments"}), 500
+
+    if data["atomic"] and failed:
+        for result in results:
+            if result["status"] == 201:
+                result.update(status=424, error="Not created: another entry failed")
+                del result["appointments"]
+
+    audit_actions = {
+        201: "APPOINTMENT_CREATE_SUCCESS",
+        400: "APPOINTMENT_CREATE_IN_PAST",
+        404: "APPOINTMENT_CREATE_PATIENT_NOT_FOUND",
+        409: "APPOINTMENT_CREATE_CONFLICT",
+        424: "APPOINTMENT_CREATE_ABORTED",
+    }
+    audit_log_many(
+        (doctor_id, audit_actions[result["status"]], "Appointment", result["patient_id"], result["status"] == 201)
+        for result in results
+    )
+
+    if failed == 0:
+        status = 201
+    else:
+        status = 409 if data["atomic"] else 200
+
+    return jsonify({
+        "created": len(rows),
+        "failed": failed,
+        "results": results
+    }), status
+
+
+# ============================================================
+# GET /appointments  (doctor, nurse) – Kalender / Terminliste
+# ============================================================
+@appointments_bp.route("/appointments", methods=["GET"])
+@require_role(["doctor", "nurse"])
+@validate_query(AppointmentListQuerySchema)
+def list_appointments():
+    """
+    Termine nach Arzt, Patient und Zeitraum, sortiert nach (date, id).
+
+    - Zeitraum: alle Termine, die sich mit [from, to) überschneiden;
+      über idx_appointments_doctor_date bzw. idx_appointments_date als
+      begrenzter Range-Scan (Beginn ab from - maximale Dauer)
+    - Keyset-Pagination (limit + next_cursor), kein OFFSET
+    - Nur Einzeltermine: Serientermine haben keine id und passen nicht in
+      den (date, id)-Cursor; inkl. Terminserien: GET /appointments/calendar
+
+    DSGVO / TR-03161:
+    - RBAC: doctor, nurse (Admin liest keine Behandlungsdaten)
+    - Ein Audit-Eintrag pro Abfrage
+    """
+
+    params = request.validated_params
+    user_id = g.current_user["id"]
+
+    where, args = [], []
+    if "doctor_id" in params:
+        where.append("doctor_id = ?")
+        args.append(params["doctor_id"])
+    if "patient_id" in params:
+        where.append("patient_id = ?")
+        args.append(params["patient_id"])
+    if "start" in params:
+        start = to_utc(params["start"])
+        where.append("date >= ? AND end_date > ?")
+        args.extend((format_date(start - timedelta(minutes=APPOINTMENT_MAX_DURATION_MINUTES)), format_date(start)))
+    if "end" in params:
+        where.append("date < ?")
+        args.append(format_date(to_utc(params["end"])))
+
+    max_page_size = current_app.config.get("APPOINTMENTS_MAX_PAGE_SIZE", Config.APPOINTMENTS_MAX_PAGE_SIZE)
+    limit = min(
+        params.get("limit") or current_app.config.get(
+            "APPOINTMENTS_DEFAULT_PAGE_SIZE", Config.APPOINTMENTS_DEFAULT_PAGE_SIZE
+        ),
+        max_page_size
+    )
+
+    after_date, after_id = params.get("cursor") or _FIRST_PAGE
+    where.append("(date, id) > (?, ?)")
+    args.extend((after_date, after_id))
+
+    try:
+        # limit + 1 Zeilen laden, um zu erkennen, ob es eine weitere Seite gibt
+        rows = fetch_all(
+            """
+            SELECT id, patient_id, doctor_id, date, end_date, description
+            FROM appointments
+            WHERE """ + " AND ".join(where) + """
+            ORDER BY date, id
+            LIMIT ?
+            """,
+            (*args, limit + 1)
+        )
+    except sqlite3.Error:
+        audit_log(user_id, "READ_APPOINTMENTS_DB_ERROR", "Appointment", None, success=False)
+        return jsonify({"error": "Database error"}), 500
+
+    audit_log(user_id, "READ_APPOINTMENTS", "Appointment", params.get("patient_id"), success=True)
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = _cursor_field.serialize("cursor", {"cursor": (last["date"], last["id"])})
+
+    return jsonify({
+        "limit": limit,
+        "next_cursor": next_cursor,
+        "appointments": [_appointment(r) for r in rows]
+    }), 200
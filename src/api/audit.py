@@ -0,0 +1,135 @@
+# src/api/audit.py
+from datetime import timezone
+
+from flask import Blueprint, jsonify, request, g, current_app
+from database.db import fetch_all, iter_rows
+from utils.security import require_role
+from utils.logging_utils import audit_log
+from utils.validation_new import AuditEventQuerySchema, validate_query, KeysetCursor
+from utils.serialization import compile_mapper, column
+from utils.streaming import ndjson_response
+import sqlite3
+
+audit_bp = Blueprint("audit", __name__)
+
+# Startpunkt ohne Cursor: liegt vor jedem (timestamp, id)
+_FIRST_PAGE = ("", 0)
+
+_cursor_field = KeysetCursor(size=2)
+
+_event = compile_mapper({
+    "id": column("id"),
+    "timestamp": column("timestamp"),
+    "user_id": column("user_id"),
+    "action": column("action"),
+    "resource_type": column("resource_type"),
+    "resource_id": column("resource_id"),
+    "success": column("success", bool),
+})
+
+
+def _timestamp(value) -> str:
+    """Gespeichert wird naive UTC-ISO (datetime.utcnow().isoformat())."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.isoformat()
+
+
+def _prefix_upper_bound(prefix: str) -> str:
+    # action >= 'LOGIN_' AND action < 'LOGIN`' statt LIKE: nutzt den Index
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+def _filters(params):
+    """WHERE-Bedingungen + Parameter; nur feste SQL-Fragmente, Werte immer als Parameter."""
+    where, args = [], []
+
+    if "start" in params:
+        where.append("timestamp >= ?")
+        args.append(_timestamp(params["start"]))
+    if "end" in params:
+        where.append("timestamp < ?")
+        args.append(_timestamp(params["end"]))
+    if "user_id" in params:
+        where.append("user_id = ?")
+        args.append(params["user_id"])
+    if "action" in params:
+        where.append("action >= ? AND action < ?")
+        args.extend((params["action"], _prefix_upper_bound(params["action"])))
+    if "resource_type" in params:
+        where.append("resource_type = ?")
+        args.append(params["resource_type"])
+    if "resource_id" in params:
+        where.append("resource_id = ?")
+        args.append(params["resource_id"])
+    if "success" in params:
+        where.append("success = ?")
+        args.append(1 if params["success"] else 0)
+
+    return where, args
+
+
+_SELECT = "SELECT id, timestamp, user_id, action, resource_type, resource_id, success FROM audit_logs"
+
+
+# ============================================================
+# GET /audit/events  (admin) – Audit-Log abfragen
+# ============================================================
+@audit_bp.route("/audit/events", methods=["GET"])
+@require_role(["admin"])
+@validate_query(AuditEventQuerySchema)
+def get_audit_events():
+    """
+    Audit-Ereignisse filtern (Zeitraum, user_id, Aktions-Präfix,
+    Ressource, Erfolg), chronologisch nach (timestamp, id).
+
+    - format=json:   Keyset-Pagination (limit + next_cursor), kein OFFSET
+    - format=ndjson: alle Treffer gestreamt (fetchmany, konstanter Speicher)
+
+    DSGVO / TR-03161:
+    - RBAC: Nur Admin
+    - Audit-Einträge enthalten nur Metadaten (keine Patientendaten)
+    - Jede Abfrage wird selbst auditiert (wer hat das Audit-Log gelesen)
+    - Archivierte Monate: CLI search-audit-archive
+    """
+
+    params = request.validated_params
+    user_id = g.current_user["id"]
+    where, args = _filters(params)
+
+    if params["format"] == "ndjson":
+        sql = _SELECT + (" WHERE " + " AND ".join(where) if where else "") + " ORDER BY timestamp, id"
+        rows = iter_rows(sql, args, chunk_size=current_app.config.get("EXPORT_FETCH_SIZE", 1000))
+        audit_log(user_id, "EXPORT_AUDIT_EVENTS", "AuditLog", None, success=True)
+        return ndjson_response(rows, _event)
+
+    max_page_size = current_app.config.get("SEARCH_MAX_PAGE_SIZE", 100)
+    limit = min(params.get("limit") or current_app.config.get("SEARCH_DEFAULT_PAGE_SIZE", 20), max_page_size)
+
+    after_timestamp, after_id = params.get("cursor") or _FIRST_PAGE
+    where.append("(timestamp, id) > (?, ?)")
+    args.extend((after_timestamp, after_id))
+
+    try:
+        # limit + 1 Zeilen laden, um zu erkennen, ob es eine weitere Seite gibt
+        rows = fetch_all(
+            _SELECT + " WHERE " + " AND ".join(where) + " ORDER BY timestamp, id LIMIT ?",
+            (*args, limit + 1)
+        )
+    except sqlite3.Error:
+        audit_log(user_id, "READ_AUDIT_EVENTS_DB_ERROR", "AuditLog", None, success=False)
+        return jsonify({"error": "Database error"}), 500
+
+    audit_log(user_id, "READ_AUDIT_EVENTS", "AuditLog", None, success=True)
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = _cursor_field.serialize("cursor", {"cursor": (last["timestamp"], last["id"])})
+
+    return jsonify({
+        "limit": limit,
+        "next_cursor": next_cursor,
+        "events": [_event(r) for r in rows]
+    }), 200
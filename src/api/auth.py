@@ -5,10 +5,11 @@ from datetime import datetime, timedelta
 
 from database.db import fetch_one, execute
 from utils.logging_utils import audit_log
-from utils.security import verify_password, hash_password, require_role
+from utils.security import require_role
+from utils.password_pool import verify_password, hash_password, needs_rehash, PasswordPoolBusy
 
 # KORREKTUR: remove_session statt delete_session importieren
-from utils.session_services import create_session, remove_session
+from utils.session_services import create_session, remove_session, invalidate_user_sessions
 from utils.validation_new import validate_json, LoginSchema, PasswordUpdateSchema
 
 auth_bp = Blueprint("auth", __name__)
@@ -78,8 +79,18 @@ def login():
             (user["id"],)
         )
 
+    # 5. Transparentes Rehash (Alt-Format oder geänderte Kostenparameter)
+    if needs_rehash(user["password"]):
+        try:
+            execute(
+                "UPDATE users SET password = ? WHERE id = ? AND password = ?",
+                (hash_password(password), user["id"], user["password"])
+            )
+        except PasswordPoolBusy:
+            pass  # Login ist gültig; Rehash beim nächsten Login
+
     # Session erstellen
-    token = create_session(user["id"])
+    token = create_session(user)
     audit_log(user["id"], "LOGIN_SUCCESS", "User", user["id"], success=True)
 
     return jsonify({
@@ -143,6 +154,7 @@ def change_password():
             "UPDATE users SET password = ? WHERE id = ?",
             (hashed_new_pw, user_id)
         )
+        invalidate_user_sessions(user_id)
         audit_log(user_id, "PASSWORD_CHANGE_SUCCESS", "User", user_id, success=True)
         return jsonify({"message": "Password updated successfully"}), 200
 
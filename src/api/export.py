@@ -0,0 +1,140 @@
+# src/api/export.py
+from itertools import chain
+
+from flask import Blueprint, jsonify, g, current_app
+from database.db import iter_rows
+from utils.security import require_role
+from utils.logging_utils import audit_log
+from api.fhir import fhir_patient_resource
+from api.patient import patient_basic, patient_with_diagnosis
+from utils.serialization import compile_mapper, column
+from utils.streaming import NDJSON_MIMETYPE, ndjson_response, stream_response
+from utils.appointment_series import SERIES_EXPORT_QUERY, iter_series_occurrences
+
+export_bp = Blueprint("export", __name__)
+
+FHIR_JSON_MIMETYPE = "application/fhir+json"
+
+_appointment = compile_mapper({
+    "id": column("id"),
+    "patient_id": column("patient_id"),
+    "doctor_id": column("doctor_id"),
+    "date": column("date"),
+    "end_date": column("end_date"),
+    "description": column("description"),
+})
+
+
+# ============================================================
+# GET /export/patients  (doctor, nurse) – NDJSON
+# ============================================================
+@export_bp.route("/export/patients", methods=["GET"])
+@require_role(["doctor", "nurse"])
+def export_patients():
+    """
+    Healthcare-SAFE Bulk-Export aller Patienten (NDJSON, gestreamt)
+
+    DSGVO / TR-03161:
+    - Admin darf NICHT lesen
+    - Minimalprinzip wie GET /patient/<id>: Diagnose nur für Ärzte
+    - EIN Audit-Eintrag pro Export (nicht pro Datensatz)
+    """
+
+    user = g.current_user
+    role = user["role"]
+
+    if role == "admin":
+        return jsonify({"error": "Not permitted"}), 403
+
+    to_dict = patient_with_diagnosis if role == "doctor" else patient_basic
+
+    rows = iter_rows(
+        """
+        SELECT id, first_name, last_name, birthdate, mrn, diagnosis
+        FROM patients
+        ORDER BY id
+        """,
+        chunk_size=current_app.config.get("EXPORT_FETCH_SIZE", 1000)
+    )
+
+    audit_log(user["id"], "EXPORT_PATIENTS", "Patient", None, success=True)
+    return ndjson_response(rows, to_dict)
+
+
+# ============================================================
+# GET /export/appointments  (doctor, nurse) – NDJSON
+# ============================================================
+@export_bp.route("/export/appointments", methods=["GET"])
+@require_role(["doctor", "nurse"])
+def export_appointments():
+    """
+    Bulk-Export aller Termine (NDJSON, gestreamt).
+
+    Zuerst Einzeltermine (nach id), danach alle Termine der Terminserien
+    (nach Serie und Beginn). Serientermine haben keine id, sondern
+    series_id + occurrence (ursprünglicher Beginn), wie in
+    GET /appointments/calendar.
+    """
+
+    user = g.current_user
+    fetch_size = current_app.config.get("EXPORT_FETCH_SIZE", 1000)
+
+    singles = iter_rows(
+        """
+        SELECT id, patient_id, doctor_id, date, end_date, description
+        FROM appointments
+        ORDER BY id
+        """,
+        chunk_size=fetch_size
+    )
+    # Generatoren: die Serien-Abfrage leiht ihre Verbindung erst, wenn die
+    # Einzeltermine (und deren Verbindung) abgearbeitet sind
+    occurrences = iter_series_occurrences(iter_rows(SERIES_EXPORT_QUERY, chunk_size=fetch_size))
+
+    dumps = current_app.json.dumps
+    chunks = chain(
+        (dumps(_appointment(row)) + "\n" for row in singles),
+        (dumps(occ) + "\n" for occ in occurrences),
+    )
+
+    audit_log(user["id"], "EXPORT_APPOINTMENTS", "Appointment", None, success=True)
+    return stream_response(chunks, NDJSON_MIMETYPE)
+
+
+# ============================================================
+# GET /export/fhir/Patient  (doctor, nurse) – FHIR Bundle
+# ============================================================
+@export_bp.route("/export/fhir/Patient", methods=["GET"])
+@require_role(["doctor", "nurse"])
+def export_fhir_patients():
+    """
+    Alle Patienten als FHIR Bundle (searchset), gestreamt.
+    Gleiche Datenminimierung wie GET /fhir/Patient/<id>.
+    """
+
+    user = g.current_user
+
+    if user["role"] == "admin":
+        return jsonify({"error": "Not permitted"}), 403
+
+    rows = iter_rows(
+        """
+        SELECT id, first_name, last_name, birthdate, mrn
+        FROM patients
+        ORDER BY id
+        """,
+        chunk_size=current_app.config.get("EXPORT_FETCH_SIZE", 1000)
+    )
+
+    dumps = current_app.json.dumps
+
+    def generate():
+        yield '{"resourceType":"Bundle","type":"searchset","entry":['
+        separator = ""
+        for row in rows:
+            yield separator + dumps({"resource": fhir_patient_resource(row)})
+            separator = ","
+        yield "]}"
+
+    audit_log(user["id"], "EXPORT_FHIR_PATIENTS", "Patient", None, success=True)
+    return stream_response(generate(), FHIR_JSON_MIMETYPE)
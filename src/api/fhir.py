@@ -1,11 +1,96 @@
 # src/api/fhir.py
-from flask import Blueprint, jsonify, g
-from database.db import fetch_one
+from flask import Blueprint, jsonify, g, request, current_app, url_for, send_from_directory
+from database.db import fetch_one, fetch_all, write_transaction, iter_keyset
 from utils.security import require_role
-from utils.logging_utils import audit_log
+from utils.logging_utils import audit_log, audit_log_many
+from utils.serialization import compile_mapper, column, template
+from utils.etag import etag_value, with_etag, is_not_modified, not_modified, if_match_values
+from utils.validation_new import PatientCreateSchema
+from utils.appointment_series import SERIES_EXPORT_KEYSET_QUERY, iter_series_occurrences
+from marshmallow import ValidationError
+from utils.fhir_bulk_export import (
+    ExportQueueFull, start_export_job, get_job, job_outputs, job_directory, delete_job,
+    is_stale, fail_stale_jobs
+)
+import json
+from datetime import datetime, timezone
+import re
+import sqlite3
 
 fhir_bp = Blueprint("fhir", __name__)
 
+FHIR_NDJSON_MIMETYPE = "application/fhir+ndjson"
+
+
+# Minimaler FHIR Patient (DSGVO Art. 5 – Datenminimierung):
+# nur ID, Name, Geburtsdatum und MRN
+fhir_patient_resource = compile_mapper({
+    "resourceType": "Patient",
+    "id": column("id", str),
+    "name": [{
+        "text": template("{first_name} {last_name}")
+    }],
+    "birthDate": column("birthdate"),
+    "identifier": [
+        {
+            "system": "urn:mrn",
+            "value": column("mrn")
+        }
+    ]
+})
+
+# Minimaler FHIR Appointment: Zeitpunkt, Beschreibung und Referenzen
+# auf Patient und behandelnden Arzt (Practitioner)
+fhir_appointment_resource = compile_mapper({
+    "resourceType": "Appointment",
+    "id": column("id", str),
+    "status": "booked",
+    "start": column("date"),
+    "end": column("end_date"),
+    "description": column("description"),
+    "participant": [
+        {"actor": {"reference": template("Patient/{patient_id}")}, "status": "accepted"},
+        {"actor": {"reference": template("Practitioner/{doctor_id}")}, "status": "accepted"}
+    ]
+})
+
+
+def operation_outcome(message: str, code: str = "processing") -> dict:
+    """Generische FHIR-Fehlerantwort (keine internen Details)."""
+    return {
+        "resourceType": "OperationOutcome",
+        "issue": [{"severity": "error", "code": code, "diagnostics": message}]
+    }
+
+
+# Zeilenquellen für $export: Keyset-Blöcke statt eines Read-Snapshots über
+# den ganzen (langen) Job, damit WAL-Checkpoints nicht blockiert werden
+def _patient_rows(fetch_size: int):
+    return iter_keyset(
+        "SELECT id, first_name, last_name, birthdate, mrn FROM patients WHERE id > ? ORDER BY id LIMIT ?",
+        chunk_size=fetch_size
+    )
+
+
+def _appointment_rows(fetch_size: int):
+    """Einzeltermine, danach alle Termine der Terminserien."""
+    yield from iter_keyset(
+        "SELECT id, patient_id, doctor_id, date, end_date, description FROM appointments WHERE id > ? ORDER BY id LIMIT ?",
+        chunk_size=fetch_size
+    )
+    for occ in iter_series_occurrences(iter_keyset(SERIES_EXPORT_KEYSET_QUERY, chunk_size=fetch_size)):
+        # FHIR id: [A-Za-z0-9-.]{1,64}, z.B. "series-12-20261020T070000Z"
+        stamp = occ["occurrence"].replace("-", "").replace(":", "")
+        yield {**occ, "id": f"series-{occ['series_id']}-{stamp}"}
+
+
+# Ressourcentypen für $export: Zeilenquelle (stabil sortiert) + Mapping auf FHIR
+# Encounter ist im Datenmodell nicht vorhanden und wird daher nicht angeboten.
+BULK_EXPORT_RESOURCES = {
+    "Patient": (_patient_rows, fhir_patient_resource),
+    "Appointment": (_appointment_rows, fhir_appointment_resource),
+}
+
 
 @fhir_bp.route("/fhir/Patient/<int:patient_id>", methods=["GET"])
 @require_role(["doctor", "nurse"])
@@ -18,6 +103,9 @@ def get_fhir_patient(patient_id):
     - Keine Diagnose, keine Versicherungsnummer, keine Notizen
     - RBAC: doctor & nurse
     - Keine detaillierten Fehlermeldungen
+
+    Versionierung: meta.versionId + ETag W/"<version>";
+    If-None-Match passt -> 304 nach reinem Versions-Lookup
     """
 
     user = g.current_user
@@ -26,10 +114,17 @@ def get_fhir_patient(patient_id):
     if user["role"] == "admin":
         return jsonify({"error": "Not permitted"}), 403
 
+    # Revalidierung: nur die Version lesen, nichts serialisieren
+    if request.if_none_match:
+        current = fetch_one("SELECT version FROM patients WHERE id = ?", (patient_id,))
+        if current is not None and is_not_modified(etag_value(current["version"])):
+            audit_log(user["id"], "FHIR_PATIENT_READ_NOT_MODIFIED", "Patient", patient_id, success=True)
+            return not_modified(etag_value(current["version"]))
+
     # Patient aus DB abrufen
     row = fetch_one(
         """
-        SELECT id, first_name, last_name, birthdate, mrn
+        SELECT id, first_name, last_name, birthdate, mrn, version
         FROM patients
         WHERE id = ?
         """,
@@ -40,22 +135,434 @@ def get_fhir_patient(patient_id):
         audit_log(user["id"], "FHIR_PATIENT_READ_NOT_FOUND", "Patient", patient_id, success=False)
         return jsonify({"error": "Patient not found"}), 404
 
-    # Minimaler FHIR Patient (DSGVO Art. 5 – Datenminimierung)
-    fhir_patient = {
-        "resourceType": "Patient",
-        "id": str(row["id"]),
-        "name": [{
-            "text": f"{row['first_name']} {row['last_name']}"
-        }],
-        "birthDate": row["birthdate"],
-        "identifier": [
+    audit_log(user["id"], "FHIR_PATIENT_READ_SUCCESS", "Patient", patient_id, success=True)
+
+    return _versioned_patient_response(row), 200
+
+
+def _versioned_patient_response(row):
+    # Minimaler FHIR Patient (DSGVO Art. 5 – Datenminimierung) + meta.versionId
+    fhir_patient = fhir_patient_resource(row)
+    fhir_patient["meta"] = {"versionId": str(row["version"])}
+    return with_etag(jsonify(fhir_patient), etag_value(row["version"]))
+
+
+def _patient_fields(resource) -> dict:
+    """
+    FHIR Patient -> Spalten (nur die Felder der minimalen Darstellung).
+    Name: name[0].family/given, sonst name[0].text "<Vorname> <Nachname>"
+    wie in GET geliefert.
+    """
+    name = (resource.get("name") or [{}])[0]
+    if not isinstance(name, dict):
+        name = {}
+    given = name.get("given") if isinstance(name.get("given"), list) else []
+    first_name, last_name = " ".join(str(v) for v in given), name.get("family")
+    if not (first_name and last_name) and isinstance(name.get("text"), str):
+        first_name, _, last_name = name["text"].strip().rpartition(" ")
+
+    mrn = next(
+        (
+            identifier.get("value") for identifier in resource.get("identifier") or []
+            if isinstance(identifier, dict) and identifier.get("system") == "urn:mrn"
+        ),
+        None
+    )
+    return {"first_name": first_name, "last_name": last_name, "birthdate": resource.get("birthDate"), "mrn": mrn}
+
+
+# ============================================================
+# PUT /fhir/Patient/<id>  (doctor) – Update mit If-Match
+# ============================================================
+@fhir_bp.route("/fhir/Patient/<int:patient_id>", methods=["PUT"])
+@require_role(["doctor"])
+def update_fhir_patient(patient_id):
+    """
+    FHIR update (Name, Geburtsdatum, MRN) mit optimistischer Sperre
+    ---------------------------------------------------------------
+    - If-Match: W/"<versionId>" ist Pflicht (fehlt -> 428)
+    - Version passt nicht mehr -> 412, nichts wird geändert
+    - Prüfung + Änderung in EINEM bedingten UPDATE (kein Lost Update)
+    - Antwort: aktualisierte Ressource mit neuem ETag / meta.versionId
+    """
+
+    user = g.current_user
+
+    expected = if_match_values()
+    if not expected:
+        return jsonify(operation_outcome("If-Match required", "required")), 428
+
+    resource = request.get_json(silent=True)
+    if not isinstance(resource, dict) or resource.get("resourceType") != "Patient":
+        return jsonify(operation_outcome("Patient resource required", "invalid")), 400
+    if resource.get("id") != str(patient_id):
+        return jsonify(operation_outcome("Resource id does not match URL", "invalid")), 400
+
+    try:
+        fields = PatientCreateSchema().load(_patient_fields(resource))
+    except ValidationError:
+        return jsonify(operation_outcome("Invalid Patient resource", "invalid")), 400
+
+    # If-Match: * -> jede Version; sonst genau eine erwartete Version
+    version_filter, version_args = "", ()
+    if expected != {"*"}:
+        if len(expected) != 1 or not next(iter(expected)).isdigit():
+            audit_log(user["id"], "FHIR_PATIENT_UPDATE_PRECONDITION_FAILED", "Patient", patient_id, success=False)
+            return jsonify(operation_outcome("Version mismatch", "conflict")), 412
+        version_filter, version_args = " AND version = ?", (int(next(iter(expected))),)
+
+    try:
+        with write_transaction() as conn:
+            row = conn.execute(
+                """
+                UPDATE patients
+                SET first_name = ?, last_name = ?, birthdate = ?, mrn = ?, version = version + 1
+                WHERE id = ?""" + version_filter + """
+                RETURNING id, first_name, last_name, birthdate, mrn, version
+                """,
+                (fields["first_name"].strip(), fields["last_name"].strip(), fields["birthdate"].isoformat(),
+                 fields["mrn"].strip(), patient_id, *version_args)
+            ).fetchone()
+            exists = row is not None or conn.execute(
+                "SELECT 1 FROM patients WHERE id = ?", (patient_id,)
+            ).fetchone() is not None
+    except sqlite3.IntegrityError:
+        audit_log(user["id"], "FHIR_PATIENT_UPDATE_CONFLICT", "Patient", patient_id, success=False)
+        return jsonify(operation_outcome("MRN already in use", "duplicate")), 409
+    except sqlite3.Error:
+        audit_log(user["id"], "FHIR_PATIENT_UPDATE_DB_ERROR", "Patient", patient_id, success=False)
+        return jsonify(operation_outcome("Database error", "exception")), 500
+
+    if not exists:
+        audit_log(user["id"], "FHIR_PATIENT_UPDATE_NOT_FOUND", "Patient", patient_id, success=False)
+        return jsonify(operation_outcome("Patient not found", "not-found")), 404
+
+    if row is None:
+        audit_log(user["id"], "FHIR_PATIENT_UPDATE_PRECONDITION_FAILED", "Patient", patient_id, success=False)
+        return jsonify(operation_outcome("Version mismatch", "conflict")), 412
+
+    audit_log(user["id"], "FHIR_PATIENT_UPDATE_SUCCESS", "Patient", patient_id, success=True)
+    return _versioned_patient_response(row), 200
+
+
+# ============================================================
+# MEHRERE PATIENTEN IN EINEM DB-ROUNDTRIP
+# ============================================================
+_PATIENT_REFERENCE = re.compile(r"^/?Patient/([1-9][0-9]{0,18})$")
+
+
+def _load_patients(patient_ids) -> dict:
+    """
+    Lädt alle Patienten mit EINER Abfrage.
+    Die IDs werden als ein JSON-Array-Parameter übergeben (json_each) –
+    statisches SQL, unabhängig vom Limit für SQL-Variablen.
+    """
+    if not patient_ids:
+        return {}
+
+    rows = fetch_all(
+        """
+        SELECT id, first_name, last_name, birthdate, mrn
+        FROM patients
+        WHERE id IN (SELECT value FROM json_each(?))
+        """,
+        (json.dumps(sorted(set(patient_ids))),)
+    )
+    return {row["id"]: row for row in rows}
+
+
+def _entry_response(status: str, resource=None, outcome=None) -> dict:
+    entry = {"response": {"status": status}}
+    if resource is not None:
+        entry["resource"] = resource
+    if outcome is not None:
+        entry["response"]["outcome"] = outcome
+    return entry
+
+
+# ============================================================
+# GET /fhir/Patient?_id=1,2,3  (doctor, nurse)
+# ============================================================
+@fhir_bp.route("/fhir/Patient", methods=["GET"])
+@require_role(["doctor", "nurse"])
+def search_fhir_patients():
+    """
+    FHIR-Suche nach mehreren Patienten per _id (searchset Bundle).
+    Nur _id wird unterstützt; Datenminimierung wie GET /fhir/Patient/<id>.
+    """
+
+    user = g.current_user
+
+    raw_ids = request.args.get("_id")
+    if not raw_ids:
+        return jsonify(operation_outcome("Search parameter _id required", "required")), 400
+
+    try:
+        patient_ids = [int(v) for v in raw_ids.split(",") if v.strip()]
+    except ValueError:
+        return jsonify(operation_outcome("Invalid _id", "invalid")), 400
+
+    max_entries = current_app.config.get("FHIR_BATCH_MAX_ENTRIES", 1000)
+    if not patient_ids or len(patient_ids) > max_entries or any(pid <= 0 for pid in patient_ids):
+        return jsonify(operation_outcome("Invalid _id", "invalid")), 400
+
+    try:
+        patients = _load_patients(patient_ids)
+    except sqlite3.Error:
+        audit_log(user["id"], "FHIR_PATIENT_SEARCH_DB_ERROR", "Patient", None, success=False)
+        return jsonify(operation_outcome("Database error", "exception")), 500
+
+    found = [patients[pid] for pid in dict.fromkeys(patient_ids) if pid in patients]
+
+    audit_log_many(
+        (user["id"], "FHIR_PATIENT_READ_SUCCESS", "Patient", row["id"], True) for row in found
+    )
+
+    return jsonify({
+        "resourceType": "Bundle",
+        "type": "searchset",
+        "total": len(found),
+        "entry": [
+            {"resource": fhir_patient_resource(row), "search": {"mode": "match"}}
+            for row in found
+        ]
+    }), 200
+
+
+# ============================================================
+# POST /fhir  (doctor, nurse) – batch Bundle
+# ============================================================
+@fhir_bp.route("/fhir", methods=["POST"])
+@require_role(["doctor", "nurse"])
+def fhir_batch():
+    """
+    FHIR batch Bundle mit "GET Patient/<id>"-Einträgen
+    --------------------------------------------------
+    - alle Patienten mit EINER DB-Abfrage
+    - EIN Audit-Batch für alle gelesenen Ressourcen
+    - Antwort: batch-response Bundle, Einträge in Anfrage-Reihenfolge
+    """
+
+    user = g.current_user
+
+    bundle = request.get_json(silent=True)
+    if not isinstance(bundle, dict) or bundle.get("resourceType") != "Bundle":
+        return jsonify(operation_outcome("Bundle required", "invalid")), 400
+
+    if bundle.get("type") != "batch":
+        return jsonify(operation_outcome("Only batch Bundles are supported", "not-supported")), 400
+
+    entries = bundle.get("entry") or []
+    if not isinstance(entries, list) or len(entries) > current_app.config.get("FHIR_BATCH_MAX_ENTRIES", 1000):
+        return jsonify(operation_outcome("Too many entries", "too-costly")), 400
+
+    # 1. Einträge parsen (ungültige werden einzeln beantwortet, nicht der ganze Batch)
+    requested = []
+    for entry in entries:
+        req = entry.get("request") if isinstance(entry, dict) else None
+        match = None
+        if isinstance(req, dict) and req.get("method") == "GET" and isinstance(req.get("url"), str):
+            match = _PATIENT_REFERENCE.match(req["url"])
+        requested.append(int(match.group(1)) if match else None)
+
+    # 2. EIN Roundtrip für alle gültigen IDs
+    try:
+        patients = _load_patients([pid for pid in requested if pid is not None])
+    except sqlite3.Error:
+        audit_log(user["id"], "FHIR_BATCH_DB_ERROR", "Patient", None, success=False)
+        return jsonify(operation_outcome("Database error", "exception")), 500
+
+    # 3. batch-response + Audit-Batch
+    response_entries = []
+    audit_entries = []
+    for pid in requested:
+        if pid is None:
+            response_entries.append(_entry_response(
+                "400 Bad Request", outcome=operation_outcome("Only GET Patient/<id> is supported", "not-supported")
+            ))
+        elif pid in patients:
+            response_entries.append(_entry_response("200 OK", resource=fhir_patient_resource(patients[pid])))
+            audit_entries.append((user["id"], "FHIR_PATIENT_READ_SUCCESS", "Patient", pid, True))
+        else:
+            response_entries.append(_entry_response(
+                "404 Not Found", outcome=operation_outcome("Patient not found", "not-found")
+            ))
+            audit_entries.append((user["id"], "FHIR_PATIENT_READ_NOT_FOUND", "Patient", pid, False))
+
+    audit_log_many(audit_entries)
+
+    return jsonify({
+        "resourceType": "Bundle",
+        "type": "batch-response",
+        "entry": response_entries
+    }), 200
+
+
+# ============================================================
+# FHIR BULK DATA ACCESS ($export)
+# ============================================================
+def _requested_types():
+    """
+    _type aus Query-String (GET/POST) oder FHIR Parameters-Body (POST).
+    Liefert None bei unbekannten Typen.
+    """
+    raw = request.args.get("_type")
+
+    body = request.get_json(silent=True) if request.method == "POST" else None
+    if raw is None and isinstance(body, dict) and body.get("resourceType") == "Parameters":
+        values = [
+            p.get("valueString") for p in body.get("parameter", [])
+            if isinstance(p, dict) and p.get("name") == "_type"
+        ]
+        raw = ",".join(v for v in values if isinstance(v, str)) or None
+
+    if raw is None:
+        return list(BULK_EXPORT_RESOURCES)
+
+    types = [t.strip() for t in raw.split(",") if t.strip()]
+    if not types or any(t not in BULK_EXPORT_RESOURCES for t in types):
+        return None
+    return list(dict.fromkeys(types))
+
+
+def _fhir_instant(value: str) -> str:
+    """Gespeicherter UTC-Zeitstempel (naiv, ISO) -> FHIR instant (Zeitzone Pflicht)."""
+    return datetime.fromisoformat(value).replace(tzinfo=timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+def _load_own_job(job_id):
+    """Job nur für den Ersteller sichtbar (sonst 404, keine Existenz-Preisgabe)."""
+    job = get_job(job_id)
+    if job is None or job["user_id"] != g.current_user["id"]:
+        return None
+    return job
+
+
+@fhir_bp.route("/fhir/$export", methods=["GET", "POST"])
+@require_role(["doctor", "nurse"])
+def bulk_export_kickoff():
+    """
+    FHIR Bulk Data Kick-off (System-Level Export)
+    ---------------------------------------------
+    - Prefer: respond-async ist Pflicht (FHIR Bulk Data Spec)
+    - 202 + Content-Location auf den Status-Endpunkt
+    - Ausführung im Hintergrund, begrenzte Parallelität
+    """
+
+    user = g.current_user
+
+    if "respond-async" not in request.headers.get("Prefer", ""):
+        return jsonify(operation_outcome("Prefer: respond-async header required", "required")), 400
+
+    output_format = request.args.get("_outputFormat")
+    if output_format not in (None, FHIR_NDJSON_MIMETYPE, "application/ndjson", "ndjson"):
+        return jsonify(operation_outcome("Unsupported _outputFormat", "not-supported")), 400
+
+    types = _requested_types()
+    if types is None:
+        return jsonify(operation_outcome("Unsupported _type", "not-supported")), 400
+
+    try:
+        job_id = start_export_job(
+            user["id"],
+            request.url,
+            {t: BULK_EXPORT_RESOURCES[t] for t in types},
+            current_app.config
+        )
+    except ExportQueueFull:
+        response = jsonify(operation_outcome("Too many export jobs, try again later", "throttled"))
+        response.headers["Retry-After"] = "60"
+        return response, 429
+    except sqlite3.Error:
+        audit_log(user["id"], "FHIR_BULK_EXPORT_DB_ERROR", "Bulk", None, success=False)
+        return jsonify(operation_outcome("Database error", "exception")), 500
+
+    audit_log(user["id"], "FHIR_BULK_EXPORT_KICKOFF", "Bulk", None, success=True)
+
+    response = current_app.response_class(status=202)
+    response.headers["Content-Location"] = url_for(
+        "fhir.bulk_export_status", job_id=job_id, _external=True
+    )
+    return response
+
+
+@fhir_bp.route("/fhir/$export-status/<job_id>", methods=["GET"])
+@require_role(["doctor", "nurse"])
+def bulk_export_status(job_id):
+    """
+    Status-Polling: 202 (läuft, X-Progress), 200 (Manifest) oder 500 (fehlgeschlagen).
+    """
+
+    job = _load_own_job(job_id)
+    if job is None:
+        return jsonify(operation_outcome("Export job not found", "not-found")), 404
+
+    # Worker neu gestartet/abgestürzt: Job nicht ewig mit 202 beantworten
+    if is_stale(job, current_app.config["FHIR_EXPORT_MAX_RUNTIME_MINUTES"]):
+        fail_stale_jobs(current_app.config["FHIR_EXPORT_MAX_RUNTIME_MINUTES"])
+        job = _load_own_job(job_id)
+
+    if job["status"] in ("queued", "in-progress"):
+        response = current_app.response_class(status=202)
+        response.headers["X-Progress"] = job["progress"] or job["status"]
+        response.headers["Retry-After"] = "5"
+        return response
+
+    if job["status"] != "completed":
+        return jsonify(operation_outcome("Export job failed", "exception")), 500
+
+    manifest = {
+        "transactionTime": _fhir_instant(job["created_at"]),
+        "request": job["request_url"],
+        "requiresAccessToken": True,
+        "output": [
             {
-                "system": "urn:mrn",
-                "value": row["mrn"]
+                "type": item["type"],
+                "url": url_for(
+                    "fhir.bulk_export_file", job_id=job_id, file_name=item["file"], _external=True
+                ),
+                "count": item["count"]
             }
-        ]
+            for item in job_outputs(job)
+        ],
+        "error": []
     }
+    return jsonify(manifest), 200
+
+
+@fhir_bp.route("/fhir/$export-status/<job_id>", methods=["DELETE"])
+@require_role(["doctor", "nurse"])
+def bulk_export_delete(job_id):
+    """Bricht einen Export ab bzw. löscht ihn samt Dateien."""
+
+    job = _load_own_job(job_id)
+    if job is None:
+        return jsonify(operation_outcome("Export job not found", "not-found")), 404
+
+    delete_job(current_app.config["FHIR_EXPORT_DIR"], job_id)
+    audit_log(g.current_user["id"], "FHIR_BULK_EXPORT_DELETE", "Bulk", None, success=True)
+    return current_app.response_class(status=202)
 
-    audit_log(user["id"], "FHIR_PATIENT_READ_SUCCESS", "Patient", patient_id, success=True)
 
-    return jsonify(fhir_patient), 200
+@fhir_bp.route("/fhir/$export-files/<job_id>/<file_name>", methods=["GET"])
+@require_role(["doctor", "nurse"])
+def bulk_export_file(job_id, file_name):
+    """
+    Download einer NDJSON-Ausgabedatei (nur Ersteller, nur Dateien aus dem Manifest).
+    """
+
+    job = _load_own_job(job_id)
+    if job is None or job["status"] != "completed":
+        return jsonify(operation_outcome("File not found", "not-found")), 404
+
+    # Nur im Manifest gelistete Dateinamen (kein Pfad aus Benutzereingaben)
+    if file_name not in {item["file"] for item in job_outputs(job)}:
+        return jsonify(operation_outcome("File not found", "not-found")), 404
+
+    audit_log(g.current_user["id"], "FHIR_BULK_EXPORT_DOWNLOAD", "Bulk", None, success=True)
+
+    return send_from_directory(
+        job_directory(current_app.config["FHIR_EXPORT_DIR"], job_id),
+        file_name,
+        mimetype=FHIR_NDJSON_MIMETYPE
+    )
@@ -0,0 +1,114 @@
+# src/api/metrics.py
+import hmac
+from functools import wraps
+
+from flask import Blueprint, Response, jsonify, request, current_app
+
+from database.db import pool_stats
+from utils.security import require_role
+from utils.metrics import is_enabled, render_metrics, add_gauge_source, registry
+from utils.logging_utils import audit_stats
+from utils.password_pool import password_pool_stats
+from utils.session_cache import get_session_cache
+from utils.session_tokens import revocation_stats
+from utils.session_reaper import reaper_stats
+
+metrics_bp = Blueprint("metrics", __name__)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+# ============================================================
+# GAUGES aus den vorhandenen stats()-Funktionen
+# ============================================================
+registry.describe("audit_events_total", "counter", "Audit writer events by result")
+registry.describe("password_hash_requests_total", "counter", "Password pool requests by result")
+registry.describe("session_cache_events_total", "counter", "Session cache events by kind")
+registry.describe("session_reaper_rows_total", "counter", "Rows deleted by the session reaper")
+
+
+def _db_gauges():
+    stats = pool_stats()
+    yield "db_pool_connections", (("state", "open"),), stats["open"]
+    yield "db_pool_connections", (("state", "idle"),), stats["idle"]
+    yield "db_pool_size", (), stats["size"]
+
+
+def _audit_gauges():
+    stats = audit_stats()
+    for result in ("enqueued", "written", "blocked", "dropped", "failed", "sync_fallback"):
+        yield "audit_events_total", (("result", result),), stats[result]
+    yield "audit_queue_depth", (), stats["queue_depth"]
+
+
+def _password_gauges():
+    stats = password_pool_stats()
+    for result in ("submitted", "rejected", "timeouts", "restarts"):
+        yield "password_hash_requests_total", (("result", result),), stats[result]
+    yield "password_hash_in_flight", (), stats["in_flight"]
+
+
+def _session_gauges():
+    stats = get_session_cache().stats()
+    for kind in ("hits", "misses", "evictions", "expirations", "invalidations"):
+        yield "session_cache_events_total", (("kind", kind),), stats[kind]
+    yield "session_cache_entries", (), stats["entries"]
+
+    revocations = revocation_stats()
+    yield "session_revocations_loaded", (("kind", "token"),), revocations["revoked_tokens"]
+    yield "session_revocations_loaded", (("kind", "user"),), revocations["revoked_users"]
+
+    reaper = reaper_stats()
+    yield "session_reaper_rows_total", (("table", "sessions"),), reaper["reaped_sessions"]
+    yield "session_reaper_rows_total", (("table", "token_revocations"),), reaper["reaped_revocations"]
+    yield "session_table_rows", (("table", "sessions"),), reaper["sessions_rows"]
+    yield "session_table_rows", (("table", "token_revocations"),), reaper["revocations_rows"]
+
+
+for _source in (_db_gauges, _audit_gauges, _password_gauges, _session_gauges):
+    add_gauge_source(_source)
+
+
+# ============================================================
+# GET /metrics  (admin) – Prometheus-Textformat
+# ============================================================
+def _is_scrape_token(header) -> bool:
+    """Authorization: Bearer <METRICS_SCRAPE_TOKEN> (Vergleich in konstanter Zeit)."""
+    expected = current_app.config.get("METRICS_SCRAPE_TOKEN")
+    if not expected or not header or not header.startswith("Bearer "):
+        return False
+    return hmac.compare_digest(header[len("Bearer "):].strip().encode("utf-8"), expected.encode("utf-8"))
+
+
+def require_admin_or_scrape_token(fn):
+    """Scraper mit statischem Token oder Admin-Session (require_role)."""
+    admin_only = require_role(["admin"])(fn)
+
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        if _is_scrape_token(request.headers.get("Authorization")):
+            return fn(*args, **kwargs)
+        return admin_only(*args, **kwargs)
+
+    return wrapper
+
+
+@metrics_bp.route("/metrics", methods=["GET"])
+@require_admin_or_scrape_token
+def get_metrics():
+    """
+    Betriebsmetriken im Prometheus-Textformat.
+
+    DSGVO / TR-03161:
+    - Keine personenbezogenen Daten (nur Endpoint-Namen, Zähler, Laufzeiten)
+    - Zugriff: Admin-Session oder statischer Scrape-Token
+      (METRICS_SCRAPE_TOKEN; Sessions laufen nach SESSION_LIFETIME_MINUTES
+      ab, ein Scraper könnte sich sonst nicht dauerhaft anmelden)
+    - Kein Audit-Eintrag pro Scrape: enthält keine Patientendaten und
+      würde das Audit-Log im Sekundentakt füllen
+    """
+
+    if not is_enabled():
+        return jsonify({"error": "Not found"}), 404
+
+    return Response(render_metrics(), content_type=PROMETHEUS_CONTENT_TYPE)
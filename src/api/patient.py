@@ -1,13 +1,26 @@
 # src/api/patient.py
 from flask import Blueprint, request, jsonify, g
-from database.db import fetch_one, execute
+from database.db import fetch_one, write_transaction
 from utils.security import require_role
 from utils.logging_utils import audit_log
-from utils.validation_new import validate_json, PatientUpdateSchema, PatientCreateSchema
+from utils.validation_new import validate_json, PatientUpdateSchema, PatientCreateSchema, PATIENT_UPDATE_FIELDS
+from utils.serialization import compile_mapper, column
+from utils.etag import etag_value, with_etag, is_not_modified, not_modified, if_match_values
 import sqlite3
 
 patient_bp = Blueprint("patient", "__name__")
 
+# Datenminimierung: Basisdaten für alle klinischen Rollen, Diagnose nur für Ärzte
+_PATIENT_FIELDS = {
+    "id": column("id"),
+    "first_name": column("first_name"),
+    "last_name": column("last_name"),
+    "birthdate": column("birthdate"),
+    "mrn": column("mrn"),
+}
+patient_basic = compile_mapper(_PATIENT_FIELDS)
+patient_with_diagnosis = compile_mapper({**_PATIENT_FIELDS, "diagnosis": column("diagnosis")})
+
 
 # ============================================================
 # GET /patient/<id>  (doctor, nurse)
@@ -21,6 +34,11 @@ def get_patient(patient_id):
     - Doctor & Nurse dürfen Basisdaten sehen
     - Admin darf NICHT lesen
     - Minimalprinzip
+
+    Bedingter GET:
+    - schwacher ETag aus patients.version + Rolle (Darstellung je Rolle
+      verschieden: Diagnose nur für Ärzte)
+    - If-None-Match passt -> 304 nach reinem Versions-Lookup
     """
 
     role = g.current_user["role"]
@@ -32,10 +50,22 @@ def get_patient(patient_id):
         audit_log(None, "READ_PATIENT_INVALID_ID", "Patient", patient_id, success=False)
         return jsonify({"error": "Invalid patient ID"}), 400
 
+    # Revalidierung: nur die Version lesen, nichts serialisieren
+    if request.if_none_match:
+        try:
+            current = fetch_one("SELECT version FROM patients WHERE id = ?", (patient_id,))
+        except sqlite3.Error:
+            audit_log(None, "READ_PATIENT_DB_ERROR", "Patient", patient_id, success=False)
+            return jsonify({"error": "Database error"}), 500
+
+        if current is not None and is_not_modified(etag_value(current["version"], role)):
+            audit_log(g.current_user["id"], "READ_PATIENT_NOT_MODIFIED", "Patient", patient_id, success=True)
+            return not_modified(etag_value(current["version"], role))
+
     try:
         patient = fetch_one(
             """
-            SELECT id, first_name, last_name, birthdate, mrn, diagnosis
+            SELECT id, first_name, last_name, birthdate, mrn, diagnosis, version
             FROM patients
             WHERE id = ?
             """,
@@ -50,19 +80,16 @@ def get_patient(patient_id):
         return jsonify({"error": "Patient not found"}), 404
 
     # Datenminimierung
-    response = {
-        "id": patient["id"],
-        "first_name": patient["first_name"],
-        "last_name": patient["last_name"],
-        "birthdate": patient["birthdate"],
-        "mrn": patient["mrn"],
-    }
-
     if role == "doctor":
-        response["diagnosis"] = patient["diagnosis"]
+        response = patient_with_diagnosis(patient)
+    else:
+        response = patient_basic(patient)
+
+    # Für Updates (POST /patient/update: "version")
+    response["version"] = patient["version"]
 
     audit_log(g.current_user["id"], "READ_PATIENT_SUCCESS", "Patient", patient_id, success=True)
-    return jsonify(response), 200
+    return with_etag(jsonify(response), etag_value(patient["version"], role)), 200
 
 
 # ============================================================
@@ -73,41 +100,93 @@ def get_patient(patient_id):
 @validate_json(PatientUpdateSchema)     # <<< WICHTIG: Marshmallow-Validation
 def update_patient():
     """
-    Diagnose-Update durch Ärzte
+    Patienten-Update durch Ärzte (Teil-Update: nur übergebene Felder)
     Jetzt TR-03161-O.Source_1/-2 konform:
     - Eingaben formal validiert
     - Keine manuelle isinstance-Prüfung
     - Einheitliches Schema für alle Endpoints
+
+    Optimistische Sperre:
+    - erwartete Version aus "version" (Body) oder If-Match (ETag aus GET)
+    - EIN bedingtes UPDATE ... RETURNING: kein Lost Update, kein
+      separater Existenz-Check; nur wenn keine Zeile geändert wurde,
+      klärt ein Lookup 404 (unbekannt) vs. 409 (Version veraltet)
+    - ohne Version und ohne If-Match -> 428 (wie FHIR PUT); nur
+      "If-Match: *" überschreibt bewusst ohne Versionsprüfung
+
+    Audit: Updates mit Diagnose behalten die bisherigen Aktionen
+    UPDATE_PATIENT_DIAGNOSIS_SUCCESS / _DB_ERROR (Compliance-Abfragen),
+    Updates ohne Diagnose loggen UPDATE_PATIENT_SUCCESS / _DB_ERROR
     """
 
     data = request.validated_data
+    user_id = g.current_user["id"]
     patient_id = data["id"]
-    new_diagnosis = data["diagnosis"]
 
-    # Patient existiert?
+    expected_version = data.get("version")
+    if expected_version is None:
+        # ETag von GET /patient/<id>: W/"<version>-<rolle>"
+        tags = if_match_values()
+        if not tags:
+            audit_log(user_id, "UPDATE_PATIENT_PRECONDITION_REQUIRED", "Patient", patient_id, success=False)
+            return jsonify({"error": "version or If-Match required"}), 428
+        tags -= {"*"}
+        if tags:
+            versions = {tag.split("-", 1)[0] for tag in tags}
+            if len(versions) != 1 or not next(iter(versions)).isdigit():
+                audit_log(user_id, "UPDATE_PATIENT_VERSION_CONFLICT", "Patient", patient_id, success=False)
+                return jsonify({"error": "Patient was modified by someone else"}), 409
+            expected_version = int(next(iter(versions)))
+
+    # Feste Spaltennamen aus PATIENT_UPDATE_FIELDS, Werte als Parameter
+    changes = {name: data[name] for name in PATIENT_UPDATE_FIELDS if name in data}
+    if "birthdate" in changes:
+        changes["birthdate"] = changes["birthdate"].isoformat()
+    for name in ("first_name", "last_name", "mrn", "diagnosis"):
+        if name in changes:
+            changes[name] = changes[name].strip()
+
+    action = "UPDATE_PATIENT_DIAGNOSIS" if "diagnosis" in changes else "UPDATE_PATIENT"
+
+    where, args = "id = ?", [patient_id]
+    if expected_version is not None:
+        where += " AND version = ?"
+        args.append(expected_version)
+
     try:
-        exists = fetch_one("SELECT id FROM patients WHERE id = ?", (patient_id,))
+        with write_transaction() as conn:
+            patient = conn.execute(
+                "UPDATE patients SET " + ", ".join(f"{name} = ?" for name in changes)
+                + ", version = version + 1 WHERE " + where
+                + " RETURNING id, first_name, last_name, birthdate, mrn, diagnosis, version",
+                (*changes.values(), *args)
+            ).fetchone()
+            exists = patient is not None or conn.execute(
+                "SELECT 1 FROM patients WHERE id = ?", (patient_id,)
+            ).fetchone() is not None
+    except sqlite3.IntegrityError:
+        audit_log(user_id, "UPDATE_PATIENT_MRN_CONFLICT", "Patient", patient_id, success=False)
+        return jsonify({"error": "MRN already in use"}), 409
     except sqlite3.Error:
-        audit_log(g.current_user["id"], "UPDATE_PATIENT_DB_ERROR", "Patient", patient_id, success=False)
-        return jsonify({"error": "Database error"}), 500
+        audit_log(user_id, f"{action}_DB_ERROR", "Patient", patient_id, success=False)
+        return jsonify({"error": "Database update error"}), 500
 
-    if exists is None:
-        audit_log(g.current_user["id"], "UPDATE_PATIENT_NOT_FOUND", "Patient", patient_id, success=False)
+    if not exists:
+        audit_log(user_id, "UPDATE_PATIENT_NOT_FOUND", "Patient", patient_id, success=False)
         return jsonify({"error": "Patient not found"}), 404
 
-    try:
-        execute(
-            "UPDATE patients SET diagnosis = ? WHERE id = ?",
-            (new_diagnosis, patient_id)
-        )
-    except sqlite3.Error:
-        audit_log(g.current_user["id"], "UPDATE_PATIENT_DIAGNOSIS_DB_ERROR", "Patient", patient_id, success=False)
-        return jsonify({"error": "Database update error"}), 500
+    if patient is None:
+        audit_log(user_id, "UPDATE_PATIENT_VERSION_CONFLICT", "Patient", patient_id, success=False)
+        return jsonify({"error": "Patient was modified by someone else"}), 409
 
-    audit_log(g.current_user["id"], "UPDATE_PATIENT_DIAGNOSIS_SUCCESS", "Patient", patient_id, success=True)
+    audit_log(user_id, f"{action}_SUCCESS", "Patient", patient_id, success=True)
 
-    return jsonify({
+    response = {
         "message": "Patient updated successfully",
         "patient_id": patient_id,
-        "diagnosis": new_diagnosis
-    }), 200
+        "diagnosis": patient["diagnosis"],
+        "updated_fields": list(changes),
+        "patient": patient_with_diagnosis(patient),
+        "version": patient["version"]
+    }
+    return jsonify(response), 200
@@ -1,13 +1,44 @@
 # src/api/search.py
-from flask import Blueprint, jsonify, request, g
+from flask import Blueprint, jsonify, request, g, current_app
 from database.db import fetch_all
 from utils.security import require_role
 from utils.logging_utils import audit_log
-from utils.validation_new import PatientSearchQuerySchema, validate_query
+from utils.validation_new import PatientSearchQuerySchema, validate_query, KeysetCursor
+from utils.serialization import compile_mapper, column
 import sqlite3
 
 search_bp = Blueprint("search", __name__)
 
+# Trigram-Index benötigt mind. 3 Zeichen; kürzere Eingaben -> LIKE-Fallback
+FTS_MIN_QUERY_LENGTH = 3
+
+# Startpunkte ohne Cursor: liegen vor jedem (last_name, id) bzw. (rank, id)
+# (last_name NOT NULL, id >= 1; bm25-rank ist endlich)
+_FIRST_PAGE = ("", 0)
+_FIRST_RANKED_PAGE = (float("-inf"), 0)
+
+_cursor_field = KeysetCursor(size=2)
+
+# DSGVO: Minimalprinzip (keine Diagnose, keine Adressen)
+_search_result = compile_mapper({
+    "id": column("id"),
+    "first_name": column("first_name"),
+    "last_name": column("last_name"),
+})
+
+
+def _like_pattern(query: str) -> str:
+    """Teilstring-Muster für LIKE ... ESCAPE '\\' (%, _ in der Eingabe wörtlich)."""
+    return "%" + query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+
+def _fts_phrase(query: str) -> str:
+    """
+    Baut einen FTS5-Phrasen-Ausdruck. Die Eingabe wird als ein einziger
+    String-Literal behandelt, FTS-Operatoren (OR, NEAR, *, ...) greifen nicht.
+    """
+    return '"' + query.replace('"', '""') + '"'
+
 
 @search_bp.route("/search", methods=["GET"])
 @require_role(["doctor", "nurse"])
@@ -19,6 +50,14 @@ def search_patients():
     Sicherheitsmerkmale:
     - RBAC (doctor, nurse)
     - Parameterisierte SQL-Abfrage
+    - Volltext-Index (FTS5 Trigram) über Vorname, Nachname und MRN
+    - Ergebnisse nach Relevanz (bm25-rank des Index), Keyset-Pagination
+      über (rank, id): begrenzte Seitengröße, kein OFFSET. Der Index
+      bewertet dafür alle Treffer (Top-N-Sortierung, Speicher ~ Seite);
+      breite Suchen liefern die besten Treffer statt eines Fehlers
+    - Kurze Eingaben (< 3 Zeichen): LIKE über dieselben Felder wie der
+      Index (Vorname, Nachname, MRN), ohne Relevanz sortiert nach
+      (last_name, id) entlang des Index
     - Query-Validierung (Marshmallow)
     - DSGVO: Minimalprinzip (keine Diagnose, keine Adressen)
     - TR-03161: Strukturierte Eingabevalidierung
@@ -28,29 +67,61 @@ def search_patients():
     params = request.validated_params
     query = params["q"].strip()
 
+    # Seitengröße serverseitig begrenzen
+    max_page_size = current_app.config.get("SEARCH_MAX_PAGE_SIZE", 100)
+    limit = min(params.get("limit") or current_app.config.get("SEARCH_DEFAULT_PAGE_SIZE", 20), max_page_size)
+
+    cursor = params.get("cursor")
+    ranked = len(query) >= FTS_MIN_QUERY_LENGTH
+
+    # Cursor passt nur zur Sortierung, die ihn erzeugt hat
+    if cursor is not None and isinstance(cursor[0], str) == ranked:
+        return jsonify({"error": "Invalid query parameters", "details": {"cursor": ["Invalid cursor"]}}), 400
+
     try:
-        results = fetch_all(
-            """
-            SELECT id, first_name, last_name
-            FROM patients
-            WHERE first_name LIKE ? OR last_name LIKE ?
-            """,
-            (f"%{query}%", f"%{query}%")
-        )
+        # limit + 1 Zeilen laden, um zu erkennen, ob es eine weitere Seite gibt
+        if ranked:
+            after_rank, after_id = cursor or _FIRST_RANKED_PAGE
+            results = fetch_all(
+                """
+                SELECT rowid AS id, first_name, last_name, rank
+                FROM patients_fts
+                WHERE patients_fts MATCH ?
+                AND (rank, rowid) > (?, ?)
+                ORDER BY rank, rowid
+                LIMIT ?
+                """,
+                (_fts_phrase(query), after_rank, after_id, limit + 1)
+            )
+        else:
+            after_last_name, after_id = cursor or _FIRST_PAGE
+            results = fetch_all(
+                """
+                SELECT id, first_name, last_name
+                FROM patients
+                WHERE (first_name LIKE ?1 ESCAPE '\\' OR last_name LIKE ?1 ESCAPE '\\' OR mrn LIKE ?1 ESCAPE '\\')
+                AND (last_name, id) > (?2, ?3)
+                ORDER BY last_name, id
+                LIMIT ?4
+                """,
+                (_like_pattern(query), after_last_name, after_id, limit + 1)
+            )
     except sqlite3.Error:
         audit_log(g.current_user["id"], "SEARCH_DB_ERROR", "Patient", None, success=False)
         return jsonify({"error": "Database error"}), 500
 
     audit_log(g.current_user["id"], "SEARCH_PATIENTS", "Patient", None, success=True)
 
+    next_cursor = None
+    if len(results) > limit:
+        results = results[:limit]
+        last = results[-1]
+        position = (last["rank"] if ranked else last["last_name"], last["id"])
+        next_cursor = _cursor_field.serialize("cursor", {"cursor": position})
+
     return jsonify({
         "query": query,
-        "results": [
-            {
-                "id": r["id"],
-                "first_name": r["first_name"],
-                "last_name": r["last_name"]
-            }
-            for r in results
-        ]
+        "limit": limit,
+        "next_cursor": next_cursor,
+        "results": [_search_result(r) for r in results]
     }), 200
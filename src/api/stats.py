@@ -1,13 +1,107 @@
 # src/api/stats.py
-from flask import Blueprint, jsonify, g
-from database.db import fetch_one
+import threading
+import time
+from datetime import datetime, timedelta
+
+from flask import Blueprint, jsonify, g, current_app
+from database.db import fetch_all
 from utils.security import require_role
 from utils.logging_utils import audit_log
+from utils.session_reaper import reaper_stats
+from config import Config
 import sqlite3
 
 stats_bp = Blueprint("stats", __name__)
 
 
+# ============================================================
+# ZÄHLER (stats_counters / appointment_days, Migration 0005)
+# ------------------------------------------------------------
+# Per Trigger gepflegt -> eine Abfrage über wenige Zeilen statt
+# COUNT(*)-Scans über patients/users/appointments
+# ============================================================
+_cache_lock = threading.Lock()
+_cache = {"expires": 0.0, "value": None}
+
+
+def _bucket_window(days: int, weeks: int):
+    today = datetime.utcnow().date()
+    monday = today - timedelta(days=today.weekday())
+    day_keys = [today + timedelta(days=i) for i in range(-days, days + 1)]
+    week_keys = [monday + timedelta(weeks=i) for i in range(-weeks, weeks + 1)]
+    return day_keys, week_keys
+
+
+def load_stats(days: int, weeks: int) -> dict:
+    day_keys, week_keys = _bucket_window(days, weeks)
+    first = min(day_keys[0], week_keys[0])
+    last = max(day_keys[-1], week_keys[-1] + timedelta(days=6))
+
+    rows = fetch_all(
+        """
+        SELECT 'counter' AS kind, name AS key, value FROM stats_counters
+        UNION ALL
+        SELECT 'day', day, count FROM appointment_days WHERE day BETWEEN ? AND ?
+        """,
+        (first.isoformat(), last.isoformat())
+    )
+
+    counters = {}
+    per_day = {}
+    for row in rows:
+        if row["kind"] == "counter":
+            counters[row["key"]] = row["value"]
+        else:
+            per_day[row["key"]] = row["value"]
+
+    # Wochen (Montag-Sonntag) aus den Tageszählern
+    per_week = dict.fromkeys(week_keys, 0)
+    for day, count in per_day.items():
+        try:
+            parsed = datetime.strptime(day, "%Y-%m-%d").date()
+        except ValueError:
+            continue
+        week = parsed - timedelta(days=parsed.weekday())
+        if week in per_week:
+            per_week[week] += count
+
+    return {
+        "patients": counters.get("patients", 0),
+        "users": counters.get("users", 0),
+        "appointments": counters.get("appointments", 0),
+        "doctors": counters.get("doctors", 0),
+        "appointments_per_day": [
+            {"date": day.isoformat(), "count": per_day.get(day.isoformat(), 0)} for day in day_keys
+        ],
+        "appointments_per_week": [
+            {"week_start": week.isoformat(), "count": count} for week, count in per_week.items()
+        ],
+    }
+
+
+def cached_stats() -> dict:
+    ttl = current_app.config.get("STATS_CACHE_TTL_SECONDS", Config.STATS_CACHE_TTL_SECONDS)
+    now = time.monotonic()
+    if _cache["value"] is not None and now < _cache["expires"]:
+        return _cache["value"]
+
+    # Lock: bei Ablauf lädt nur ein Thread neu, die anderen warten kurz
+    with _cache_lock:
+        if _cache["value"] is not None and time.monotonic() < _cache["expires"]:
+            return _cache["value"]
+
+        value = load_stats(
+            current_app.config.get("STATS_BUCKET_DAYS", Config.STATS_BUCKET_DAYS),
+            current_app.config.get("STATS_BUCKET_WEEKS", Config.STATS_BUCKET_WEEKS),
+        )
+        # Betriebsmetriken (keine personenbezogenen Daten)
+        value["sessions"] = reaper_stats()
+
+        _cache["value"] = value
+        _cache["expires"] = time.monotonic() + ttl
+        return value
+
+
 @stats_bp.route("/stats", methods=["GET"])
 @require_role(["admin"])
 def get_stats():
@@ -15,31 +109,22 @@ def get_stats():
     Healthcare-SAFE System Statistics Endpoint
     ------------------------------------------
     DSGVO / TR-03161:
-    - Keine personenbezogenen Daten
+    - Keine personenbezogenen Daten (nur Zähler)
     - RBAC: Nur Admin
     - Generische Fehlermeldungen
     - Sicherer Zugriff auf Datenbank
+    - Werte bis zu STATS_CACHE_TTL_SECONDS alt (Dashboard-Refresh)
     """
 
     # Admin User (falls Middleware nicht gesetzt wäre → Safe Fallback)
     user_id = g.current_user["id"] if g.get("current_user") else None
 
     try:
-        patients_count = fetch_one("SELECT COUNT(*) AS count FROM patients")
-        users_count = fetch_one("SELECT COUNT(*) AS count FROM users")
-        appointments_count = fetch_one("SELECT COUNT(*) AS count FROM appointments")
-        doctors_count = fetch_one(
-            "SELECT COUNT(*) AS count FROM users WHERE role = 'doctor'"
-        )
+        stats = cached_stats()
     except sqlite3.Error:
         audit_log(user_id, "READ_STATS_DB_ERROR", "System", None, success=False)
         return jsonify({"error": "Database error"}), 500
 
     audit_log(user_id, "READ_STATS_SUCCESS", "System", None, success=True)
 
-    return jsonify({
-        "patients": patients_count["count"],
-        "users": users_count["count"],
-        "appointments": appointments_count["count"],
-        "doctors": doctors_count["count"]
-    }), 200
+    return jsonify(stats), 200
@@ -1,18 +1,43 @@
 # src/app.py
 import os
-from flask import Flask, render_template, jsonify
+from flask import Flask, render_template, jsonify, request
 
 # API Blueprints
 from api.auth import auth_bp
 from api.patient import patient_bp
 from api.search import search_bp
 from api.appointments import appointments_bp
+from api.appointment_series import series_bp
 from api.stats import stats_bp
 from api.fhir import fhir_bp
+from api.export import export_bp
+from api.metrics import metrics_bp
+from api.audit import audit_bp
 
 # Middleware
 from utils.auth_middleware import load_current_user
 
+# Datenbank (Connection-Pool)
+from database.db import init_app as init_database
+
+# Audit-Logging (gebündelter Writer)
+from utils.logging_utils import init_audit_log
+
+# JSON-Backend (orjson optional)
+from utils.serialization import init_json_provider
+
+# Löschen abgelaufener Sessions (Hintergrund-Thread)
+from utils.session_reaper import init_session_reaper
+
+# Metriken (Latenz, SQL, Audit, Hashing) + Server-Timing
+from utils.metrics import init_metrics
+
+# Slow-Query-Log + EXPLAIN QUERY PLAN (opt-in)
+from utils.slow_query_log import init_slow_query_log
+
+# Passwort-Hashing (begrenzter Prozess-Pool)
+from utils.password_pool import init_password_pool
+
 # Configs (Secure-by-Default)
 from config import DevelopmentConfig, ProductionConfig
 
@@ -43,9 +68,28 @@ def create_app():
     # SECRET_KEY setzen (wird aus Config geladen)
     app.secret_key = app.config["SECRET_KEY"]
 
+    # Schneller JSON-Provider (Fallback: Flask-Standard)
+    init_json_provider(app)
+
+    # Instrumentierung zuerst: misst auch die Middleware (Auth, Session-Lookup)
+    init_metrics(app)
+    init_slow_query_log(app)
+
+    # Connection-Pool konfigurieren + Verbindung am Request-Ende zurückgeben
+    init_database(app)
+
+    # Audit-Writer konfigurieren (Flush bei Shutdown via atexit / SIGTERM)
+    init_audit_log(app)
+
+    # PBKDF2 außerhalb der Request-Worker (Überlast -> 503 + Retry-After)
+    init_password_pool(app)
+
     # Authentication Middleware laden
     load_current_user(app)
 
+    # Abgelaufene Sessions periodisch in Batches löschen
+    init_session_reaper(app)
+
     # =============================
     # API Blueprints
     # =============================
@@ -53,8 +97,12 @@ def create_app():
     app.register_blueprint(patient_bp)
     app.register_blueprint(search_bp)
     app.register_blueprint(appointments_bp)
+    app.register_blueprint(series_bp)
     app.register_blueprint(stats_bp)
     app.register_blueprint(fhir_bp)
+    app.register_blueprint(export_bp)
+    app.register_blueprint(metrics_bp)
+    app.register_blueprint(audit_bp)
 
     # =============================
     # Frontend Routes (UI)
@@ -87,7 +135,14 @@ def create_app():
         # Basis-Header
         response.headers["X-Content-Type-Options"] = "nosniff"
         response.headers["Referrer-Policy"] = "no-referrer"
-        response.headers["Cache-Control"] = "no-store"
+        # Lesende Antworten mit ETag (utils/etag.py): nur der Client darf
+        # speichern und muss vor jeder Verwendung revalidieren; geteilte
+        # Caches nie. Antworten auf Schreibzugriffe (PUT/POST) werden nie
+        # gespeichert, auch wenn sie einen ETag tragen (FHIR PUT)
+        if "ETag" in response.headers and request.method in ("GET", "HEAD"):
+            response.headers["Cache-Control"] = "private, no-cache"
+        else:
+            response.headers["Cache-Control"] = "no-store"
         response.headers["Pragma"] = "no-cache"
 
         # HSTS (HTTPS-Pflicht) - 1 Jahr
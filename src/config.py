@@ -1,6 +1,7 @@
 # src/config.py
 import os
 import secrets
+import tempfile
 from pathlib import Path
 
 
@@ -17,10 +18,9 @@ class Config:
 
     # ====== Sicherheit ======
     # In Produktion MUSS dies per Environment Variable gesetzt sein!
-    SECRET_KEY = os.environ.get(
-        "SECRET_KEY",
-        secrets.token_hex(32)  # Fallback: Sicherer Zufallswert
-    )
+    # Fallback: Zufallswert PRO PROZESS (für SESSION_MODE "stateless" unzulässig)
+    GENERATED_SECRET_KEY = secrets.token_hex(32)
+    SECRET_KEY = os.environ.get("SECRET_KEY", GENERATED_SECRET_KEY)
 
     # ====== Session-Härtung (O.Auth_10 / O.Source_10) ======
     SESSION_COOKIE_HTTPONLY = True  # Schutz gegen XSS
@@ -29,6 +29,162 @@ class Config:
     # Timeout-Konfiguration
     SESSION_LIFETIME_MINUTES = int(os.environ.get("SESSION_LIFETIME_MINUTES", "60"))
 
+    # "stateful": Token-Zeile in sessions (Standard)
+    # "stateless": HMAC-signiertes Token (User, Rolle, Ablauf) ohne DB-Lookup pro Request;
+    #              erfordert einen gemeinsamen SECRET_KEY aller Worker (Environment)
+    SESSION_MODE = os.environ.get("SESSION_MODE", "stateful")
+    # Intervall, in dem jeder Worker neue Widerrufe (Logout, Passwortänderung) nachlädt
+    SESSION_REVOCATION_REFRESH_SECONDS = float(os.environ.get("SESSION_REVOCATION_REFRESH_SECONDS", "5"))
+    # Maximal gleichzeitig gültige Sessions pro User (älteste wird verdrängt), 0 = unbegrenzt
+    SESSION_MAX_PER_USER = int(os.environ.get("SESSION_MAX_PER_USER", "5"))
+    # Hintergrund-Löschung abgelaufener Sessions (0 = nur per CLI: reap-sessions, z.B. per Cron)
+    # Jeder Prozess mit SESSION_REAPER_ENABLED=1 startet einen eigenen Reaper-Thread;
+    # daher standardmäßig aus und bei mehreren Workern nur in EINEM Prozess aktivieren
+    SESSION_REAPER_ENABLED = os.environ.get("SESSION_REAPER_ENABLED", "0") == "1"
+    SESSION_REAPER_INTERVAL_SECONDS = float(os.environ.get("SESSION_REAPER_INTERVAL_SECONDS", "300"))
+    SESSION_REAPER_BATCH_SIZE = int(os.environ.get("SESSION_REAPER_BATCH_SIZE", "1000"))
+
+    # ====== Datenbank-Connection-Pool ======
+    # Maximale Anzahl gleichzeitig geöffneter SQLite-Verbindungen pro Prozess
+    DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", "8"))
+    # Wartezeit (Sekunden), bis ein Request bei erschöpftem Pool abbricht
+    DB_POOL_TIMEOUT_SECONDS = float(os.environ.get("DB_POOL_TIMEOUT_SECONDS", "5"))
+    # Health-Check (SELECT 1) nur für Verbindungen, die länger als X Sekunden ungenutzt waren
+    DB_POOL_HEALTHCHECK_SECONDS = float(os.environ.get("DB_POOL_HEALTHCHECK_SECONDS", "30"))
+
+    # ====== SQLite Storage-Profil (auf JEDE Verbindung angewendet) ======
+    # WAL: Leser blockieren Schreiber nicht (und umgekehrt)
+    SQLITE_JOURNAL_MODE = os.environ.get("SQLITE_JOURNAL_MODE", "WAL")
+    # NORMAL ist im WAL-Modus crash-sicher (nur der letzte Commit kann bei Stromausfall fehlen)
+    SQLITE_SYNCHRONOUS = os.environ.get("SQLITE_SYNCHRONOUS", "NORMAL")
+    SQLITE_MMAP_SIZE = int(os.environ.get("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+    # Negativ = KiB (hier 64 MiB Page-Cache pro Verbindung)
+    SQLITE_CACHE_SIZE = int(os.environ.get("SQLITE_CACHE_SIZE", "-65536"))
+    SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+    SQLITE_TEMP_STORE = os.environ.get("SQLITE_TEMP_STORE", "MEMORY")
+    # Alle Schreibzugriffe eines Prozesses über EINE Writer-Verbindung serialisieren
+    DB_SERIALIZE_WRITES = os.environ.get("DB_SERIALIZE_WRITES", "1") == "1"
+
+    # ====== Audit-Logging ======
+    # "batched": Hintergrund-Thread schreibt gesammelt (Standard)
+    # "sync":    jeder Eintrag wird sofort committed (Compliance-Deployments)
+    AUDIT_LOG_MODE = os.environ.get("AUDIT_LOG_MODE", "batched")
+    AUDIT_QUEUE_SIZE = int(os.environ.get("AUDIT_QUEUE_SIZE", "10000"))
+    AUDIT_BATCH_SIZE = int(os.environ.get("AUDIT_BATCH_SIZE", "500"))
+    AUDIT_FLUSH_INTERVAL_SECONDS = float(os.environ.get("AUDIT_FLUSH_INTERVAL_SECONDS", "0.5"))
+    # Back-Pressure: so lange blockiert audit_log() bei voller Queue, danach wird verworfen
+    AUDIT_ENQUEUE_TIMEOUT_SECONDS = float(os.environ.get("AUDIT_ENQUEUE_TIMEOUT_SECONDS", "0.1"))
+
+    # ====== Audit-Archiv (python src/database/__init__.py archive-audit-logs, z.B. per Cron) ======
+    AUDIT_ARCHIVE_DIR = Path(os.environ.get("AUDIT_ARCHIVE_DIR", str(BASE_DIR.parent / "archive" / "audit")))
+    # Abgeschlossene Monate, die zusätzlich zum laufenden Monat in der DB bleiben
+    AUDIT_HOT_MONTHS = int(os.environ.get("AUDIT_HOT_MONTHS", "3"))
+    # Archivdateien danach löschen (Monate); 0 = unbegrenzt aufbewahren
+    AUDIT_ARCHIVE_RETENTION_MONTHS = int(os.environ.get("AUDIT_ARCHIVE_RETENTION_MONTHS", "0"))
+    # Zeilen pro Lösch-Transaktion nach dem Archivieren
+    AUDIT_ARCHIVE_BATCH_SIZE = int(os.environ.get("AUDIT_ARCHIVE_BATCH_SIZE", "5000"))
+
+    # ====== Session-Cache (Token-Lookup der Middleware) ======
+    SESSION_CACHE_ENABLED = os.environ.get("SESSION_CACHE_ENABLED", "1") == "1"
+    SESSION_CACHE_MAX_ENTRIES = int(os.environ.get("SESSION_CACHE_MAX_ENTRIES", "10000"))
+    # Obergrenze, wie lange ein Eintrag ohne DB-Abgleich gilt
+    SESSION_CACHE_TTL_SECONDS = float(os.environ.get("SESSION_CACHE_TTL_SECONDS", "30"))
+    # "unix" = Invalidierung (Logout, Passwortänderung, Session-Limit) an alle
+    # Worker auf dem Host; "local" = nur dieser Prozess -> NUR bei genau einem
+    # Worker, sonst gelten widerrufene Tokens in anderen Workern bis zur TTL weiter
+    SESSION_CACHE_BACKEND = os.environ.get("SESSION_CACHE_BACKEND", "unix")
+    SESSION_CACHE_SOCKET_DIR = os.environ.get(
+        "SESSION_CACHE_SOCKET_DIR",
+        os.path.join(tempfile.gettempdir(), "healthcare-session-cache")
+    )
+
+    # ====== Patientensuche (GET /search) ======
+    SEARCH_DEFAULT_PAGE_SIZE = int(os.environ.get("SEARCH_DEFAULT_PAGE_SIZE", "20"))
+    SEARCH_MAX_PAGE_SIZE = int(os.environ.get("SEARCH_MAX_PAGE_SIZE", "100"))
+
+    # ====== FHIR batch / Mehrfach-Lesezugriffe ======
+    # Obergrenze Einträge pro batch-Bundle bzw. IDs pro _id-Suche
+    FHIR_BATCH_MAX_ENTRIES = int(os.environ.get("FHIR_BATCH_MAX_ENTRIES", "1000"))
+
+    # ====== Bulk-Export ======
+    # Zeilen pro fetchmany()-Block beim Streaming
+    EXPORT_FETCH_SIZE = int(os.environ.get("EXPORT_FETCH_SIZE", "1000"))
+
+    # FHIR Bulk Data ($export)
+    FHIR_EXPORT_DIR = Path(os.environ.get("FHIR_EXPORT_DIR", str(BASE_DIR.parent / "exports")))
+    # Gleichzeitig laufende Export-Jobs pro Prozess (schützt interaktive Requests)
+    FHIR_EXPORT_MAX_CONCURRENCY = int(os.environ.get("FHIR_EXPORT_MAX_CONCURRENCY", "2"))
+    # Maximal wartende + laufende Jobs; darüber -> 429
+    FHIR_EXPORT_MAX_PENDING = int(os.environ.get("FHIR_EXPORT_MAX_PENDING", "10"))
+    # Ressourcen pro NDJSON-Datei (große Exporte werden in mehrere Dateien geteilt)
+    FHIR_EXPORT_FILE_MAX_RESOURCES = int(os.environ.get("FHIR_EXPORT_FILE_MAX_RESOURCES", "100000"))
+    # Abgeschlossene Jobs + Dateien werden danach gelöscht
+    FHIR_EXPORT_RETENTION_HOURS = int(os.environ.get("FHIR_EXPORT_RETENTION_HOURS", "24"))
+    # Jobs, die danach (ab Anlage) noch "queued"/"in-progress" sind, gelten als
+    # verwaist (Worker neu gestartet/abgestürzt) und werden "failed"
+    FHIR_EXPORT_MAX_RUNTIME_MINUTES = int(os.environ.get("FHIR_EXPORT_MAX_RUNTIME_MINUTES", "120"))
+
+    # ====== Passwort-Hash-Format / Kosten ======
+    # "pbkdf2_sha256" oder "scrypt"; Änderungen greifen beim nächsten Login (Rehash)
+    PASSWORD_HASH_ALGORITHM = os.environ.get("PASSWORD_HASH_ALGORITHM", "pbkdf2_sha256")
+    # Kalibrieren: python src/database/__init__.py calibrate-password-hash --target-ms 250
+    PASSWORD_PBKDF2_ITERATIONS = int(os.environ.get("PASSWORD_PBKDF2_ITERATIONS", "200000"))
+    PASSWORD_SCRYPT_N = int(os.environ.get("PASSWORD_SCRYPT_N", str(2 ** 15)))
+    PASSWORD_SCRYPT_R = int(os.environ.get("PASSWORD_SCRYPT_R", "8"))
+    PASSWORD_SCRYPT_P = int(os.environ.get("PASSWORD_SCRYPT_P", "1"))
+
+    # ====== Passwort-Hashing im Prozess-Pool ======
+    # 0 = inline im Request-Worker (kein Pool). Worker werden per "spawn"
+    # gestartet: Startskripte brauchen einen if __name__ == "__main__"-Guard
+    PASSWORD_HASH_WORKERS = int(os.environ.get("PASSWORD_HASH_WORKERS", "2"))
+    # Zusätzlich wartende Aufträge; darüber hinaus sofort 503
+    PASSWORD_HASH_MAX_PENDING = int(os.environ.get("PASSWORD_HASH_MAX_PENDING", "32"))
+    PASSWORD_HASH_TIMEOUT_SECONDS = float(os.environ.get("PASSWORD_HASH_TIMEOUT_SECONDS", "5"))
+    PASSWORD_HASH_RETRY_AFTER_SECONDS = int(os.environ.get("PASSWORD_HASH_RETRY_AFTER_SECONDS", "1"))
+
+    # ====== JSON-Serialisierung ======
+    # "auto": orjson falls installiert (optional), sonst stdlib json
+    JSON_BACKEND = os.environ.get("JSON_BACKEND", "auto")
+
+    # ====== Metriken / Instrumentierung ======
+    # Latenz-Histogramme, SQL-/Audit-/Hash-Zeiten, GET /metrics (Admin oder Scrape-Token)
+    METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "1") == "1"
+    # Statischer Bearer-Token für den Prometheus-Scraper (Admin-Sessions laufen ab);
+    # mind. 32 Zeichen, z.B. python -c "import secrets; print(secrets.token_urlsafe(32))"
+    # Nicht gesetzt = nur Admin-Sessions
+    METRICS_SCRAPE_TOKEN = os.environ.get("METRICS_SCRAPE_TOKEN") or None
+    # Server-Timing-Header: gibt Laufzeiten an Clients heraus -> nur zur Analyse aktivieren
+    SERVER_TIMING_ENABLED = os.environ.get("SERVER_TIMING_ENABLED", "0") == "1"
+
+    # ====== Slow-Query-Log (opt-in) ======
+    SLOW_QUERY_LOG_ENABLED = os.environ.get("SLOW_QUERY_LOG_ENABLED", "0") == "1"
+    SLOW_QUERY_THRESHOLD_MS = float(os.environ.get("SLOW_QUERY_THRESHOLD_MS", "100"))
+    # EXPLAIN QUERY PLAN beim ersten Auftreten eines Statements (Full-Scan-Erkennung)
+    SLOW_QUERY_EXPLAIN = os.environ.get("SLOW_QUERY_EXPLAIN", "1") == "1"
+    SLOW_QUERY_LOG_PATH = Path(os.environ.get(
+        "SLOW_QUERY_LOG_PATH", str(BASE_DIR.parent / "logs" / "slow_queries.ndjson")
+    ))
+
+    # ====== Termine ======
+    # Dauer, wenn beim Anlegen keine duration_minutes angegeben ist
+    APPOINTMENT_DEFAULT_DURATION_MINUTES = int(os.environ.get("APPOINTMENT_DEFAULT_DURATION_MINUTES", "30"))
+    # Termine pro Seite bei GET /appointments (Standard / Maximum)
+    APPOINTMENTS_DEFAULT_PAGE_SIZE = int(os.environ.get("APPOINTMENTS_DEFAULT_PAGE_SIZE", "100"))
+    APPOINTMENTS_MAX_PAGE_SIZE = int(os.environ.get("APPOINTMENTS_MAX_PAGE_SIZE", "500"))
+    # POST /appointments/bulk: Termine pro Anfrage nach Expansion der Serien
+    APPOINTMENTS_BULK_MAX_OCCURRENCES = int(os.environ.get("APPOINTMENTS_BULK_MAX_OCCURRENCES", "1000"))
+    # Terminserien: Obergrenze Termine pro Serie (Konfliktprüfung beim Anlegen)
+    APPOINTMENT_SERIES_MAX_OCCURRENCES = int(os.environ.get("APPOINTMENT_SERIES_MAX_OCCURRENCES", "5000"))
+    # GET /appointments/calendar: maximale Fensterlänge in Tagen
+    APPOINTMENT_CALENDAR_MAX_DAYS = int(os.environ.get("APPOINTMENT_CALENDAR_MAX_DAYS", "62"))
+
+    # ====== Dashboard-Statistiken (GET /stats) ======
+    # Antwort wird pro Worker so lange zwischengespeichert (0 = kein Cache)
+    STATS_CACHE_TTL_SECONDS = float(os.environ.get("STATS_CACHE_TTL_SECONDS", "5"))
+    # Termine pro Tag/Woche: Fenster um heute (UTC), jeweils zurück und voraus
+    STATS_BUCKET_DAYS = int(os.environ.get("STATS_BUCKET_DAYS", "7"))
+    STATS_BUCKET_WEEKS = int(os.environ.get("STATS_BUCKET_WEEKS", "4"))
+
     # ====== Standard-Verhalten (Härtung für O.Source_6) ======
     # Debug-Modus standardmäßig AUS!
     DEBUG = False
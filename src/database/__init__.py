@@ -3,6 +3,8 @@
 # HEALTHCARE-SAFE DATABASE INITIALIZER (NO CIRCULAR IMPORTS)
 # ============================================================
 
+import argparse
+import json
 import sqlite3
 from pathlib import Path
 import sys
@@ -13,13 +15,17 @@ if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
     print(f"[INIT] Added to PYTHONPATH: {ROOT}")
 
-from utils.security import hash_password
-from database.db import execute
+from utils.security import hash_password, calibrate, HASH_ALGORITHMS
+from database.db import execute, close_pool, get_connection
+from utils.session_reaper import reap_expired_sessions
+from utils.slow_query_log import top_queries
+from database.migrate import migrate, status
+from utils.audit_archive import run_archiver, verify_archives, iter_archived_events
+from config import Config
 
 BASE_DIR = Path(__file__).resolve().parent
 DB_PATH = BASE_DIR.parent / "healthcare.db"
 
-CREATE_TABLES_PATH = BASE_DIR / "create_tables.sql"
 SEED_DATA_PATH = BASE_DIR / "seed_data.sql"
 
 
@@ -38,33 +44,224 @@ def seed_users_secure():
         print(f"[+] Secured user: {username}")
 
 
-def init_db():
+def init_db(target: int = None):
+    """
+    Bringt die Datenbank per Migration auf den aktuellen Stand.
+    Bestehende Daten bleiben erhalten; Seed-Daten nur in eine leere DB.
+    """
     print("===========================================")
     print("  HEALTHCARE-SAFE DATABASE INITIALIZATION  ")
     print("===========================================\n")
 
-    if DB_PATH.exists():
-        DB_PATH.unlink()
-        print("[+] Existing database removed.")
+    run_migrations(target)
 
     conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
+    try:
+        empty = conn.execute("SELECT COUNT(*) FROM users").fetchone()[0] == 0
+        if empty:
+            with open(SEED_DATA_PATH, "r", encoding="utf-8") as f:
+                conn.executescript(f.read())
+            conn.commit()
+    finally:
+        conn.close()
 
-    with open(CREATE_TABLES_PATH, "r", encoding="utf-8") as f:
-        cursor.executescript(f.read())
-        print("[+] Tables created.")
-
-    with open(SEED_DATA_PATH, "r", encoding="utf-8") as f:
-        cursor.executescript(f.read())
+    if empty:
         print("[+] Seed data inserted.")
+        seed_users_secure()
+    else:
+        print("[=] Existing data kept (no seeding).")
 
-    conn.commit()
-    conn.close()
+    print("\n[✔] Healthcare database ready.\n")
 
-    seed_users_secure()
 
-    print("\n[✔] Healthcare database ready.\n")
+def reset_db():
+    """Entwicklung/Tests: Datenbank löschen und komplett neu aufbauen."""
+    # Gepoolte Verbindungen würden sonst auf die gelöschte Datei zeigen
+    close_pool()
 
+    for suffix in ("", "-wal", "-shm"):
+        path = Path(str(DB_PATH) + suffix)
+        if path.exists():
+            path.unlink()
+    print("[+] Existing database removed.")
 
-if __name__ == "__main__":
     init_db()
+
+
+def run_migrations(target: int = None):
+    applied = migrate(DB_PATH, target)
+    for migration in applied:
+        print(f"[+] Applied migration {migration!r}")
+    if not applied:
+        print("[=] Schema up to date.")
+
+
+def migration_status():
+    for item in status(DB_PATH):
+        state = "applied" if item["applied"] else "pending"
+        if item["modified"]:
+            state += " (file modified since)"
+        print(f"{item['version']:04d}_{item['name']:<32} {state}")
+
+
+def rebuild_search_index():
+    """
+    Befüllt den FTS5-Suchindex (Migration 0002) vollständig neu aus der
+    patients-Tabelle, z.B. nach Änderungen an Patientendaten außerhalb der App.
+    """
+    print("[*] Rebuilding patient search index...")
+
+    run_migrations()
+
+    conn = get_connection()
+    try:
+        conn.execute("INSERT INTO patients_fts (patients_fts) VALUES ('rebuild')")
+        conn.commit()
+
+        count = conn.execute("SELECT COUNT(*) FROM patients").fetchone()[0]
+    finally:
+        conn.close()
+
+    print(f"[+] Search index rebuilt ({count} patients).")
+
+
+def reap_sessions():
+    """Löscht abgelaufene Sessions und Token-Widerrufe einmalig (z.B. per Cron)."""
+    print("[*] Removing expired sessions...")
+    result = reap_expired_sessions()
+    print(f"[+] Removed {result['sessions']} sessions, {result['revocations']} token revocations.")
+
+
+def slow_queries_report(path, top: int, sort: str):
+    """Top-N-Statements aus dem Slow-Query-Log (z.B. nach Schema-Änderungen vergleichen)."""
+    path = Path(path)
+    if not path.exists():
+        print(f"[!] No slow query log at {path} (SLOW_QUERY_LOG_ENABLED=1?)")
+        return
+
+    report = top_queries(path, top, sort)
+    print(f"{'#':>3} {'count':>7} {'total ms':>10} {'max ms':>9} {'scan':>5}  fingerprint   statement")
+    for rank, item in enumerate(report, start=1):
+        sql = item["sql"] if len(item["sql"]) <= 100 else item["sql"][:97] + "..."
+        print(f"{rank:>3} {item['count']:>7} {item['total_ms']:>10.1f} {item['max_ms']:>9.1f} "
+              f"{'FULL' if item['full_scan'] else '':>5}  {item['fingerprint']}  {sql}")
+        print(f"{'':>38}endpoints: {', '.join(item['endpoints'])}")
+        for detail in item["plan"] or ():
+            print(f"{'':>38}plan: {detail}")
+
+
+def archive_audit_logs(vacuum: bool):
+    """Abgeschlossene Audit-Monate archivieren und aus der DB löschen (monatlich per Cron)."""
+    print(f"[*] Archiving audit logs to {Config.AUDIT_ARCHIVE_DIR} (hot months: {Config.AUDIT_HOT_MONTHS})...")
+
+    result = run_archiver(Config)
+    for item in result["archived"]:
+        print(f"[+] {item['month']}: {item['rows']} rows archived ({item['bytes'] / 1024:.0f} KiB), "
+              f"{item['purged']} rows removed from database")
+    for month in result["expired"]:
+        print(f"[-] {month}: archive file deleted (retention period exceeded)")
+    if not result["archived"]:
+        print(f"[=] Nothing to archive before {result['cutoff']}.")
+
+    if vacuum and result["archived"]:
+        # Gibt den Platz an das Dateisystem zurück; sperrt die DB währenddessen
+        print("[*] VACUUM...")
+        close_pool()
+        conn = sqlite3.connect(DB_PATH)
+        conn.execute("VACUUM")
+        conn.close()
+        print("[+] Database file compacted.")
+
+
+def verify_audit_archive():
+    problems = verify_archives(Config.AUDIT_ARCHIVE_DIR)
+    for month, problem in problems:
+        print(f"[!] {month}: {problem}")
+    if not problems:
+        print("[✔] All audit archive files match their checksums.")
+    return not problems
+
+
+def search_audit_archive(start: str, end: str, user_id: int = None):
+    """Archivierte Einträge als NDJSON auf stdout (z.B. für Auskunftsersuchen)."""
+    for event in iter_archived_events(Config.AUDIT_ARCHIVE_DIR, start, end, user_id):
+        print(json.dumps(event, ensure_ascii=False))
+
+
+def calibrate_password_hash(algorithm: str, target_ms: float):
+    """
+    Misst die Verify-Laufzeit auf dieser Maschine und gibt passende
+    Kostenparameter als Umgebungsvariablen aus.
+    """
+    print(f"[*] Calibrating {algorithm} for ~{target_ms:g} ms per verify...")
+
+    policy = calibrate(algorithm, target_ms)
+
+    print(f"[+] Measured: {policy['measured_ms']} ms\n")
+    print(f"PASSWORD_HASH_ALGORITHM={algorithm}")
+    if algorithm == "pbkdf2_sha256":
+        print(f"PASSWORD_PBKDF2_ITERATIONS={policy['iterations']}")
+        if policy["iterations"] < 600_000:
+            print("[!] Below the OWASP recommendation of 600,000 iterations for PBKDF2-SHA256.")
+    else:
+        print(f"PASSWORD_SCRYPT_N={policy['n']}")
+        print(f"PASSWORD_SCRYPT_R={policy['r']}")
+        print(f"PASSWORD_SCRYPT_P={policy['p']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Healthcare database management")
+    commands = parser.add_subparsers(dest="command")
+    commands.add_parser("init", help="Migrationen anwenden, leere DB mit Seed-Daten füllen (Standard)")
+    migration = commands.add_parser("migrate", help="Ausstehende Schema-Migrationen anwenden")
+    migration.add_argument("--target", type=int, default=None, help="höchste anzuwendende Version")
+    migration.add_argument("--status", action="store_true", help="nur den Stand anzeigen")
+    commands.add_parser("reset", help="Datenbank LÖSCHEN und neu anlegen (nur Entwicklung)")
+    commands.add_parser("rebuild-search-index", help="FTS5-Patientensuchindex anlegen und neu aufbauen")
+    commands.add_parser("reap-sessions", help="Abgelaufene Sessions in Batches löschen")
+    slow = commands.add_parser("slow-queries", help="Top-N-Report aus dem Slow-Query-Log")
+    slow.add_argument("--path", default=str(Config.SLOW_QUERY_LOG_PATH))
+    slow.add_argument("--top", type=int, default=20)
+    slow.add_argument("--sort", choices=["total", "max", "count"], default="total")
+    archive = commands.add_parser("archive-audit-logs", help="Alte Audit-Monate nach AUDIT_ARCHIVE_DIR auslagern")
+    archive.add_argument("--vacuum", action="store_true", help="danach VACUUM (sperrt die DB)")
+    commands.add_parser("verify-audit-archive", help="Prüfsummen der Audit-Archivdateien prüfen")
+    search = commands.add_parser("search-audit-archive", help="Archivierte Audit-Einträge ausgeben (NDJSON)")
+    search.add_argument("--from", dest="start", required=True, help="z.B. 2025-01-01T00:00:00")
+    search.add_argument("--to", dest="end", required=True, help="exklusiv")
+    search.add_argument("--user-id", type=int, default=None)
+    calibration = commands.add_parser(
+        "calibrate-password-hash", help="Hash-Kosten für eine Ziel-Latenz pro Verify ermitteln"
+    )
+    calibration.add_argument("--algorithm", choices=HASH_ALGORITHMS, default="pbkdf2_sha256")
+    calibration.add_argument("--target-ms", type=float, default=250.0)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "migrate":
+        if args.status:
+            migration_status()
+        else:
+            run_migrations(args.target)
+    elif args.command == "reset":
+        reset_db()
+    elif args.command == "rebuild-search-index":
+        rebuild_search_index()
+    elif args.command == "reap-sessions":
+        reap_sessions()
+    elif args.command == "slow-queries":
+        slow_queries_report(args.path, args.top, args.sort)
+    elif args.command == "archive-audit-logs":
+        archive_audit_logs(args.vacuum)
+    elif args.command == "verify-audit-archive":
+        sys.exit(0 if verify_audit_archive() else 1)
+    elif args.command == "search-audit-archive":
+        search_audit_archive(args.start, args.end, args.user_id)
+    elif args.command == "calibrate-password-hash":
+        calibrate_password_hash(args.algorithm, args.target_ms)
+    else:
+        init_db()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,53 +0,0 @@
--- src/database/create_tables.sql
-
-DROP TABLE IF EXISTS users;
-DROP TABLE IF EXISTS patients;
-DROP TABLE IF EXISTS appointments;
-DROP TABLE IF EXISTS sessions;
-DROP TABLE IF EXISTS audit_logs;
-
-CREATE TABLE users (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    username TEXT NOT NULL UNIQUE,
-    password TEXT NOT NULL,
-    role TEXT NOT NULL CHECK(role IN ('admin', 'doctor', 'nurse'))
-);
-
-CREATE TABLE patients (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    first_name TEXT NOT NULL,
-    last_name TEXT NOT NULL,
-    birthdate TEXT NOT NULL,         -- YYYY-MM-DD
-    mrn TEXT NOT NULL UNIQUE,        -- Medical Record Number
-    diagnosis TEXT                   -- optional, only for doctor
-);
-
-CREATE TABLE appointments (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    patient_id INTEGER NOT NULL,
-    doctor_id INTEGER NOT NULL,
-    date TEXT NOT NULL,
-    description TEXT NOT NULL,
-    FOREIGN KEY(patient_id) REFERENCES patients(id),
-    FOREIGN KEY(doctor_id) REFERENCES users(id)
-);
-
-CREATE TABLE sessions (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    user_id INTEGER NOT NULL,
-    token TEXT NOT NULL UNIQUE,
-    created_at TEXT NOT NULL,
-    expires_at TEXT NOT NULL,
-    FOREIGN KEY(user_id) REFERENCES users(id)
-);
-
-CREATE TABLE audit_logs (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    timestamp TEXT NOT NULL,
-    user_id INTEGER,
-    action TEXT NOT NULL,
-    resource_type TEXT,
-    resource_id INTEGER,
-    success INTEGER NOT NULL,
-    FOREIGN KEY(user_id) REFERENCES users(id)
-);
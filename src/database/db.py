@@ -1,30 +1,507 @@
 # src/database/db.py
+# ============================================================
+# SQLITE CONNECTION MANAGEMENT
+# ------------------------------------------------------------
+# - Pro Prozess ein begrenzter Connection-Pool (DB_POOL_SIZE)
+# - Innerhalb eines Flask-Requests: genau EINE Verbindung (g)
+# - Außerhalb eines Requests (Skripte, Threads): Verbindung
+#   wird pro Aufruf aus dem Pool geliehen und zurückgegeben
+# - Rückgabe an den Pool über app.teardown_appcontext
+# - Storage-Profil (WAL, synchronous, mmap, ...) pro Verbindung
+# - Schreibzugriffe laufen serialisiert über EINE Writer-Verbindung
+# ============================================================
+
+import queue
 import sqlite3
+import threading
+import time
+from contextlib import contextmanager
 from pathlib import Path
 
+from flask import g, has_app_context
+
+from config import Config
+
 DB_PATH = Path(__file__).resolve().parent.parent / "healthcare.db"
 
+
+# ============================================================
+# STORAGE-PROFIL (PRAGMAs)
+# ============================================================
+# PRAGMA-Werte lassen sich nicht parametrisieren -> nur Allowlist-Werte
+_JOURNAL_MODES = {"DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"}
+_SYNCHRONOUS_MODES = {"OFF", "NORMAL", "FULL", "EXTRA"}
+_TEMP_STORES = {"DEFAULT", "FILE", "MEMORY"}
+
+
+def _storage_profile(source) -> dict:
+    """Liest und validiert das Storage-Profil aus einer Config (Klasse oder dict)."""
+    get = source.get if isinstance(source, dict) else lambda key, default=None: getattr(source, key, default)
+
+    profile = {
+        "journal_mode": str(get("SQLITE_JOURNAL_MODE", Config.SQLITE_JOURNAL_MODE)).upper(),
+        "synchronous": str(get("SQLITE_SYNCHRONOUS", Config.SQLITE_SYNCHRONOUS)).upper(),
+        "mmap_size": int(get("SQLITE_MMAP_SIZE", Config.SQLITE_MMAP_SIZE)),
+        "cache_size": int(get("SQLITE_CACHE_SIZE", Config.SQLITE_CACHE_SIZE)),
+        "busy_timeout": int(get("SQLITE_BUSY_TIMEOUT_MS", Config.SQLITE_BUSY_TIMEOUT_MS)),
+        "temp_store": str(get("SQLITE_TEMP_STORE", Config.SQLITE_TEMP_STORE)).upper(),
+        "serialize_writes": bool(get("DB_SERIALIZE_WRITES", Config.DB_SERIALIZE_WRITES)),
+    }
+
+    if profile["journal_mode"] not in _JOURNAL_MODES:
+        raise ValueError(f"Invalid SQLITE_JOURNAL_MODE: {profile['journal_mode']}")
+    if profile["synchronous"] not in _SYNCHRONOUS_MODES:
+        raise ValueError(f"Invalid SQLITE_SYNCHRONOUS: {profile['synchronous']}")
+    if profile["temp_store"] not in _TEMP_STORES:
+        raise ValueError(f"Invalid SQLITE_TEMP_STORE: {profile['temp_store']}")
+
+    return profile
+
+
+_storage = _storage_profile(Config)
+
+
+def configure_storage(source):
+    """
+    Setzt das Storage-Profil für alle NEU erzeugten Verbindungen.
+    Bestehende Verbindungen werden geschlossen, damit das Profil überall gilt.
+    """
+    global _storage
+    _storage = _storage_profile(source)
+    close_pool()
+
+
+def _apply_pragmas(conn):
+    s = _storage
+    conn.execute(f"PRAGMA busy_timeout = {s['busy_timeout']}")
+    conn.execute(f"PRAGMA journal_mode = {s['journal_mode']}")
+    conn.execute(f"PRAGMA synchronous = {s['synchronous']}")
+    conn.execute(f"PRAGMA mmap_size = {s['mmap_size']}")
+    conn.execute(f"PRAGMA cache_size = {s['cache_size']}")
+    conn.execute(f"PRAGMA temp_store = {s['temp_store']}")
+
+
 def get_connection():
-    conn = sqlite3.connect(DB_PATH)
+    """
+    Erstellt eine NEUE, vollständig konfigurierte Verbindung.
+    Wird vom Pool verwendet; direkte Nutzung nur für Wartungsaufgaben.
+    """
+    # check_same_thread=False: Verbindungen wandern über den Pool zwischen
+    # Threads, werden aber nie von zwei Threads gleichzeitig genutzt.
+    conn = sqlite3.connect(
+        DB_PATH,
+        timeout=_storage["busy_timeout"] / 1000,
+        check_same_thread=False
+    )
     conn.row_factory = sqlite3.Row
+    _apply_pragmas(conn)
     return conn
 
+
+# ============================================================
+# CONNECTION POOL
+# ============================================================
+class PoolTimeout(sqlite3.OperationalError):
+    """Kein freier Pool-Slot innerhalb von DB_POOL_TIMEOUT_SECONDS."""
+
+
+class ConnectionPool:
+    """
+    Thread-sicherer, größenbegrenzter Pool für SQLite-Verbindungen.
+
+    - Verbindungen werden lazy erzeugt (maximal `size` Stück)
+    - LIFO: zuletzt genutzte ("warme") Verbindungen zuerst
+    - Health-Check vor Wiederverwendung länger ungenutzter Verbindungen
+    """
+
+    def __init__(self, size: int, timeout: float, healthcheck_after: float):
+        self.size = max(1, size)
+        self.timeout = timeout
+        self.healthcheck_after = healthcheck_after
+
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._created = 0
+
+    def acquire(self):
+        conn, last_used = self._take()
+
+        if conn is None:
+            try:
+                return get_connection()
+            except sqlite3.Error:
+                self._discard()
+                raise
+
+        if time.monotonic() - last_used >= self.healthcheck_after and not self._is_healthy(conn):
+            self._close(conn)
+            self._discard()
+            return self.acquire()
+
+        return conn
+
+    def release(self, conn):
+        # Offene Transaktionen dürfen nicht in den nächsten Request "lecken"
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            self._close(conn)
+            self._discard()
+            return
+
+        self._idle.put((conn, time.monotonic()))
+
+    def close_all(self):
+        """Schließt alle freien Verbindungen (z.B. vor init_db / beim Shutdown)."""
+        while True:
+            try:
+                conn, _ = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._close(conn)
+            self._discard()
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size,
+            "open": self._created,
+            "idle": self._idle.qsize(),
+        }
+
+    # ------------------------------------------------------------
+    # Interne Helfer
+    # ------------------------------------------------------------
+    def _take(self):
+        """Liefert (conn, last_used) oder (None, None) wenn neu erzeugt werden darf."""
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            if self._created < self.size:
+                self._created += 1
+                return None, None
+
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise PoolTimeout("Database connection pool exhausted") from None
+
+    def _discard(self):
+        with self._lock:
+            self._created -= 1
+
+    @staticmethod
+    def _is_healthy(conn) -> bool:
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    @staticmethod
+    def _close(conn):
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ConnectionPool:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(
+                    Config.DB_POOL_SIZE,
+                    Config.DB_POOL_TIMEOUT_SECONDS,
+                    Config.DB_POOL_HEALTHCHECK_SECONDS,
+                )
+    return _pool
+
+
+def configure_pool(size: int, timeout: float, healthcheck_after: float):
+    """Ersetzt den Prozess-Pool (bestehende freie Verbindungen werden geschlossen)."""
+    global _pool
+    with _pool_lock:
+        old = _pool
+        _pool = ConnectionPool(size, timeout, healthcheck_after)
+    if old is not None:
+        old.close_all()
+
+
+def pool_stats() -> dict:
+    return _get_pool().stats()
+
+
+def close_pool():
+    """Schließt alle freien Verbindungen des Prozess-Pools inkl. Writer."""
+    global _writer
+    if _pool is not None:
+        _pool.close_all()
+
+    with _write_lock:
+        if _writer is not None:
+            ConnectionPool._close(_writer)
+            _writer = None
+
+
+# ============================================================
+# WRITER (serialisierte Schreibzugriffe)
+# ============================================================
+# SQLite erlaubt ohnehin nur einen Schreiber gleichzeitig. Statt dass
+# mehrere Verbindungen um den RESERVED-Lock konkurrieren (busy-wait,
+# "database is locked"), stellen sich Writer hier an einem Lock an.
+_writer = None
+_write_lock = threading.RLock()
+
+
+def _get_writer():
+    global _writer
+    if _writer is None:
+        _writer = get_connection()
+    return _writer
+
+
+@contextmanager
+def write_transaction():
+    """
+    Eine Schreib-Transaktion (BEGIN IMMEDIATE ... COMMIT).
+    Verschachtelte Aufrufe im selben Thread laufen in der äußeren Transaktion.
+
+    Die gelieferte Verbindung meldet execute/executemany an die
+    Query-Listener (Metriken, Slow-Query-Log) wie die Query-Helper.
+    """
+    if not _storage["serialize_writes"]:
+        with connection() as conn:
+            yield from _transaction(conn)
+        return
+
+    with _write_lock:
+        yield from _transaction(_get_writer())
+
+
+# Verbindung der äußeren Transaktion pro Thread: verschachtelte Aufrufe
+# bekommen dasselbe (ggf. instrumentierte) Objekt
+_current_tx = threading.local()
+
+
+def _transaction(conn):
+    if conn.in_transaction:
+        outer = getattr(_current_tx, "conn", None)
+        yield outer if outer is not None else _instrumented(conn)
+        return
+
+    conn.execute("BEGIN IMMEDIATE")
+    _current_tx.conn = _instrumented(conn)
+    try:
+        yield _current_tx.conn
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        _current_tx.conn = None
+
+
+@contextmanager
+def connection():
+    """
+    Liefert die Verbindung des aktuellen Kontexts:
+    - im Request: dieselbe Verbindung für alle Queries (gespeichert in g)
+    - sonst: kurzzeitig aus dem Pool geliehen
+    """
+    if has_app_context():
+        conn = g.get("_db_conn")
+        if conn is None:
+            conn = g._db_conn = _get_pool().acquire()
+        yield conn
+        return
+
+    pool = _get_pool()
+    conn = pool.acquire()
+    try:
+        yield conn
+    finally:
+        pool.release(conn)
+
+
+def close_connection(_exc=None):
+    """teardown_appcontext: Request-Verbindung an den Pool zurückgeben."""
+    conn = g.pop("_db_conn", None)
+    if conn is not None:
+        _get_pool().release(conn)
+
+
+def init_app(app):
+    """
+    Konfiguriert Storage-Profil und Pool aus der App-Config
+    und registriert das Teardown.
+    """
+    configure_storage(app.config)
+    configure_pool(
+        app.config.get("DB_POOL_SIZE", Config.DB_POOL_SIZE),
+        app.config.get("DB_POOL_TIMEOUT_SECONDS", Config.DB_POOL_TIMEOUT_SECONDS),
+        app.config.get("DB_POOL_HEALTHCHECK_SECONDS", Config.DB_POOL_HEALTHCHECK_SECONDS),
+    )
+    app.teardown_appcontext(close_connection)
+
+
+# ============================================================
+# QUERY-LISTENER (Instrumentierung, z.B. utils.metrics)
+# ============================================================
+# listener(query, params, duration_seconds) wird nach jedem Statement
+# der Query-Helper aufgerufen. Ohne Listener entfällt nur der Aufruf.
+_query_listeners = []
+
+
+def add_query_listener(listener):
+    if listener not in _query_listeners:
+        _query_listeners.append(listener)
+
+
+def remove_query_listener(listener):
+    if listener in _query_listeners:
+        _query_listeners.remove(listener)
+
+
+def _notify(query, params, duration):
+    for listener in _query_listeners:
+        try:
+            listener(query, params, duration)
+        except Exception:
+            # Instrumentierung darf keine Query scheitern lassen
+            pass
+
+
+class _InstrumentedConnection:
+    """
+    Verbindung in write_transaction(): execute/executemany laufen über
+    _notify, alles andere (rowcount, lastrowid, in_transaction, ...)
+    geht unverändert an die sqlite3-Verbindung.
+
+    Gemessen wird der Aufruf selbst; bei SELECTs ist das die Zeit bis zur
+    ersten Zeile (die übrigen holt der Aufrufer per fetch*).
+    """
+
+    __slots__ = ("_conn",)
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def execute(self, query, params=()):
+        started = time.perf_counter()
+        cur = self._conn.execute(query, params)
+        _notify(query, params, time.perf_counter() - started)
+        return cur
+
+    def executemany(self, query, seq_of_params):
+        # Einmal messen und melden; EXPLAIN/Parameteranzahl anhand der ersten Zeile
+        rows = list(seq_of_params)
+        started = time.perf_counter()
+        cur = self._conn.executemany(query, rows)
+        _notify(query, rows[0] if rows else (), time.perf_counter() - started)
+        return cur
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+def _instrumented(conn):
+    # Ohne Listener die rohe Verbindung (kein Overhead pro Statement)
+    return _InstrumentedConnection(conn) if _query_listeners else conn
+
+
+# ============================================================
+# QUERY HELPERS (unveränderte Signaturen)
+# ============================================================
 def fetch_one(query, params=()):
-    conn = get_connection()
-    cur = conn.execute(query, params)
-    row = cur.fetchone()
-    conn.close()
+    started = time.perf_counter()
+    with connection() as conn:
+        cur = conn.execute(query, params)
+        row = cur.fetchone()
+        cur.close()
+    if _query_listeners:
+        _notify(query, params, time.perf_counter() - started)
     return row
 
+
 def fetch_all(query, params=()):
-    conn = get_connection()
-    cur = conn.execute(query, params)
-    rows = cur.fetchall()
-    conn.close()
+    started = time.perf_counter()
+    with connection() as conn:
+        cur = conn.execute(query, params)
+        rows = cur.fetchall()
+        cur.close()
+    if _query_listeners:
+        _notify(query, params, time.perf_counter() - started)
     return rows
 
-def execute(query, params=()):
-    conn = get_connection()
-    conn.execute(query, params)
-    conn.commit()
-    conn.close()
+
+def iter_rows(query, params=(), chunk_size=1000):
+    """
+    Generator für große Ergebnismengen (Exporte): liest per fetchmany in
+    Blöcken, der Speicherbedarf ist unabhängig von der Zeilenanzahl.
+
+    Nutzt eine EIGENE Pool-Verbindung, die erst beim Ende/Abbruch des
+    Generators zurückgegeben wird (auch wenn der Request-Kontext schon
+    abgebaut ist, z.B. bei Streaming-Responses).
+
+    Gemessen wird nur die Zeit in SQLite (execute + fetchmany), nicht die
+    Verarbeitung der Zeilen durch den Aufrufer.
+    """
+    pool = _get_pool()
+    conn = pool.acquire()
+    cur = None
+    elapsed = 0.0
+    try:
+        started = time.perf_counter()
+        cur = conn.execute(query, params)
+        while True:
+            rows = cur.fetchmany(chunk_size)
+            elapsed += time.perf_counter() - started
+            if not rows:
+                break
+            yield from rows
+            started = time.perf_counter()
+    finally:
+        if cur is not None:
+            cur.close()
+        pool.release(conn)
+        if _query_listeners:
+            _notify(query, params, elapsed)
+
+
+def iter_keyset(query, params=(), chunk_size=1000, key="id", start=0):
+    """
+    Generator für große Ergebnismengen in Hintergrund-Jobs ($export): liest
+    Block für Block mit je einer eigenen kurzen Abfrage ab dem letzten
+    Schlüssel (Keyset), die Verbindung wird nur pro Block geliehen.
+
+    Anders als iter_rows bleibt kein Read-Snapshot über den ganzen Lauf
+    offen (der WAL-Checkpoints blockiert). Dafür kein konsistenter Stand:
+    Änderungen während des Laufs werden ab dem nächsten Block sichtbar.
+
+    query endet mit den Platzhaltern für "<key> > ?" und "LIMIT ?" und ist
+    nach key sortiert; key ist die Spalte im Ergebnis, start liegt vor dem
+    ersten Schlüssel. Ein Block darf mehr als chunk_size Zeilen liefern
+    (z.B. LIMIT auf Serien, Zeilen je Ausnahme); Ende = leerer Block.
+    """
+    last = start
+    while True:
+        rows = fetch_all(query, (*params, last, chunk_size))
+        if not rows:
+            return
+        last = rows[-1][key]
+        yield from rows
+
+
+def execute(query, params=()) -> int:
+    # Gemeldet von der instrumentierten Verbindung aus write_transaction()
+    with write_transaction() as conn:
+        return conn.execute(query, params).rowcount
@@ -0,0 +1,205 @@
+# src/database/migrate.py
+# ============================================================
+# MIGRATIONS-RUNNER (ersetzt das Löschen + Neuanlegen in init_db)
+# ------------------------------------------------------------
+# - Migrationen liegen in database/migrations/ als
+#   NNNN_name.sql  (Statements) oder
+#   NNNN_name.py   (Funktion upgrade(conn))
+# - Angewendete Versionen stehen in schema_version
+#   (Version, Name, Zeitpunkt, SHA-256 der Datei)
+# - Jede Migration läuft in einer eigenen BEGIN-IMMEDIATE-
+#   Transaktion: schlägt sie fehl, bleibt die DB auf dem Stand
+#   davor. Mehrere Worker, die gleichzeitig starten, warten auf
+#   die Schreibsperre und überspringen bereits Angewendetes.
+# - Nur vorwärts: bereits ausgelieferte Dateien nicht ändern,
+#   sondern eine neue Migration anlegen (Prüfsummen-Warnung)
+# ============================================================
+
+import hashlib
+import importlib.util
+import logging
+import re
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_DIR = Path(__file__).resolve().parent / "migrations"
+
+_FILENAME = re.compile(r"^(\d{4})_(\w+)\.(sql|py)$")
+
+SCHEMA_VERSION_TABLE = """
+    CREATE TABLE IF NOT EXISTS schema_version (
+        version INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        applied_at TEXT NOT NULL,
+        checksum TEXT NOT NULL
+    )
+"""
+
+
+class MigrationError(Exception):
+    pass
+
+
+class Migration:
+
+    def __init__(self, version: int, name: str, path: Path):
+        self.version = version
+        self.name = name
+        self.path = path
+        self.checksum = hashlib.sha256(path.read_bytes()).hexdigest()
+
+    def apply(self, conn: sqlite3.Connection):
+        if self.path.suffix == ".py":
+            spec = importlib.util.spec_from_file_location(f"migration_{self.version:04d}", self.path)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            module.upgrade(conn)
+        else:
+            for statement in split_statements(self.path.read_text(encoding="utf-8")):
+                conn.execute(statement)
+
+    def __repr__(self):
+        return f"{self.version:04d}_{self.name}"
+
+
+def split_statements(script: str) -> list:
+    """
+    Zerlegt ein SQL-Skript in einzelne Statements.
+    executescript() würde selbst COMMIT ausführen und damit die
+    Transaktion der Migration beenden; complete_statement() erkennt
+    auch Trigger-Körper (BEGIN ... END;) korrekt.
+    """
+    statements = []
+    buffer = ""
+    for line in script.splitlines(keepends=True):
+        buffer += line
+        if sqlite3.complete_statement(buffer):
+            statement = _strip_comments(buffer)
+            if statement:
+                statements.append(statement)
+            buffer = ""
+
+    if _strip_comments(buffer):
+        raise MigrationError(f"Incomplete SQL statement: {buffer.strip()[:80]}")
+    return statements
+
+
+def _strip_comments(sql: str) -> str:
+    # Nur ganze Kommentarzeilen; "--" in Literalen bleibt unangetastet
+    return "\n".join(line for line in sql.splitlines() if not line.strip().startswith("--")).strip()
+
+
+def discover(directory: Path = MIGRATIONS_DIR) -> list:
+    migrations = []
+    for path in sorted(Path(directory).iterdir()):
+        match = _FILENAME.match(path.name)
+        if match:
+            migrations.append(Migration(int(match.group(1)), match.group(2), path))
+
+    versions = [m.version for m in migrations]
+    if versions != list(range(1, len(versions) + 1)):
+        raise MigrationError(f"Migration versions must be 1..n without gaps or duplicates: {versions}")
+    return migrations
+
+
+# ============================================================
+# AUSFÜHRUNG
+# ============================================================
+def _connect(db_path) -> sqlite3.Connection:
+    # isolation_level=None: Transaktionen explizit steuern (BEGIN IMMEDIATE)
+    conn = sqlite3.connect(db_path, isolation_level=None, timeout=Config.SQLITE_BUSY_TIMEOUT_MS / 1000)
+    conn.execute("PRAGMA foreign_keys = ON")
+    conn.execute(SCHEMA_VERSION_TABLE)
+    return conn
+
+
+def _applied(conn) -> dict:
+    return {row[0]: (row[1], row[2]) for row in conn.execute("SELECT version, name, checksum FROM schema_version")}
+
+
+def current_version(db_path) -> int:
+    conn = _connect(db_path)
+    try:
+        return conn.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def status(db_path, directory: Path = MIGRATIONS_DIR) -> list:
+    """[{"version", "name", "applied", "modified"}] für alle bekannten Migrationen."""
+    applied = {}
+    # Nur anzeigen: keine leere Datenbankdatei anlegen
+    if Path(db_path).exists():
+        conn = _connect(db_path)
+        try:
+            applied = _applied(conn)
+        finally:
+            conn.close()
+
+    return [
+        {
+            "version": m.version,
+            "name": m.name,
+            "applied": m.version in applied,
+            "modified": m.version in applied and applied[m.version][1] != m.checksum,
+        }
+        for m in discover(directory)
+    ]
+
+
+def migrate(db_path, target: int = None, directory: Path = MIGRATIONS_DIR) -> list:
+    """
+    Wendet alle ausstehenden Migrationen bis target (Standard: neueste) an.
+    Rückgabe: Liste der in diesem Aufruf angewendeten Migrationen.
+    """
+    migrations = discover(directory)
+    if target is not None:
+        migrations = [m for m in migrations if m.version <= target]
+
+    conn = _connect(db_path)
+    done = []
+    try:
+        applied = _applied(conn)
+        for migration in migrations:
+            if migration.version in applied and applied[migration.version][1] != migration.checksum:
+                logger.warning("Migration %r was modified after it was applied", migration)
+
+        for migration in migrations:
+            if migration.version in applied:
+                continue   # Normalfall beim Start: keine Schreibsperre nötig
+
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Erst unter der Schreibsperre prüfen (parallel startende Worker)
+                already = conn.execute(
+                    "SELECT 1 FROM schema_version WHERE version = ?", (migration.version,)
+                ).fetchone()
+                if already:
+                    conn.execute("ROLLBACK")
+                    continue
+
+                migration.apply(conn)
+                conn.execute(
+                    "INSERT INTO schema_version (version, name, applied_at, checksum) VALUES (?, ?, ?, ?)",
+                    (migration.version, migration.name, datetime.utcnow().isoformat(), migration.checksum)
+                )
+                conn.execute("COMMIT")
+            except Exception as e:
+                conn.execute("ROLLBACK")
+                raise MigrationError(f"Migration {migration!r} failed: {e}") from e
+
+            logger.info("Applied migration %r", migration)
+            done.append(migration)
+
+        if done:
+            # Statistiken für neue Indizes, damit der Planer sie sofort nutzt
+            conn.execute("PRAGMA optimize")
+    finally:
+        conn.close()
+
+    return done
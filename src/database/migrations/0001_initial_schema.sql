@@ -0,0 +1,86 @@
+-- src/database/migrations/0001_initial_schema.sql
+-- Ausgangsschema (ehemals create_tables.sql). IF NOT EXISTS: bestehende
+-- Datenbanken aus der Zeit vor dem Migrations-Runner werden übernommen,
+-- ohne Daten zu verlieren.
+
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    username TEXT NOT NULL UNIQUE,
+    password TEXT NOT NULL,
+    role TEXT NOT NULL CHECK(role IN ('admin', 'doctor', 'nurse'))
+);
+
+CREATE TABLE IF NOT EXISTS patients (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    first_name TEXT NOT NULL,
+    last_name TEXT NOT NULL,
+    birthdate TEXT NOT NULL,         -- YYYY-MM-DD
+    mrn TEXT NOT NULL UNIQUE,        -- Medical Record Number
+    diagnosis TEXT                   -- optional, only for doctor
+);
+
+-- Sortierung/Keyset-Pagination der Suche: (last_name, id)
+CREATE INDEX IF NOT EXISTS idx_patients_last_name ON patients(last_name, id);
+
+CREATE TABLE IF NOT EXISTS appointments (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    patient_id INTEGER NOT NULL,
+    doctor_id INTEGER NOT NULL,
+    date TEXT NOT NULL,
+    description TEXT NOT NULL,
+    FOREIGN KEY(patient_id) REFERENCES patients(id),
+    FOREIGN KEY(doctor_id) REFERENCES users(id)
+);
+
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    token TEXT NOT NULL UNIQUE,
+    created_at TEXT NOT NULL,
+    expires_at TEXT NOT NULL,
+    FOREIGN KEY(user_id) REFERENCES users(id)
+);
+
+-- Reaper (abgelaufene Sessions) und Session-Limit pro User
+CREATE INDEX IF NOT EXISTS idx_sessions_expires_at ON sessions(expires_at);
+CREATE INDEX IF NOT EXISTS idx_sessions_user_id ON sessions(user_id, expires_at);
+
+CREATE TABLE IF NOT EXISTS audit_logs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT NOT NULL,
+    user_id INTEGER,
+    action TEXT NOT NULL,
+    resource_type TEXT,
+    resource_id INTEGER,
+    success INTEGER NOT NULL,
+    FOREIGN KEY(user_id) REFERENCES users(id)
+);
+
+-- FHIR Bulk Data ($export): Job-Status ist in der DB, damit jeder Worker
+-- Status-Abfragen beantworten kann. Die NDJSON-Dateien liegen auf der Platte.
+CREATE TABLE IF NOT EXISTS bulk_export_jobs (
+    id TEXT PRIMARY KEY,             -- zufällige Job-ID (URL-sicher)
+    user_id INTEGER NOT NULL,
+    status TEXT NOT NULL CHECK(status IN ('queued', 'in-progress', 'completed', 'failed', 'cancelled')),
+    resource_types TEXT NOT NULL,    -- z.B. "Patient,Appointment"
+    request_url TEXT NOT NULL,
+    progress TEXT,
+    output TEXT,                     -- JSON-Liste der Ausgabedateien
+    created_at TEXT NOT NULL,
+    completed_at TEXT,
+    FOREIGN KEY(user_id) REFERENCES users(id)
+);
+
+-- Widerrufene stateless Session-Tokens (SESSION_MODE = "stateless"):
+-- jti gesetzt        -> einzelnes Token (Logout)
+-- issued_before      -> alle Tokens des Users, die davor ausgestellt wurden
+CREATE TABLE IF NOT EXISTS token_revocations (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    jti TEXT UNIQUE,
+    user_id INTEGER NOT NULL,
+    issued_before REAL,              -- UNIX-Zeit
+    expires_at REAL NOT NULL,        -- danach kann der Eintrag gelöscht werden
+    FOREIGN KEY(user_id) REFERENCES users(id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_token_revocations_expires_at ON token_revocations(expires_at);
@@ -0,0 +1,36 @@
+-- src/database/migrations/0002_patient_search_index.sql
+-- Volltext-Index (FTS5, Trigram-Tokenizer) für die Patientensuche.
+-- Trigramme erlauben Teilstring-Suche ("oss" findet "Rossi") ohne
+-- LIKE '%q%'-Full-Table-Scan. Bestehende Patienten werden beim
+-- Anlegen übernommen (Backfill).
+
+CREATE VIRTUAL TABLE IF NOT EXISTS patients_fts USING fts5(
+    first_name,
+    last_name,
+    mrn,
+    content='patients',
+    content_rowid='id',
+    tokenize='trigram'
+);
+
+-- Synchronisation patients -> patients_fts
+CREATE TRIGGER IF NOT EXISTS patients_fts_ai AFTER INSERT ON patients BEGIN
+    INSERT INTO patients_fts (rowid, first_name, last_name, mrn)
+    VALUES (new.id, new.first_name, new.last_name, new.mrn);
+END;
+
+CREATE TRIGGER IF NOT EXISTS patients_fts_ad AFTER DELETE ON patients BEGIN
+    INSERT INTO patients_fts (patients_fts, rowid, first_name, last_name, mrn)
+    VALUES ('delete', old.id, old.first_name, old.last_name, old.mrn);
+END;
+
+-- Nur bei Änderung indizierter Spalten (z.B. nicht bei Diagnose-Updates)
+CREATE TRIGGER IF NOT EXISTS patients_fts_au AFTER UPDATE OF first_name, last_name, mrn ON patients BEGIN
+    INSERT INTO patients_fts (patients_fts, rowid, first_name, last_name, mrn)
+    VALUES ('delete', old.id, old.first_name, old.last_name, old.mrn);
+    INSERT INTO patients_fts (rowid, first_name, last_name, mrn)
+    VALUES (new.id, new.first_name, new.last_name, new.mrn);
+END;
+
+-- Backfill für Datenbanken, die schon Patienten enthalten
+INSERT INTO patients_fts (patients_fts) VALUES ('rebuild');
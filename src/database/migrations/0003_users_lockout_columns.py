@@ -0,0 +1,21 @@
+# src/database/migrations/0003_users_lockout_columns.py
+# ============================================================
+# Login-Sperre: users.failed_attempts / users.locked_until
+# ------------------------------------------------------------
+# api/auth.py liest beide Spalten, das Ausgangsschema kannte sie
+# nicht. Manche Installationen haben sie bereits von Hand ergänzt
+# -> Python statt SQL, damit nur fehlende Spalten angelegt werden
+# (SQLite kennt kein ADD COLUMN IF NOT EXISTS).
+# ============================================================
+
+COLUMNS = {
+    "failed_attempts": "INTEGER NOT NULL DEFAULT 0",
+    "locked_until": "TEXT",
+}
+
+
+def upgrade(conn):
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(users)")}
+    for name, definition in COLUMNS.items():
+        if name not in existing:
+            conn.execute(f"ALTER TABLE users ADD COLUMN {name} {definition}")
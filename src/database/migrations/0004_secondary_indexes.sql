@@ -0,0 +1,17 @@
+-- src/database/migrations/0004_secondary_indexes.sql
+-- Sekundärindizes für Fremdschlüssel und häufige Filter.
+-- CREATE INDEX hält nur die Schreibsperre: im WAL-Modus lesen die
+-- Worker während des Aufbaus weiter (nur Schreiber warten).
+
+-- Termine eines Patienten (Löschung/Export pro Patient, FHIR-Referenzen)
+CREATE INDEX IF NOT EXISTS idx_appointments_patient_id ON appointments(patient_id);
+
+-- Kalender eines Arztes: WHERE doctor_id = ? AND date BETWEEN ? AND ?
+CREATE INDEX IF NOT EXISTS idx_appointments_doctor_date ON appointments(doctor_id, date);
+
+-- Audit-Auswertung nach Zeitraum bzw. pro Benutzer (chronologisch)
+CREATE INDEX IF NOT EXISTS idx_audit_logs_timestamp ON audit_logs(timestamp);
+CREATE INDEX IF NOT EXISTS idx_audit_logs_user_id ON audit_logs(user_id, timestamp);
+
+-- /stats: COUNT(*) ... WHERE role = 'doctor'
+CREATE INDEX IF NOT EXISTS idx_users_role ON users(role);
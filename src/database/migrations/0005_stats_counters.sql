@@ -0,0 +1,74 @@
+-- src/database/migrations/0005_stats_counters.sql
+-- Materialisierte Zähler für GET /stats statt COUNT(*)-Scans.
+-- Gepflegt per Trigger in derselben Transaktion wie die Änderung,
+-- damit kein Schreibpfad sie vergessen kann. Kosten pro Schreibzugriff:
+-- ein Update einer Zeile (Writer ist ohnehin serialisiert).
+
+CREATE TABLE IF NOT EXISTS stats_counters (
+    name TEXT PRIMARY KEY,           -- patients, users, doctors, appointments
+    value INTEGER NOT NULL
+) WITHOUT ROWID;
+
+-- Termine pro Tag (UTC, "YYYY-MM-DD"). Wochenwerte werden beim Lesen
+-- aus höchstens 7 Tageszeilen pro Woche summiert; ein eigener Wochen-
+-- Bucket hätte jeden Insert um ein weiteres Upsert verteuert.
+-- Leere Tage bleiben mit count = 0 stehen (harmlos).
+CREATE TABLE IF NOT EXISTS appointment_days (
+    day TEXT PRIMARY KEY,
+    count INTEGER NOT NULL
+) WITHOUT ROWID;
+
+-- Einmaliger Backfill (einziger Scan der großen Tabellen)
+INSERT OR REPLACE INTO stats_counters (name, value)
+SELECT 'patients', COUNT(*) FROM patients
+UNION ALL SELECT 'users', COUNT(*) FROM users
+UNION ALL SELECT 'doctors', COUNT(*) FROM users WHERE role = 'doctor'
+UNION ALL SELECT 'appointments', COUNT(*) FROM appointments;
+
+INSERT OR REPLACE INTO appointment_days (day, count)
+SELECT substr(date, 1, 10), COUNT(*) FROM appointments GROUP BY 1;
+
+-- patients
+CREATE TRIGGER IF NOT EXISTS stats_patients_ai AFTER INSERT ON patients BEGIN
+    UPDATE stats_counters SET value = value + 1 WHERE name = 'patients';
+END;
+
+CREATE TRIGGER IF NOT EXISTS stats_patients_ad AFTER DELETE ON patients BEGIN
+    UPDATE stats_counters SET value = value - 1 WHERE name = 'patients';
+END;
+
+-- users / doctors
+CREATE TRIGGER IF NOT EXISTS stats_users_ai AFTER INSERT ON users BEGIN
+    UPDATE stats_counters SET value = value + 1 WHERE name = 'users';
+    UPDATE stats_counters SET value = value + 1 WHERE name = 'doctors' AND new.role = 'doctor';
+END;
+
+CREATE TRIGGER IF NOT EXISTS stats_users_ad AFTER DELETE ON users BEGIN
+    UPDATE stats_counters SET value = value - 1 WHERE name = 'users';
+    UPDATE stats_counters SET value = value - 1 WHERE name = 'doctors' AND old.role = 'doctor';
+END;
+
+CREATE TRIGGER IF NOT EXISTS stats_users_au AFTER UPDATE OF role ON users
+WHEN (old.role = 'doctor') <> (new.role = 'doctor') BEGIN
+    UPDATE stats_counters SET value = value + (CASE WHEN new.role = 'doctor' THEN 1 ELSE -1 END)
+    WHERE name = 'doctors';
+END;
+
+-- appointments (Gesamtzahl + Tageszähler)
+CREATE TRIGGER IF NOT EXISTS stats_appointments_ai AFTER INSERT ON appointments BEGIN
+    UPDATE stats_counters SET value = value + 1 WHERE name = 'appointments';
+    INSERT INTO appointment_days (day, count) VALUES (substr(new.date, 1, 10), 1)
+    ON CONFLICT (day) DO UPDATE SET count = count + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS stats_appointments_ad AFTER DELETE ON appointments BEGIN
+    UPDATE stats_counters SET value = value - 1 WHERE name = 'appointments';
+    UPDATE appointment_days SET count = count - 1 WHERE day = substr(old.date, 1, 10);
+END;
+
+CREATE TRIGGER IF NOT EXISTS stats_appointments_au AFTER UPDATE OF date ON appointments
+WHEN substr(old.date, 1, 10) <> substr(new.date, 1, 10) BEGIN
+    UPDATE appointment_days SET count = count - 1 WHERE day = substr(old.date, 1, 10);
+    INSERT INTO appointment_days (day, count) VALUES (substr(new.date, 1, 10), 1)
+    ON CONFLICT (day) DO UPDATE SET count = count + 1;
+END;
@@ -0,0 +1,19 @@
+-- src/database/migrations/0006_audit_archive_index.sql
+-- Verzeichnis der archivierten Audit-Monate (utils/audit_archive.py).
+-- Eine Zeile pro Kalendermonat (UTC). Die Datei enthält alle Einträge des
+-- Monats als gzip-NDJSON; sha256 erlaubt den Nachweis der Unverändertheit.
+
+CREATE TABLE IF NOT EXISTS audit_archive_index (
+    month TEXT PRIMARY KEY,          -- YYYY-MM
+    path TEXT NOT NULL,              -- relativ zu AUDIT_ARCHIVE_DIR
+    rows INTEGER NOT NULL,
+    first_id INTEGER,
+    last_id INTEGER,
+    first_timestamp TEXT,
+    last_timestamp TEXT,
+    bytes INTEGER NOT NULL,
+    sha256 TEXT NOT NULL,
+    archived_at TEXT NOT NULL,
+    purged_at TEXT,                  -- Zeilen aus audit_logs gelöscht
+    expired_at TEXT                  -- Datei nach Aufbewahrungsfrist gelöscht
+);
@@ -0,0 +1,11 @@
+-- src/database/migrations/0007_audit_query_indexes.sql
+-- Zusammengesetzte Indizes für GET /audit/events. Alle enden auf
+-- timestamp (+ implizit id): Filter + Keyset-Sortierung (timestamp, id)
+-- ohne temporären Sortier-B-Tree. Zeitraum und user_id sind über
+-- Migration 0004 abgedeckt.
+
+-- "Wer hat auf Patient X zugegriffen?" (Auskunft Art. 15 DSGVO)
+CREATE INDEX IF NOT EXISTS idx_audit_logs_resource ON audit_logs(resource_type, resource_id, timestamp);
+
+-- Aktion (exakt oder Präfix, z.B. "LOGIN_")
+CREATE INDEX IF NOT EXISTS idx_audit_logs_action ON audit_logs(action, timestamp);
@@ -0,0 +1,51 @@
+# src/database/migrations/0008_appointment_intervals.py
+# ============================================================
+# Termine als Intervall [date, end_date) in sortierbarer Form
+# ------------------------------------------------------------
+# - date/end_date einheitlich "YYYY-MM-DDTHH:MM:SSZ" (UTC): String-
+#   Vergleich = zeitlicher Vergleich -> Range-Abfragen über
+#   idx_appointments_doctor_date (Migration 0004)
+# - Bisher gespeichert: isoformat() der Eingabe (mit/ohne Offset,
+#   Mikrosekunden) -> wird hier nach UTC umgerechnet
+# - end_date bestehender Termine: date + 30 Minuten
+# - Nicht lesbare Werte bleiben unverändert (end_date NULL) und
+#   zählen bei der Konfliktprüfung nicht
+# ============================================================
+
+from datetime import datetime, timezone
+
+LEGACY_DURATION_MINUTES = 30
+
+# Bereits normalisiert: feste Länge, endet auf Z
+_NORMALIZED = "length(date) = 20 AND date GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]T[0-9][0-9]:[0-9][0-9]:[0-9][0-9]Z'"
+
+
+def _normalize(value: str):
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except (AttributeError, ValueError):
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def upgrade(conn):
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(appointments)")}
+    if "end_date" not in columns:
+        conn.execute("ALTER TABLE appointments ADD COLUMN end_date TEXT")
+
+    rows = conn.execute(f"SELECT id, date FROM appointments WHERE NOT ({_NORMALIZED})").fetchall()
+    updates = [(normalized, row_id) for row_id, date in rows if (normalized := _normalize(date)) is not None]
+    conn.executemany("UPDATE appointments SET date = ? WHERE id = ?", updates)
+
+    conn.execute(
+        f"""
+        UPDATE appointments
+        SET end_date = strftime('%Y-%m-%dT%H:%M:%SZ', date, '+{LEGACY_DURATION_MINUTES} minutes')
+        WHERE end_date IS NULL AND {_NORMALIZED}
+        """
+    )
+
+    # Kalender über alle Ärzte (z.B. Tagesansicht der Pflege)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_appointments_date ON appointments(date)")
@@ -0,0 +1,43 @@
+-- src/database/migrations/0009_appointment_series.sql
+-- Terminserien: Regel einmal speichern statt einer appointments-Zeile
+-- pro Termin. Termine werden beim Lesen nur für das angefragte
+-- Zeitfenster expandiert (utils/appointment_series.py).
+
+CREATE TABLE IF NOT EXISTS appointment_series (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    patient_id INTEGER NOT NULL,
+    doctor_id INTEGER NOT NULL,
+    date TEXT NOT NULL,                 -- Serienbeginn (DTSTART), UTC wie appointments.date
+    duration_minutes INTEGER NOT NULL,
+    frequency TEXT NOT NULL,            -- minutely | hourly | daily | weekly
+    interval INTEGER NOT NULL DEFAULT 1,
+    count INTEGER,                      -- genau eines von count / until
+    until TEXT,
+    by_weekday TEXT,                    -- "MO,TH" oder NULL
+    timezone TEXT,                      -- IANA-Zone oder NULL (= UTC)
+    description TEXT NOT NULL,
+    -- Beginn des ersten / Ende des letzten Termins (inkl. verschobener):
+    -- Range-Filter, ohne die Serie zu expandieren
+    span_start TEXT NOT NULL,
+    span_end TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    FOREIGN KEY(patient_id) REFERENCES patients(id),
+    FOREIGN KEY(doctor_id) REFERENCES users(id)
+);
+
+-- Kalender/Konfliktprüfung: Serien, die nach Fensterbeginn noch laufen
+CREATE INDEX IF NOT EXISTS idx_appointment_series_doctor_span ON appointment_series(doctor_id, span_end);
+CREATE INDEX IF NOT EXISTS idx_appointment_series_patient_span ON appointment_series(patient_id, span_end);
+
+-- Abweichungen einzelner Termine; occurrence = ursprünglicher Beginn
+CREATE TABLE IF NOT EXISTS appointment_series_exceptions (
+    series_id INTEGER NOT NULL,
+    occurrence TEXT NOT NULL,
+    cancelled INTEGER NOT NULL DEFAULT 0,
+    -- Überschreibungen; NULL = wie in der Serie
+    date TEXT,
+    end_date TEXT,
+    description TEXT,
+    PRIMARY KEY (series_id, occurrence),
+    FOREIGN KEY(series_id) REFERENCES appointment_series(id) ON DELETE CASCADE
+) WITHOUT ROWID;
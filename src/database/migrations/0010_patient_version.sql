@@ -0,0 +1,6 @@
+-- src/database/migrations/0010_patient_version.sql
+-- Zeilenversion für Patienten: wird von jedem Update hochgezählt
+-- (version = version + 1 im selben UPDATE). Grundlage für ETags bei
+-- GET /patient/<id> und /fhir/Patient/<id> (If-None-Match -> 304 per
+-- reinem Versions-Lookup) sowie If-Match / meta.versionId bei FHIR.
+ALTER TABLE patients ADD COLUMN version INTEGER NOT NULL DEFAULT 1;
@@ -0,0 +1,111 @@
+# src/database/migrations/0011_series_stats.py
+# ============================================================
+# /stats: Terminserien nachträglich mitzählen
+# ------------------------------------------------------------
+# Serien (Migration 0009) wurden bisher in stats_counters /
+# appointment_days nicht gezählt; seitdem pflegt die API beide in
+# derselben Transaktion (adjust_appointment_stats). Hier einmalig
+# alle bestehenden Serien expandieren und ihre Termine addieren.
+# Python statt SQL: Serien lassen sich nur in Python expandieren
+# (Zeitzonen, Wochentage).
+#
+# Eingefroren: Abfrage, Expansion und Zählung sind Kopien des
+# Stands von utils/appointment_series.py + utils/recurrence.py bei
+# Einführung dieser Migration (kein Import von App-Code, spätere
+# Änderungen dort dürfen diese Migration nicht verändern).
+# ============================================================
+
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+DATE_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+FREQUENCIES = {
+    "minutely": timedelta(minutes=1),
+    "hourly": timedelta(hours=1),
+    "daily": timedelta(days=1),
+    "weekly": timedelta(weeks=1),
+}
+
+WEEKDAYS = ("MO", "TU", "WE", "TH", "FR", "SA", "SU")
+
+SERIES_QUERY = """
+    SELECT id, date, frequency, interval, count, until, by_weekday, timezone
+    FROM appointment_series
+    ORDER BY id
+"""
+
+EXCEPTIONS_QUERY = """
+    SELECT series_id, occurrence, cancelled, date
+    FROM appointment_series_exceptions
+"""
+
+
+def _parse(value: str) -> datetime:
+    return datetime.strptime(value, DATE_FORMAT).replace(tzinfo=timezone.utc)
+
+
+def _starts(date, frequency, interval, count, until, by_weekday, timezone_name):
+    """Alle ursprünglichen Beginnzeiten einer Serie (UTC), aufsteigend."""
+    start = _parse(date)
+    until = _parse(until) if until else None
+
+    # daily/weekly in lokaler Wandzeit rechnen, kürzere Intervalle absolut
+    zone = ZoneInfo(timezone_name) if timezone_name else None
+    local = zone is not None and frequency in ("daily", "weekly")
+
+    first = start.astimezone(zone).replace(tzinfo=None) if local else start
+    step = FREQUENCIES[frequency] * interval
+
+    if by_weekday:
+        offsets = sorted(WEEKDAYS.index(day) for day in set(by_weekday.split(",")))
+        period = first - timedelta(days=first.weekday())   # Montag der ersten Woche
+    else:
+        offsets = (0,)
+        period = first
+
+    index = 0
+    while True:
+        for offset in offsets:
+            current = period + timedelta(days=offset)
+            if current < first:
+                continue
+            if count is not None and index >= count:
+                return
+            value = current.replace(tzinfo=zone).astimezone(timezone.utc) if local else current
+            if until is not None and value > until:
+                return
+            index += 1
+            yield value
+        period += step
+
+
+def upgrade(conn):
+    exceptions = {
+        (series_id, occurrence): (cancelled, date)
+        for series_id, occurrence, cancelled, date in conn.execute(EXCEPTIONS_QUERY)
+    }
+
+    # Tag = UTC-Datum des (ggf. verschobenen) Beginns, wie im Trigger aus 0005
+    per_day = Counter()
+    for series_id, *rule in conn.execute(SERIES_QUERY).fetchall():
+        for begin in _starts(*rule):
+            key = begin.strftime(DATE_FORMAT)
+            cancelled, date = exceptions.get((series_id, key), (0, None))
+            if not cancelled:
+                per_day[(date or key)[:10]] += 1
+
+    if not per_day:
+        return
+    conn.executemany(
+        """
+        INSERT INTO appointment_days (day, count) VALUES (?, ?)
+        ON CONFLICT (day) DO UPDATE SET count = count + excluded.count
+        """,
+        per_day.items()
+    )
+    conn.execute(
+        "UPDATE stats_counters SET value = value + ? WHERE name = 'appointments'",
+        (sum(per_day.values()),)
+    )
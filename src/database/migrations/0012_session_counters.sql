@@ -0,0 +1,28 @@
+-- src/database/migrations/0012_session_counters.sql
+-- Tabellengröße von sessions / token_revocations als Metrik für den
+-- Session-Reaper, ohne COUNT(*) pro Scrape: Zähler in stats_counters
+-- (Migration 0005), per Trigger in derselben Transaktion gepflegt.
+-- Kosten: ein Zeilen-Update pro Login, Logout bzw. gelöschter Session.
+
+-- Einmaliger Backfill
+INSERT OR REPLACE INTO stats_counters (name, value)
+SELECT 'sessions', COUNT(*) FROM sessions
+UNION ALL SELECT 'token_revocations', COUNT(*) FROM token_revocations;
+
+-- sessions
+CREATE TRIGGER IF NOT EXISTS stats_sessions_ai AFTER INSERT ON sessions BEGIN
+    UPDATE stats_counters SET value = value + 1 WHERE name = 'sessions';
+END;
+
+CREATE TRIGGER IF NOT EXISTS stats_sessions_ad AFTER DELETE ON sessions BEGIN
+    UPDATE stats_counters SET value = value - 1 WHERE name = 'sessions';
+END;
+
+-- token_revocations
+CREATE TRIGGER IF NOT EXISTS stats_token_revocations_ai AFTER INSERT ON token_revocations BEGIN
+    UPDATE stats_counters SET value = value + 1 WHERE name = 'token_revocations';
+END;
+
+CREATE TRIGGER IF NOT EXISTS stats_token_revocations_ad AFTER DELETE ON token_revocations BEGIN
+    UPDATE stats_counters SET value = value - 1 WHERE name = 'token_revocations';
+END;
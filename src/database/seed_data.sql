@@ -12,8 +12,8 @@ VALUES
 ('Maria', 'Rossi', '1975-07-09', 'MRN-1002', 'Hypertension'),
 ('Ali', 'Yilmaz', '1990-12-21', 'MRN-1003', 'Asthma');
 
-INSERT INTO appointments (patient_id, doctor_id, date, description)
+INSERT INTO appointments (patient_id, doctor_id, date, end_date, description)
 VALUES
-(1, 2, '2025-12-20T10:00:00Z', 'Routine check'),
-(2, 2, '2025-12-21T14:00:00Z', 'Blood pressure review'),
-(3, 2, '2025-12-22T09:30:00Z', 'Asthma follow-up');
+(1, 2, '2025-12-20T10:00:00Z', '2025-12-20T10:30:00Z', 'Routine check'),
+(2, 2, '2025-12-21T14:00:00Z', '2025-12-21T14:30:00Z', 'Blood pressure review'),
+(3, 2, '2025-12-22T09:30:00Z', '2025-12-22T10:00:00Z', 'Asthma follow-up');
@@ -1,5 +1,8 @@
 // patient.js
 
+// Version des geladenen Datensatzes (optimistische Sperre beim Update)
+let patientVersion = null;
+
 window.onload = async () => {
     const token = localStorage.getItem("token");
     const msg = document.getElementById("message");
@@ -34,6 +37,8 @@ window.onload = async () => {
             return;
         }
 
+        patientVersion = data.version;
+
         // SAFE (kein innerHTML)
         document.getElementById("name").textContent = `${data.first_name} ${data.last_name}`;
         document.getElementById("diagnosis").textContent = data.diagnosis;
@@ -83,7 +88,8 @@ async function updateDiagnosis() {
             },
             body: JSON.stringify({
                 id: PATIENT_ID,
-                diagnosis: diagnosis
+                diagnosis: diagnosis,
+                version: patientVersion
             })
         });
 
@@ -96,12 +102,19 @@ async function updateDiagnosis() {
 
         const data = await res.json();
 
+        // 409 → zwischenzeitlich von jemand anderem geändert
+        if (res.status === 409) {
+            msg.textContent = "Patient was changed in the meantime. Please reload the page.";
+            return;
+        }
+
         if (!res.ok) {
             msg.textContent = data.error || "Update failed.";
             return;
         }
 
         // Erfolgreich
+        patientVersion = data.version;
         document.getElementById("diagnosis").textContent = diagnosis;
         document.getElementById("newDiagnosis").value = "";
         msg.textContent = "Updated successfully!";
@@ -0,0 +1,225 @@
+# src/utils/appointment_series.py
+# ============================================================
+# TERMINSERIEN: einmal gespeichert, beim Lesen expandiert
+# ------------------------------------------------------------
+# - appointment_series (Migration 0009): Regel + Dauer, keine
+#   appointments-Zeile pro Termin
+# - appointment_series_exceptions: einzelne Termine abgesagt oder
+#   verschoben/geändert; Schlüssel = ursprünglicher Beginn
+#   ("occurrence")
+# - Abfragen laden nur Serien, deren span das Fenster schneidet, und
+#   expandieren nur Termine im Fenster (recurrence.occurrences mit
+#   after=) -> Aufwand ~ sichtbares Fenster, nicht ~ Serienlänge
+# - Exporte expandieren alle Serien vollständig (iter_series_occurrences)
+# - /stats: die Trigger aus Migration 0005 sehen nur appointments;
+#   Serientermine zählt adjust_appointment_stats in derselben
+#   Schreib-Transaktion wie die Änderung
+# ============================================================
+
+import json
+from collections import Counter
+from datetime import datetime, timedelta
+from itertools import groupby
+
+from utils.recurrence import occurrences, format_date, parse_date
+
+_SERIES_COLUMNS = """
+    id, patient_id, doctor_id, date, duration_minutes, frequency, interval, count, until,
+    by_weekday, timezone, description, span_start, span_end
+"""
+
+
+def series_starts(series, after: datetime = None):
+    """Lazy: ursprüngliche Beginnzeiten (naive UTC) einer gespeicherten Serie."""
+    return occurrences(
+        parse_date(series["date"]),
+        series["frequency"],
+        series["interval"],
+        series["count"],
+        parse_date(series["until"]) if series["until"] else None,
+        series["by_weekday"].split(",") if series["by_weekday"] else None,
+        series["timezone"],
+        after=after
+    )
+
+
+def is_occurrence(series, start: datetime) -> bool:
+    """Ist start ein (ursprünglicher) Termin der Serie?"""
+    return next(series_starts(series, after=start), None) == start
+
+
+def get_series(conn, series_id: int):
+    return conn.execute(f"SELECT {_SERIES_COLUMNS} FROM appointment_series WHERE id = ?", (series_id,)).fetchone()
+
+
+def get_exception(conn, series_id: int, occurrence: str):
+    return conn.execute(
+        """
+        SELECT series_id, occurrence, cancelled, date, end_date, description
+        FROM appointment_series_exceptions
+        WHERE series_id = ? AND occurrence = ?
+        """,
+        (series_id, occurrence)
+    ).fetchone()
+
+
+def _load_series(conn, start: datetime, end: datetime, doctor_id=None, patient_id=None):
+    where, args = ["span_end > ?", "span_start < ?"], [format_date(start), format_date(end)]
+    if doctor_id is not None:
+        where.append("doctor_id = ?")
+        args.append(doctor_id)
+    if patient_id is not None:
+        where.append("patient_id = ?")
+        args.append(patient_id)
+    return conn.execute(
+        f"SELECT {_SERIES_COLUMNS} FROM appointment_series WHERE " + " AND ".join(where),
+        args
+    ).fetchall()
+
+
+def _load_exceptions(conn, series_rows, start: datetime, end: datetime):
+    """Abweichungen, deren ursprünglicher oder neuer Termin das Fenster berührt."""
+    longest = timedelta(minutes=max(series["duration_minutes"] for series in series_rows))
+    return conn.execute(
+        """
+        SELECT series_id, occurrence, cancelled, date, end_date, description
+        FROM appointment_series_exceptions
+        WHERE series_id IN (SELECT value FROM json_each(?))
+          AND ((occurrence > ? AND occurrence < ?) OR (date < ? AND end_date > ?))
+        """,
+        (
+            json.dumps([series["id"] for series in series_rows]),
+            format_date(start - longest), format_date(end),
+            format_date(end), format_date(start),
+        )
+    ).fetchall()
+
+
+def _occurrence(series, occurrence: str, date: str, end_date: str, description: str) -> dict:
+    return {
+        "series_id": series["id"],
+        "occurrence": occurrence,
+        "patient_id": series["patient_id"],
+        "doctor_id": series["doctor_id"],
+        "date": date,
+        "end_date": end_date,
+        "description": description,
+    }
+
+
+def occurrences_in_window(conn, start: datetime, end: datetime, doctor_id=None, patient_id=None) -> list:
+    """
+    Alle Serientermine, die [start, end) überschneiden, nach Beginn sortiert
+    (abgesagte fehlen, verschobene stehen an ihrem neuen Termin).
+    """
+    series_rows = _load_series(conn, start, end, doctor_id, patient_id)
+    if not series_rows:
+        return []
+
+    exceptions = {(row["series_id"], row["occurrence"]): row for row in _load_exceptions(conn, series_rows, start, end)}
+    by_id = {series["id"]: series for series in series_rows}
+
+    result = []
+    for series in series_rows:
+        duration = timedelta(minutes=series["duration_minutes"])
+        # Beginn > start - Dauer <=> Ende > start (Sekundenraster)
+        for begin in series_starts(series, after=start - duration + timedelta(seconds=1)):
+            if begin >= end:
+                break
+            key = format_date(begin)
+            if (series["id"], key) in exceptions:
+                continue
+            result.append(_occurrence(series, key, key, format_date(begin + duration), series["description"]))
+
+    for (series_id, key), row in exceptions.items():
+        if row["cancelled"] or not (row["date"] < format_date(end) and row["end_date"] > format_date(start)):
+            continue
+        series = by_id[series_id]
+        result.append(_occurrence(series, key, row["date"], row["end_date"], row["description"] or series["description"]))
+
+    result.sort(key=lambda occ: (occ["date"], occ["series_id"], occ["occurrence"]))
+    return result
+
+
+# ============================================================
+# EXPORTE (alle Termine aller Serien)
+# ============================================================
+# Serien + Abweichungen in EINEM Cursor (nach Serie gruppiert), damit
+# ein Export neben iter_rows keine weitere Verbindung braucht
+_SERIES_EXPORT_SELECT = """
+    SELECT
+        s.id, s.patient_id, s.doctor_id, s.date, s.duration_minutes, s.frequency, s.interval, s.count,
+        s.until, s.by_weekday, s.timezone, s.description,
+        e.occurrence AS exc_occurrence, e.cancelled AS exc_cancelled, e.date AS exc_date,
+        e.end_date AS exc_end_date, e.description AS exc_description
+    FROM appointment_series s
+    LEFT JOIN appointment_series_exceptions e ON e.series_id = s.id
+"""
+
+SERIES_EXPORT_QUERY = _SERIES_EXPORT_SELECT + """
+    ORDER BY s.id, e.occurrence
+"""
+
+# Für iter_keyset: Blöcke aus ganzen Serien (LIMIT zählt Serien, nicht Ausnahmen)
+SERIES_EXPORT_KEYSET_QUERY = _SERIES_EXPORT_SELECT + """
+    WHERE s.id IN (SELECT id FROM appointment_series WHERE id > ? ORDER BY id LIMIT ?)
+    ORDER BY s.id, e.occurrence
+"""
+
+
+def iter_series_occurrences(rows):
+    """
+    Alle Serientermine (abgesagte fehlen, verschobene stehen an ihrem
+    neuen Termin), Serie für Serie. rows: Ergebnis von SERIES_EXPORT_QUERY.
+    """
+    for _series_id, group in groupby(rows, key=lambda row: row["id"]):
+        group = list(group)
+        series = group[0]
+        exceptions = {row["exc_occurrence"]: row for row in group if row["exc_occurrence"] is not None}
+        duration = timedelta(minutes=series["duration_minutes"])
+
+        for begin in series_starts(series):
+            key = format_date(begin)
+            exception = exceptions.get(key)
+            if exception is None:
+                yield _occurrence(series, key, key, format_date(begin + duration), series["description"])
+            elif not exception["exc_cancelled"]:
+                yield _occurrence(series, key, exception["exc_date"], exception["exc_end_date"],
+                                  exception["exc_description"] or series["description"])
+
+
+# ============================================================
+# STATISTIK (stats_counters / appointment_days, Migration 0005)
+# ============================================================
+def adjust_appointment_stats(conn, dates, delta: int):
+    """
+    Zählt Serientermine in /stats mit (delta +1: angelegt, -1: entfernt).
+    dates: Beginn je Termin ("YYYY-MM-DDTHH:MM:SSZ"); Tag = UTC wie im Trigger.
+    """
+    per_day = Counter(date[:10] for date in dates)
+    if not per_day:
+        return
+    conn.executemany(
+        """
+        INSERT INTO appointment_days (day, count) VALUES (?, ?)
+        ON CONFLICT (day) DO UPDATE SET count = count + excluded.count
+        """,
+        ((day, delta * n) for day, n in per_day.items())
+    )
+    conn.execute(
+        "UPDATE stats_counters SET value = value + ? WHERE name = 'appointments'",
+        (delta * sum(per_day.values()),)
+    )
+
+
+def find_series_conflict(conn, doctor_id: int, start: datetime, end: datetime, ignore=None):
+    """
+    Erster Serientermin des Arztes, der [start, end) überschneidet, sonst None.
+    ignore: (series_id, occurrence) des Termins, der gerade verschoben wird.
+    """
+    for occ in occurrences_in_window(conn, start, end, doctor_id=doctor_id):
+        if ignore is not None and (occ["series_id"], occ["occurrence"]) == ignore:
+            continue
+        # Wie bei Einzelterminen nur Zeitangaben + Schlüssel, keine Inhalte
+        return {key: occ[key] for key in ("series_id", "occurrence", "date", "end_date")}
+    return None
@@ -0,0 +1,286 @@
+# src/utils/audit_archive.py
+# ============================================================
+# AUDIT-ARCHIV: Monatspartitionen -> gzip-NDJSON + Prüfsumme
+# ------------------------------------------------------------
+# - Partition = Kalendermonat (UTC) von audit_logs.timestamp
+# - Abgeschlossene Monate älter als AUDIT_HOT_MONTHS werden
+#   gestreamt in <AUDIT_ARCHIVE_DIR>/<YYYY>/audit-<YYYY-MM>.ndjson.gz
+#   geschrieben (SHA-256 zusätzlich als .sha256 neben der Datei),
+#   in audit_archive_index eingetragen und danach in Batches aus
+#   der DB gelöscht -> die Hot-DB bleibt klein (Backup, VACUUM)
+# - Reihenfolge ist absturzsicher: Datei (tmp + rename) -> Index ->
+#   Löschen. Ein erneuter Lauf setzt an der richtigen Stelle fort.
+# - Aufbewahrung: AUDIT_ARCHIVE_RETENTION_MONTHS (0 = unbegrenzt)
+# - Aufruf: python src/database/__init__.py archive-audit-logs
+# ============================================================
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime
+from pathlib import Path
+
+from config import Config
+from database.db import fetch_one, fetch_all, execute, iter_rows, write_transaction
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = ("id", "timestamp", "user_id", "action", "resource_type", "resource_id", "success")
+
+
+class AuditArchiveError(Exception):
+    pass
+
+
+# ============================================================
+# MONATE
+# ============================================================
+def _shift_month(year: int, month: int, delta: int):
+    index = year * 12 + (month - 1) + delta
+    return index // 12, index % 12 + 1
+
+
+def month_bounds(month: str):
+    """"2025-03" -> ("2025-03-01T00:00:00", "2025-04-01T00:00:00") für timestamp >= / <."""
+    year, mon = (int(part) for part in month.split("-"))
+    next_year, next_mon = _shift_month(year, mon, 1)
+    return f"{year:04d}-{mon:02d}-01T00:00:00", f"{next_year:04d}-{next_mon:02d}-01T00:00:00"
+
+
+def archive_cutoff(hot_months: int, now: datetime = None) -> str:
+    """Erster Monat, der in der DB bleibt (laufender Monat minus hot_months)."""
+    now = now or datetime.utcnow()
+    year, mon = _shift_month(now.year, now.month, -max(0, hot_months))
+    return f"{year:04d}-{mon:02d}"
+
+
+def _next_month_to_archive(cutoff: str):
+    # MIN(timestamp) über idx_audit_logs_timestamp: kein Scan
+    row = fetch_one("SELECT MIN(timestamp) AS ts FROM audit_logs WHERE timestamp < ?", (month_bounds(cutoff)[0],))
+    return row["ts"][:7] if row and row["ts"] else None
+
+
+# ============================================================
+# ARCHIVIEREN
+# ============================================================
+class _HashingWriter:
+    """Dateiobjekt-Hülle: SHA-256 und Größe der komprimierten Bytes beim Schreiben."""
+
+    def __init__(self, fh):
+        self._fh = fh
+        self.sha256 = hashlib.sha256()
+        self.bytes = 0
+
+    def write(self, data):
+        self.sha256.update(data)
+        self.bytes += len(data)
+        return self._fh.write(data)
+
+    def flush(self):
+        self._fh.flush()
+
+
+def archive_path(archive_dir, month: str) -> Path:
+    return Path(archive_dir) / month[:4] / f"audit-{month}.ndjson.gz"
+
+
+def _write_month(archive_dir, month: str, fetch_size: int) -> dict:
+    start, end = month_bounds(month)
+    path = archive_path(archive_dir, month)
+    path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+
+    info = {"rows": 0, "first_id": None, "last_id": None, "first_timestamp": None, "last_timestamp": None}
+    rows = iter_rows(
+        """
+        SELECT id, timestamp, user_id, action, resource_type, resource_id, success
+        FROM audit_logs
+        WHERE timestamp >= ? AND timestamp < ?
+        ORDER BY timestamp, id
+        """,
+        (start, end),
+        chunk_size=fetch_size
+    )
+
+    encode = json.JSONEncoder(separators=(",", ":")).encode
+    with open(tmp, "wb") as raw:
+        writer = _HashingWriter(raw)
+        # mtime fest -> gleiche Zeilen ergeben dieselbe Datei (reproduzierbare Prüfsumme);
+        # Stufe 6 statt 9: kaum größer, deutlich schneller
+        with gzip.GzipFile(filename="", mode="wb", fileobj=writer, compresslevel=6, mtime=0) as gz:
+            lines = []
+            for row in rows:
+                lines.append(encode(dict(zip(COLUMNS, row))))
+                if info["rows"] == 0:
+                    info["first_timestamp"] = row[1]
+                    info["first_id"] = info["last_id"] = row[0]
+                info["rows"] += 1
+                info["first_id"] = min(info["first_id"], row[0])
+                info["last_id"] = max(info["last_id"], row[0])
+                info["last_timestamp"] = row[1]
+                # Ein gz.write pro Block statt pro Zeile
+                if len(lines) >= fetch_size:
+                    gz.write(("\n".join(lines) + "\n").encode("utf-8"))
+                    lines = []
+            if lines:
+                gz.write(("\n".join(lines) + "\n").encode("utf-8"))
+        raw.flush()
+        os.fsync(raw.fileno())
+
+    os.replace(tmp, path)
+    info["sha256"] = writer.sha256.hexdigest()
+    info["bytes"] = writer.bytes
+    path.with_name(path.name + ".sha256").write_text(f"{info['sha256']}  {path.name}\n", encoding="utf-8")
+    return info
+
+
+def _file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _purge_month(entry, batch_size: int) -> int:
+    start, end = month_bounds(entry["month"])
+
+    # Nur löschen, was nachweislich im Archiv steht
+    remaining = fetch_one(
+        "SELECT COUNT(*) AS n FROM audit_logs WHERE timestamp >= ? AND timestamp < ?", (start, end)
+    )["n"]
+    if remaining != entry["rows"]:
+        raise AuditArchiveError(
+            f"{entry['month']}: {remaining} rows in audit_logs, {entry['rows']} in archive - not purging"
+        )
+
+    deleted = 0
+    while True:
+        with write_transaction() as conn:
+            n = conn.execute(
+                """
+                DELETE FROM audit_logs WHERE id IN (
+                    SELECT id FROM audit_logs WHERE timestamp >= ? AND timestamp < ? LIMIT ?
+                )
+                """,
+                (start, end, batch_size)
+            ).rowcount
+        deleted += n
+        if n < batch_size:
+            break
+
+    execute(
+        "UPDATE audit_archive_index SET purged_at = ? WHERE month = ?",
+        (datetime.utcnow().isoformat(), entry["month"])
+    )
+    return deleted
+
+
+def archive_month(month: str, archive_dir, batch_size: int, fetch_size: int = 1000) -> dict:
+    archive_dir = Path(archive_dir)
+    entry = fetch_one("SELECT * FROM audit_archive_index WHERE month = ?", (month,))
+
+    if entry is None:
+        info = _write_month(archive_dir, month, fetch_size)
+        execute(
+            """
+            INSERT INTO audit_archive_index
+                (month, path, rows, first_id, last_id, first_timestamp, last_timestamp, bytes, sha256, archived_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (month, str(archive_path(archive_dir, month).relative_to(archive_dir)), info["rows"],
+             info["first_id"], info["last_id"], info["first_timestamp"], info["last_timestamp"],
+             info["bytes"], info["sha256"], datetime.utcnow().isoformat())
+        )
+        entry = fetch_one("SELECT * FROM audit_archive_index WHERE month = ?", (month,))
+        logger.info("Archived audit month %s (%d rows)", month, info["rows"])
+    elif entry["purged_at"]:
+        raise AuditArchiveError(f"{month}: already archived and purged, but audit_logs has rows for it")
+    elif _file_sha256(archive_dir / entry["path"]) != entry["sha256"]:
+        # Abbruch nach dem Indexeintrag: Datei muss unverändert sein, bevor gelöscht wird
+        raise AuditArchiveError(f"{month}: archive file does not match its checksum")
+
+    purged = _purge_month(entry, batch_size)
+    return {"month": month, "rows": entry["rows"], "purged": purged, "bytes": entry["bytes"]}
+
+
+def apply_retention(archive_dir, retention_months: int, now: datetime = None) -> list:
+    """Löscht Archivdateien älter als retention_months; der Indexeintrag bleibt (expired_at)."""
+    if retention_months <= 0:
+        return []
+
+    cutoff = archive_cutoff(retention_months, now)
+    expired = []
+    for entry in fetch_all(
+        "SELECT month, path FROM audit_archive_index WHERE month < ? AND expired_at IS NULL", (cutoff,)
+    ):
+        path = Path(archive_dir) / entry["path"]
+        for file in (path, path.with_name(path.name + ".sha256")):
+            if file.exists():
+                file.unlink()
+        execute(
+            "UPDATE audit_archive_index SET expired_at = ? WHERE month = ?",
+            (datetime.utcnow().isoformat(), entry["month"])
+        )
+        expired.append(entry["month"])
+    return expired
+
+
+def run_archiver(source=Config, now: datetime = None) -> dict:
+    get = source.get if isinstance(source, dict) else lambda key, default=None: getattr(source, key, default)
+    archive_dir = Path(get("AUDIT_ARCHIVE_DIR", Config.AUDIT_ARCHIVE_DIR))
+    batch_size = max(1, int(get("AUDIT_ARCHIVE_BATCH_SIZE", Config.AUDIT_ARCHIVE_BATCH_SIZE)))
+    cutoff = archive_cutoff(int(get("AUDIT_HOT_MONTHS", Config.AUDIT_HOT_MONTHS)), now)
+
+    archived = []
+    while True:
+        month = _next_month_to_archive(cutoff)
+        if month is None:
+            break
+        archived.append(archive_month(month, archive_dir, batch_size))
+
+    expired = apply_retention(
+        archive_dir, int(get("AUDIT_ARCHIVE_RETENTION_MONTHS", Config.AUDIT_ARCHIVE_RETENTION_MONTHS)), now
+    )
+    return {"cutoff": cutoff, "archived": archived, "expired": expired}
+
+
+# ============================================================
+# PRÜFEN / NACHSCHLAGEN
+# ============================================================
+def verify_archives(archive_dir) -> list:
+    """[(month, problem)] für fehlende oder veränderte Archivdateien."""
+    problems = []
+    for entry in fetch_all("SELECT month, path, sha256 FROM audit_archive_index WHERE expired_at IS NULL ORDER BY month"):
+        path = Path(archive_dir) / entry["path"]
+        if not path.exists():
+            problems.append((entry["month"], "missing"))
+        elif _file_sha256(path) != entry["sha256"]:
+            problems.append((entry["month"], "checksum mismatch"))
+    return problems
+
+
+def iter_archived_events(archive_dir, start: str, end: str, user_id: int = None):
+    """
+    Einträge mit start <= timestamp < end aus den Archivdateien (chronologisch).
+    Über den Index werden nur die betroffenen Monate geöffnet.
+    """
+    entries = fetch_all(
+        """
+        SELECT month, path, sha256 FROM audit_archive_index
+        WHERE expired_at IS NULL AND last_timestamp >= ? AND first_timestamp < ?
+        ORDER BY month
+        """,
+        (start, end)
+    )
+    for entry in entries:
+        with gzip.open(Path(archive_dir) / entry["path"], "rt", encoding="utf-8") as f:
+            for line in f:
+                event = json.loads(line)
+                if event["timestamp"] < start or event["timestamp"] >= end:
+                    continue
+                if user_id is not None and event["user_id"] != user_id:
+                    continue
+                yield event
@@ -5,15 +5,31 @@
 
 from flask import g, request
 from utils.session_services import get_user_by_token, remove_session
+from utils.session_cache import init_session_cache, get_session_cache
+from utils.session_tokens import init_session_tokens, verify_token
 from datetime import datetime
+from config import Config
 
 
 def load_current_user(app):
     """
     Registriert eine before_request-Funktion,
     die den eingeloggten Benutzer anhand des Bearer-Tokens lädt.
+    Gültige Sessions werden im Session-Cache gehalten (LRU + TTL).
+    Im SESSION_MODE "stateless" wird das signierte Token ohne DB-Zugriff geprüft.
     """
 
+    mode = app.config.get("SESSION_MODE", "stateful")
+    if mode not in ("stateful", "stateless"):
+        raise ValueError(f"Invalid SESSION_MODE: {mode}")
+    # Zufälliger Fallback-Key ist pro Worker verschieden: ein Token aus einem
+    # Worker würde in allen anderen als ungültig abgewiesen
+    if mode == "stateless" and app.config["SECRET_KEY"] == Config.GENERATED_SECRET_KEY:
+        raise RuntimeError("SESSION_MODE=stateless requires SECRET_KEY to be set in the environment")
+
+    init_session_cache(app)
+    init_session_tokens(app)
+
     @app.before_request
     def _load_user():
         g.current_user = None
@@ -33,12 +49,30 @@ def load_current_user(app):
         if not token:
             return
 
-        # 3. Session + User aus DB laden
+        # 3a. Stateless: Signatur, Ablauf und Widerrufsliste prüfen (kein DB-Zugriff)
+        if mode == "stateless":
+            claims = verify_token(token)
+            if claims is not None:
+                g.current_user = {
+                    "id": claims["uid"],
+                    "username": claims["usr"],
+                    "role": claims["role"]
+                }
+            return
+
+        # 3b. Session-Cache (kein DB-Zugriff, Ablaufzeit bereits geparst)
+        cache = get_session_cache()
+        cached_user = cache.get(token)
+        if cached_user is not None:
+            g.current_user = cached_user
+            return
+
+        # 4. Session + User aus DB laden
         row = get_user_by_token(token)
         if row is None:
             return
 
-        # 4. Ablaufzeit prüfen
+        # 5. Ablaufzeit prüfen
         try:
             expires_at = datetime.fromisoformat(row["expires_at"])
         except Exception:
@@ -48,9 +82,10 @@ def load_current_user(app):
             remove_session(token)
             return
 
-        # 5. Benutzer im Flask-Kontext speichern
+        # 6. Benutzer im Flask-Kontext speichern
         g.current_user = {
             "id": row["id"],
             "username": row["username"],
             "role": row["role"]
         }
+        cache.put(token, g.current_user, expires_at)
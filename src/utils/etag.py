@@ -0,0 +1,45 @@
+# src/utils/etag.py
+# ============================================================
+# ETAGS / BEDINGTE REQUESTS (RFC 9110, FHIR versionId)
+# ------------------------------------------------------------
+# - Schwache ETags aus der Zeilenversion (patients.version) plus
+#   Darstellungsvariante (z.B. Rolle: Arzt sieht die Diagnose)
+# - If-None-Match wird VOR dem Laden der Zeile geprüft: ein
+#   Versions-Lookup genügt für 304, ohne Serialisierung
+# - Caching: "private, no-cache" (set_security_headers in app.py):
+#   nur der Client speichert und muss immer revalidieren, geteilte
+#   Caches/Proxies nie; Vary: Authorization
+# ============================================================
+
+from flask import Response, request
+
+
+def etag_value(version, variant: str = None) -> str:
+    """Opaker ETag-Wert (ohne W/ und Anführungszeichen)."""
+    return f"{version}-{variant}" if variant else str(version)
+
+
+def with_etag(response: Response, value: str) -> Response:
+    response.set_etag(value, weak=True)
+    response.vary.add("Authorization")
+    return response
+
+
+def is_not_modified(value: str) -> bool:
+    """If-None-Match trifft (schwacher Vergleich, "*" inklusive)."""
+    return bool(request.if_none_match) and request.if_none_match.contains_weak(value)
+
+
+def not_modified(value: str) -> Response:
+    return with_etag(Response(status=304), value)
+
+
+def if_match_values() -> set:
+    """
+    Werte aus If-Match (W/"3" und "3" gleichbehandelt, wie bei FHIR üblich).
+    Leere Menge, wenn der Header fehlt; {"*"} für If-Match: *.
+    """
+    header = request.if_match
+    if header.star_tag:
+        return {"*"}
+    return set(header.as_set(include_weak=True))
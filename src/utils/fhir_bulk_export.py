@@ -0,0 +1,294 @@
+# src/utils/fhir_bulk_export.py
+# ============================================================
+# FHIR BULK DATA ($export) – JOB RUNNER
+# ------------------------------------------------------------
+# - Job-Status in der Tabelle bulk_export_jobs (für alle Worker sichtbar)
+# - Ausführung in einem begrenzten Thread-Pool pro Prozess
+#   (FHIR_EXPORT_MAX_CONCURRENCY), damit große Exporte den
+#   interaktiven Traffic nicht verdrängen
+# - Lesen in kurzen Keyset-Blöcken (db.iter_keyset): kein Read-Snapshot
+#   über den ganzen Job, WAL-Checkpoints laufen weiter
+# - Ausgabe: NDJSON-Dateien pro Ressourcentyp, in Teile gesplittet
+# - Jobs eines neu gestarteten/abgestürzten Workers bleiben sonst
+#   ewig "queued"/"in-progress": nach FHIR_EXPORT_MAX_RUNTIME_MINUTES
+#   werden sie "failed" (Status -> OperationOutcome statt ewig 202)
+# ============================================================
+
+import json
+import logging
+import secrets
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from database.db import fetch_one, fetch_all, execute
+from utils.serialization import fast_dumps
+
+logger = logging.getLogger(__name__)
+
+
+class ExportQueueFull(Exception):
+    """Zu viele wartende/laufende Export-Jobs (FHIR_EXPORT_MAX_PENDING)."""
+
+
+_executor = None
+_executor_size = None
+_lock = threading.Lock()
+_pending = 0
+_cancel_events = {}
+
+
+def _get_executor(max_workers: int) -> ThreadPoolExecutor:
+    """
+    Export-Pool in der aktuell konfigurierten Größe. Ändert sich
+    FHIR_EXPORT_MAX_CONCURRENCY (z.B. andere App-Konfiguration), wird ein
+    neuer Pool angelegt; der alte arbeitet seine Jobs noch ab.
+    Aufrufer hält _lock.
+    """
+    global _executor, _executor_size
+    max_workers = max(1, max_workers)
+    if _executor is None or _executor_size != max_workers:
+        if _executor is not None:
+            _executor.shutdown(wait=False)
+        _executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="fhir-export")
+        _executor_size = max_workers
+    return _executor
+
+
+def start_export_job(user_id: int, request_url: str, resources: dict, config) -> str:
+    """
+    Legt einen Job an und reiht ihn in den Export-Pool ein.
+
+    :param resources: {"Patient": (rows, mapper), ...} – rows(fetch_size): Iterable der Zeilen
+                      (z.B. iter_keyset), mapper: Zeile -> FHIR-Resource (dict)
+    :raises ExportQueueFull: wenn FHIR_EXPORT_MAX_PENDING erreicht ist
+    """
+    global _pending
+
+    fail_stale_jobs(config["FHIR_EXPORT_MAX_RUNTIME_MINUTES"])
+    purge_expired_jobs(config["FHIR_EXPORT_DIR"], config["FHIR_EXPORT_RETENTION_HOURS"])
+
+    with _lock:
+        if _pending >= config["FHIR_EXPORT_MAX_PENDING"]:
+            raise ExportQueueFull()
+        _pending += 1
+
+    job_id = secrets.token_urlsafe(16)
+    cancel = threading.Event()
+
+    try:
+        execute(
+            """
+            INSERT INTO bulk_export_jobs (id, user_id, status, resource_types, request_url, created_at)
+            VALUES (?, ?, 'queued', ?, ?, ?)
+            """,
+            (job_id, user_id, ",".join(resources), request_url, datetime.utcnow().isoformat())
+        )
+
+        with _lock:
+            _cancel_events[job_id] = cancel
+            executor = _get_executor(config["FHIR_EXPORT_MAX_CONCURRENCY"])
+
+        executor.submit(
+            _run_job,
+            job_id,
+            resources,
+            Path(config["FHIR_EXPORT_DIR"]),
+            config["FHIR_EXPORT_FILE_MAX_RESOURCES"],
+            config["EXPORT_FETCH_SIZE"],
+            cancel,
+        )
+    except Exception:
+        with _lock:
+            _pending -= 1
+            _cancel_events.pop(job_id, None)
+        raise
+
+    return job_id
+
+
+def get_job(job_id: str):
+    return fetch_one(
+        """
+        SELECT id, user_id, status, resource_types, request_url, progress, output, created_at, completed_at
+        FROM bulk_export_jobs
+        WHERE id = ?
+        """,
+        (job_id,)
+    )
+
+
+def job_outputs(job) -> list:
+    return json.loads(job["output"]) if job["output"] else []
+
+
+def job_directory(export_dir, job_id: str) -> Path:
+    return Path(export_dir) / job_id
+
+
+def delete_job(export_dir, job_id: str):
+    """Bricht einen laufenden Job ab (auch in anderen Workern) und löscht Dateien + Status."""
+    with _lock:
+        cancel = _cancel_events.get(job_id)
+    if cancel is not None:
+        cancel.set()
+
+    execute("DELETE FROM bulk_export_jobs WHERE id = ?", (job_id,))
+    shutil.rmtree(job_directory(export_dir, job_id), ignore_errors=True)
+
+
+def is_stale(job, max_runtime_minutes: int) -> bool:
+    """Läuft der Job (laut DB) länger als erlaubt? Dann ist sein Worker weg."""
+    cutoff = (datetime.utcnow() - timedelta(minutes=max_runtime_minutes)).isoformat()
+    return job["status"] in ("queued", "in-progress") and job["created_at"] < cutoff
+
+
+def fail_stale_jobs(max_runtime_minutes: int) -> int:
+    """
+    Markiert verwaiste Jobs als "failed" (prozessübergreifend über die DB).
+    Ein noch laufender Export-Thread bemerkt das beim nächsten Teil und bricht ab.
+    """
+    now = datetime.utcnow()
+    return execute(
+        """
+        UPDATE bulk_export_jobs
+        SET status = 'failed', progress = NULL, completed_at = ?
+        WHERE status IN ('queued', 'in-progress') AND created_at < ?
+        """,
+        (now.isoformat(), (now - timedelta(minutes=max_runtime_minutes)).isoformat())
+    )
+
+
+def purge_expired_jobs(export_dir, retention_hours: int):
+    cutoff = (datetime.utcnow() - timedelta(hours=retention_hours)).isoformat()
+    expired = fetch_all(
+        """
+        SELECT id FROM bulk_export_jobs
+        WHERE created_at < ? AND status NOT IN ('queued', 'in-progress')
+        """,
+        (cutoff,)
+    )
+    for job in expired:
+        delete_job(export_dir, job["id"])
+
+
+# ============================================================
+# AUSFÜHRUNG (Export-Thread)
+# ============================================================
+def _job_active(job_id: str) -> bool:
+    """Job noch vorhanden und nicht (z.B. als verwaist) beendet?"""
+    return fetch_one(
+        "SELECT 1 FROM bulk_export_jobs WHERE id = ? AND status = 'in-progress'", (job_id,)
+    ) is not None
+
+
+def _run_job(job_id, resources, export_dir, file_max_resources, fetch_size, cancel):
+    global _pending
+
+    job_dir = job_directory(export_dir, job_id)
+    outputs = []
+
+    try:
+        if not execute(
+            "UPDATE bulk_export_jobs SET status = 'in-progress', progress = ? WHERE id = ? AND status = 'queued'",
+            ("started", job_id)
+        ):
+            raise _Cancelled()
+        job_dir.mkdir(mode=0o700, parents=True, exist_ok=True)
+
+        for resource_type, (rows, mapper) in resources.items():
+            part = 0
+            handle = None
+            count = 0
+
+            try:
+                for row in rows(fetch_size):
+                    if handle is None or count >= file_max_resources:
+                        if handle is not None:
+                            handle.close()
+                            outputs.append({"type": resource_type, "file": handle.name_only, "count": count})
+                        part += 1
+                        count = 0
+                        handle = _open_part(job_dir, resource_type, part)
+
+                        # Abbruch prüfen (lokal per Event, prozessübergreifend per DB)
+                        if cancel.is_set() or not _job_active(job_id):
+                            raise _Cancelled()
+                        execute(
+                            "UPDATE bulk_export_jobs SET progress = ? WHERE id = ?",
+                            (f"{resource_type}: part {part}", job_id)
+                        )
+
+                    if cancel.is_set():
+                        raise _Cancelled()
+
+                    handle.write(fast_dumps(mapper(row)))
+                    handle.write("\n")
+                    count += 1
+            finally:
+                if handle is not None and not handle.closed:
+                    handle.close()
+
+            if handle is not None:
+                outputs.append({"type": resource_type, "file": handle.name_only, "count": count})
+
+        # Nicht über einen inzwischen als verwaist markierten Job schreiben
+        if not execute(
+            """
+            UPDATE bulk_export_jobs
+            SET status = 'completed', progress = NULL, output = ?, completed_at = ?
+            WHERE id = ? AND status = 'in-progress'
+            """,
+            (json.dumps(outputs), datetime.utcnow().isoformat(), job_id)
+        ):
+            raise _Cancelled()
+
+    except _Cancelled:
+        shutil.rmtree(job_dir, ignore_errors=True)
+
+    except Exception:
+        logger.exception("FHIR bulk export job %s failed", job_id)
+        shutil.rmtree(job_dir, ignore_errors=True)
+        try:
+            execute(
+                """
+                UPDATE bulk_export_jobs SET status = 'failed', progress = NULL, completed_at = ?
+                WHERE id = ? AND status IN ('queued', 'in-progress')
+                """,
+                (datetime.utcnow().isoformat(), job_id)
+            )
+        except Exception:
+            logger.exception("Could not mark FHIR bulk export job %s as failed", job_id)
+
+    finally:
+        with _lock:
+            _pending -= 1
+            _cancel_events.pop(job_id, None)
+
+
+class _Cancelled(Exception):
+    pass
+
+
+class _PartFile:
+    """Schreib-Handle einer NDJSON-Teildatei (merkt sich den Dateinamen)."""
+
+    def __init__(self, path: Path):
+        self.name_only = path.name
+        self._fh = open(path, "w", encoding="utf-8")
+
+    @property
+    def closed(self):
+        return self._fh.closed
+
+    def write(self, data):
+        self._fh.write(data)
+
+    def close(self):
+        self._fh.close()
+
+
+def _open_part(job_dir: Path, resource_type: str, part: int) -> _PartFile:
+    return _PartFile(job_dir / f"{resource_type}_{part}.ndjson")
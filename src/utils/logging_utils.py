@@ -1,6 +1,23 @@
-# src/utils/logging_utils.py
+import atexit
+import logging
+import os
+import queue
+import signal
+import sqlite3
+import threading
+import time
 from datetime import datetime
-from database.db import execute
+
+from config import Config
+from database.db import execute, write_transaction
+from utils.metrics import record_timing, registry
+
+logger = logging.getLogger(__name__)
+
+_INSERT_AUDIT = """
+    INSERT INTO audit_logs (timestamp, user_id, action, resource_type, resource_id, success)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
 
 
 def audit_log(user_id, action: str, resource_type: str = None, resource_id: int = None, success: bool = True):
@@ -18,21 +35,324 @@ def audit_log(user_id, action: str, resource_type: str = None, resource_id: int
 
     Damit wird das Prinzip der Datenminimierung (Art. 5 DSGVO) eingehalten
     und gleichzeitig die Nachvollziehbarkeit (BSI TR-03161) unterstützt.
+
+    Je nach AUDIT_LOG_MODE wird sofort (sync) oder gebündelt (batched) geschrieben.
     """
 
+    started = time.perf_counter()
     timestamp = datetime.utcnow().isoformat()
 
-    execute(
+    row = (
+        timestamp,
+        user_id,
+        action,
+        resource_type,
+        resource_id,
+        1 if success else 0
+    )
+
+    if _writer.mode == "sync":
+        execute(_INSERT_AUDIT, row)
+    else:
+        _writer.submit(row)
+
+    record_timing("audit", time.perf_counter() - started, "audit_log_duration_seconds", (("mode", _writer.mode),))
+
+
+def audit_log_many(entries):
+    """
+    Mehrere Audit-Einträge auf einmal (z.B. FHIR batch: ein Eintrag pro Ressource).
+
+    :param entries: Iterable von (user_id, action, resource_type, resource_id, success)
+    """
+
+    started = time.perf_counter()
+    timestamp = datetime.utcnow().isoformat()
+
+    rows = [
+        (timestamp, user_id, action, resource_type, resource_id, 1 if success else 0)
+        for user_id, action, resource_type, resource_id, success in entries
+    ]
+    if not rows:
+        return
+
+    if _writer.mode == "sync":
+        with write_transaction() as conn:
+            conn.executemany(_INSERT_AUDIT, rows)
+    else:
+        for row in rows:
+            _writer.submit(row)
+
+    record_timing("audit", time.perf_counter() - started, "audit_log_duration_seconds", (("mode", _writer.mode),))
+
+
+# ============================================================
+# GEBÜNDELTER AUDIT-WRITER
+# ------------------------------------------------------------
+# - begrenzte Queue im Prozess
+# - Hintergrund-Thread schreibt per executemany in EINER Transaktion
+# - Flush bei Batch-Größe, Zeitintervall und Shutdown (atexit/SIGTERM)
+# ============================================================
+class _FlushRequest:
+    def __init__(self):
+        self.done = threading.Event()
+
+
+_STOP = object()
+
+
+class AuditWriter:
+
+    def __init__(self, mode: str, queue_size: int, batch_size: int,
+                 flush_interval: float, enqueue_timeout: float):
+        if mode not in ("sync", "batched"):
+            raise ValueError(f"Invalid AUDIT_LOG_MODE: {mode}")
+
+        self.mode = mode
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.enqueue_timeout = enqueue_timeout
+
+        self._queue = queue.Queue(maxsize=max(1, queue_size))
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self._stopped_pid = None    # stop() lief in diesem Prozess -> synchron schreiben
+
+        self._counters = {
+            "enqueued": 0,
+            "written": 0,
+            "batches": 0,
+            "blocked": 0,    # Back-Pressure: Queue war voll, Aufrufer musste warten
+            "dropped": 0,    # Queue blieb voll -> Eintrag verworfen
+            "failed": 0,     # DB-Fehler beim Schreiben eines Batches
+            "sync_fallback": 0,  # Writer gestoppt -> direkt geschrieben statt eingereiht
+        }
+
+    # ------------------------------------------------------------
+    # Producer-Seite (Request-Threads)
+    # ------------------------------------------------------------
+    def submit(self, row):
+        if not self._ensure_started():
+            # Nach stop() (atexit/SIGTERM) liest niemand mehr die Queue
+            self._write_sync(row)
+            return
+
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            self._count("blocked")
+            try:
+                self._queue.put(row, timeout=self.enqueue_timeout)
+            except queue.Full:
+                self._count("dropped")
+                logger.error("Audit queue full - audit event dropped (action=%s)", row[2])
+                return
+
+        self._count("enqueued")
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wartet, bis alle bisher eingereihten Einträge geschrieben sind."""
+        if self._thread is None or not self._thread.is_alive():
+            return True
+
+        request = _FlushRequest()
+        try:
+            # Volle Queue darf keinen Request-Worker unbegrenzt blockieren
+            self._queue.put(request, timeout=timeout)
+        except queue.Full:
+            return False
+        return request.done.wait(timeout)
+
+    def stop(self, timeout: float = 5.0):
+        """Schreibt ausstehende Einträge und beendet den Hintergrund-Thread."""
+        with self._lock:
+            self._stopped_pid = os.getpid()
+
+        thread = self._thread
+        if thread is None or not thread.is_alive() or self._pid != os.getpid():
+            return
+
+        self._queue.put(_STOP)
+        thread.join(timeout)
+        if not thread.is_alive():
+            # Einträge, die zwischen Prüfung und put() nach _STOP eingereiht wurden
+            self._drain()
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._counters)
+        stats["queue_depth"] = self._queue.qsize()
+        stats["mode"] = self.mode
+        return stats
+
+    # ------------------------------------------------------------
+    # Consumer-Seite (Hintergrund-Thread)
+    # ------------------------------------------------------------
+    def _ensure_started(self) -> bool:
         """
-        INSERT INTO audit_logs (timestamp, user_id, action, resource_type, resource_id, success)
-        VALUES (?, ?, ?, ?, ?, ?)
-        """,
-        (
-            timestamp,
-            user_id,
-            action,
-            resource_type,
-            resource_id,
-            1 if success else 0
-        )
+        True, wenn ein lebender Writer-Thread die Queue liest (wird bei
+        Bedarf gestartet); False nach stop() in diesem Prozess.
+        """
+        pid = os.getpid()
+        # Schneller Pfad ohne Lock (wird pro Audit-Eintrag aufgerufen)
+        if self._pid == pid and self._thread is not None and self._thread.is_alive():
+            return True
+
+        with self._lock:
+            if self._stopped_pid == pid:
+                return False
+            # Nach fork() (z.B. gunicorn --preload) existiert der Thread im Kind
+            # nicht mehr; ein abgestürzter Thread wird neu gestartet
+            if self._thread is not None and self._thread.is_alive() and self._pid == pid:
+                return True
+            self._pid = pid
+            self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+            self._thread.start()
+            return True
+
+    def _write_sync(self, row):
+        try:
+            execute(_INSERT_AUDIT, row)
+        except sqlite3.Error as e:
+            self._count("failed")
+            logger.error("Audit write failed (action=%s): %s", row[2], e)
+            return
+        self._count("sync_fallback")
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            batch = []
+            waiters = []
+            stop = False
+
+            # Batch auffüllen: bis batch_size erreicht oder flush_interval abgelaufen
+            deadline = time.monotonic() + self.flush_interval
+            while True:
+                if item is _STOP:
+                    stop = True
+                    break
+                if isinstance(item, _FlushRequest):
+                    waiters.append(item)
+                    break
+
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+
+            if batch:
+                self._write_batch(batch)
+
+            for waiter in waiters:
+                waiter.done.set()
+
+            if stop:
+                self._drain()
+                return
+
+    def _drain(self):
+        batch = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if isinstance(item, _FlushRequest):
+                item.done.set()
+            elif item is not _STOP:
+                batch.append(item)
+
+        for start in range(0, len(batch), self.batch_size):
+            self._write_batch(batch[start:start + self.batch_size])
+
+    def _write_batch(self, batch):
+        started = time.perf_counter()
+        try:
+            with write_transaction() as conn:
+                conn.executemany(_INSERT_AUDIT, batch)
+        except sqlite3.Error as e:
+            self._count("failed", len(batch))
+            logger.error("Audit batch write failed (%d events): %s", len(batch), e)
+            return
+
+        with self._lock:
+            self._counters["written"] += len(batch)
+            self._counters["batches"] += 1
+
+        registry.observe("audit_batch_write_duration_seconds", time.perf_counter() - started)
+
+    def _count(self, name: str, n: int = 1):
+        with self._lock:
+            self._counters[name] += n
+
+
+def _writer_from(source) -> AuditWriter:
+    get = source.get if isinstance(source, dict) else lambda key, default=None: getattr(source, key, default)
+    return AuditWriter(
+        mode=str(get("AUDIT_LOG_MODE", Config.AUDIT_LOG_MODE)).lower(),
+        queue_size=int(get("AUDIT_QUEUE_SIZE", Config.AUDIT_QUEUE_SIZE)),
+        batch_size=int(get("AUDIT_BATCH_SIZE", Config.AUDIT_BATCH_SIZE)),
+        flush_interval=float(get("AUDIT_FLUSH_INTERVAL_SECONDS", Config.AUDIT_FLUSH_INTERVAL_SECONDS)),
+        enqueue_timeout=float(get("AUDIT_ENQUEUE_TIMEOUT_SECONDS", Config.AUDIT_ENQUEUE_TIMEOUT_SECONDS)),
     )
+
+
+_writer = _writer_from(Config)
+_shutdown_hooks_installed = False
+
+
+def flush_audit_log(timeout: float = 5.0) -> bool:
+    return _writer.flush(timeout)
+
+
+def audit_stats() -> dict:
+    return _writer.stats()
+
+
+def _shutdown():
+    _writer.stop()
+
+
+def _install_sigterm_handler():
+    # Signal-Handler können nur im Main-Thread gesetzt werden
+    if threading.current_thread() is not threading.main_thread():
+        return
+
+    previous = signal.getsignal(signal.SIGTERM)
+
+    def _on_sigterm(signum, frame):
+        _shutdown()
+        if callable(previous):
+            previous(signum, frame)
+        elif previous == signal.SIG_DFL:
+            # Standardverhalten (Prozess beenden) wiederherstellen
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            os.kill(os.getpid(), signal.SIGTERM)
+
+    signal.signal(signal.SIGTERM, _on_sigterm)
+
+
+def init_audit_log(app):
+    """
+    Konfiguriert den Audit-Writer aus der App-Config und stellt sicher,
+    dass gepufferte Einträge beim Beenden (atexit / SIGTERM) geschrieben werden.
+    """
+    global _writer, _shutdown_hooks_installed
+
+    old = _writer
+    _writer = _writer_from(app.config)
+    old.stop()
+
+    if _writer.mode == "batched" and not _shutdown_hooks_installed:
+        atexit.register(_shutdown)
+        _install_sigterm_handler()
+        _shutdown_hooks_installed = True
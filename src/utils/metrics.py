@@ -0,0 +1,251 @@
+# src/utils/metrics.py
+# ============================================================
+# METRIKEN: Request-Latenz, SQL, Audit-Log, Passwort-Hashing
+# ------------------------------------------------------------
+# - Histogramme im Prozessspeicher (pro Worker)
+# - Export im Prometheus-Textformat (GET /metrics, nur Admin)
+# - Optional Server-Timing-Header pro Response
+#   (SERVER_TIMING_ENABLED; verrät Laufzeiten an Clients, z.B.
+#   ob beim Login ein Passwort geprüft wurde -> nur zur Analyse)
+# - Keine personenbezogenen Daten: Labels sind nur Endpoint-Name,
+#   Methode und Statusklasse
+# ============================================================
+
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+from flask import request
+
+from database.db import add_query_listener, remove_query_listener
+
+# Latenz-Buckets in Sekunden (Prometheus-Konvention: le = "kleiner gleich")
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100)
+
+
+class Histogram:
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)   # letzter Eintrag: +Inf
+        self.sum = 0.0
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def observe(self, value: float):
+        # bisect_left: erster Bucket mit bound >= value ("le")
+        i = bisect_left(self.buckets, value)
+        with self.lock:
+            self.counts[i] += 1
+            self.sum += value
+            self.count += 1
+
+    def snapshot(self):
+        with self.lock:
+            return list(self.counts), self.sum, self.count
+
+
+class MetricsRegistry:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}   # (name, labels) -> Histogram
+        self._help = {}
+
+    def describe(self, name: str, kind: str, text: str):
+        self._help[name] = (kind, text)
+
+    def histogram(self, name: str, labels: tuple = (), buckets=LATENCY_BUCKETS) -> Histogram:
+        """Liefert (und legt ggf. an) das Histogramm; Aufrufer können es sich merken."""
+        key = (name, labels)
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(key, Histogram(buckets))
+        return histogram
+
+    def observe(self, name: str, value: float, labels: tuple = (), buckets=LATENCY_BUCKETS):
+        self.histogram(name, labels, buckets).observe(value)
+
+    def render(self, gauges=()) -> str:
+        """Prometheus-Textformat (Version 0.0.4)."""
+        with self._lock:
+            items = list(self._histograms.items())
+        histograms = [(key, h.buckets, *h.snapshot()) for key, h in items]
+
+        lines = []
+        seen = set()
+
+        def header(name, default_kind):
+            if name in seen:
+                return
+            seen.add(name)
+            kind, text = self._help.get(name, (default_kind, ""))
+            if text:
+                lines.append(f"# HELP {name} {text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        for (name, labels), buckets, counts, total, count in sorted(histograms, key=lambda h: h[0]):
+            header(name, "histogram")
+            cumulative = 0
+            for bound, n in zip(buckets, counts):
+                cumulative += n
+                lines.append(f"{name}_bucket{_labels(labels + (('le', _number(bound)),))} {cumulative}")
+            lines.append(f"{name}_bucket{_labels(labels + (('le', '+Inf'),))} {count}")
+            lines.append(f"{name}_sum{_labels(labels)} {_number(total)}")
+            lines.append(f"{name}_count{_labels(labels)} {count}")
+
+        for name, labels, value in gauges:
+            header(name, "gauge")
+            lines.append(f"{name}{_labels(labels)} {_number(value)}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _labels(labels: tuple) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value) -> str:
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, int):
+        return str(value)
+    return repr(float(value))
+
+
+registry = MetricsRegistry()
+registry.describe("http_request_duration_seconds", "histogram", "Request latency per endpoint")
+registry.describe("http_request_db_queries", "histogram", "SQL statements per request")
+registry.describe("db_query_duration_seconds", "histogram", "Duration of SQL statements via database.db")
+registry.describe("audit_log_duration_seconds", "histogram", "Time request threads spend in audit_log()")
+registry.describe("audit_batch_write_duration_seconds", "histogram", "Batched audit writes (one transaction)")
+registry.describe("password_hash_duration_seconds", "histogram", "Password hashing incl. pool wait")
+
+_enabled = False
+_server_timing = False
+_gauge_sources = []
+
+# Zeiten des laufenden Requests (ContextVar: günstiger als g / has_request_context
+# im Query-Pfad; Flask-Kontexte sind selbst ContextVars -> thread-/greenlet-sicher)
+_current = ContextVar("request_metrics", default=None)
+_db_histogram = registry.histogram("db_query_duration_seconds")
+
+
+class _RequestTimings:
+    __slots__ = ("started", "db", "queries", "other")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.db = 0.0
+        self.queries = 0
+        self.other = {}
+
+
+# ============================================================
+# AUFNAHME (von anderen Modulen aufgerufen)
+# ============================================================
+def is_enabled() -> bool:
+    return _enabled
+
+
+def record_timing(kind: str, duration: float, metric: str, labels: tuple = ()):
+    """
+    Zeit einer Teiloperation (audit, hash, ...) erfassen:
+    global als Histogramm und im aktuellen Request für Server-Timing.
+    """
+    if not _enabled:
+        return
+    registry.observe(metric, duration, labels)
+    timings = _current.get()
+    if timings is not None:
+        timings.other[kind] = timings.other.get(kind, 0.0) + duration
+
+
+def _on_query(_query, _params, duration):
+    _db_histogram.observe(duration)
+    timings = _current.get()
+    if timings is not None:
+        timings.db += duration
+        timings.queries += 1
+
+
+def add_gauge_source(source):
+    """source() -> Iterable[(name, labels, value)], wird beim Scrape ausgewertet."""
+    if source not in _gauge_sources:
+        _gauge_sources.append(source)
+
+
+def render_metrics() -> str:
+    gauges = []
+    for source in _gauge_sources:
+        try:
+            gauges.extend(source())
+        except Exception:
+            continue
+    return registry.render(gauges)
+
+
+# ============================================================
+# FLASK-HOOKS
+# ============================================================
+# Statischer Scrape-Token gilt unbegrenzt -> nur ausreichend lange Werte
+METRICS_SCRAPE_TOKEN_MIN_LENGTH = 32
+
+
+def init_metrics(app):
+    """
+    METRICS_ENABLED: Histogramme + /metrics
+    SERVER_TIMING_ENABLED: zusätzlich Server-Timing-Header
+    """
+    global _enabled, _server_timing
+
+    scrape_token = app.config.get("METRICS_SCRAPE_TOKEN")
+    if scrape_token and len(scrape_token) < METRICS_SCRAPE_TOKEN_MIN_LENGTH:
+        raise ValueError(f"METRICS_SCRAPE_TOKEN must have at least {METRICS_SCRAPE_TOKEN_MIN_LENGTH} characters")
+
+    _enabled = bool(app.config.get("METRICS_ENABLED", True))
+    _server_timing = _enabled and bool(app.config.get("SERVER_TIMING_ENABLED", False))
+
+    if not _enabled:
+        remove_query_listener(_on_query)
+        return
+
+    add_query_listener(_on_query)
+
+    @app.before_request
+    def _start_timer():
+        _current.set(_RequestTimings())
+
+    @app.after_request
+    def _record_request(response):
+        timings = _current.get()
+        if timings is None:
+            return response
+        # Statements eines gestreamten Bodys zählen nicht mehr zu diesem Request
+        _current.set(None)
+
+        duration = time.perf_counter() - timings.started
+        # Endpoint-Name statt URL: keine IDs/PII in Labels, begrenzte Kardinalität
+        endpoint = ("endpoint", request.endpoint or "unmatched")
+        labels = (endpoint, ("method", request.method), ("status", f"{response.status_code // 100}xx"))
+        registry.observe("http_request_duration_seconds", duration, labels)
+        registry.observe("http_request_db_queries", timings.queries, (endpoint,), QUERY_COUNT_BUCKETS)
+
+        if _server_timing:
+            parts = [f"app;dur={duration * 1000:.1f}"]
+            if timings.queries:
+                parts.append(f'db;dur={timings.db * 1000:.1f};desc="{timings.queries} SQL"')
+            for kind, value in timings.other.items():
+                parts.append(f"{kind};dur={value * 1000:.1f}")
+            response.headers["Server-Timing"] = ", ".join(parts)
+
+        return response
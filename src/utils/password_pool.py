@@ -0,0 +1,243 @@
+# src/utils/password_pool.py
+# ============================================================
+# PASSWORT-HASHING IM PROZESS-POOL
+# ------------------------------------------------------------
+# - PBKDF2 (200.000 Iterationen) blockiert sonst den Request-
+#   Worker; ein Login-Burst (Schichtwechsel) verdrängt dann
+#   alle anderen Anfragen
+# - Begrenzter Prozess-Pool (PASSWORD_HASH_WORKERS) + begrenzte
+#   Warteschlange (PASSWORD_HASH_MAX_PENDING)
+# - Bei Überlast: sofort PasswordPoolBusy -> 503 + Retry-After,
+#   statt Worker-Threads in der Warteschlange zu parken
+# ============================================================
+
+import atexit
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+
+from flask import jsonify
+
+from config import Config
+from utils import security
+from utils.metrics import record_timing
+
+logger = logging.getLogger(__name__)
+
+
+class PasswordPoolBusy(Exception):
+    """Hash-Pool ausgelastet oder Timeout – Anfrage später wiederholen."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Password hashing pool saturated")
+        self.retry_after = retry_after
+
+
+class PasswordPool:
+
+    def __init__(self, workers: int, max_pending: int, timeout: float, retry_after: int, policy: dict):
+        self.policy = policy
+        self.workers = max(0, workers)
+        self.max_pending = max(0, max_pending)
+        self.timeout = timeout
+        self.retry_after = max(1, retry_after)
+
+        # Laufende + wartende Aufträge (0 Worker -> inline im Request-Thread)
+        self._slots = threading.BoundedSemaphore(self.workers + self.max_pending) if self.workers else None
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pid = None
+
+        self._counters = {
+            "submitted": 0,
+            "rejected": 0,   # Pool + Warteschlange voll -> 503
+            "timeouts": 0,   # Ergebnis nicht innerhalb von timeout
+            "restarts": 0,   # Worker-Prozess abgestürzt, Pool neu aufgebaut
+        }
+        self._in_flight = 0
+
+    # ------------------------------------------------------------
+    # API
+    # ------------------------------------------------------------
+    def verify(self, password: str, stored_hash: str) -> bool:
+        return self._timed("verify", security.verify_password, password, stored_hash)
+
+    def hash(self, password: str) -> str:
+        return self._timed("hash", security.hash_password, password, self.policy)
+
+    def needs_rehash(self, stored_hash: str) -> bool:
+        return security.needs_rehash(stored_hash, self.policy)
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+            owner = self._pid == os.getpid()
+        if executor is not None and owner:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._counters)
+            stats["in_flight"] = self._in_flight
+        stats["workers"] = self.workers
+        stats["max_pending"] = self.max_pending
+        return stats
+
+    # ------------------------------------------------------------
+    # Intern
+    # ------------------------------------------------------------
+    def _timed(self, op: str, fn, *args):
+        # inkl. Wartezeit im Pool = Zeit, die der Request tatsächlich blockiert
+        started = time.perf_counter()
+        try:
+            return self._call(fn, *args)
+        finally:
+            record_timing(
+                "hash", time.perf_counter() - started, "password_hash_duration_seconds",
+                (("op", op), ("mode", "pool" if self.workers else "inline"))
+            )
+
+    def _call(self, fn, *args):
+        if self._slots is None:
+            return fn(*args)
+
+        # Nicht blockieren: volle Warteschlange wird sofort abgewiesen
+        if not self._slots.acquire(blocking=False):
+            self._count("rejected")
+            raise PasswordPoolBusy(self.retry_after)
+
+        with self._lock:
+            self._in_flight += 1
+            self._counters["submitted"] += 1
+
+        try:
+            future = self._submit(fn, *args)
+        except BaseException:
+            self._release()
+            raise
+        # Slot erst freigeben, wenn der Auftrag wirklich fertig ist: ein
+        # laufender Hash lässt sich nach Timeout nicht abbrechen und
+        # belegt seinen Worker weiter
+        future.add_done_callback(self._release)
+
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            future.cancel()
+            self._count("timeouts")
+            raise PasswordPoolBusy(self.retry_after)
+        except BrokenProcessPool:
+            # Worker während der Berechnung beendet -> Pool für die nächste Anfrage neu aufbauen
+            logger.error("Password hashing worker died - restarting pool")
+            self._reset_executor()
+            self._count("restarts")
+            raise PasswordPoolBusy(self.retry_after)
+
+    def _release(self, future=None):
+        with self._lock:
+            self._in_flight -= 1
+        self._slots.release()
+
+    def _submit(self, fn, *args):
+        try:
+            return self._get_executor().submit(fn, *args)
+        except BrokenProcessPool:
+            # Worker wurde beendet (OOM-Killer o.ä.) -> Pool einmal neu aufbauen
+            logger.error("Password hashing pool broken - restarting")
+            self._reset_executor()
+            self._count("restarts")
+            return self._get_executor().submit(fn, *args)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            # Nach fork() gehört der Pool dem Elternprozess
+            if self._executor is None or self._pid != os.getpid():
+                # "spawn": keine geerbten Locks/Threads/DB-Verbindungen im Worker
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+                self._pid = os.getpid()
+            return self._executor
+
+    def _reset_executor(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _count(self, name: str, n: int = 1):
+        with self._lock:
+            self._counters[name] += n
+
+
+def _pool_from(source) -> PasswordPool:
+    get = source.get if isinstance(source, dict) else lambda key, default=None: getattr(source, key, default)
+    return PasswordPool(
+        workers=int(get("PASSWORD_HASH_WORKERS", Config.PASSWORD_HASH_WORKERS)),
+        max_pending=int(get("PASSWORD_HASH_MAX_PENDING", Config.PASSWORD_HASH_MAX_PENDING)),
+        timeout=float(get("PASSWORD_HASH_TIMEOUT_SECONDS", Config.PASSWORD_HASH_TIMEOUT_SECONDS)),
+        retry_after=int(get("PASSWORD_HASH_RETRY_AFTER_SECONDS", Config.PASSWORD_HASH_RETRY_AFTER_SECONDS)),
+        # Hash-Parameter explizit mitgeben: Worker-Prozesse sehen app.config nicht
+        policy=security.password_policy(source),
+    )
+
+
+# Bis init_password_pool(): inline (z.B. CLI / init_db ohne App)
+_pool = PasswordPool(workers=0, max_pending=0, timeout=0, retry_after=1, policy=security.password_policy())
+_shutdown_hook_installed = False
+
+
+def verify_password(password: str, stored_hash: str) -> bool:
+    """verify_password aus utils.security, ausgeführt im Hash-Pool."""
+    return _pool.verify(password, stored_hash)
+
+
+def hash_password(password: str) -> str:
+    """hash_password aus utils.security, ausgeführt im Hash-Pool."""
+    return _pool.hash(password)
+
+
+def needs_rehash(stored_hash: str) -> bool:
+    """Entspricht der gespeicherte Hash nicht mehr den konfigurierten Parametern?"""
+    return _pool.needs_rehash(stored_hash)
+
+
+def password_pool_stats() -> dict:
+    return _pool.stats()
+
+
+def _shutdown():
+    _pool.shutdown()
+
+
+def configure_password_pool(source):
+    """Ersetzt den Hash-Pool (Config-Klasse oder dict, z.B. app.config)."""
+    global _pool, _shutdown_hook_installed
+
+    old = _pool
+    _pool = _pool_from(source)
+    old.shutdown()
+
+    if not _shutdown_hook_installed:
+        atexit.register(_shutdown)
+        _shutdown_hook_installed = True
+
+
+def init_password_pool(app):
+    """
+    Konfiguriert den Hash-Pool aus der App-Config und beantwortet
+    Überlast einheitlich mit 503 + Retry-After.
+    """
+    configure_password_pool(app.config)
+
+    @app.errorhandler(PasswordPoolBusy)
+    def password_pool_busy(exc):
+        response = jsonify({"error": "Service temporarily unavailable, please retry"})
+        response.status_code = 503
+        response.headers["Retry-After"] = str(exc.retry_after)
+        return response
@@ -0,0 +1,150 @@
+# src/utils/recurrence.py
+# ============================================================
+# WIEDERHOLUNGSREGELN (Terminserien)
+# ------------------------------------------------------------
+# Teilmenge von RFC 5545 RRULE:
+#   frequency : minutely | hourly | daily | weekly
+#   interval  : jede n-te Wiederholung (Standard 1)
+#   count     : Anzahl Termine   \ genau eines von beiden
+#   until     : letzter Beginn   /  (inklusiv)
+#   by_weekday: nur weekly, z.B. ["MO", "TH"]
+#   timezone  : IANA-Zone (z.B. "Europe/Berlin"); daily/weekly
+#               behalten dann die Uhrzeit über Sommer-/Winterzeit
+#
+# Ohne timezone wird in UTC gerechnet. occurrences() ist ein
+# Generator und springt mit after= direkt an den Anfang eines
+# Zeitfensters (Aufwand ~ Fenster, nicht ~ Alter der Serie).
+# ============================================================
+
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+# Gespeichertes Terminformat: UTC, feste Länge -> sortierbar
+DATE_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+FREQUENCIES = {
+    "minutely": timedelta(minutes=1),
+    "hourly": timedelta(hours=1),
+    "daily": timedelta(days=1),
+    "weekly": timedelta(weeks=1),
+}
+
+WEEKDAYS = ("MO", "TU", "WE", "TH", "FR", "SA", "SU")
+
+
+class RecurrenceError(ValueError):
+    pass
+
+
+def utc_now() -> datetime:
+    """Aktuelle Zeit als naive UTC (wie to_utc; ersetzt das veraltete datetime.utcnow())."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def to_utc(value: datetime) -> datetime:
+    """Naive Werte gelten als UTC; Ergebnis ist naive UTC (Vergleich mit utc_now())."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.replace(microsecond=0)
+
+
+def format_date(value: datetime) -> str:
+    return value.strftime(DATE_FORMAT)
+
+
+def parse_date(value: str) -> datetime:
+    """Gespeicherter Wert ("...Z") -> naive UTC."""
+    return datetime.strptime(value, DATE_FORMAT)
+
+
+def get_zone(name: str):
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise RecurrenceError(f"Unknown timezone: {name}")
+
+
+def _check_rule(frequency: str, count, until, by_weekday):
+    if frequency not in FREQUENCIES:
+        raise RecurrenceError(f"Unknown frequency: {frequency}")
+    if (count is None) == (until is None):
+        raise RecurrenceError("Exactly one of count or until is required")
+    if by_weekday and frequency != "weekly":
+        raise RecurrenceError("by_weekday requires frequency weekly")
+
+
+def _aware(value):
+    if value is None:
+        return None
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+def occurrences(start: datetime, frequency: str, interval: int = 1, count: int = None, until: datetime = None,
+                by_weekday=None, timezone_name: str = None, after: datetime = None):
+    """
+    Beginnzeiten der Serie (naive UTC), aufsteigend, lazy.
+
+    start/until/after ohne tzinfo gelten als UTC. Mit after werden nur
+    Termine mit Beginn >= after geliefert; ganze Perioden davor werden
+    übersprungen statt erzeugt (count zählt trotzdem ab start).
+    """
+    _check_rule(frequency, count, until, by_weekday)
+    start, until, after = _aware(start), _aware(until), _aware(after)
+
+    # daily/weekly in lokaler Wandzeit rechnen, kürzere Intervalle absolut
+    zone = get_zone(timezone_name) if timezone_name else None
+    local = zone is not None and frequency in ("daily", "weekly")
+
+    def domain(value):
+        return value.astimezone(zone).replace(tzinfo=None) if local else value
+
+    first = domain(start)
+    step = FREQUENCIES[frequency] * interval
+
+    if by_weekday:
+        offsets = sorted(WEEKDAYS.index(day) for day in set(by_weekday))
+        anchor = first - timedelta(days=first.weekday())   # Montag der ersten Woche
+        first_week = sum(1 for offset in offsets if anchor + timedelta(days=offset) >= first)
+    else:
+        offsets = (0,)
+        anchor = first
+        first_week = 1
+
+    # Perioden vor after überspringen (eine Periode Reserve)
+    periods = 0
+    if after is not None and domain(after) > anchor:
+        periods = max(0, (domain(after) - anchor) // step - 1)
+    index = first_week + (periods - 1) * len(offsets) if periods else 0
+
+    period = anchor + step * periods
+    while True:
+        for offset in offsets:
+            current = period + timedelta(days=offset)
+            if current < first:
+                continue
+            if count is not None and index >= count:
+                return
+            value = current.replace(tzinfo=zone).astimezone(timezone.utc) if local else current
+            if until is not None and value > until:
+                return
+            index += 1
+            if after is not None and value < after:
+                continue
+            yield value.astimezone(timezone.utc).replace(tzinfo=None)
+        period += step
+
+
+def expand(start: datetime, frequency: str, interval: int = 1, count: int = None, until: datetime = None,
+           by_weekday=None, timezone_name: str = None, limit: int = 1000) -> list:
+    """
+    Alle Beginnzeiten der Serie (naive UTC), aufsteigend.
+    RecurrenceError, wenn die Serie mehr als `limit` Termine ergibt.
+    """
+    _check_rule(frequency, count, until, by_weekday)
+
+    starts = []
+    for value in occurrences(start, frequency, interval, count, until, by_weekday, timezone_name):
+        if len(starts) == limit:
+            raise RecurrenceError(f"Recurrence yields more than {limit} appointments")
+        starts.append(value)
+    return starts
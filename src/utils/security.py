@@ -4,49 +4,179 @@ import hashlib
 import hmac
 import os
 import secrets
+import time
 from functools import wraps
 
 from flask import request, jsonify, g
 
+from config import Config
+
 
 # -------------------------------------------------------
-# Passwort-Hashing (PBKDF2)
+# Passwort-Hashing (PBKDF2 / scrypt)
 # -------------------------------------------------------
+# Selbstbeschreibendes Format:
+#   pbkdf2_sha256$i=<iterations>$<salt>$<hash>
+#   scrypt$n=<n>,r=<r>,p=<p>$<salt>$<hash>
+# (salt/hash: base64). Alte Hashes base64(salt + dk) ohne "$"
+# werden weiterhin verifiziert und beim Login ersetzt.
+
+HASH_ALGORITHMS = ("pbkdf2_sha256", "scrypt")
+
+# Parameter der Alt-Hashes (vor dem versionierten Format)
+_LEGACY_ITERATIONS = 200_000
+_SALT_BYTES = 16
 
-def hash_password(password: str) -> str:
+
+def password_policy(source=None) -> dict:
+    """
+    Aktuelle Hash-Parameter aus Config-Klasse oder dict (z.B. app.config).
+    """
+    source = Config if source is None else source
+    get = source.get if isinstance(source, dict) else lambda key, default=None: getattr(source, key, default)
+
+    algorithm = str(get("PASSWORD_HASH_ALGORITHM", Config.PASSWORD_HASH_ALGORITHM)).lower()
+    if algorithm not in HASH_ALGORITHMS:
+        raise ValueError(f"Invalid PASSWORD_HASH_ALGORITHM: {algorithm}")
+
+    return {
+        "algorithm": algorithm,
+        "iterations": int(get("PASSWORD_PBKDF2_ITERATIONS", Config.PASSWORD_PBKDF2_ITERATIONS)),
+        "n": int(get("PASSWORD_SCRYPT_N", Config.PASSWORD_SCRYPT_N)),
+        "r": int(get("PASSWORD_SCRYPT_R", Config.PASSWORD_SCRYPT_R)),
+        "p": int(get("PASSWORD_SCRYPT_P", Config.PASSWORD_SCRYPT_P)),
+    }
+
+
+def _derive(algorithm: str, params: dict, password: bytes, salt: bytes) -> bytes:
+    if algorithm == "pbkdf2_sha256":
+        return hashlib.pbkdf2_hmac("sha256", password, salt, params["i"])
+    if algorithm == "scrypt":
+        n, r, p = params["n"], params["r"], params["p"]
+        return hashlib.scrypt(
+            password, salt=salt, n=n, r=r, p=p,
+            # Speicherbedarf ~ 128 * r * n Bytes; OpenSSL-Default (32 MiB) ist zu knapp
+            maxmem=128 * r * (n + p + 2) + 1024 * 1024,
+            dklen=32
+        )
+    raise ValueError(f"Unsupported hash algorithm: {algorithm}")
+
+
+def _policy_params(policy: dict) -> dict:
+    if policy["algorithm"] == "pbkdf2_sha256":
+        return {"i": policy["iterations"]}
+    return {"n": policy["n"], "r": policy["r"], "p": policy["p"]}
+
+
+def _parse_hash(stored_hash: str):
+    """-> (algorithm, params, salt, dk) oder None bei ungültigem Format."""
+    try:
+        if "$" not in stored_hash:
+            raw = base64.b64decode(stored_hash.encode("ascii"), validate=True)
+            if len(raw) < 32:
+                return None
+            return "pbkdf2_sha256", {"i": _LEGACY_ITERATIONS, "legacy": True}, raw[:_SALT_BYTES], raw[_SALT_BYTES:]
+
+        algorithm, param_str, salt, dk = stored_hash.split("$")
+        if algorithm not in HASH_ALGORITHMS:
+            return None
+        params = {}
+        for item in param_str.split(","):
+            key, value = item.split("=")
+            params[key] = int(value)
+        return (
+            algorithm,
+            params,
+            base64.b64decode(salt.encode("ascii"), validate=True),
+            base64.b64decode(dk.encode("ascii"), validate=True),
+        )
+    except (ValueError, TypeError, AttributeError):
+        return None
+
+
+def hash_password(password: str, policy: dict | None = None) -> str:
     if not isinstance(password, str):
         raise ValueError("Password must be a string")
 
-    salt = os.urandom(16)
-    dk = hashlib.pbkdf2_hmac(
-        "sha256",
-        password.encode("utf-8"),
-        salt,
-        200_000
-    )
-    return base64.b64encode(salt + dk).decode("ascii")
+    policy = policy or password_policy()
+    algorithm = policy["algorithm"]
+    params = _policy_params(policy)
+
+    salt = os.urandom(_SALT_BYTES)
+    dk = _derive(algorithm, params, password.encode("utf-8"), salt)
+
+    return "$".join((
+        algorithm,
+        ",".join(f"{k}={v}" for k, v in params.items()),
+        base64.b64encode(salt).decode("ascii"),
+        base64.b64encode(dk).decode("ascii"),
+    ))
 
 
 def verify_password(password: str, stored_hash: str) -> bool:
-    try:
-        raw = base64.b64decode(stored_hash.encode("ascii"))
-    except Exception:
+    parsed = _parse_hash(stored_hash)
+    if parsed is None:
         return False
 
-    if len(raw) < 32:
+    algorithm, params, salt, stored_dk = parsed
+
+    try:
+        new_dk = _derive(algorithm, params, password.encode("utf-8"), salt)
+    except (KeyError, ValueError):
         return False
 
-    salt = raw[:16]
-    stored_dk = raw[16:]
+    return hmac.compare_digest(stored_dk, new_dk)
 
-    new_dk = hashlib.pbkdf2_hmac(
-        "sha256",
-        password.encode("utf-8"),
-        salt,
-        200_000
-    )
 
-    return hmac.compare_digest(stored_dk, new_dk)
+def needs_rehash(stored_hash: str, policy: dict | None = None) -> bool:
+    """
+    True, wenn der Hash nicht mit den aktuellen Parametern erzeugt wurde
+    (Alt-Format, anderer Algorithmus oder andere Kosten).
+    """
+    parsed = _parse_hash(stored_hash)
+    if parsed is None:
+        return True
+
+    policy = policy or password_policy()
+    algorithm, params, _, _ = parsed
+    return algorithm != policy["algorithm"] or params != _policy_params(policy)
+
+
+def calibrate(algorithm: str, target_ms: float, policy: dict | None = None) -> dict:
+    """
+    Ermittelt Kostenparameter, mit denen EIN verify auf dieser Maschine
+    etwa target_ms dauert (PBKDF2: Iterationen, scrypt: n als Zweierpotenz).
+    """
+    policy = dict(policy or password_policy())
+    policy["algorithm"] = algorithm
+    password, salt = b"calibration-password", os.urandom(_SALT_BYTES)
+
+    def measure() -> float:
+        params = _policy_params(policy)
+        start = time.perf_counter()
+        _derive(algorithm, params, password, salt)
+        return (time.perf_counter() - start) * 1000
+
+    if algorithm == "pbkdf2_sha256":
+        policy["iterations"] = 10_000
+        elapsed = measure()
+        # Laufzeit ist linear in den Iterationen; auf 1.000 runden
+        policy["iterations"] = max(1000, int(policy["iterations"] * target_ms / elapsed / 1000) * 1000)
+        policy["measured_ms"] = round(measure(), 1)
+        return policy
+
+    if algorithm == "scrypt":
+        policy["n"] = 2 ** 14
+        # n verdoppeln, solange das Ziel noch nicht erreicht ist
+        while True:
+            elapsed = measure()
+            if elapsed >= target_ms or policy["n"] >= 2 ** 20:
+                break
+            policy["n"] *= 2
+        policy["measured_ms"] = round(elapsed, 1)
+        return policy
+
+    raise ValueError(f"Unsupported hash algorithm: {algorithm}")
 
 
 def generate_token() -> str:
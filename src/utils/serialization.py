@@ -0,0 +1,166 @@
+# src/utils/serialization.py
+# ============================================================
+# SERIALISIERUNG: deklarative Row -> Resource Mapper + JSON-Backend
+# ------------------------------------------------------------
+# - Mapper werden EINMAL beim Import aus einer Spezifikation
+#   kompiliert (Closures / itemgetter), pro Request wird nur
+#   noch die fertige Funktion aufgerufen
+# - Optional orjson als JSON-Backend (Fallback: stdlib json)
+# ============================================================
+
+import json
+from operator import itemgetter
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optionale Abhängigkeit
+    orjson = None
+
+
+# ============================================================
+# MAPPER-SPEZIFIKATION
+# ============================================================
+class Column:
+    """Wert einer Spalte, optional konvertiert (z.B. str für FHIR-IDs)."""
+
+    def __init__(self, name: str, convert=None):
+        self.name = name
+        self.convert = convert
+
+
+class Template:
+    """Formatierter String aus Spalten, z.B. "{first_name} {last_name}"."""
+
+    def __init__(self, fmt: str):
+        self.fmt = fmt
+
+
+def column(name: str, convert=None) -> Column:
+    return Column(name, convert)
+
+
+def template(fmt: str) -> Template:
+    return Template(fmt)
+
+
+def compile_mapper(spec):
+    """
+    Kompiliert eine Spezifikation (dict/list/Column/Template/Konstante)
+    in eine Funktion row -> JSON-fähige Struktur.
+    """
+    if isinstance(spec, Column):
+        getter = itemgetter(spec.name)
+        if spec.convert is None:
+            return getter
+        convert = spec.convert
+
+        def convert_column(row):
+            value = getter(row)
+            return None if value is None else convert(value)
+        return convert_column
+
+    if isinstance(spec, Template):
+        # sqlite3.Row und dict unterstützen beide den Zugriff per Spaltenname
+        return spec.fmt.format_map
+
+    if isinstance(spec, dict):
+        keys = tuple(spec)
+
+        # Schneller Pfad: nur direkte Spalten -> itemgetter + zip
+        if all(isinstance(v, Column) and v.convert is None for v in spec.values()):
+            if len(keys) == 1:
+                key, getter = keys[0], itemgetter(spec[keys[0]].name)
+                return lambda row: {key: getter(row)}
+            getter = itemgetter(*(spec[k].name for k in keys))
+            return lambda row: dict(zip(keys, getter(row)))
+
+        # Führende Konstanten (z.B. "resourceType") einmal vorberechnen,
+        # pro Row wird nur noch der variable Teil aufgerufen
+        static = {}
+        for k in keys:
+            if not _is_static(spec[k]):
+                break
+            static[k] = spec[k]
+        fields = tuple((k, compile_mapper(v)) for k, v in spec.items() if k not in static)
+
+        if len(fields) == 1:
+            (k1, f1), = fields
+            return lambda row: {**static, k1: f1(row)}
+        if len(fields) == 2:
+            (k1, f1), (k2, f2) = fields
+            return lambda row: {**static, k1: f1(row), k2: f2(row)}
+        if len(fields) == 3:
+            (k1, f1), (k2, f2), (k3, f3) = fields
+            return lambda row: {**static, k1: f1(row), k2: f2(row), k3: f3(row)}
+        if len(fields) == 4:
+            (k1, f1), (k2, f2), (k3, f3), (k4, f4) = fields
+            return lambda row: {**static, k1: f1(row), k2: f2(row), k3: f3(row), k4: f4(row)}
+        return lambda row: {**static, **{k: f(row) for k, f in fields}}
+
+    if isinstance(spec, list):
+        if len(spec) == 1:
+            item = compile_mapper(spec[0])
+            return lambda row: [item(row)]
+        items = tuple(compile_mapper(v) for v in spec)
+        return lambda row: [f(row) for f in items]
+
+    # Konstante (str/int/bool/None)
+    return lambda row: spec
+
+
+def _is_static(spec) -> bool:
+    """Skalare Konstante (kein Column/Template, keine Struktur)."""
+    return not isinstance(spec, (Column, Template, dict, list))
+
+
+# ============================================================
+# JSON-BACKEND
+# ============================================================
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    Flask JSON-Provider auf Basis von orjson.
+    Typen, die orjson nicht kennt (Decimal, date, ...), laufen über den
+    Flask-Default-Handler – Ausgabeformat bleibt identisch.
+    """
+
+    def dumps(self, obj, **kwargs) -> str:
+        return self._dumps_bytes(obj).decode("utf-8")
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(
+            self._dumps_bytes(obj, indent) + b"\n", mimetype=self.mimetype
+        )
+
+    def _dumps_bytes(self, obj, indent: bool = False) -> bytes:
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option)
+
+
+def fast_dumps(obj) -> str:
+    """Kompaktes JSON ohne App-Kontext (z.B. in Export-Threads)."""
+    if orjson is not None:
+        return orjson.dumps(obj).decode("utf-8")
+    return json.dumps(obj, separators=(",", ":"))
+
+
+def init_json_provider(app):
+    """
+    JSON_BACKEND: "auto" (orjson falls installiert), "orjson" oder "stdlib".
+    """
+    backend = str(app.config.get("JSON_BACKEND", "auto")).lower()
+
+    if backend not in ("auto", "orjson", "stdlib"):
+        raise ValueError(f"Invalid JSON_BACKEND: {backend}")
+    if backend == "orjson" and orjson is None:
+        raise RuntimeError("JSON_BACKEND=orjson but orjson is not installed")
+
+    if backend != "stdlib" and orjson is not None:
+        app.json = OrjsonProvider(app)
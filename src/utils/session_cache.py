@@ -0,0 +1,296 @@
+# src/utils/session_cache.py
+# ============================================================
+# SESSION-CACHE (LRU + TTL) für die Token-Prüfung der Middleware
+# ------------------------------------------------------------
+# - Schlüssel: SHA-256 des Tokens (Klartext-Token wird nie gespeichert)
+# - Wert: User-Dict + bereits geparste Ablaufzeit
+# - Invalidierung lokal und prozessübergreifend
+#   (Standard-Backend "unix": Broadcast über UNIX-Datagram-Sockets)
+# ============================================================
+
+import hashlib
+import logging
+import os
+import socket
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+
+def token_key(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+# ============================================================
+# INVALIDATION-BACKENDS
+# ============================================================
+class LocalBackend:
+    """Nur dieser Prozess (z.B. ein einzelner Worker oder Entwicklung)."""
+
+    def start(self, on_message):
+        pass
+
+    def publish(self, message: str):
+        pass
+
+    def close(self):
+        pass
+
+
+class UnixSocketBackend:
+    """
+    Prozessübergreifende Invalidierung für mehrere Worker auf einem Host.
+
+    Jeder Prozess bindet <socket_dir>/<pid>.sock und empfängt dort
+    Invalidierungen der anderen Worker. Nachrichten:
+      t:<token_key>   einzelne Session
+      u:<user_id>     alle Sessions eines Users
+    """
+
+    def __init__(self, socket_dir):
+        self.socket_dir = Path(socket_dir)
+        self._sock = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def start(self, on_message):
+        # Nach fork() braucht jeder Worker seinen eigenen Socket
+        if self._pid == os.getpid():
+            return
+
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+
+            self.socket_dir.mkdir(mode=0o700, parents=True, exist_ok=True)
+            path = self.socket_dir / f"{os.getpid()}.sock"
+            if path.exists():
+                path.unlink()
+
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            sock.bind(str(path))
+            os.chmod(path, 0o600)
+
+            self._sock = sock
+            self._pid = os.getpid()
+
+            thread = threading.Thread(
+                target=self._listen, args=(sock, on_message),
+                name="session-cache-listener", daemon=True
+            )
+            thread.start()
+
+    def publish(self, message: str):
+        if self._sock is None:
+            return
+
+        own = f"{os.getpid()}.sock"
+        data = message.encode("ascii")
+
+        for peer in self.socket_dir.glob("*.sock"):
+            if peer.name == own:
+                continue
+            try:
+                self._sock.sendto(data, str(peer))
+            except (ConnectionRefusedError, FileNotFoundError):
+                # Worker existiert nicht mehr -> verwaisten Socket aufräumen
+                try:
+                    peer.unlink()
+                except OSError:
+                    pass
+            except OSError as e:
+                logger.warning("Session cache invalidation to %s failed: %s", peer.name, e)
+
+    def close(self):
+        """Socket schließen (beendet auch den Listener-Thread)."""
+        with self._lock:
+            if self._sock is None or self._pid != os.getpid():
+                return
+            try:
+                (self.socket_dir / f"{self._pid}.sock").unlink()
+            except OSError:
+                pass
+            self._sock.close()
+            self._sock = None
+            self._pid = None
+
+    @staticmethod
+    def _listen(sock, on_message):
+        while True:
+            try:
+                data = sock.recv(512)
+            except OSError:
+                return
+            on_message(data.decode("ascii", errors="ignore"))
+
+
+# ============================================================
+# CACHE
+# ============================================================
+class SessionCache:
+
+    def __init__(self, enabled: bool, max_entries: int, ttl: float, backend=None):
+        self.enabled = enabled
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl
+        self.backend = backend or LocalBackend()
+
+        # key -> (user, expires_at, cached_until)
+        self._entries = OrderedDict()
+        self._by_user = {}
+        self._lock = threading.Lock()
+
+        self._counters = {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "invalidations": 0,
+        }
+
+    def get(self, token: str):
+        """Liefert eine Kopie des gecachten Users oder None."""
+        if not self.enabled:
+            return None
+
+        key = token_key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._counters["misses"] += 1
+                return None
+
+            user, expires_at, cached_until = entry
+            if cached_until < time.monotonic() or expires_at < datetime.utcnow():
+                self._remove(key)
+                self._counters["expirations"] += 1
+                self._counters["misses"] += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._counters["hits"] += 1
+            return dict(user)
+
+    def put(self, token: str, user: dict, expires_at: datetime):
+        if not self.enabled:
+            return
+
+        self.backend.start(self._on_message)
+
+        key = token_key(token)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            self._entries[key] = (dict(user), expires_at, time.monotonic() + self.ttl)
+            self._by_user.setdefault(user["id"], set()).add(key)
+
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self._counters["evictions"] += 1
+
+    def invalidate(self, token: str):
+        if not self.enabled:
+            return
+
+        key = token_key(token)
+        self._invalidate_key(key)
+        self.backend.start(self._on_message)
+        self.backend.publish(f"t:{key}")
+
+    def invalidate_user(self, user_id: int):
+        if not self.enabled:
+            return
+
+        self._invalidate_user(user_id)
+        self.backend.start(self._on_message)
+        self.backend.publish(f"u:{user_id}")
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_user.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._counters)
+            stats["entries"] = len(self._entries)
+        return stats
+
+    # ------------------------------------------------------------
+    # Interne Helfer (Aufrufer hält ggf. self._lock)
+    # ------------------------------------------------------------
+    def _remove(self, key):
+        user, _, _ = self._entries.pop(key)
+        keys = self._by_user.get(user["id"])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_user[user["id"]]
+
+    def _invalidate_key(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+                self._counters["invalidations"] += 1
+
+    def _invalidate_user(self, user_id):
+        with self._lock:
+            for key in list(self._by_user.get(user_id, ())):
+                self._remove(key)
+                self._counters["invalidations"] += 1
+
+    def _on_message(self, message: str):
+        kind, _, value = message.partition(":")
+        if kind == "t":
+            self._invalidate_key(value)
+        elif kind == "u" and value.isdigit():
+            self._invalidate_user(int(value))
+
+
+def _cache_from(source) -> SessionCache:
+    get = source.get if isinstance(source, dict) else lambda key, default=None: getattr(source, key, default)
+
+    enabled = bool(get("SESSION_CACHE_ENABLED", Config.SESSION_CACHE_ENABLED))
+    backend_name = str(get("SESSION_CACHE_BACKEND", Config.SESSION_CACHE_BACKEND)).lower()
+    if backend_name == "unix":
+        if hasattr(socket, "AF_UNIX"):
+            backend = UnixSocketBackend(get("SESSION_CACHE_SOCKET_DIR", Config.SESSION_CACHE_SOCKET_DIR))
+        else:
+            # Ohne Invalidierung an die anderen Worker wäre ein widerrufenes
+            # Token dort bis zur TTL gültig -> lieber ohne Cache
+            logger.warning("SESSION_CACHE_BACKEND=unix not supported on this platform - session cache disabled")
+            enabled = False
+            backend = LocalBackend()
+    elif backend_name == "local":
+        backend = LocalBackend()
+    else:
+        raise ValueError(f"Invalid SESSION_CACHE_BACKEND: {backend_name}")
+
+    return SessionCache(
+        enabled=enabled,
+        max_entries=int(get("SESSION_CACHE_MAX_ENTRIES", Config.SESSION_CACHE_MAX_ENTRIES)),
+        ttl=float(get("SESSION_CACHE_TTL_SECONDS", Config.SESSION_CACHE_TTL_SECONDS)),
+        backend=backend,
+    )
+
+
+_cache = _cache_from(Config)
+
+
+def init_session_cache(app):
+    global _cache
+    _cache.clear()
+    _cache.backend.close()
+    _cache = _cache_from(app.config)
+
+
+def get_session_cache() -> SessionCache:
+    return _cache
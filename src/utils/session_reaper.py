@@ -0,0 +1,189 @@
+# src/utils/session_reaper.py
+# ============================================================
+# SESSION-REAPER: löscht abgelaufene Sessions im Hintergrund
+# ------------------------------------------------------------
+# - Abgelaufene Sessions wurden bisher nur gelöscht, wenn der
+#   Client das Token erneut vorlegt -> verlassene Sessions
+#   blieben für immer in der Tabelle
+# - Löschen in begrenzten Batches (je eine kurze Schreib-
+#   Transaktion), damit der Writer nicht lange blockiert
+# - Ebenso: abgelaufene Einträge in token_revocations
+# - Als Hintergrund-Thread (SESSION_REAPER_INTERVAL_SECONDS)
+#   oder einmalig per CLI: python src/database/__init__.py reap-sessions
+# - Der Thread läuft PRO PROZESS und ist standardmäßig aus
+#   (SESSION_REAPER_ENABLED=0): bei gunicorn mit N Workern würde
+#   sonst jeder Worker einen eigenen Reaper starten. Entweder in
+#   genau einem Prozess einschalten oder die CLI per Cron aufrufen
+# - Metriken: gelöschte Zeilen + Tabellengröße (stats_counters)
+# ============================================================
+
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+
+from config import Config
+from database.db import fetch_all, write_transaction
+
+logger = logging.getLogger(__name__)
+
+
+class SessionReaper:
+
+    def __init__(self, interval: float, batch_size: int, enabled: bool = True):
+        self.enabled = enabled
+        self.interval = interval
+        self.batch_size = max(1, batch_size)
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._pid = None
+
+        self._counters = {
+            "runs": 0,
+            "reaped_sessions": 0,
+            "reaped_revocations": 0,
+            "errors": 0,
+        }
+        self._last_run = None
+        self._last_duration_ms = None
+
+    # ------------------------------------------------------------
+    # Ausführung
+    # ------------------------------------------------------------
+    def run_once(self) -> dict:
+        """Löscht alle aktuell abgelaufenen Einträge -> {"sessions": n, "revocations": m}."""
+        started = time.perf_counter()
+
+        sessions = self._delete_batched(
+            """
+            DELETE FROM sessions WHERE id IN (
+                SELECT id FROM sessions WHERE expires_at < ? LIMIT ?
+            )
+            """,
+            datetime.utcnow().isoformat()
+        )
+        revocations = self._delete_batched(
+            """
+            DELETE FROM token_revocations WHERE id IN (
+                SELECT id FROM token_revocations WHERE expires_at < ? LIMIT ?
+            )
+            """,
+            time.time()
+        )
+
+        with self._lock:
+            self._counters["runs"] += 1
+            self._counters["reaped_sessions"] += sessions
+            self._counters["reaped_revocations"] += revocations
+            self._last_run = datetime.utcnow().isoformat()
+            self._last_duration_ms = round((time.perf_counter() - started) * 1000, 1)
+
+        if sessions or revocations:
+            logger.info("Session reaper removed %d sessions, %d revocations", sessions, revocations)
+
+        return {"sessions": sessions, "revocations": revocations}
+
+    def _delete_batched(self, sql: str, cutoff) -> int:
+        total = 0
+        while True:
+            with write_transaction() as conn:
+                deleted = conn.execute(sql, (cutoff, self.batch_size)).rowcount
+            total += deleted
+            if deleted < self.batch_size or self._stop.is_set():
+                return total
+
+    # ------------------------------------------------------------
+    # Hintergrund-Thread
+    # ------------------------------------------------------------
+    def start(self):
+        if not self.enabled or self.interval <= 0:
+            return
+        # Schneller Pfad ohne Lock (wird pro Request aufgerufen)
+        if self._pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+            return
+
+        with self._lock:
+            # Nach fork() existiert der Thread im Kind nicht mehr
+            if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="session-reaper", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        thread = self._thread
+        self._stop.set()
+        if thread is not None and thread.is_alive() and self._pid == os.getpid():
+            thread.join(timeout)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.run_once()
+            except Exception:
+                logger.exception("Session reaper run failed")
+                with self._lock:
+                    self._counters["errors"] += 1
+
+    # ------------------------------------------------------------
+    # Metriken
+    # ------------------------------------------------------------
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._counters)
+            stats["last_run"] = self._last_run
+            stats["last_duration_ms"] = self._last_duration_ms
+        stats["enabled"] = self.enabled and self.interval > 0
+
+        # Tabellengrößen aus stats_counters (Trigger, Migration 0012) –
+        # zwei Schlüssel-Lookups statt COUNT(*) pro Scrape
+        rows = fetch_all(
+            "SELECT name, value FROM stats_counters WHERE name IN ('sessions', 'token_revocations')"
+        )
+        sizes = {row["name"]: row["value"] for row in rows}
+        stats["sessions_rows"] = sizes.get("sessions", 0)
+        stats["revocations_rows"] = sizes.get("token_revocations", 0)
+        return stats
+
+
+def _reaper_from(source) -> SessionReaper:
+    get = source.get if isinstance(source, dict) else lambda key, default=None: getattr(source, key, default)
+    return SessionReaper(
+        interval=float(get("SESSION_REAPER_INTERVAL_SECONDS", Config.SESSION_REAPER_INTERVAL_SECONDS)),
+        batch_size=int(get("SESSION_REAPER_BATCH_SIZE", Config.SESSION_REAPER_BATCH_SIZE)),
+        enabled=bool(get("SESSION_REAPER_ENABLED", Config.SESSION_REAPER_ENABLED)),
+    )
+
+
+_reaper = _reaper_from(Config)
+
+
+def reap_expired_sessions() -> dict:
+    return _reaper.run_once()
+
+
+def reaper_stats() -> dict:
+    return _reaper.stats()
+
+
+def init_session_reaper(app):
+    """
+    Konfiguriert den Reaper aus der App-Config und startet den Hintergrund-Thread
+    (nur in Prozessen mit SESSION_REAPER_ENABLED).
+    """
+    global _reaper
+
+    old = _reaper
+    _reaper = _reaper_from(app.config)
+    old.stop()
+
+    _reaper.start()
+
+    # Nach fork() (z.B. gunicorn --preload) im Worker neu starten
+    @app.before_request
+    def _ensure_session_reaper():
+        _reaper.start()
@@ -1,30 +1,64 @@
 # src/utils/session_services.py
 from datetime import datetime, timedelta
 from flask import current_app  # KORREKTUR: Zugriff auf Config
-from database.db import fetch_one, execute
+from database.db import fetch_one, execute, write_transaction
 from utils.security import generate_token
+from utils.session_cache import get_session_cache
+from utils.session_tokens import issue_token, revoke_token, revoke_user_tokens
 
 
-def create_session(user_id: int) -> str:
+def is_stateless() -> bool:
+    return current_app.config.get("SESSION_MODE", "stateful") == "stateless"
+
+
+def create_session(user) -> str:
     """
-    Erstellt einen neuen Session-Eintrag in der Datenbank.
+    Erstellt eine neue Session für user (id, username, role).
     Liest die Lifetime dynamisch aus der App-Config.
-    """
-    token = generate_token()
-    now = datetime.utcnow()
 
+    stateful:  Session-Eintrag in der Datenbank, Token ist zufällig
+    stateless: signiertes Token, kein Datenbank-Eintrag
+    """
     # KORREKTUR: Wert aus Config laden (Fallback 60 Min)
     lifetime_minutes = current_app.config.get("SESSION_LIFETIME_MINUTES", 60)
 
+    if is_stateless():
+        return issue_token(user, lifetime_minutes * 60)
+
+    user_id = user["id"]
+    token = generate_token()
+    now = datetime.utcnow()
+
     expires = now + timedelta(minutes=lifetime_minutes)
 
-    execute(
-        """
-        INSERT INTO sessions (user_id, token, created_at, expires_at)
-        VALUES (?, ?, ?, ?)
-        """,
-        (user_id, token, now.isoformat(), expires.isoformat())
-    )
+    max_sessions = current_app.config.get("SESSION_MAX_PER_USER", 0)
+
+    with write_transaction() as conn:
+        conn.execute(
+            """
+            INSERT INTO sessions (user_id, token, created_at, expires_at)
+            VALUES (?, ?, ?, ?)
+            """,
+            (user_id, token, now.isoformat(), expires.isoformat())
+        )
+
+        # Session-Limit: älteste (auch abgelaufene) Sessions des Users verdrängen
+        if max_sessions > 0:
+            conn.execute(
+                """
+                DELETE FROM sessions
+                WHERE user_id = ? AND id NOT IN (
+                    SELECT id FROM sessions WHERE user_id = ?
+                    ORDER BY expires_at DESC, id DESC
+                    LIMIT ?
+                )
+                """,
+                (user_id, user_id, max_sessions)
+            )
+
+    # Neuer Login -> gecachten Session-Zustand des Users verwerfen
+    # (inkl. soeben verdrängter Sessions)
+    get_session_cache().invalidate_user(user_id)
 
     return token
 
@@ -42,4 +76,21 @@ def get_user_by_token(token: str):
 
 
 def remove_session(token: str):
-    execute("DELETE FROM sessions WHERE token = ?", (token,))
\ No newline at end of file
+    if is_stateless():
+        revoke_token(token)
+        return
+
+    execute("DELETE FROM sessions WHERE token = ?", (token,))
+    get_session_cache().invalidate(token)
+
+
+def invalidate_user_sessions(user_id: int):
+    """
+    Verwirft Sessions eines Users (z.B. nach Passwortänderung).
+    stateful: gecachte Sessions, stateless: alle bisher ausgestellten Tokens.
+    """
+    if is_stateless():
+        revoke_user_tokens(user_id, current_app.config.get("SESSION_LIFETIME_MINUTES", 60) * 60)
+        return
+
+    get_session_cache().invalidate_user(user_id)
@@ -0,0 +1,219 @@
+# src/utils/session_tokens.py
+# ============================================================
+# STATELESS SESSION-TOKENS (SESSION_MODE = "stateless")
+# ------------------------------------------------------------
+# - Bearer-Token = HMAC-signierte Nutzlast (itsdangerous):
+#   User-ID, Username, Rolle, Ausstellungs- und Ablaufzeit, jti
+# - Prüfung in der Middleware ohne DB-Zugriff
+# - Widerruf (Logout, Passwortänderung) über die Tabelle
+#   token_revocations; jeder Prozess hält eine kompakte Kopie
+#   im Speicher und lädt neue Einträge periodisch nach
+#
+# Hinweis: Rollenänderungen greifen erst mit dem nächsten Login
+# (bzw. nach Ablauf des Tokens) – Lebensdauer entsprechend kurz halten.
+# ============================================================
+
+import logging
+import secrets
+import threading
+import time
+
+from itsdangerous import BadSignature, URLSafeSerializer
+
+from config import Config
+from database.db import fetch_all, execute
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_SALT = "healthcare-session-token"
+
+
+class TokenCodec:
+    """Signiert / prüft Token-Nutzlasten mit dem SECRET_KEY der App."""
+
+    def __init__(self, secret_key: str):
+        self._serializer = URLSafeSerializer(secret_key, salt=_TOKEN_SALT)
+
+    def issue(self, user: dict, lifetime_seconds: float) -> str:
+        now = time.time()
+        return self._serializer.dumps({
+            "uid": user["id"],
+            "usr": user["username"],
+            "role": user["role"],
+            "iat": now,
+            "exp": int(now + lifetime_seconds),
+            "jti": secrets.token_urlsafe(12),
+        })
+
+    def decode(self, token: str):
+        """Claims bei gültiger Signatur, sonst None (Ablauf prüft der Aufrufer)."""
+        try:
+            claims = self._serializer.loads(token)
+        except BadSignature:
+            return None
+        if not isinstance(claims, dict) or not {"uid", "usr", "role", "iat", "exp", "jti"} <= claims.keys():
+            return None
+        return claims
+
+
+# ============================================================
+# WIDERRUFSLISTE
+# ============================================================
+class RevocationList:
+    """
+    In-Memory-Kopie von token_revocations.
+
+    - jti-Einträge: einzelne Tokens (Logout)
+    - User-Cutoffs: alle Tokens eines Users mit iat < issued_before
+      (Passwortänderung)
+    Neue Zeilen werden inkrementell (id > zuletzt gesehene id) geladen.
+    """
+
+    def __init__(self, refresh_interval: float):
+        self.refresh_interval = refresh_interval
+
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._jti = {}           # jti -> exp
+        self._user_cutoff = {}   # user_id -> issued_before
+        self._last_id = 0
+        self._next_refresh = 0.0
+
+        self._counters = {
+            "refreshes": 0,
+            "refresh_errors": 0,
+            "rejected": 0,
+        }
+
+    def is_revoked(self, claims: dict) -> bool:
+        self._maybe_refresh()
+
+        with self._lock:
+            revoked = (
+                claims["jti"] in self._jti
+                or claims["iat"] < self._user_cutoff.get(claims["uid"], 0)
+            )
+            if revoked:
+                self._counters["rejected"] += 1
+        return revoked
+
+    def revoke_token(self, claims: dict):
+        execute(
+            "INSERT OR IGNORE INTO token_revocations (jti, user_id, expires_at) VALUES (?, ?, ?)",
+            (claims["jti"], claims["uid"], claims["exp"])
+        )
+        with self._lock:
+            self._jti[claims["jti"]] = claims["exp"]
+
+    def revoke_user(self, user_id: int, expires_at: float):
+        """Widerruft alle bis jetzt ausgestellten Tokens des Users."""
+        issued_before = time.time()
+        execute(
+            "INSERT INTO token_revocations (user_id, issued_before, expires_at) VALUES (?, ?, ?)",
+            (user_id, issued_before, expires_at)
+        )
+        with self._lock:
+            self._user_cutoff[user_id] = max(self._user_cutoff.get(user_id, 0), issued_before)
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._counters)
+            stats["revoked_tokens"] = len(self._jti)
+            stats["revoked_users"] = len(self._user_cutoff)
+        return stats
+
+    # ------------------------------------------------------------
+    # Nachladen
+    # ------------------------------------------------------------
+    def _maybe_refresh(self):
+        if time.monotonic() < self._next_refresh:
+            return
+        # Nur ein Thread lädt nach; die anderen prüfen gegen den bisherigen Stand
+        if not self._refresh_lock.acquire(blocking=False):
+            return
+        try:
+            self._refresh()
+        finally:
+            self._refresh_lock.release()
+
+    def _refresh(self):
+        try:
+            rows = fetch_all(
+                """
+                SELECT id, jti, user_id, issued_before, expires_at
+                FROM token_revocations
+                WHERE id > ?
+                ORDER BY id
+                """,
+                (self._last_id,)
+            )
+        except Exception:
+            # Fail-closed wäre ein Totalausfall; bisherigen Stand behalten und bald erneut versuchen
+            logger.exception("Token revocation refresh failed")
+            with self._lock:
+                self._counters["refresh_errors"] += 1
+            self._next_refresh = time.monotonic() + min(1.0, self.refresh_interval)
+            return
+
+        now = time.time()
+        with self._lock:
+            for row in rows:
+                if row["jti"] is not None:
+                    self._jti[row["jti"]] = row["expires_at"]
+                elif row["issued_before"] is not None:
+                    self._user_cutoff[row["user_id"]] = max(
+                        self._user_cutoff.get(row["user_id"], 0), row["issued_before"]
+                    )
+                self._last_id = row["id"]
+
+            # Abgelaufene Tokens sind ohnehin ungültig -> Liste kompakt halten
+            self._jti = {jti: exp for jti, exp in self._jti.items() if exp >= now}
+            self._counters["refreshes"] += 1
+
+        self._next_refresh = time.monotonic() + self.refresh_interval
+
+
+# ============================================================
+# MODUL-ZUSTAND
+# ============================================================
+_codec = None
+_revocations = RevocationList(Config.SESSION_REVOCATION_REFRESH_SECONDS)
+
+
+def init_session_tokens(app):
+    global _codec, _revocations
+    _codec = TokenCodec(app.config["SECRET_KEY"])
+    _revocations = RevocationList(
+        float(app.config.get("SESSION_REVOCATION_REFRESH_SECONDS", Config.SESSION_REVOCATION_REFRESH_SECONDS))
+    )
+
+
+def issue_token(user: dict, lifetime_seconds: float) -> str:
+    return _codec.issue(user, lifetime_seconds)
+
+
+def verify_token(token: str):
+    """
+    Gültige, nicht abgelaufene und nicht widerrufene Tokens -> Claims, sonst None.
+    """
+    claims = _codec.decode(token)
+    if claims is None or claims["exp"] < time.time():
+        return None
+    if _revocations.is_revoked(claims):
+        return None
+    return claims
+
+
+def revoke_token(token: str):
+    claims = _codec.decode(token)
+    if claims is not None:
+        _revocations.revoke_token(claims)
+
+
+def revoke_user_tokens(user_id: int, lifetime_seconds: float):
+    # Eintrag wird nach Ablauf der längsten möglichen Token-Lebensdauer wertlos
+    _revocations.revoke_user(user_id, time.time() + lifetime_seconds)
+
+
+def revocation_stats() -> dict:
+    return _revocations.stats()
@@ -0,0 +1,202 @@
+# src/utils/slow_query_log.py
+# ============================================================
+# SLOW-QUERY-LOG + EXPLAIN QUERY PLAN (opt-in)
+# ------------------------------------------------------------
+# - Hängt sich als Query-Listener an database.db
+# - Statements über SLOW_QUERY_THRESHOLD_MS -> NDJSON-Zeile mit
+#   normalisiertem SQL, Parameteranzahl, Dauer, Endpoint
+# - Beim ersten Auftreten eines Statements (pro Prozess) wird
+#   EXPLAIN QUERY PLAN erfasst; Full Table Scans werden als
+#   eigene Zeile geloggt, auch wenn das Statement (noch) schnell ist
+# - Keine Parameterwerte im Log (können Patientendaten enthalten)
+# - Auswertung: python src/database/__init__.py slow-queries --top 20
+# ============================================================
+
+import hashlib
+import json
+import logging
+import re
+import threading
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+
+from flask import has_request_context, request
+
+from config import Config
+from database.db import add_query_listener, remove_query_listener, connection
+
+logger = logging.getLogger(__name__)
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+# Parser-Cache: Statements sind fast immer Konstanten im Code
+_FINGERPRINT_CACHE_SIZE = 1000
+
+
+def normalize_sql(query: str) -> str:
+    """Literale -> ?, IN-Listen zusammengefasst, Whitespace vereinheitlicht."""
+    sql = _STRING_LITERAL.sub("?", query)
+    sql = _NUMBER_LITERAL.sub("?", sql)
+    sql = _WHITESPACE.sub(" ", sql).strip()
+    return _PLACEHOLDER_LIST.sub("(?, ...)", sql)
+
+
+def is_full_scan(plan_detail: str) -> bool:
+    """
+    "SCAN patients" = Full Table Scan. Nicht gezählt: Scans über einen
+    Index ("SCAN t USING INDEX ...") und virtuelle Tabellen (FTS5).
+    """
+    return (
+        plan_detail.startswith("SCAN ")
+        and " USING " not in plan_detail
+        and "VIRTUAL TABLE" not in plan_detail
+    )
+
+
+class SlowQueryLog:
+
+    def __init__(self, path, threshold_ms: float, explain: bool):
+        self.path = Path(path)
+        self.threshold = threshold_ms / 1000
+        self.explain = explain
+
+        self._lock = threading.Lock()
+        self._fingerprints = {}   # query -> (fingerprint, normalized)
+        self._plans = {}          # fingerprint -> {"plan": [...], "full_scan": bool}
+
+    def __call__(self, query, params, duration):
+        fingerprint, normalized = self._fingerprint(query)
+
+        plan = self._plans.get(fingerprint)
+        first_sighting = plan is None
+        if first_sighting:
+            plan = self._capture_plan(fingerprint, query, params)
+
+        slow = duration >= self.threshold
+        if not slow and not (first_sighting and plan["full_scan"]):
+            return
+
+        entry = {
+            "ts": datetime.utcnow().isoformat(),
+            "kind": "slow" if slow else "full_scan",
+            "fingerprint": fingerprint,
+            "sql": normalized,
+            "params": len(params) if isinstance(params, (tuple, list, dict)) else 0,
+            "duration_ms": round(duration * 1000, 3),
+            "endpoint": request.endpoint if has_request_context() else threading.current_thread().name,
+            "full_scan": plan["full_scan"],
+        }
+        if first_sighting:
+            entry["plan"] = plan["plan"]
+        self._write(entry)
+
+    # ------------------------------------------------------------
+    # Intern
+    # ------------------------------------------------------------
+    def _fingerprint(self, query: str):
+        cached = self._fingerprints.get(query)
+        if cached is not None:
+            return cached
+
+        normalized = normalize_sql(query)
+        cached = (hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:12], normalized)
+        with self._lock:
+            if len(self._fingerprints) >= _FINGERPRINT_CACHE_SIZE:
+                self._fingerprints.clear()
+            self._fingerprints[query] = cached
+        return cached
+
+    def _capture_plan(self, fingerprint: str, query: str, params) -> dict:
+        plan = {"plan": [], "full_scan": False}
+        if self.explain:
+            try:
+                with connection() as conn:
+                    rows = conn.execute("EXPLAIN QUERY PLAN " + query, params).fetchall()
+                plan["plan"] = [row[3] for row in rows]
+                plan["full_scan"] = any(is_full_scan(detail) for detail in plan["plan"])
+            except Exception as e:
+                # z.B. Statements ohne Query-Plan; nicht erneut versuchen
+                plan["plan"] = [f"unavailable: {type(e).__name__}"]
+
+        with self._lock:
+            return self._plans.setdefault(fingerprint, plan)
+
+    def _write(self, entry: dict):
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        try:
+            with self._lock:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(line)
+        except OSError as e:
+            logger.error("Could not write slow query log: %s", e)
+
+
+# ============================================================
+# TOP-N-REPORT (CLI)
+# ============================================================
+def top_queries(path, top: int = 20, sort: str = "total") -> list:
+    """
+    Aggregiert das NDJSON-Log pro Fingerprint:
+    Anzahl, Summe/Max der Dauer, Full-Scan-Flag, Endpoints, Plan.
+    """
+    stats = defaultdict(lambda: {
+        "count": 0, "total_ms": 0.0, "max_ms": 0.0, "full_scan": False,
+        "endpoints": set(), "sql": "", "plan": None,
+    })
+
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+
+            item = stats[entry["fingerprint"]]
+            item["sql"] = entry["sql"]
+            item["full_scan"] = item["full_scan"] or entry.get("full_scan", False)
+            item["endpoints"].add(entry.get("endpoint") or "-")
+            if entry.get("plan"):
+                item["plan"] = entry["plan"]
+            if entry.get("kind", "slow") == "slow":
+                item["count"] += 1
+                item["total_ms"] += entry["duration_ms"]
+                item["max_ms"] = max(item["max_ms"], entry["duration_ms"])
+
+    key = {
+        "total": lambda item: item[1]["total_ms"],
+        "max": lambda item: item[1]["max_ms"],
+        "count": lambda item: item[1]["count"],
+    }[sort]
+
+    ranked = sorted(stats.items(), key=key, reverse=True)[:top]
+    return [dict(item, fingerprint=fingerprint, endpoints=sorted(item["endpoints"])) for fingerprint, item in ranked]
+
+
+# ============================================================
+# MODUL-ZUSTAND
+# ============================================================
+_log = None
+
+
+def init_slow_query_log(app):
+    """SLOW_QUERY_LOG_ENABLED=1 aktiviert den Listener (Standard: aus)."""
+    global _log
+
+    if _log is not None:
+        remove_query_listener(_log)
+        _log = None
+
+    if not app.config.get("SLOW_QUERY_LOG_ENABLED", Config.SLOW_QUERY_LOG_ENABLED):
+        return
+
+    _log = SlowQueryLog(
+        path=app.config.get("SLOW_QUERY_LOG_PATH", Config.SLOW_QUERY_LOG_PATH),
+        threshold_ms=float(app.config.get("SLOW_QUERY_THRESHOLD_MS", Config.SLOW_QUERY_THRESHOLD_MS)),
+        explain=bool(app.config.get("SLOW_QUERY_EXPLAIN", Config.SLOW_QUERY_EXPLAIN)),
+    )
+    add_query_listener(_log)
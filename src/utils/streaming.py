@@ -0,0 +1,35 @@
+# src/utils/streaming.py
+# ============================================================
+# STREAMING-RESPONSES für Exporte (NDJSON, FHIR Bundles)
+# ------------------------------------------------------------
+# - Gemeinsam für /export/* und /audit/events?format=ndjson
+# - Belegen nur EINE Pool-Verbindung pro Stream
+# ============================================================
+
+from flask import Response, current_app, stream_with_context
+
+from database.db import close_connection
+
+NDJSON_MIMETYPE = "application/x-ndjson"
+
+
+def stream_response(chunks, mimetype: str) -> Response:
+    """
+    Streaming-Response, die nur EINE Pool-Verbindung belegt: die
+    Request-Verbindung (g) wird vor dem ersten Block zurückgegeben,
+    iter_rows leiht sich erst beim ersten Lesen eine eigene.
+    """
+    def generate():
+        close_connection()
+        yield from chunks
+
+    return Response(stream_with_context(generate()), mimetype=mimetype)
+
+
+def ndjson_response(rows, to_dict) -> Response:
+    """
+    Streamt eine Zeile pro Datensatz. Es wird nie die gesamte
+    Ergebnismenge im Speicher gehalten (Generator + fetchmany).
+    """
+    dumps = current_app.json.dumps
+    return stream_response((dumps(to_dict(row)) + "\n" for row in rows), NDJSON_MIMETYPE)
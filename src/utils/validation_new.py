@@ -1,7 +1,49 @@
+import base64
+import binascii
+import json
+import math
 from functools import wraps
 from flask import request, jsonify
-from marshmallow import Schema, fields, ValidationError, validates
-from marshmallow.validate import Length, And, Regexp
+from marshmallow import Schema, fields, ValidationError, validates, validates_schema
+from marshmallow.validate import Length, And, Regexp, Range, OneOf
+from utils.recurrence import FREQUENCIES, WEEKDAYS, RecurrenceError, get_zone, to_utc
+
+
+# ============================================================
+# KEYSET CURSOR FIELD (opaker Paging-Cursor)
+# ============================================================
+class KeysetCursor(fields.Field):
+    """
+    Opaker Cursor für Keyset-Pagination: base64url(JSON-Liste der Sortwerte).
+    Deserialisiert zu einem Tupel mit genau `size` Werten.
+    """
+
+    def __init__(self, size: int, **kwargs):
+        super().__init__(**kwargs)
+        self.size = size
+
+    def _serialize(self, value, attr, obj, **kwargs):
+        if value is None:
+            return None
+        raw = json.dumps(list(value), separators=(",", ":")).encode("utf-8")
+        return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+    def _deserialize(self, value, attr, data, **kwargs):
+        if not isinstance(value, str) or len(value) > 512:
+            raise ValidationError("Invalid cursor")
+        try:
+            raw = base64.urlsafe_b64decode(value + "=" * (-len(value) % 4))
+            decoded = json.loads(raw.decode("utf-8"))
+        except (binascii.Error, ValueError, UnicodeDecodeError):
+            raise ValidationError("Invalid cursor")
+
+        if not isinstance(decoded, list) or len(decoded) != self.size:
+            raise ValidationError("Invalid cursor")
+        if not all(isinstance(v, (str, int, float)) and not isinstance(v, bool) for v in decoded):
+            raise ValidationError("Invalid cursor")
+        if any(isinstance(v, float) and not math.isfinite(v) for v in decoded):
+            raise ValidationError("Invalid cursor")
+        return tuple(decoded)
 
 
 # ============================================================
@@ -60,9 +102,26 @@ class PatientCreateSchema(Schema):
 # ============================================================
 # PATIENT UPDATE (doctor only)
 # ============================================================
+# Änderbare Spalten (Teil-Update: nur übergebene Felder)
+PATIENT_UPDATE_FIELDS = ("first_name", "last_name", "birthdate", "mrn", "diagnosis")
+
 class PatientUpdateSchema(Schema):
     id = fields.Int(required=True)
-    diagnosis = fields.Str(required=True, validate=Length(min=1, max=500))
+    # Erwartete Version (GET /patient/<id>: "version" bzw. ETag); alternativ If-Match
+    version = fields.Int(required=False, validate=Range(min=1))
+    first_name = fields.Str(required=False, validate=Length(min=1, max=100))
+    last_name = fields.Str(required=False, validate=Length(min=1, max=100))
+    birthdate = fields.Date(required=False)
+    mrn = fields.Str(required=False, validate=Length(min=1, max=50))
+    diagnosis = fields.Str(required=False, validate=Length(min=1, max=500))
+
+    @validates_schema
+    def validate_fields(self, data, **kwargs):
+        if not any(name in data for name in PATIENT_UPDATE_FIELDS):
+            raise ValidationError("At least one field to update is required")
+        for name in ("first_name", "last_name", "mrn"):
+            if name in data and len(data[name].strip()) == 0:
+                raise ValidationError("Field cannot be empty", name)
 
     @validates("diagnosis")
     def validate_diag(self, value, **kwargs):
@@ -76,9 +135,16 @@ class PatientUpdateSchema(Schema):
 # ============================================================
 # APPOINTMENT CREATE (doctor/nurse)
 # ============================================================
+# Obergrenze der Termindauer: begrenzt zugleich den Suchbereich der
+# Konfliktprüfung (Termine, die bis zu so lange vor dem neuen beginnen)
+APPOINTMENT_MAX_DURATION_MINUTES = 12 * 60
+
+
 class AppointmentCreateSchema(Schema):
     patient_id = fields.Int(required=True)
+    # Ohne Zeitzone = UTC
     date = fields.DateTime(required=True)
+    duration_minutes = fields.Int(required=False, validate=Range(min=5, max=APPOINTMENT_MAX_DURATION_MINUTES))
     description = fields.Str(required=True, validate=Length(min=1, max=500))
 
     @validates("description")
@@ -88,10 +154,113 @@ class AppointmentCreateSchema(Schema):
 
 
 # ============================================================
-# PATIENT SEARCH QUERY (GET /search?q=)
+# APPOINTMENT BULK CREATE (POST /appointments/bulk)
+# ============================================================
+# Obergrenze Einträge pro Anfrage (Serien zählen hier als ein Eintrag;
+# die expandierten Termine begrenzt APPOINTMENTS_BULK_MAX_OCCURRENCES)
+APPOINTMENT_BULK_MAX_ITEMS = 1000
+
+class RecurrenceSchema(Schema):
+    frequency = fields.Str(required=True, validate=OneOf(list(FREQUENCIES)))
+    interval = fields.Int(required=False, load_default=1, validate=Range(min=1, max=1000))
+    count = fields.Int(required=False, validate=Range(min=1))
+    # Letzter möglicher Beginn (inklusiv); ohne Zeitzone = UTC
+    until = fields.DateTime(required=False)
+    by_weekday = fields.List(fields.Str(validate=OneOf(WEEKDAYS)), required=False, validate=Length(min=1, max=7))
+    timezone = fields.Str(required=False, validate=Length(min=1, max=64))
+
+    @validates_schema
+    def validate_rule(self, data, **kwargs):
+        if ("count" in data) == ("until" in data):
+            raise ValidationError("Exactly one of count or until is required")
+        if "by_weekday" in data and data["frequency"] != "weekly":
+            raise ValidationError("by_weekday requires frequency weekly", "by_weekday")
+        if "timezone" in data:
+            try:
+                get_zone(data["timezone"])
+            except RecurrenceError:
+                raise ValidationError("Unknown timezone", "timezone")
+
+
+class AppointmentBulkItemSchema(AppointmentCreateSchema):
+    # Optional: Eintrag ist eine Serie ab "date"
+    recurrence = fields.Nested(RecurrenceSchema, required=False)
+
+
+class AppointmentBulkCreateSchema(Schema):
+    appointments = fields.List(
+        fields.Nested(AppointmentBulkItemSchema),
+        required=True,
+        validate=Length(min=1, max=APPOINTMENT_BULK_MAX_ITEMS)
+    )
+    # true: bei einem fehlerhaften Eintrag wird nichts angelegt
+    atomic = fields.Bool(required=False, load_default=False)
+
+
+# ============================================================
+# APPOINTMENT SERIES (POST /appointments/series, PUT .../occurrences/<start>)
+# ============================================================
+class AppointmentSeriesCreateSchema(AppointmentCreateSchema):
+    # Serie ab "date"; gespeichert wird nur die Regel
+    recurrence = fields.Nested(RecurrenceSchema, required=True)
+
+
+class OccurrenceUpdateSchema(Schema):
+    # Neuer Beginn (ohne Zeitzone = UTC) / Dauer / Beschreibung eines Serientermins
+    date = fields.DateTime(required=False)
+    duration_minutes = fields.Int(required=False, validate=Range(min=5, max=APPOINTMENT_MAX_DURATION_MINUTES))
+    description = fields.Str(required=False, validate=Length(min=1, max=500))
+
+    @validates_schema
+    def validate_change(self, data, **kwargs):
+        if not data:
+            raise ValidationError("At least one of date, duration_minutes or description is required")
+        if "description" in data and len(data["description"].strip()) == 0:
+            raise ValidationError("Description cannot be empty", "description")
+
+
+# ============================================================
+# APPOINTMENT CALENDAR QUERY (GET /appointments/calendar)
+# ============================================================
+class AppointmentCalendarQuerySchema(Schema):
+    doctor_id = fields.Int(required=False, validate=Range(min=1))
+    patient_id = fields.Int(required=False, validate=Range(min=1))
+    # Fenster [from, to); Länge serverseitig begrenzt
+    start = fields.DateTime(required=True, data_key="from")
+    end = fields.DateTime(required=True, data_key="to")
+
+    @validates_schema
+    def validate_window(self, data, **kwargs):
+        if "doctor_id" not in data and "patient_id" not in data:
+            raise ValidationError("doctor_id or patient_id is required")
+        if "start" in data and "end" in data and to_utc(data["end"]) <= to_utc(data["start"]):
+            raise ValidationError("to must be after from", "to")
+
+
+# ============================================================
+# APPOINTMENT LIST QUERY (GET /appointments)
+# ============================================================
+class AppointmentListQuerySchema(Schema):
+    doctor_id = fields.Int(required=False, validate=Range(min=1))
+    patient_id = fields.Int(required=False, validate=Range(min=1))
+    # Zeitraum: Termine, die sich mit [from, to) überschneiden
+    start = fields.DateTime(required=False, data_key="from")
+    end = fields.DateTime(required=False, data_key="to")
+    limit = fields.Int(required=False, validate=Range(min=1))
+    # Keyset-Cursor: (date, id)
+    cursor = KeysetCursor(size=2, required=False)
+
+
+# ============================================================
+# PATIENT SEARCH QUERY (GET /search?q=&limit=&cursor=)
 # ============================================================
 class PatientSearchQuerySchema(Schema):
     q = fields.Str(required=True, validate=Length(min=1, max=50))
+    # Seitengröße (serverseitig zusätzlich auf SEARCH_MAX_PAGE_SIZE begrenzt)
+    limit = fields.Int(required=False, validate=Range(min=1))
+    # Keyset-Cursor aus "next_cursor" der vorherigen Seite:
+    # (rank, id) bei Volltextsuche, (last_name, id) bei kurzen Eingaben
+    cursor = KeysetCursor(size=2, required=False)
 
     @validates("q")
     def validate_query(self, value, **kwargs):
@@ -99,6 +268,26 @@ class PatientSearchQuerySchema(Schema):
             raise ValidationError("Query cannot be empty")
 
 
+# ============================================================
+# AUDIT EVENTS QUERY (GET /audit/events)
+# ============================================================
+class AuditEventQuerySchema(Schema):
+    # Zeitraum (UTC): from inklusiv, to exklusiv
+    start = fields.DateTime(required=False, data_key="from")
+    end = fields.DateTime(required=False, data_key="to")
+    user_id = fields.Int(required=False, validate=Range(min=1))
+    # Präfix: "LOGIN_" findet LOGIN_SUCCESS, LOGIN_FAILED, ...
+    action = fields.Str(required=False, validate=And(Length(min=1, max=64), Regexp(r"^[A-Z0-9_]+$")))
+    resource_type = fields.Str(required=False, validate=And(Length(min=1, max=64), Regexp(r"^[A-Za-z]+$")))
+    resource_id = fields.Int(required=False, validate=Range(min=0))
+    success = fields.Bool(required=False)
+    # "json": Seite + next_cursor, "ndjson": alle Treffer gestreamt
+    format = fields.Str(required=False, load_default="json", validate=OneOf(["json", "ndjson"]))
+    limit = fields.Int(required=False, validate=Range(min=1))
+    # Keyset-Cursor: (timestamp, id)
+    cursor = KeysetCursor(size=2, required=False)
+
+
 # ============================================================
 # JSON BODY VALIDATOR for POST/PUT/PATCH
 # ============================================================
@@ -0,0 +1,113 @@
+# tests/conftest.py
+# ============================================================
+# Gemeinsame Fixtures: jede Test-Funktion bekommt eine eigene
+# SQLite-Datei (Kopie einer einmal migrierten + geseedeten DB)
+# und eine frisch erzeugte App.
+# ============================================================
+
+import os
+import sqlite3
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+# Config liest die Umgebung beim Import -> vor dem ersten Import setzen
+os.environ.update({
+    "FLASK_ENV": "production",
+    # Hashing inline (kein Prozess-Pool) und mit wenigen Iterationen
+    "PASSWORD_HASH_WORKERS": "0",
+    "PASSWORD_PBKDF2_ITERATIONS": "1000",
+    "STATS_CACHE_TTL_SECONDS": "0",
+    # Session-Cache-Invalidierung nicht über das Verzeichnis echter Worker
+    "SESSION_CACHE_SOCKET_DIR": tempfile.mkdtemp(prefix="session-cache-"),
+})
+
+import database  # noqa: E402
+from database import db  # noqa: E402
+from config import Config  # noqa: E402
+
+USERS = {
+    "admin": "Admin123!",
+    "doctor1": "Doctor123!",
+    "nurse1": "Nurse123!",
+}
+
+
+def use_database(path: Path):
+    """Alle Verbindungen (Pool, Writer, init_db) auf path umstellen."""
+    db.close_pool()
+    # Tests dürfen den Pool umkonfigurieren -> für den nächsten Test zurücksetzen
+    db.configure_pool(Config.DB_POOL_SIZE, Config.DB_POOL_TIMEOUT_SECONDS, Config.DB_POOL_HEALTHCHECK_SECONDS)
+    db.DB_PATH = path
+    database.DB_PATH = path
+
+
+@pytest.fixture(scope="session")
+def template_db(tmp_path_factory):
+    path = tmp_path_factory.mktemp("template") / "healthcare.db"
+    use_database(path)
+    database.init_db()
+    db.close_pool()
+    return path
+
+
+@pytest.fixture
+def db_path(template_db, tmp_path):
+    path = tmp_path / "healthcare.db"
+    # Backup-API statt Dateikopie: unabhängig von WAL-Dateien
+    source = sqlite3.connect(template_db)
+    target = sqlite3.connect(path)
+    try:
+        source.backup(target)
+    finally:
+        source.close()
+        target.close()
+
+    use_database(path)
+    yield path
+    db.close_pool()
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "app_config(**values): Config-Werte für create_app() in diesem Test")
+
+
+@pytest.fixture
+def app(db_path, tmp_path, request, monkeypatch):
+    from app import create_app
+    from config import ProductionConfig
+    from utils.logging_utils import flush_audit_log
+
+    # create_app() liest die Config-Klasse -> Abweichungen nur für diesen Test
+    marker = request.node.get_closest_marker("app_config")
+    for key, value in (marker.kwargs if marker else {}).items():
+        monkeypatch.setattr(ProductionConfig, key, value, raising=False)
+
+    app = create_app()
+    app.config.update(
+        TESTING=True,
+        FHIR_EXPORT_DIR=tmp_path / "exports",
+    )
+    yield app
+    # Gepufferte Audit-Einträge gehören in die DB dieses Tests
+    flush_audit_log()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def login(client):
+    def _login(username: str) -> dict:
+        response = client.post("/login", json={"username": username, "password": USERS[username]})
+        assert response.status_code == 200, response.get_json()
+        return {"Authorization": "Bearer " + response.get_json()["token"]}
+    return _login
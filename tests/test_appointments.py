@@ -0,0 +1,244 @@
+from collections import Counter
+
+import pytest
+
+from database import db
+from database.migrate import discover
+
+
+DOCTOR_ID = 2
+
+
+def _create(client, headers, date, patient_id=1, **extra):
+    body = {"patient_id": patient_id, "date": date, "description": "Kontrolle", **extra}
+    return client.post("/appointments/create", json=body, headers=headers)
+
+
+def _series(client, headers, date, patient_id=1, **recurrence):
+    body = {"patient_id": patient_id, "date": date, "description": "Physio", "recurrence": recurrence}
+    return client.post("/appointments/series", json=body, headers=headers)
+
+
+def _calendar(client, headers, start, end):
+    response = client.get("/appointments/calendar", query_string={"from": start, "to": end, "doctor_id": DOCTOR_ID},
+                          headers=headers)
+    assert response.status_code == 200
+    return response.get_json()["appointments"]
+
+
+def _stats(client, login):
+    return client.get("/stats", headers=login("admin")).get_json()["appointments"]
+
+
+@pytest.fixture
+def doctor(login):
+    return login("doctor1")
+
+
+# ============================================================
+# Konfliktprüfung + Listing
+# ============================================================
+def test_overlapping_appointment_is_rejected_with_409(client, doctor):
+    first = _create(client, doctor, "2031-01-10T09:00:00Z", duration_minutes=30)
+    assert first.status_code == 201
+
+    clash = _create(client, doctor, "2031-01-10T09:15:00Z", patient_id=2)
+    assert clash.status_code == 409
+    assert clash.get_json()["conflict"]["id"] == first.get_json()["id"]
+
+    # Direkt anschließend ist kein Konflikt
+    assert _create(client, doctor, "2031-01-10T09:30:00Z", patient_id=2).status_code == 201
+    assert _create(client, doctor, "2030-01-01T09:00:00Z", patient_id=99).status_code == 404
+
+
+def test_listing_pages_by_cursor_and_includes_overlapping_window(client, doctor):
+    for hour in range(8, 13):
+        assert _create(client, doctor, f"2031-02-01T{hour:02d}:00:00Z", duration_minutes=45).status_code == 201
+
+    seen, cursor = [], None
+    while True:
+        query = {"doctor_id": DOCTOR_ID, "from": "2031-02-01T00:00:00Z", "limit": 2}
+        body = client.get("/appointments", query_string={**query, **({"cursor": cursor} if cursor else {})},
+                          headers=doctor).get_json()
+        assert len(body["appointments"]) <= 2
+        seen += [a["date"] for a in body["appointments"]]
+        cursor = body["next_cursor"]
+        if not cursor:
+            break
+    assert seen == [f"2031-02-01T{hour:02d}:00:00Z" for hour in range(8, 13)]
+
+    # Termin 10:00–10:45 überschneidet sich mit dem Fenster ab 10:30
+    window = client.get("/appointments", query_string={"from": "2031-02-01T10:30:00Z", "to": "2031-02-01T11:30:00Z"},
+                        headers=doctor).get_json()
+    assert [a["date"] for a in window["appointments"]] == ["2031-02-01T10:00:00Z", "2031-02-01T11:00:00Z"]
+
+
+# ============================================================
+# Bulk-Anlage
+# ============================================================
+def test_bulk_reports_per_entry_results(client, doctor):
+    assert _create(client, doctor, "2031-04-01T09:00:00Z").status_code == 201
+    before = db.fetch_one("SELECT COUNT(*) AS n FROM appointments")["n"]
+
+    response = client.post("/appointments/bulk", json={"appointments": [
+        {"patient_id": 1, "date": "2031-04-01T09:10:00Z", "description": "Konflikt Bestand"},
+        {"patient_id": 2, "date": "2031-04-02T09:00:00Z", "description": "ok",
+         "recurrence": {"frequency": "daily", "count": 3}},
+        {"patient_id": 99, "date": "2031-04-05T09:00:00Z", "description": "kein Patient"},
+        {"patient_id": 3, "date": "2031-04-03T09:00:00Z", "description": "Konflikt Anfrage"},
+        {"patient_id": 3, "date": "2020-01-01T09:00:00Z", "description": "Vergangenheit"},
+    ]}, headers=doctor)
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert [r["status"] for r in body["results"]] == [409, 201, 404, 409, 400]
+    # created zählt Termine (Serie = 3), failed Einträge
+    assert body["created"] == 3 and body["failed"] == 4
+    assert [a["date"] for a in body["results"][1]["appointments"]] == [
+        "2031-04-02T09:00:00Z", "2031-04-03T09:00:00Z", "2031-04-04T09:00:00Z"
+    ]
+    assert body["results"][3]["conflicts"][0]["conflict"]["index"] == 1
+    assert db.fetch_one("SELECT COUNT(*) AS n FROM appointments")["n"] == before + 3
+
+
+def test_atomic_bulk_creates_nothing_on_failure(client, doctor):
+    before = db.fetch_one("SELECT COUNT(*) AS n FROM appointments")["n"]
+
+    response = client.post("/appointments/bulk", json={"atomic": True, "appointments": [
+        {"patient_id": 1, "date": "2031-05-01T09:00:00Z", "description": "ok"},
+        {"patient_id": 99, "date": "2031-05-01T10:00:00Z", "description": "kein Patient"},
+    ]}, headers=doctor)
+
+    assert response.status_code == 409
+    body = response.get_json()
+    assert [r["status"] for r in body["results"]] == [424, 404]
+    assert body["created"] == 0
+    assert db.fetch_one("SELECT COUNT(*) AS n FROM appointments")["n"] == before
+
+    ok = client.post("/appointments/bulk", json={"atomic": True, "appointments": [
+        {"patient_id": 1, "date": "2031-05-01T09:00:00Z", "description": "ok"},
+    ]}, headers=doctor)
+    assert ok.status_code == 201
+
+
+@pytest.mark.app_config(APPOINTMENTS_BULK_MAX_OCCURRENCES=5)
+def test_bulk_limits_expanded_occurrences(client, doctor):
+    response = client.post("/appointments/bulk", json={"appointments": [
+        {"patient_id": 1, "date": "2031-06-01T09:00:00Z", "description": "x",
+         "recurrence": {"frequency": "daily", "count": 6}},
+    ]}, headers=doctor)
+    assert response.status_code == 400
+
+
+# ============================================================
+# Terminserien
+# ============================================================
+def test_series_is_expanded_in_calendar(client, doctor):
+    created = _series(client, doctor, "2031-07-07T08:00:00Z", frequency="weekly", count=4)
+    assert created.status_code == 201
+    body = created.get_json()
+    assert body["occurrences"] == 4
+    assert (body["span_start"], body["span_end"]) == ("2031-07-07T08:00:00Z", "2031-07-28T08:30:00Z")
+
+    # Nur die Termine im Fenster, mit Serien-Bezug
+    items = _calendar(client, doctor, "2031-07-10T00:00:00Z", "2031-07-25T00:00:00Z")
+    assert [(i["series_id"], i["occurrence"]) for i in items] == [
+        (body["id"], "2031-07-14T08:00:00Z"), (body["id"], "2031-07-21T08:00:00Z")
+    ]
+
+    assert client.get("/appointments/calendar?from=2031-01-01T00:00:00Z&to=2031-12-31T00:00:00Z",
+                      headers=doctor).status_code == 400
+
+
+def test_series_and_single_appointments_conflict(client, doctor):
+    assert _create(client, doctor, "2031-08-03T08:15:00Z").status_code == 201
+
+    clash = _series(client, doctor, "2031-08-01T08:00:00Z", frequency="daily", count=5)
+    assert clash.status_code == 409
+    assert len(clash.get_json()["conflicts"]) == 1
+
+    assert _series(client, doctor, "2031-08-01T09:00:00Z", frequency="daily", count=5).status_code == 201
+    assert _create(client, doctor, "2031-08-04T09:00:00Z").status_code == 409
+
+
+def test_moving_an_occurrence_frees_its_slot(client, doctor, login):
+    series_id = _series(client, doctor, "2031-09-01T08:00:00Z", frequency="daily", count=3).get_json()["id"]
+    occurrence = "2031-09-02T08:00:00Z"
+    url = f"/appointments/series/{series_id}/occurrences/{occurrence}"
+    stats = _stats(client, login)
+
+    moved = client.put(url, json={"date": "2031-09-02T14:00:00Z", "description": "verschoben"}, headers=doctor)
+    assert moved.status_code == 200
+    assert moved.get_json()["end_date"] == "2031-09-02T14:30:00Z"
+    assert _stats(client, login) == stats
+
+    items = _calendar(client, doctor, "2031-09-02T00:00:00Z", "2031-09-03T00:00:00Z")
+    assert [(i["occurrence"], i["date"], i["description"]) for i in items] == [
+        (occurrence, "2031-09-02T14:00:00Z", "verschoben")
+    ]
+
+    # Alter Slot ist frei, neuer belegt
+    assert _create(client, doctor, occurrence).status_code == 201
+    assert _create(client, doctor, "2031-09-02T14:10:00Z").status_code == 409
+    assert client.put(url, json={"date": occurrence}, headers=doctor).status_code == 409
+
+
+def test_cancelling_an_occurrence(client, doctor, login):
+    series_id = _series(client, doctor, "2031-10-01T08:00:00Z", frequency="daily", count=3).get_json()["id"]
+    stats = _stats(client, login)
+    url = f"/appointments/series/{series_id}/occurrences/2031-10-02T08:00:00Z"
+
+    assert client.delete(url, headers=doctor).status_code == 200
+    assert _stats(client, login) == stats - 1
+    assert client.delete(url, headers=doctor).status_code == 404
+
+    items = _calendar(client, doctor, "2031-10-01T00:00:00Z", "2031-10-04T00:00:00Z")
+    assert [i["occurrence"] for i in items] == ["2031-10-01T08:00:00Z", "2031-10-03T08:00:00Z"]
+    # Abgesagter Slot ist wieder frei
+    assert _create(client, doctor, "2031-10-02T08:00:00Z").status_code == 201
+
+
+def test_unknown_series_or_occurrence_is_404(client, doctor):
+    series_id = _series(client, doctor, "2031-11-01T08:00:00Z", frequency="daily", count=2).get_json()["id"]
+    body = {"description": "x"}
+    assert client.put(f"/appointments/series/{series_id}/occurrences/2031-11-01T09:00:00Z", json=body,
+                      headers=doctor).status_code == 404
+    assert client.put(f"/appointments/series/{series_id}/occurrences/2031-11-05T08:00:00Z", json=body,
+                      headers=doctor).status_code == 404
+    assert client.put(f"/appointments/series/{series_id}/occurrences/x", json=body,
+                      headers=doctor).status_code == 404
+    assert client.delete("/appointments/series/999/occurrences/2031-11-01T08:00:00Z",
+                         headers=doctor).status_code == 404
+
+
+def test_series_counts_in_stats(client, doctor, login):
+    before = _stats(client, login)
+    assert _series(client, doctor, "2031-12-01T08:00:00Z", frequency="daily", count=4).status_code == 201
+    assert _stats(client, login) == before + 4
+
+
+def _day_counts():
+    rows = db.fetch_all("SELECT day, count FROM appointment_days")
+    total = db.fetch_one("SELECT value FROM stats_counters WHERE name = 'appointments'")["value"]
+    return Counter({row["day"]: row["count"] for row in rows}), total
+
+
+def test_series_stats_migration_counts_like_the_api(client, doctor):
+    days_before, total_before = _day_counts()
+    weekly = _series(client, doctor, "2032-03-23T08:00:00Z", frequency="weekly", by_weekday=["MO", "TH"],
+                     until="2032-05-01T00:00:00Z", timezone="Europe/Berlin").get_json()["id"]
+    _series(client, doctor, "2032-03-27T22:30:00Z", frequency="daily", interval=2, count=5)
+    url = f"/appointments/series/{weekly}/occurrences"
+    assert client.put(f"{url}/2032-03-25T08:00:00Z", json={"date": "2032-03-26T12:00:00Z"},
+                      headers=doctor).status_code == 200
+    assert client.delete(f"{url}/2032-04-05T07:00:00Z", headers=doctor).status_code == 200
+    days_api, total_api = _day_counts()
+
+    # Eingefrorene Migration auf den aktuellen Bestand: zählt dieselben Termine erneut
+    migration = next(m for m in discover() if m.name == "series_stats")
+    with db.write_transaction() as conn:
+        migration.apply(conn)
+    days_migrated, total_migrated = _day_counts()
+
+    assert days_migrated - days_api == days_api - days_before
+    assert total_migrated - total_api == total_api - total_before > 0
@@ -0,0 +1,76 @@
+import os
+from datetime import datetime
+
+import pytest
+
+from database import db
+from utils.logging_utils import AuditWriter, _STOP
+
+
+def _row(action, user_id=1, timestamp=None):
+    return (timestamp or datetime.utcnow().isoformat(), user_id, action, None, None, 1)
+
+
+def _count(action):
+    return db.fetch_one("SELECT COUNT(*) AS n FROM audit_logs WHERE action = ?", (action,))["n"]
+
+
+@pytest.fixture
+def writer(db_path):
+    writer = AuditWriter("batched", queue_size=100, batch_size=500, flush_interval=60, enqueue_timeout=0.01)
+    yield writer
+    writer.stop()
+
+
+# ============================================================
+# Gebündelter Audit-Writer
+# ============================================================
+def test_writer_flush_writes_queued_events(writer):
+    for _ in range(25):
+        writer.submit(_row("TEST_FLUSH"))
+
+    assert writer.flush(timeout=5)
+    assert _count("TEST_FLUSH") == 25
+    assert writer.stats()["written"] == 25
+
+
+def test_writer_stop_drains_and_writes_later_events_synchronously(writer):
+    for _ in range(10):
+        writer.submit(_row("TEST_STOP"))
+    writer.stop()
+    assert _count("TEST_STOP") == 10
+
+    # Nach stop() liest niemand mehr die Queue -> direkt schreiben
+    writer.submit(_row("TEST_AFTER_STOP"))
+    assert _count("TEST_AFTER_STOP") == 1
+    assert writer.stats()["sync_fallback"] == 1
+    assert writer.stats()["queue_depth"] == 0
+
+
+def test_writer_restarts_dead_thread(writer):
+    writer.submit(_row("TEST_RESTART"))
+    # Thread endet ohne stop() (wie nach fork() oder einem Absturz)
+    writer._queue.put(_STOP)
+    writer._thread.join(5)
+    assert not writer._thread.is_alive()
+
+    writer.submit(_row("TEST_RESTART"))
+    assert writer.flush(timeout=5)
+    assert _count("TEST_RESTART") == 2
+
+
+def test_writer_drops_when_queue_stays_full(db_path):
+    writer = AuditWriter("batched", queue_size=1, batch_size=500, flush_interval=60, enqueue_timeout=0.01)
+    # Kein Thread liest die Queue: als gestartet markieren, ohne zu starten
+    writer._thread = type("Alive", (), {"is_alive": lambda self: True})()
+    writer._pid = os.getpid()
+
+    writer.submit(_row("TEST_FULL"))
+    writer.submit(_row("TEST_FULL"))
+    stats = writer.stats()
+    assert (stats["enqueued"], stats["blocked"], stats["dropped"]) == (1, 1, 1)
+
+
+def test_flush_after_stop_returns_immediately(writer):
+    writer.stop()
+    assert writer.flush(timeout=0.1)
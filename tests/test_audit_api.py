@@ -0,0 +1,77 @@
+import json
+
+import pytest
+
+from database import db
+
+
+def _insert(rows):
+    with db.write_transaction() as conn:
+        conn.executemany(
+            "INSERT INTO audit_logs (timestamp, user_id, action, resource_type, resource_id, success) VALUES (?, ?, ?, ?, ?, ?)",
+            rows
+        )
+
+
+@pytest.fixture
+def audit_events(db_path):
+    actions = ["LOGIN_SUCCESS", "LOGIN_FAILED", "READ_PATIENT"]
+    _insert([
+        (f"2025-01-{1 + i % 28:02d}T10:00:{i % 60:02d}.{i:06d}", 1 + i % 3, actions[i % 3],
+         "Patient" if i % 3 == 2 else None, i % 7 if i % 3 == 2 else None, int(i % 3 != 1))
+        for i in range(600)
+    ])
+
+
+def test_audit_events_keyset_pages(client, login, audit_events):
+    headers = login("admin")
+    query = {"from": "2025-01-05T00:00:00Z", "to": "2025-01-20", "action": "LOGIN_", "limit": 50}
+
+    seen, cursor = [], None
+    while True:
+        response = client.get("/audit/events", query_string={**query, **({"cursor": cursor} if cursor else {})}, headers=headers)
+        assert response.status_code == 200
+        body = response.get_json()
+        assert len(body["events"]) <= 50
+        seen += [(e["timestamp"], e["id"]) for e in body["events"]]
+        cursor = body["next_cursor"]
+        if not cursor:
+            break
+
+    assert seen == sorted(seen) and len(set(seen)) == len(seen)
+    expected = db.fetch_one(
+        "SELECT COUNT(*) AS n FROM audit_logs WHERE timestamp >= '2025-01-05' AND timestamp < '2025-01-20' AND action LIKE 'LOGIN\\_%' ESCAPE '\\'"
+    )["n"]
+    assert len(seen) == expected > 50
+
+    ndjson = client.get("/audit/events", query_string={**query, "format": "ndjson"}, headers=headers)
+    assert ndjson.mimetype == "application/x-ndjson"
+    lines = [json.loads(line) for line in ndjson.get_data(as_text=True).splitlines()]
+    assert [(e["timestamp"], e["id"]) for e in lines] == seen
+
+
+
+# Ohne Session-Cache belegt die Authentifizierung die Request-Verbindung (g)
+@pytest.mark.app_config(DB_POOL_SIZE=1, DB_POOL_TIMEOUT_SECONDS=0.5, EXPORT_FETCH_SIZE=7, SESSION_CACHE_ENABLED=False)
+def test_audit_ndjson_stream_uses_a_single_connection(client, login, audit_events):
+    headers = login("admin")
+    response = client.get("/audit/events", query_string={"format": "ndjson", "action": "LOGIN_FAILED"},
+                          headers=headers)
+    assert response.status_code == 200
+    assert len(response.get_data(as_text=True).splitlines()) == 200
+    stats = db.pool_stats()
+    assert stats["idle"] == stats["open"]
+
+def test_audit_events_filters_and_validation(client, login, audit_events):
+    headers = login("admin")
+    response = client.get(
+        "/audit/events",
+        query_string={"resource_type": "Patient", "resource_id": 3, "success": "true", "limit": 100},
+        headers=headers
+    )
+    events = response.get_json()["events"]
+    assert events and all(e["resource_id"] == 3 and e["success"] and e["action"] == "READ_PATIENT" for e in events)
+
+    assert client.get("/audit/events?cursor=zzz", headers=headers).status_code == 400
+    assert client.get("/audit/events?format=csv", headers=headers).status_code == 400
+    assert client.get("/audit/events", headers=login("doctor1")).status_code == 403
@@ -0,0 +1,91 @@
+from datetime import datetime
+
+import pytest
+
+from database import db
+from utils.audit_archive import run_archiver, verify_archives, iter_archived_events, archive_path, AuditArchiveError
+
+
+def _row(action, user_id=1, timestamp=None):
+    return (timestamp or datetime.utcnow().isoformat(), user_id, action, None, None, 1)
+
+
+def _count(action):
+    return db.fetch_one("SELECT COUNT(*) AS n FROM audit_logs WHERE action = ?", (action,))["n"]
+
+
+def _insert(rows):
+    with db.write_transaction() as conn:
+        conn.executemany(
+            "INSERT INTO audit_logs (timestamp, user_id, action, resource_type, resource_id, success) VALUES (?, ?, ?, ?, ?, ?)",
+            rows
+        )
+
+
+def _archive_config(tmp_path, **overrides):
+    config = {
+        "AUDIT_ARCHIVE_DIR": tmp_path / "archive",
+        "AUDIT_HOT_MONTHS": 2,
+        "AUDIT_ARCHIVE_RETENTION_MONTHS": 0,
+        "AUDIT_ARCHIVE_BATCH_SIZE": 40,
+    }
+    config.update(overrides)
+    return config
+
+
+def test_archiver_writes_checksummed_files_and_purges(db_path, tmp_path):
+    _insert([
+        _row("ARCHIVE_TEST", user_id=1 + i % 3, timestamp=f"2025-{month:02d}-{day:02d}T10:00:00.{i:06d}")
+        for month in (1, 2, 3, 4, 5) for day in (1, 15) for i in range(30)
+    ])
+    config = _archive_config(tmp_path)
+
+    result = run_archiver(config, now=datetime(2025, 6, 10))
+    assert result["cutoff"] == "2025-04"
+    assert [(a["month"], a["rows"], a["purged"]) for a in result["archived"]] == [
+        ("2025-01", 60, 60), ("2025-02", 60, 60), ("2025-03", 60, 60)
+    ]
+    assert db.fetch_one("SELECT COUNT(*) AS n FROM audit_logs WHERE timestamp < '2025-04'")["n"] == 0
+    assert _count("ARCHIVE_TEST") == 120
+
+    path = archive_path(config["AUDIT_ARCHIVE_DIR"], "2025-02")
+    checksum = path.with_name(path.name + ".sha256").read_text().split()[0]
+    index = db.fetch_one("SELECT sha256, rows FROM audit_archive_index WHERE month = '2025-02'")
+    assert (index["sha256"], index["rows"]) == (checksum, 60)
+    assert verify_archives(config["AUDIT_ARCHIVE_DIR"]) == []
+
+    events = list(iter_archived_events(config["AUDIT_ARCHIVE_DIR"], "2025-02-10T00:00:00", "2025-03-10T00:00:00", user_id=2))
+    assert len(events) == 20
+    assert all(e["user_id"] == 2 and "2025-02-10" <= e["timestamp"] < "2025-03-10" for e in events)
+
+    # Erneuter Lauf: nichts mehr zu tun
+    assert run_archiver(config, now=datetime(2025, 6, 10))["archived"] == []
+
+    # Manipulierte Datei fällt auf
+    data = bytearray(path.read_bytes())
+    data[-10] ^= 1
+    path.write_bytes(bytes(data))
+    assert verify_archives(config["AUDIT_ARCHIVE_DIR"]) == [("2025-02", "checksum mismatch")]
+
+
+def test_archiver_refuses_rows_for_purged_month(db_path, tmp_path):
+    _insert([_row("ARCHIVE_TEST", timestamp="2025-01-05T10:00:00")])
+    config = _archive_config(tmp_path)
+    run_archiver(config, now=datetime(2025, 6, 10))
+
+    _insert([_row("ARCHIVE_TEST", timestamp="2025-01-06T10:00:00")])
+    with pytest.raises(AuditArchiveError):
+        run_archiver(config, now=datetime(2025, 6, 10))
+    assert _count("ARCHIVE_TEST") == 1
+
+
+def test_archive_retention_deletes_old_files(db_path, tmp_path):
+    _insert([_row("ARCHIVE_TEST", timestamp="2025-01-05T10:00:00")])
+    config = _archive_config(tmp_path, AUDIT_ARCHIVE_RETENTION_MONTHS=12)
+    run_archiver(config, now=datetime(2025, 6, 10))
+    path = archive_path(config["AUDIT_ARCHIVE_DIR"], "2025-01")
+    assert path.exists()
+
+    assert run_archiver(config, now=datetime(2026, 2, 10))["expired"] == ["2025-01"]
+    assert not path.exists()
+    assert db.fetch_one("SELECT expired_at FROM audit_archive_index WHERE month = '2025-01'")["expired_at"]
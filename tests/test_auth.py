@@ -0,0 +1,103 @@
+import base64
+import hashlib
+import os
+import time
+
+import pytest
+
+from database import db
+from utils import password_pool, security
+from utils.password_pool import PasswordPool, PasswordPoolBusy
+
+
+def _stored_hash(username):
+    return db.fetch_one("SELECT password FROM users WHERE username = ?", (username,))["password"]
+
+
+def _set_hash(username, value):
+    db.execute("UPDATE users SET password = ? WHERE username = ?", (value, username))
+
+
+# ============================================================
+# Hash-Pool: Überlast -> 503 + Retry-After
+# ============================================================
+@pytest.mark.app_config(PASSWORD_HASH_WORKERS=1, PASSWORD_HASH_MAX_PENDING=0, PASSWORD_HASH_RETRY_AFTER_SECONDS=7)
+def test_login_answers_503_when_hash_pool_is_saturated(client):
+    # Einziger Slot belegt (wie durch einen laufenden Login)
+    slots = password_pool._pool._slots
+    assert slots.acquire(blocking=False)
+    try:
+        response = client.post("/login", json={"username": "nurse1", "password": "Nurse123!"})
+    finally:
+        slots.release()
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "7"
+    assert password_pool.password_pool_stats()["rejected"] == 1
+
+
+def test_timed_out_hash_keeps_its_slot_until_it_finishes():
+    pool = PasswordPool(workers=1, max_pending=0, timeout=0.3, retry_after=3, policy=security.password_policy())
+    try:
+        assert pool._call(abs, -1) == 1   # Worker-Prozess starten
+
+        with pytest.raises(PasswordPoolBusy):
+            pool._call(time.sleep, 1.0)
+        assert pool.stats()["timeouts"] == 1
+        # Der Hash läuft im Worker weiter -> Slot bleibt belegt
+        assert pool.stats()["in_flight"] == 1
+        with pytest.raises(PasswordPoolBusy) as busy:
+            pool._call(abs, -2)
+        assert busy.value.retry_after == 3
+
+        deadline = time.monotonic() + 5
+        while pool.stats()["in_flight"] and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert pool.stats()["in_flight"] == 0
+        assert pool._call(abs, -3) == 3
+    finally:
+        pool.shutdown()
+
+
+# ============================================================
+# Versioniertes Hash-Format + Rehash beim Login
+# ============================================================
+def test_login_upgrades_legacy_hash(client, login):
+    salt = os.urandom(16)
+    legacy = base64.b64encode(salt + hashlib.pbkdf2_hmac("sha256", b"Nurse123!", salt, 200_000)).decode()
+    _set_hash("nurse1", legacy)
+
+    login("nurse1")
+
+    upgraded = _stored_hash("nurse1")
+    assert upgraded.startswith("pbkdf2_sha256$i=1000$")
+    assert security.verify_password("Nurse123!", upgraded)
+    assert not security.needs_rehash(upgraded)
+
+
+@pytest.mark.app_config(PASSWORD_PBKDF2_ITERATIONS=2000)
+def test_login_rehashes_after_cost_change(client, login):
+    assert _stored_hash("doctor1").startswith("pbkdf2_sha256$i=1000$")
+    login("doctor1")
+    assert _stored_hash("doctor1").startswith("pbkdf2_sha256$i=2000$")
+
+
+def test_failed_login_keeps_hash(client):
+    before = _stored_hash("doctor1")
+    response = client.post("/login", json={"username": "doctor1", "password": "wrong-password"})
+    assert response.status_code == 401
+    assert _stored_hash("doctor1") == before
+
+
+def test_scrypt_hashes_verify_and_report_rehash():
+    policy = dict(security.password_policy(), algorithm="scrypt", n=2 ** 12)
+    stored = security.hash_password("pw", policy)
+
+    assert stored.startswith("scrypt$")
+    assert security.verify_password("pw", stored) and not security.verify_password("px", stored)
+    assert security.needs_rehash(stored) and not security.needs_rehash(stored, policy)
+
+
+@pytest.mark.parametrize("stored", ["", "abc", "scrypt$n=1$$", "md5$i=1$YQ==$YQ==", "pbkdf2_sha256$i=x$a$b", None])
+def test_malformed_hashes_never_verify(stored):
+    assert security.verify_password("pw", stored) is False
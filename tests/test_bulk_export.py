@@ -0,0 +1,124 @@
+import json
+import time
+
+import pytest
+
+from database import db
+from utils import fhir_bulk_export
+
+
+def _ndjson(response):
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines() if line]
+
+
+def _path(url):
+    return url.replace("http://localhost", "")
+
+
+def _kickoff(client, headers, query=""):
+    return client.post(f"/fhir/$export{query}", headers={**headers, "Prefer": "respond-async"})
+
+
+def _wait(client, headers, location):
+    for _ in range(200):
+        response = client.get(location, headers=headers)
+        if response.status_code != 202:
+            return response
+        time.sleep(0.02)
+    raise AssertionError("export job did not finish")
+
+
+@pytest.mark.app_config(FHIR_EXPORT_FILE_MAX_RESOURCES=2)
+def test_bulk_export_lifecycle(client, login):
+    doctor = login("doctor1")
+    kickoff = _kickoff(client, doctor)
+    assert kickoff.status_code == 202
+    location = _path(kickoff.headers["Content-Location"])
+
+    status = _wait(client, doctor, location)
+    assert status.status_code == 200
+    manifest = status.get_json()
+    assert manifest["transactionTime"].endswith("Z") and manifest["requiresAccessToken"]
+
+    # Höchstens 2 Ressourcen pro Datei
+    patient_files = [o for o in manifest["output"] if o["type"] == "Patient"]
+    assert [o["count"] for o in patient_files] == [2, 1]
+
+    resources = []
+    for output in manifest["output"]:
+        download = client.get(_path(output["url"]), headers=doctor)
+        assert download.status_code == 200
+        resources += _ndjson(download)
+    assert sorted(r["resourceType"] for r in resources) == ["Appointment"] * 3 + ["Patient"] * 3
+
+    # Nur der Ersteller sieht Job und Dateien
+    nurse = login("nurse1")
+    assert client.get(location, headers=nurse).status_code == 404
+    assert client.get(_path(manifest["output"][0]["url"]), headers=nurse).status_code == 404
+
+    assert client.delete(location, headers=doctor).status_code == 202
+    assert client.get(location, headers=doctor).status_code == 404
+
+
+def test_bulk_export_type_filter_and_validation(client, login):
+    doctor = login("doctor1")
+    assert client.post("/fhir/$export", headers=doctor).status_code == 400
+    assert _kickoff(client, doctor, "?_type=Encounter").status_code == 400
+    assert _kickoff(client, doctor, "?_outputFormat=text/csv").status_code == 400
+
+    kickoff = _kickoff(client, doctor, "?_type=Patient")
+    manifest = _wait(client, doctor, _path(kickoff.headers["Content-Location"])).get_json()
+    assert {o["type"] for o in manifest["output"]} == {"Patient"}
+
+
+def test_orphaned_job_is_reported_as_failed(client, login):
+    doctor = login("doctor1")
+    user_id = db.fetch_one("SELECT id FROM users WHERE username = 'doctor1'")["id"]
+    db.execute(
+        "INSERT INTO bulk_export_jobs (id, user_id, status, resource_types, request_url, created_at) "
+        "VALUES ('orphan', ?, 'in-progress', 'Patient', 'x', '2020-01-01T00:00:00')",
+        (user_id,)
+    )
+
+    assert client.get("/fhir/$export-status/orphan", headers=doctor).status_code == 500
+    assert db.fetch_one("SELECT status FROM bulk_export_jobs WHERE id = 'orphan'")["status"] == "failed"
+
+
+@pytest.mark.app_config(FHIR_EXPORT_MAX_CONCURRENCY=3)
+def test_export_pool_follows_current_config(client, login):
+    doctor = login("doctor1")
+    kickoff = _kickoff(client, doctor, "?_type=Patient")
+    assert fhir_bulk_export._executor_size == 3
+    _wait(client, doctor, _path(kickoff.headers["Content-Location"]))
+
+
+@pytest.mark.app_config(EXPORT_FETCH_SIZE=2)
+def test_export_reads_in_keyset_chunks(client, login):
+    doctor = login("doctor1")
+    for day in (3, 4):
+        client.post("/appointments/series", json={
+            "patient_id": 1, "date": f"2031-03-0{day}T08:00:00Z", "description": "Physio",
+            "recurrence": {"frequency": "weekly", "count": 2}
+        }, headers=doctor)
+    client.delete("/appointments/series/1/occurrences/2031-03-10T08:00:00Z", headers=doctor)
+
+    kickoff = _kickoff(client, doctor)
+    manifest = _wait(client, doctor, _path(kickoff.headers["Content-Location"])).get_json()
+    resources = []
+    for output in manifest["output"]:
+        resources += _ndjson(client.get(_path(output["url"]), headers=doctor))
+
+    assert [r["id"] for r in resources if r["resourceType"] == "Patient"] == ["1", "2", "3"]
+    appointments = [r["id"] for r in resources if r["resourceType"] == "Appointment"]
+    assert appointments == ["1", "2", "3", "series-1-20310303T080000Z",
+                            "series-2-20310304T080000Z", "series-2-20310311T080000Z"]
+
+
+def test_keyset_reader_holds_no_snapshot_between_chunks(db_path):
+    rows = db.iter_keyset("SELECT id FROM patients WHERE id > ? ORDER BY id LIMIT ?", chunk_size=1)
+    assert next(rows)["id"] == 1
+
+    # Zwischen zwei Blöcken: kein offener Leser, Checkpoint kommt durch
+    db.execute("UPDATE patients SET diagnosis = 'x' WHERE id = 3")
+    assert db.fetch_one("PRAGMA wal_checkpoint(TRUNCATE)")[0] == 0
+    assert [row["id"] for row in rows] == [2, 3]
@@ -0,0 +1,84 @@
+import threading
+
+import pytest
+
+from database import db
+
+
+# ============================================================
+# Connection-Pool
+# ============================================================
+def test_request_reuses_one_connection_and_returns_it(app):
+    with app.test_request_context():
+        with db.connection() as first:
+            pass
+        with db.connection() as second:
+            pass
+        assert first is second
+        assert db.pool_stats()["idle"] == 0
+
+    stats = db.pool_stats()
+    assert stats["open"] == 1 and stats["idle"] == 1
+
+
+def test_pool_is_bounded_under_concurrency(db_path):
+    db.configure_pool(size=3, timeout=5, healthcheck_after=30)
+
+    def reader():
+        for _ in range(50):
+            db.fetch_one("SELECT 1")
+
+    threads = [threading.Thread(target=reader) for _ in range(10)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    stats = db.pool_stats()
+    assert stats["open"] <= 3
+    assert stats["idle"] == stats["open"]
+
+
+def test_pool_timeout_when_exhausted(db_path):
+    db.configure_pool(size=1, timeout=0.05, healthcheck_after=30)
+    held = db._get_pool().acquire()
+    try:
+        with pytest.raises(db.PoolTimeout):
+            db.fetch_one("SELECT 1")
+    finally:
+        db._get_pool().release(held)
+    assert db.fetch_one("SELECT 1 AS x")["x"] == 1
+
+
+def test_release_rolls_back_open_transaction(db_path):
+    pool = db._get_pool()
+    conn = pool.acquire()
+    conn.execute("BEGIN")
+    conn.execute("DELETE FROM patients")
+    pool.release(conn)
+
+    assert db.fetch_one("SELECT COUNT(*) AS n FROM patients")["n"] == 3
+
+
+# ============================================================
+# WAL / Writer
+# ============================================================
+def test_connections_use_wal(db_path):
+    assert db.fetch_one("PRAGMA journal_mode")[0] == "wal"
+
+
+def test_nested_write_transaction_joins_outer(db_path):
+    with pytest.raises(RuntimeError):
+        with db.write_transaction() as outer:
+            outer.execute("UPDATE patients SET diagnosis = 'a' WHERE id = 1")
+            with db.write_transaction() as inner:
+                assert inner is outer
+                inner.execute("UPDATE patients SET diagnosis = 'b' WHERE id = 2")
+            raise RuntimeError("abort")
+
+    rows = db.fetch_all("SELECT diagnosis FROM patients WHERE id IN (1, 2)")
+    assert all(row["diagnosis"] not in ("a", "b") for row in rows)
+
+
+def test_execute_returns_rowcount(db_path):
+    assert db.execute("UPDATE patients SET diagnosis = 'x' WHERE id <= 2") == 2
@@ -0,0 +1,62 @@
+import json
+
+import pytest
+
+from database import db
+
+
+def _ndjson(response):
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines() if line]
+
+
+# ============================================================
+# Streaming-Exporte
+# ============================================================
+def test_patient_export_streams_role_filtered_ndjson(client, login):
+    response = client.get("/export/patients", headers=login("doctor1"))
+    assert response.status_code == 200 and response.is_streamed
+    assert response.mimetype == "application/x-ndjson"
+    patients = _ndjson(response)
+    assert [p["id"] for p in patients] == [1, 2, 3]
+    assert all("diagnosis" in p for p in patients)
+
+    nurse = _ndjson(client.get("/export/patients", headers=login("nurse1")))
+    assert nurse and all("diagnosis" not in p for p in nurse)
+
+    assert client.get("/export/patients", headers=login("admin")).status_code == 403
+
+
+@pytest.mark.app_config(EXPORT_FETCH_SIZE=7)
+def test_export_returns_every_connection_to_the_pool(client, login):
+    with db.write_transaction() as conn:
+        conn.executemany(
+            "INSERT INTO patients (first_name, last_name, birthdate, mrn) VALUES ('A', 'B', '1990-01-01', ?)",
+            [(f"E-{i}",) for i in range(100)]
+        )
+    headers = login("doctor1")
+
+    assert len(_ndjson(client.get("/export/patients", headers=headers))) == 103
+    stats = db.pool_stats()
+    assert stats["idle"] == stats["open"]
+
+
+def test_fhir_bundle_export_is_valid_json(client, login):
+    response = client.get("/export/fhir/Patient", headers=login("nurse1"))
+    bundle = json.loads(response.get_data(as_text=True))
+    assert bundle["resourceType"] == "Bundle" and bundle["type"] == "searchset"
+    assert [e["resource"]["id"] for e in bundle["entry"]] == ["1", "2", "3"]
+
+
+def test_appointment_export_includes_series_occurrences(client, login):
+    headers = login("doctor1")
+    response = client.post("/appointments/series", json={
+        "patient_id": 1, "date": "2031-03-03T08:00:00Z", "description": "Physio",
+        "recurrence": {"frequency": "daily", "count": 3}
+    }, headers=headers)
+    assert response.status_code == 201
+
+    rows = _ndjson(client.get("/export/appointments", headers=headers))
+    singles = [r for r in rows if "id" in r]
+    occurrences = [r for r in rows if "series_id" in r]
+    assert len(singles) == 3
+    assert [o["date"] for o in occurrences] == [f"2031-03-0{d}T08:00:00Z" for d in (3, 4, 5)]
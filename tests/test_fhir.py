@@ -0,0 +1,92 @@
+import pytest
+
+from database import db
+from utils.logging_utils import flush_audit_log
+
+
+def _batch(*requests):
+    return {
+        "resourceType": "Bundle",
+        "type": "batch",
+        "entry": [{"request": {"method": method, "url": url}} for method, url in requests],
+    }
+
+
+# ============================================================
+# batch-Bundle / _id-Suche
+# ============================================================
+def test_batch_answers_each_entry(client, login):
+    bundle = _batch(("GET", "Patient/2"), ("GET", "Patient/77"), ("DELETE", "Patient/1"), ("GET", "Patient/1"))
+    response = client.post("/fhir", json=bundle, headers=login("doctor1"))
+    assert response.status_code == 200
+
+    body = response.get_json()
+    assert body["type"] == "batch-response"
+    entries = body["entry"]
+    assert [e["response"]["status"][:3] for e in entries] == ["200", "404", "400", "200"]
+    assert entries[0]["resource"]["id"] == "2"
+    assert entries[1]["response"]["outcome"]["resourceType"] == "OperationOutcome"
+
+
+def test_batch_audits_one_entry_per_resource(client, login):
+    client.post("/fhir", json=_batch(("GET", "Patient/2"), ("GET", "Patient/3"), ("GET", "Patient/99")), headers=login("doctor1"))
+    flush_audit_log()
+    rows = db.fetch_all("SELECT resource_id, success FROM audit_logs WHERE resource_type = 'Patient' AND action LIKE 'FHIR%' ORDER BY id")
+    assert [(r["resource_id"], r["success"]) for r in rows][-3:] == [(2, 1), (3, 1), (99, 0)]
+
+
+@pytest.mark.app_config(FHIR_BATCH_MAX_ENTRIES=2)
+def test_batch_validation(client, login):
+    headers = login("doctor1")
+    assert client.post("/fhir", json={"resourceType": "Patient"}, headers=headers).status_code == 400
+    assert client.post("/fhir", json={**_batch(("GET", "Patient/1")), "type": "transaction"}, headers=headers).status_code == 400
+    too_many = _batch(("GET", "Patient/1"), ("GET", "Patient/2"), ("GET", "Patient/3"))
+    assert client.post("/fhir", json=too_many, headers=headers).status_code == 400
+
+
+def test_id_search_returns_found_patients_once(client, login):
+    headers = login("doctor1")
+    body = client.get("/fhir/Patient?_id=3,1,99,1", headers=headers).get_json()
+    assert body["type"] == "searchset" and body["total"] == 2
+    assert sorted(e["resource"]["id"] for e in body["entry"]) == ["1", "3"]
+
+    assert client.get("/fhir/Patient?_id=x", headers=headers).status_code == 400
+    assert client.get("/fhir/Patient", headers=headers).status_code == 400
+
+
+# ============================================================
+# ETag / bedingte Anfragen
+# ============================================================
+def test_conditional_read_and_update(client, login):
+    doctor = login("doctor1")
+    response = client.get("/fhir/Patient/1", headers=doctor)
+    etag = response.headers["ETag"]
+    resource = response.get_json()
+    assert resource["meta"]["versionId"] in etag
+
+    assert client.get("/fhir/Patient/1", headers={**doctor, "If-None-Match": etag}).status_code == 304
+
+    resource.pop("meta")
+    resource["name"] = [{"family": "Mustermann-Neu", "given": ["Max"]}]
+    assert client.put("/fhir/Patient/1", json=resource, headers=doctor).status_code == 428
+
+    updated = client.put("/fhir/Patient/1", json=resource, headers={**doctor, "If-Match": etag})
+    assert updated.status_code == 200
+    assert updated.headers["ETag"] != etag
+    assert updated.get_json()["name"] == [{"text": "Max Mustermann-Neu"}]
+
+    # Veraltete Version
+    assert client.put("/fhir/Patient/1", json=resource, headers={**doctor, "If-Match": etag}).status_code == 412
+    assert client.get("/fhir/Patient/1", headers={**doctor, "If-None-Match": etag}).status_code == 200
+
+
+def test_fhir_update_validation(client, login):
+    doctor = login("doctor1")
+    resource = client.get("/fhir/Patient/1", headers=doctor).get_json()
+    resource.pop("meta")
+    unconditional = {**doctor, "If-Match": "*"}
+
+    assert client.put("/fhir/Patient/1", json={**resource, "id": "2"}, headers=unconditional).status_code == 400
+    assert client.put("/fhir/Patient/1", json={**resource, "birthDate": "x"}, headers=unconditional).status_code == 400
+    assert client.put("/fhir/Patient/999", json={**resource, "id": "999"}, headers=unconditional).status_code == 404
+    assert client.put("/fhir/Patient/1", json=resource, headers={**login("nurse1"), "If-Match": "*"}).status_code == 403
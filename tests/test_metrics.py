@@ -0,0 +1,66 @@
+import pytest
+
+
+PROMETHEUS_METRICS = (
+    "http_request_duration_seconds_bucket",
+    "db_query_duration_seconds_count",
+    "password_hash_duration_seconds_sum",
+    "audit_log_duration_seconds",
+    "db_pool_connections",
+    "audit_events_total",
+)
+
+
+def test_metrics_are_admin_only(client, login):
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers=login("doctor1")).status_code == 403
+
+
+def test_metrics_render_prometheus_text(client, login):
+    doctor = login("doctor1")
+    client.get("/patient/1", headers=doctor)
+
+    response = client.get("/metrics", headers=login("admin"))
+    assert response.status_code == 200
+    assert response.mimetype == "text/plain"
+    assert "version=0.0.4" in response.headers["Content-Type"]
+
+    text = response.get_data(as_text=True)
+    for name in PROMETHEUS_METRICS:
+        assert name in text, name
+    # Keine Patientendaten, nur Endpoint-Namen
+    assert "John" not in text and "MRN-1001" not in text
+
+
+@pytest.mark.app_config(METRICS_ENABLED=False)
+def test_metrics_can_be_disabled(client, login):
+    assert client.get("/metrics", headers=login("admin")).status_code == 404
+
+
+SCRAPE_TOKEN = "s" * 40
+
+
+@pytest.mark.app_config(METRICS_SCRAPE_TOKEN=SCRAPE_TOKEN)
+def test_scrape_token_reads_metrics_without_session(client, login):
+    response = client.get("/metrics", headers={"Authorization": f"Bearer {SCRAPE_TOKEN}"})
+    assert response.status_code == 200
+    assert "http_request_duration_seconds_bucket" in response.get_data(as_text=True)
+
+    assert client.get("/metrics", headers={"Authorization": "Bearer " + "x" * 40}).status_code == 401
+    assert client.get("/metrics", headers=login("doctor1")).status_code == 403
+    assert client.get("/metrics", headers=login("admin")).status_code == 200
+    # Scrape-Token gilt nur für /metrics
+    assert client.get("/stats", headers={"Authorization": f"Bearer {SCRAPE_TOKEN}"}).status_code == 401
+
+
+def test_scrape_token_needs_configuration(client):
+    assert client.get("/metrics", headers={"Authorization": f"Bearer {SCRAPE_TOKEN}"}).status_code == 401
+
+
+def test_short_scrape_token_is_rejected(db_path, monkeypatch):
+    from app import create_app
+    from config import ProductionConfig
+
+    monkeypatch.setattr(ProductionConfig, "METRICS_SCRAPE_TOKEN", "too-short", raising=False)
+    with pytest.raises(ValueError):
+        create_app()
@@ -0,0 +1,52 @@
+import sqlite3
+
+import pytest
+
+from database.migrate import migrate, status, current_version, MigrationError
+
+
+def test_migrations_are_recorded_with_checksums(db_path):
+    entries = status(db_path)
+    assert entries and all(e["applied"] and not e["modified"] for e in entries)
+    assert current_version(db_path) == entries[-1]["version"]
+    assert migrate(db_path) == []
+
+
+def test_modified_migration_is_reported(tmp_path):
+    migrations = tmp_path / "migrations"
+    migrations.mkdir()
+    (migrations / "0001_first.sql").write_text("CREATE TABLE t (x INTEGER);\n")
+    target = tmp_path / "m.db"
+
+    assert [m.version for m in migrate(target, directory=migrations)] == [1]
+
+    (migrations / "0001_first.sql").write_text("CREATE TABLE t (x INTEGER, y INTEGER);\n")
+    assert status(target, migrations) == [{"version": 1, "name": "first", "applied": True, "modified": True}]
+    # Bereits angewendet -> nicht erneut ausführen
+    assert migrate(target, directory=migrations) == []
+
+
+def test_failed_migration_rolls_back(tmp_path):
+    migrations = tmp_path / "migrations"
+    migrations.mkdir()
+    (migrations / "0001_ok.sql").write_text("CREATE TABLE t (x INTEGER);\n")
+    (migrations / "0002_bad.sql").write_text("CREATE TABLE u (x INTEGER);\nINSERT INTO missing VALUES (1);\n")
+    target = tmp_path / "m.db"
+
+    with pytest.raises(MigrationError):
+        migrate(target, directory=migrations)
+
+    conn = sqlite3.connect(target)
+    try:
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    finally:
+        conn.close()
+    assert "t" in tables and "u" not in tables
+    assert current_version(target) == 1
+
+
+def test_migration_versions_without_gaps(tmp_path):
+    (tmp_path / "0001_a.sql").write_text("SELECT 1;\n")
+    (tmp_path / "0003_c.sql").write_text("SELECT 1;\n")
+    with pytest.raises(MigrationError):
+        migrate(tmp_path / "m.db", directory=tmp_path)
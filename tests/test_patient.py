@@ -0,0 +1,101 @@
+from database import db
+from utils.logging_utils import flush_audit_log
+
+
+def _get(client, headers, patient_id=1, **extra):
+    return client.get(f"/patient/{patient_id}", headers={**headers, **extra})
+
+
+def _update(client, headers, body, **extra):
+    return client.post("/patient/update", json=body, headers={**headers, **extra})
+
+
+# ============================================================
+# ETag / If-None-Match
+# ============================================================
+def test_unchanged_patient_answers_304(client, login):
+    doctor = login("doctor1")
+    response = _get(client, doctor)
+    etag = response.headers["ETag"]
+    assert response.headers["Cache-Control"] == "private, no-cache"
+
+    not_modified = _get(client, doctor, **{"If-None-Match": etag})
+    assert not_modified.status_code == 304 and not_modified.data == b""
+    assert not_modified.headers["ETag"] == etag
+
+
+def test_etag_differs_per_role_and_version(client, login):
+    doctor, nurse = login("doctor1"), login("nurse1")
+    doctor_etag = _get(client, doctor).headers["ETag"]
+    nurse_etag = _get(client, nurse).headers["ETag"]
+    assert doctor_etag != nurse_etag
+    # Nurse-Darstellung (ohne Diagnose) ist für den Arzt nicht "unverändert"
+    assert _get(client, doctor, **{"If-None-Match": nurse_etag}).status_code == 200
+
+    assert _update(client, doctor, {"id": 1, "diagnosis": "new", "version": 1}).status_code == 200
+    assert _get(client, doctor, **{"If-None-Match": doctor_etag}).status_code == 200
+
+
+def test_write_responses_are_not_cached(client, login):
+    response = _update(client, login("doctor1"), {"id": 1, "diagnosis": "x", "version": 1})
+    assert response.status_code == 200
+    assert "ETag" not in response.headers
+    assert "no-store" in response.headers["Cache-Control"]
+
+
+# ============================================================
+# Optimistische Nebenläufigkeit (version / If-Match)
+# ============================================================
+def test_stale_version_is_rejected_with_409(client, login):
+    doctor = login("doctor1")
+    version = _get(client, doctor).get_json()["version"]
+
+    first = _update(client, doctor, {"id": 1, "first_name": " Maxi ", "version": version})
+    assert first.status_code == 200
+    assert first.get_json()["version"] == version + 1
+
+    stale = _update(client, doctor, {"id": 1, "diagnosis": "stale", "version": version})
+    assert stale.status_code == 409
+    row = db.fetch_one("SELECT first_name, diagnosis FROM patients WHERE id = 1")
+    assert row["first_name"] == "Maxi"
+    assert row["diagnosis"] != "stale"
+
+
+def test_if_match_uses_etag_from_get(client, login):
+    doctor = login("doctor1")
+    old_etag = _get(client, doctor).headers["ETag"]
+    assert _update(client, doctor, {"id": 1, "diagnosis": "a"}, **{"If-Match": old_etag}).status_code == 200
+    assert _update(client, doctor, {"id": 1, "diagnosis": "b"}, **{"If-Match": old_etag}).status_code == 409
+
+    fresh_etag = _get(client, doctor).headers["ETag"]
+    assert _update(client, doctor, {"id": 1, "diagnosis": "c"}, **{"If-Match": fresh_etag}).status_code == 200
+    assert _update(client, doctor, {"id": 1, "diagnosis": "d"}, **{"If-Match": "*"}).status_code == 200
+
+
+def test_update_without_precondition_is_rejected(client, login):
+    response = _update(client, login("doctor1"), {"id": 1, "diagnosis": "x"})
+    assert response.status_code == 428
+
+
+def test_update_errors(client, login):
+    doctor = login("doctor1")
+    assert _update(client, doctor, {"id": 999, "diagnosis": "x", "version": 1}).status_code == 404
+    assert _update(client, doctor, {"id": 1, "first_name": "  ", "version": 1}).status_code == 400
+    assert _update(client, login("nurse1"), {"id": 1, "diagnosis": "x", "version": 1}).status_code == 403
+
+    other_mrn = _get(client, doctor, 2).get_json()["mrn"]
+    assert _update(client, doctor, {"id": 1, "mrn": other_mrn}, **{"If-Match": "*"}).status_code == 409
+
+
+def test_diagnosis_updates_keep_their_audit_action(client, login):
+    doctor = login("doctor1")
+    assert _update(client, doctor, {"id": 1, "diagnosis": "neu"}, **{"If-Match": "*"}).status_code == 200
+    assert _update(client, doctor, {"id": 2, "first_name": "Erika"}, **{"If-Match": "*"}).status_code == 200
+    flush_audit_log()
+
+    rows = db.fetch_all(
+        "SELECT resource_id, action FROM audit_logs WHERE action LIKE 'UPDATE_PATIENT%' ORDER BY id"
+    )
+    assert [(row["resource_id"], row["action"]) for row in rows] == [
+        (1, "UPDATE_PATIENT_DIAGNOSIS_SUCCESS"), (2, "UPDATE_PATIENT_SUCCESS")
+    ]
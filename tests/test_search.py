@@ -0,0 +1,109 @@
+import pytest
+
+from database import db
+
+
+def _search(client, headers, **query):
+    response = client.get("/search", query_string=query, headers=headers)
+    return response.status_code, response.get_json()
+
+
+def _names(body):
+    return [(r["first_name"], r["last_name"]) for r in body["results"]]
+
+
+@pytest.fixture
+def doctor(login):
+    return login("doctor1")
+
+
+# ============================================================
+# Volltext-Index (FTS5 Trigram)
+# ============================================================
+def test_fts_matches_substrings_case_insensitive(client, doctor):
+    assert _names(_search(client, doctor, q="oss")[1]) == [("Maria", "Rossi")]
+    assert _names(_search(client, doctor, q="OSS")[1]) == [("Maria", "Rossi")]
+    assert _names(_search(client, doctor, q="MRN-1003")[1]) == [("Ali", "Yilmaz")]
+
+
+def test_fts_operators_are_literal(client, doctor):
+    for query in ('a"b', "xyz*", "Doe OR", "NEAR(a b)"):
+        status, body = _search(client, doctor, q=query)
+        assert status == 200 and body["results"] == [], query
+
+
+def test_index_follows_updates(client, doctor):
+    db.execute("UPDATE patients SET last_name = 'Bianchi' WHERE id = 2")
+    assert _names(_search(client, doctor, q="anch")[1]) == [("Maria", "Bianchi")]
+    assert _search(client, doctor, q="Rossi")[1]["results"] == []
+
+
+def test_short_queries_use_like_fallback_including_mrn(client, doctor):
+    assert {r["id"] for r in _search(client, doctor, q="o")[1]["results"]} == {1, 2}
+    db.execute("UPDATE patients SET mrn = 'Q7' WHERE id = 3")
+    assert _names(_search(client, doctor, q="Q7")[1]) == [("Ali", "Yilmaz")]
+    # LIKE-Platzhalter sind wörtlich
+    assert _search(client, doctor, q="%")[1]["results"] == []
+
+
+def test_results_are_ranked_by_relevance(client, doctor):
+    db.execute("INSERT INTO patients (first_name, last_name, birthdate, mrn) VALUES ('Anna', 'Grossmann-Osswald', '1990-01-01', 'X-1')")
+    # Zwei Vorkommen von "oss" vor einem
+    assert _names(_search(client, doctor, q="oss")[1]) == [("Anna", "Grossmann-Osswald"), ("Maria", "Rossi")]
+
+
+def test_broad_query_returns_first_page(client, doctor):
+    with db.write_transaction() as conn:
+        conn.executemany(
+            "INSERT INTO patients (first_name, last_name, birthdate, mrn) VALUES (?, 'Schmidt', '1990-01-01', ?)",
+            [(f"P{i}", f"S-{i}") for i in range(30)]
+        )
+    status, body = _search(client, doctor, q="Schmidt", limit=10)
+    assert status == 200
+    assert len(body["results"]) == 10 and body["next_cursor"]
+
+
+def test_search_requires_clinical_role(client, login):
+    assert _search(client, login("admin"), q="oss")[0] == 403
+    assert client.get("/search?q=oss").status_code == 401
+
+
+# ============================================================
+# Keyset-Pagination
+# ============================================================
+@pytest.fixture
+def many_patients(db_path):
+    with db.write_transaction() as conn:
+        conn.executemany(
+            "INSERT INTO patients (first_name, last_name, birthdate, mrn) VALUES (?, ?, '1990-01-01', ?)",
+            [(f"Anna{i}", "Rossa" if i % 2 else "Bossa", f"X{i}") for i in range(25)]
+        )
+
+
+@pytest.mark.parametrize("query", ["oss", "o"])
+def test_cursor_round_trip_visits_every_match_once(client, doctor, many_patients, query):
+    seen, cursor = [], None
+    while True:
+        status, body = _search(client, doctor, q=query, limit=7, **({"cursor": cursor} if cursor else {}))
+        assert status == 200 and len(body["results"]) <= 7
+        seen += [(r["last_name"], r["id"]) for r in body["results"]]
+        cursor = body["next_cursor"]
+        if not cursor:
+            break
+
+    assert len(set(seen)) == len(seen) >= 26
+    if len(query) < 3:
+        # LIKE-Fallback: (last_name, id)-Reihenfolge
+        assert seen == sorted(seen)
+
+
+def test_page_size_is_capped_and_cursor_validated(client, doctor):
+    assert _search(client, doctor, q="o", limit=100000)[1]["limit"] == 100
+    assert _search(client, doctor, q="o", cursor="zzz")[0] == 400
+
+    # Cursor einer Volltextsuche passt nicht zum LIKE-Fallback (und umgekehrt)
+    ranked_cursor = _search(client, doctor, q="MRN", limit=1)[1]["next_cursor"]
+    like_cursor = _search(client, doctor, q="o", limit=1)[1]["next_cursor"]
+    assert _search(client, doctor, q="o", cursor=ranked_cursor)[0] == 400
+    assert _search(client, doctor, q="MRN", cursor=like_cursor)[0] == 400
+    assert _search(client, doctor, q="   ")[0] == 400
@@ -0,0 +1,80 @@
+import os
+import socket
+import time
+from datetime import datetime
+
+import pytest
+
+from utils.session_cache import SessionCache, UnixSocketBackend, get_session_cache, init_session_cache
+
+
+FAR_FUTURE = datetime(2999, 1, 1)
+
+
+def test_cached_session_skips_lookup_and_logout_invalidates(client, login):
+    headers = login("doctor1")
+    for _ in range(3):
+        assert client.get("/patient/1", headers=headers).status_code == 200
+    stats = get_session_cache().stats()
+    assert stats["hits"] >= 2 and stats["entries"] == 1
+
+    assert client.post("/logout", headers=headers).status_code == 200
+    assert client.get("/patient/1", headers=headers).status_code == 401
+
+
+def test_cache_entries_expire_after_ttl():
+    cache = SessionCache(enabled=True, max_entries=10, ttl=0)
+    cache.put("token", {"id": 1, "username": "u", "role": "doctor"}, FAR_FUTURE)
+    assert cache.get("token") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_cache_evicts_least_recently_used():
+    cache = SessionCache(enabled=True, max_entries=2, ttl=60)
+    for token in ("a", "b"):
+        cache.put(token, {"id": 1, "username": "u", "role": "doctor"}, FAR_FUTURE)
+    cache.get("a")
+    cache.put("c", {"id": 2, "username": "v", "role": "nurse"}, FAR_FUTURE)
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert cache.stats()["evictions"] == 1
+
+
+@pytest.mark.skipif(not hasattr(os, "fork") or not hasattr(socket, "AF_UNIX"), reason="needs fork + AF_UNIX")
+def test_unix_backend_invalidates_other_processes(tmp_path):
+    ready_r, ready_w = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        # Kind = anderer Worker mit eigenem Cache
+        code = 2
+        try:
+            cache = SessionCache(True, 10, 60, UnixSocketBackend(tmp_path))
+            cache.put("token", {"id": 7, "username": "u", "role": "doctor"}, FAR_FUTURE)
+            os.write(ready_w, b"1")
+            deadline = time.monotonic() + 5
+            while cache.get("token") is not None and time.monotonic() < deadline:
+                time.sleep(0.01)
+            code = 0 if cache.get("token") is None else 1
+        finally:
+            os._exit(code)
+
+    os.close(ready_w)
+    assert os.read(ready_r, 1) == b"1"
+    cache = SessionCache(True, 10, 60, UnixSocketBackend(tmp_path))
+    cache.invalidate_user(7)
+
+    _, status = os.waitpid(pid, 0)
+    assert os.waitstatus_to_exitcode(status) == 0
+
+
+@pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="needs AF_UNIX")
+def test_default_backend_invalidates_across_workers(app):
+    # Mehrere Worker: Logout/Passwortänderung müssen alle Caches erreichen
+    assert isinstance(get_session_cache().backend, UnixSocketBackend)
+
+
+def test_cache_is_disabled_without_cross_process_invalidation(app, monkeypatch):
+    monkeypatch.delattr(socket, "AF_UNIX", raising=False)
+    init_session_cache(app)
+    assert not get_session_cache().enabled
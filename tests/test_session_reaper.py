@@ -0,0 +1,74 @@
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from config import Config
+from database import db
+from utils.session_reaper import SessionReaper, reaper_stats
+
+
+@pytest.mark.app_config(SESSION_MAX_PER_USER=2)
+def test_oldest_sessions_are_displaced(client, login):
+    tokens = [login("nurse1") for _ in range(3)]
+    count = db.fetch_one(
+        "SELECT COUNT(*) AS n FROM sessions WHERE user_id = (SELECT id FROM users WHERE username = 'nurse1')"
+    )["n"]
+    assert count == 2
+    assert client.get("/search?q=abc", headers=tokens[0]).status_code == 401
+    assert client.get("/search?q=abc", headers=tokens[-1]).status_code == 200
+
+
+def _insert_sessions(n, expires_at):
+    with db.write_transaction() as conn:
+        conn.executemany(
+            "INSERT INTO sessions (user_id, token, created_at, expires_at) VALUES (1, ?, ?, ?)",
+            [(f"{expires_at}-{i}", "2000-01-01T00:00:00", expires_at) for i in range(n)]
+        )
+
+
+def test_reaper_deletes_expired_rows_in_batches(db_path):
+    _insert_sessions(250, "2000-01-01T00:00:00")
+    _insert_sessions(3, (datetime.utcnow() + timedelta(hours=1)).isoformat())
+    db.execute(
+        "INSERT INTO token_revocations (jti, user_id, expires_at) VALUES ('old', 1, ?), ('new', 1, ?)",
+        (time.time() - 10, time.time() + 3600)
+    )
+
+    reaper = SessionReaper(interval=0, batch_size=100)
+    assert (reaper.stats()["sessions_rows"], reaper.stats()["revocations_rows"]) == (253, 2)
+    assert reaper.run_once() == {"sessions": 250, "revocations": 1}
+
+    assert db.fetch_one("SELECT COUNT(*) AS n FROM sessions")["n"] == 3
+    assert db.fetch_one("SELECT jti FROM token_revocations")["jti"] == "new"
+    stats = reaper.stats()
+    assert (stats["runs"], stats["reaped_sessions"], stats["sessions_rows"], stats["revocations_rows"]) == (1, 250, 3, 1)
+
+
+def test_reaper_thread_runs_only_when_enabled(db_path):
+    disabled = SessionReaper(interval=0.01, batch_size=100, enabled=False)
+    disabled.start()
+    assert disabled._thread is None and not disabled.stats()["enabled"]
+
+    _insert_sessions(10, "2000-01-01T00:00:00")
+    reaper = SessionReaper(interval=0.01, batch_size=100)
+    reaper.start()
+    try:
+        deadline = time.monotonic() + 5
+        while reaper.stats()["sessions_rows"] and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        reaper.stop()
+    assert reaper.stats()["reaped_sessions"] == 10
+
+
+def test_reaper_is_off_by_default_and_table_size_is_counted(client, login):
+    # Sonst startet jeder gunicorn-Worker einen eigenen Reaper
+    assert Config.SESSION_REAPER_ENABLED is False
+    assert reaper_stats()["enabled"] is False
+
+    before = reaper_stats()["sessions_rows"]
+    headers = login("doctor1")
+    assert reaper_stats()["sessions_rows"] == before + 1
+    client.post("/logout", headers=headers)
+    assert reaper_stats()["sessions_rows"] == before
@@ -0,0 +1,65 @@
+import time
+
+import pytest
+
+from database import db
+from utils import session_tokens
+from utils.session_services import invalidate_user_sessions
+
+# Gemeinsamer Schlüssel aller Worker (wie per Environment gesetzt)
+SECRET_KEY = "test-secret-key"
+
+
+@pytest.mark.app_config(SESSION_MODE="stateless", SESSION_REVOCATION_REFRESH_SECONDS=0, SECRET_KEY=SECRET_KEY)
+def test_stateless_tokens_need_no_session_rows(client, login):
+    headers = login("doctor1")
+    assert db.fetch_one("SELECT COUNT(*) AS n FROM sessions")["n"] == 0
+    assert client.get("/patient/1", headers=headers).status_code == 200
+
+    token = headers["Authorization"]
+    tampered = token[:-2] + ("AA" if not token.endswith("AA") else "BB")
+    assert client.get("/patient/1", headers={"Authorization": tampered}).status_code == 401
+
+
+@pytest.mark.app_config(SESSION_MODE="stateless", SESSION_REVOCATION_REFRESH_SECONDS=0, SECRET_KEY=SECRET_KEY)
+def test_logout_revokes_only_that_token(client, login):
+    first, second = login("doctor1"), login("doctor1")
+
+    assert client.post("/logout", headers=first).status_code == 200
+    assert client.get("/patient/1", headers=first).status_code == 401
+    assert client.get("/patient/1", headers=second).status_code == 200
+
+    # Ein anderer Worker lädt den Widerruf aus token_revocations
+    other_worker = session_tokens.RevocationList(refresh_interval=0)
+    assert other_worker.is_revoked(session_tokens._codec.decode(first["Authorization"][7:]))
+    assert not other_worker.is_revoked(session_tokens._codec.decode(second["Authorization"][7:]))
+
+
+@pytest.mark.app_config(SESSION_MODE="stateless", SESSION_REVOCATION_REFRESH_SECONDS=0, SECRET_KEY=SECRET_KEY)
+def test_user_revocation_rejects_all_earlier_tokens(app, client, login):
+    old, other = login("nurse1"), login("nurse1")
+    user_id = session_tokens._codec.decode(old["Authorization"][7:])["uid"]
+
+    # Wie nach einer Passwortänderung
+    with app.test_request_context():
+        invalidate_user_sessions(user_id)
+
+    assert client.get("/search?q=abc", headers=old).status_code == 401
+    assert client.get("/search?q=abc", headers=other).status_code == 401
+
+    time.sleep(0.01)
+    assert client.get("/search?q=abc", headers=login("nurse1")).status_code == 200
+
+
+def test_stateless_mode_requires_configured_secret_key(db_path, monkeypatch):
+    from app import create_app
+    from config import ProductionConfig
+
+    monkeypatch.setattr(ProductionConfig, "SESSION_MODE", "stateless")
+    monkeypatch.setattr(ProductionConfig, "SECRET_KEY", ProductionConfig.GENERATED_SECRET_KEY)
+    with pytest.raises(RuntimeError, match="SECRET_KEY"):
+        create_app()
+
+    # Anderer Worker = anderer Zufallsschlüssel -> Token dort ungültig
+    token = session_tokens.TokenCodec("worker-1").issue({"id": 1, "username": "u", "role": "doctor"}, 60)
+    assert session_tokens.TokenCodec("worker-2").decode(token) is None
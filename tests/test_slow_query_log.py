@@ -0,0 +1,36 @@
+import json
+
+import pytest
+
+from utils.logging_utils import flush_audit_log
+
+
+@pytest.fixture
+def slow_log(tmp_path, monkeypatch):
+    from config import ProductionConfig
+
+    path = tmp_path / "slow_queries.ndjson"
+    # Schwelle 0: jedes Statement wird geloggt
+    for key, value in {"SLOW_QUERY_LOG_ENABLED": True, "SLOW_QUERY_THRESHOLD_MS": 0.0,
+                       "SLOW_QUERY_LOG_PATH": path}.items():
+        monkeypatch.setattr(ProductionConfig, key, value)
+    return path
+
+
+def _logged_sql(path):
+    return [json.loads(line)["sql"] for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_writes_in_write_transaction_are_logged(slow_log, client, login):
+    doctor = login("doctor1")
+    response = client.post("/patient/update", json={"id": 1, "diagnosis": "x"}, headers={**doctor, "If-Match": "*"})
+    assert response.status_code == 200
+    flush_audit_log()
+
+    logged = _logged_sql(slow_log)
+    assert any(sql.startswith("INSERT INTO sessions") for sql in logged)
+    assert any(sql.startswith("UPDATE patients SET diagnosis") for sql in logged)
+    # executemany des Audit-Writers: Parameteranzahl und Plan aus der ersten Zeile
+    audit = [json.loads(line) for line in slow_log.read_text(encoding="utf-8").splitlines()
+             if "INSERT INTO audit_logs" in line]
+    assert audit and audit[0]["params"] == 6 and audit[0]["plan"] == []
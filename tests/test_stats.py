@@ -0,0 +1,39 @@
+from database import db
+
+
+def _counter(name):
+    return db.fetch_one("SELECT value FROM stats_counters WHERE name = ?", (name,))["value"]
+
+
+def _day(day):
+    row = db.fetch_one("SELECT count FROM appointment_days WHERE day = ?", (day,))
+    return row["count"] if row else 0
+
+
+def test_stats_triggers_follow_inserts_updates_and_deletes(db_path):
+    appointments = _counter("appointments")
+    patients = _counter("patients")
+
+    db.execute(
+        "INSERT INTO appointments (patient_id, doctor_id, date, end_date, description) "
+        "VALUES (1, 2, '2031-05-05T09:00:00Z', '2031-05-05T09:30:00Z', 'x')"
+    )
+    assert _counter("appointments") == appointments + 1
+    assert _day("2031-05-05") == 1
+
+    db.execute("UPDATE appointments SET date = '2031-05-06T09:00:00Z', end_date = '2031-05-06T09:30:00Z' WHERE description = 'x'")
+    assert (_day("2031-05-05"), _day("2031-05-06")) == (0, 1)
+
+    db.execute("DELETE FROM appointments WHERE description = 'x'")
+    assert _counter("appointments") == appointments
+    assert _day("2031-05-06") == 0
+
+    db.execute("INSERT INTO patients (first_name, last_name, birthdate, mrn) VALUES ('A', 'B', '1990-01-01', 'T-1')")
+    assert _counter("patients") == patients + 1
+
+
+def test_stats_endpoint_reads_counters(client, login):
+    body = client.get("/stats", headers=login("admin")).get_json()
+    assert body["patients"] == _counter("patients")
+    assert body["appointments"] == _counter("appointments")
+    assert body["users"] == 3 and body["doctors"] == 1